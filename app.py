@@ -1,4 +1,5 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request, stream_with_context
+from datetime import datetime
 import pandas as pd
 import bson.json_util as json_util
 
@@ -14,6 +15,7 @@ from trading_core.responser import (
 from trading_core.common import (
     HistoryDataParamModel,
     StrategyParamModel,
+    SignalParamModel,
     TraderSymbolIntervalLimitModel,
     TransactionModel,
     UserModel,
@@ -27,9 +29,12 @@ from trading_core.common import (
     TransactionModel,
     SessionType,
     StrategyType,
+    TransactionRecordingType,
+    StreamLimitException,
 )
 
 from trading_core.robot import SessionManager
+from trading_core.signal_stream import SignalBroker
 
 app = Flask(__name__)
 
@@ -268,6 +273,11 @@ def get_orders():
     return responser.get_orders(session_id)
 
 
+@app.route("/orders/metrics", methods=["GET"])
+def get_order_metrics():
+    return responser.get_order_metrics()
+
+
 @app.route("/order", methods=["POST"])
 def create_order():
     order_data = request.get_json()
@@ -407,6 +417,12 @@ def get_strategies():
     return responser.get_strategies()
 
 
+@app.route("/strategies/warm_up", methods=["GET"])
+def get_strategy_warm_up():
+    tolerance = request.args.get("tolerance", None, type=float)
+    return responser.get_strategy_warm_up(tolerance)
+
+
 @app.route("/history_data", methods=["GET"])
 def get_history_data():
     trader_id = request.args.get(Const.DB_TRADER_ID, None)
@@ -421,6 +437,15 @@ def get_strategy_data():
     return responser.get_strategy_data(strategy_param)
 
 
+@app.route("/strategy_sweep", methods=["POST"])
+def get_strategy_sweep():
+    strategy_param = StrategyParamModel(**request.json)
+    grid = request.json.get("grid", {})
+    top = request.json.get("top", None)
+
+    return responser.get_strategy_sweep(param=strategy_param, grid=grid, top=top)
+
+
 @app.route("/signals", methods=["GET"])
 def get_signals():
     symbols = request.args.getlist("symbol", None)
@@ -438,6 +463,57 @@ def get_signals():
     )
 
 
+@app.route("/signals/stream", methods=["GET"])
+def stream_signals():
+    format = request.args.get("format", SignalBroker.FORMAT_SSE)
+
+    try:
+        subscription = SignalBroker.subscribe(
+            symbols=request.args.getlist("symbol"),
+            intervals=request.args.getlist("interval"),
+            strategies=request.args.getlist("strategy"),
+            signal_types=request.args.getlist("signal"),
+        )
+    except StreamLimitException as error:
+        return jsonify({"error": str(error)}), 503
+
+    return Response(
+        stream_with_context(SignalBroker.stream(subscription, format=format)),
+        mimetype=(
+            "text/event-stream"
+            if format == SignalBroker.FORMAT_SSE
+            else "application/x-ndjson"
+        ),
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.route("/signals/history", methods=["GET"])
+def get_signal_history():
+    date_from = request.args.get("date_from", None)
+    date_to = request.args.get("date_to", None)
+
+    param = SignalParamModel(
+        trader_id=request.args.get(Const.DB_TRADER_ID, None),
+        symbol=request.args.get(Const.DB_SYMBOL, None),
+        interval=request.args.get(Const.DB_INTERVAL, None),
+        strategy=request.args.get(Const.DB_STRATEGY, None),
+        types=request.args.getlist("signal"),
+    )
+
+    return responser.get_signal_history(
+        param=param,
+        date_from=datetime.fromisoformat(date_from) if date_from else None,
+        date_to=datetime.fromisoformat(date_to) if date_to else None,
+    )
+
+
+@app.route("/signals/backfill", methods=["POST"])
+def backfill_signals():
+    strategy_param = StrategyParamModel(**request.json)
+    return responser.backfill_signals(strategy_param)
+
+
 @app.route("/jobs", methods=["GET"])
 def get_jobs():
     return responser.get_jobs()
@@ -496,6 +572,12 @@ def get_history_simulation():
     take_profit_rate = request.args.get(Const.SRV_TAKE_PROFIT_RATE, 0)
     init_balance = float(request.args.get(Const.SRV_INIT_BALANCE, 1000))
     limit = int(request.args.get(Const.SRV_LIMIT, 400))
+    try:
+        transaction_recording = TransactionRecordingType(
+            request.args.get(Const.SRV_TRANSACTIONS, TransactionRecordingType.FULL)
+        )
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
 
     return responser.get_history_simulation(
         trader_id=trader_id,
@@ -508,6 +590,51 @@ def get_history_simulation():
         take_profit_rate=take_profit_rate,
         init_balance=init_balance,
         limit=limit,
+        transaction_recording=transaction_recording,
+    )
+
+
+@app.route("/history_simulation/stream", methods=["GET"])
+def stream_history_simulation():
+    trader_id = request.args.get("trader_id", None)
+    trading_type = request.args.get("trading_type", None)
+    symbol = request.args.get("symbol", None)
+    intervals = request.args.getlist("interval", None)
+    strategies = request.args.getlist("strategy", None)
+    stop_loss_rate = request.args.get(Const.SRV_STOP_LOSS_RATE, 0)
+    is_trailing_stop = responser.get_param_bool(
+        request.args.get(Const.SRV_IS_TRAILING_STOP_LOSS, "false")
+    )
+    take_profit_rate = request.args.get(Const.SRV_TAKE_PROFIT_RATE, 0)
+    init_balance = float(request.args.get(Const.SRV_INIT_BALANCE, 1000))
+    limit = int(request.args.get(Const.SRV_LIMIT, 400))
+    try:
+        transaction_recording = TransactionRecordingType(
+            request.args.get(Const.SRV_TRANSACTIONS, TransactionRecordingType.SUMMARY)
+        )
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+
+    try:
+        stream = responser.stream_history_simulation(
+            trader_id=trader_id,
+            trading_type=trading_type,
+            symbol=symbol,
+            intervals=intervals,
+            strategies=strategies,
+            stop_loss_rate=stop_loss_rate,
+            is_trailing_stop=is_trailing_stop,
+            take_profit_rate=take_profit_rate,
+            init_balance=init_balance,
+            limit=limit,
+            transaction_recording=transaction_recording,
+        )
+    except StreamLimitException as error:
+        return jsonify({"error": str(error)}), 503
+
+    return Response(
+        stream_with_context(stream),
+        mimetype="application/x-ndjson",
     )
 
 
@@ -529,6 +656,17 @@ def get_dashboard():
 
 @app.route("/trend", methods=["GET"])
 def get_trend():
+    symbols = request.args.getlist("symbol", None)
+    intervals = request.args.getlist("interval", None)
+
+    # Trend heatmap for several symbols and/or intervals
+    if len(symbols) > 1 or len(intervals) > 1:
+        return responser.get_trends(
+            trader_id=request.args.get("trader_id", None),
+            symbols=symbols,
+            intervals=intervals,
+        )
+
     param = TraderSymbolIntervalLimitModel(**request.args)
     return responser.get_trend(param)
 
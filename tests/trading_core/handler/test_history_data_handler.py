@@ -0,0 +1,167 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from datetime import datetime
+import pandas as pd
+
+from trading_core.handler import HistoryDataHandler
+from trading_core.common import HistoryDataModel, HistoryDataParamModel, IntervalType
+
+
+def get_history_data(symbol: str, hours: list) -> HistoryDataModel:
+    return HistoryDataModel(
+        symbol=symbol,
+        interval=IntervalType.HOUR_1,
+        limit=len(hours),
+        data=pd.DataFrame(
+            {"Close": [100] * len(hours)},
+            index=pd.DatetimeIndex([datetime(2024, 10, 10, hour) for hour in hours]),
+        ),
+    )
+
+
+def get_end_datetime(interval, original_datetime=None, closed_bars=False):
+    # The bar 10:00 - 11:00 has been closed just now
+    return datetime(2024, 10, 10, 10) if closed_bars else datetime(2024, 10, 10, 9)
+
+
+class TestHistoryDataHandler:
+    @pytest.fixture
+    def exchange_handler(self):
+        exchange_handler = MagicMock()
+        exchange_handler.get_end_datetime.side_effect = get_end_datetime
+        return exchange_handler
+
+    @pytest.fixture(autouse=True)
+    def no_delay(self):
+        with patch("trading_core.handler.time.sleep") as mock_sleep:
+            yield mock_sleep
+
+    def get_param(self, symbol: str) -> HistoryDataParamModel:
+        return HistoryDataParamModel(
+            symbol=symbol, interval=IntervalType.HOUR_1, limit=2, closed_bars=True
+        )
+
+    def test_closed_bar_is_waited_for(self, exchange_handler, no_delay):
+        exchange_handler.get_history_data.side_effect = [
+            get_history_data("BAR/WAIT", [8, 9]),
+            get_history_data("BAR/WAIT", [9, 10]),
+        ]
+        handler = HistoryDataHandler(exchange_handler=exchange_handler)
+
+        history_data_mdl = handler.get_history_data(self.get_param("BAR/WAIT"))
+
+        assert history_data_mdl.data.index[-1] == datetime(2024, 10, 10, 10)
+        assert exchange_handler.get_history_data.call_count == 2
+        no_delay.assert_called_once_with(HistoryDataHandler.BAR_CLOSE_RETRY_DELAY)
+
+    def test_symbol_without_trading_isnt_waited_for(self, exchange_handler):
+        exchange_handler.get_history_data.return_value = get_history_data(
+            "BAR/CLOSED", [6, 7]
+        )
+        handler = HistoryDataHandler(exchange_handler=exchange_handler)
+
+        handler.get_history_data(self.get_param("BAR/CLOSED"))
+
+        assert exchange_handler.get_history_data.call_count == 1
+
+    def test_retry_limit(self, exchange_handler):
+        exchange_handler.get_history_data.return_value = get_history_data(
+            "BAR/LATE", [8, 9]
+        )
+        handler = HistoryDataHandler(exchange_handler=exchange_handler)
+
+        handler.get_history_data(self.get_param("BAR/LATE"))
+
+        assert (
+            exchange_handler.get_history_data.call_count
+            == HistoryDataHandler.BAR_CLOSE_RETRY_LIMIT + 1
+        )
+
+    def test_prepared_buffer_gets_latest_bars(self, exchange_handler):
+        exchange_handler.get_end_datetime.side_effect = None
+        exchange_handler.get_end_datetime.return_value = datetime(2024, 10, 10, 9)
+        exchange_handler.get_history_data.return_value = get_history_data(
+            "BAR/PREPARED", [7, 8, 9]
+        )
+        handler = HistoryDataHandler(exchange_handler=exchange_handler)
+
+        # Before the bar close
+        handler.get_history_data(self.get_param("BAR/PREPARED"))
+
+        # At the bar close just the latest bars are requested
+        exchange_handler.get_end_datetime.side_effect = get_end_datetime
+        exchange_handler.get_history_data.return_value = get_history_data(
+            "BAR/PREPARED", [9, 10]
+        )
+        history_data_mdl = handler.get_history_data(self.get_param("BAR/PREPARED"))
+
+        increment_param = exchange_handler.get_history_data.call_args.kwargs[
+            "history_data_param"
+        ]
+        assert increment_param.limit == HistoryDataHandler.INCREMENT_LIMIT
+        assert list(history_data_mdl.data.index.hour) == [9, 10]
+
+    def test_pre_close_load_limits_the_request_at_close(self, exchange_handler):
+        param = HistoryDataParamModel(
+            symbol="BAR/PRE_CLOSE",
+            interval=IntervalType.HOUR_1,
+            limit=5,
+            closed_bars=True,
+        )
+
+        # A few seconds before the close of the bar 10:00 - 11:00
+        exchange_handler.get_end_datetime.side_effect = None
+        exchange_handler.get_end_datetime.return_value = datetime(2024, 10, 10, 9)
+        exchange_handler.get_history_data.return_value = get_history_data(
+            "BAR/PRE_CLOSE", [5, 6, 7, 8, 9]
+        )
+        handler = HistoryDataHandler(exchange_handler=exchange_handler)
+        handler.get_history_data(param.model_copy())
+
+        pre_close_param = exchange_handler.get_history_data.call_args.kwargs[
+            "history_data_param"
+        ]
+        assert pre_close_param.limit == 5
+
+        # At the bar close
+        exchange_handler.get_end_datetime.side_effect = get_end_datetime
+        exchange_handler.get_history_data.return_value = get_history_data(
+            "BAR/PRE_CLOSE", [9, 10]
+        )
+        history_data_mdl = handler.get_history_data(param.model_copy())
+
+        close_param = exchange_handler.get_history_data.call_args.kwargs[
+            "history_data_param"
+        ]
+        assert close_param.limit == HistoryDataHandler.INCREMENT_LIMIT
+        assert exchange_handler.get_history_data.call_count == 2
+        assert list(history_data_mdl.data.index.hour) == [6, 7, 8, 9, 10]
+
+    def test_request_at_close_without_pre_close_load(self, exchange_handler):
+        param = HistoryDataParamModel(
+            symbol="BAR/NO_PRE_CLOSE",
+            interval=IntervalType.HOUR_1,
+            limit=5,
+            closed_bars=True,
+        )
+
+        # The buffer has been loaded by the previous tick
+        exchange_handler.get_end_datetime.side_effect = None
+        exchange_handler.get_end_datetime.return_value = datetime(2024, 10, 10, 8)
+        exchange_handler.get_history_data.return_value = get_history_data(
+            "BAR/NO_PRE_CLOSE", [4, 5, 6, 7, 8]
+        )
+        handler = HistoryDataHandler(exchange_handler=exchange_handler)
+        handler.get_history_data(param.model_copy())
+
+        exchange_handler.get_end_datetime.side_effect = get_end_datetime
+        exchange_handler.get_history_data.return_value = get_history_data(
+            "BAR/NO_PRE_CLOSE", [6, 7, 8, 9, 10]
+        )
+        history_data_mdl = handler.get_history_data(param.model_copy())
+
+        close_param = exchange_handler.get_history_data.call_args.kwargs[
+            "history_data_param"
+        ]
+        assert close_param.limit == 5
+        assert list(history_data_mdl.data.index.hour) == [6, 7, 8, 9, 10]
@@ -0,0 +1,54 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from datetime import datetime
+import pandas as pd
+
+from trading_core.handler import QuoteHandler
+from trading_core.common import HistoryDataModel, IntervalType, PriceType
+
+
+def get_history_data(close: float) -> HistoryDataModel:
+    return HistoryDataModel(
+        symbol="BTC/USD",
+        interval=IntervalType.HOUR_1,
+        limit=1,
+        data=pd.DataFrame(
+            {"Close": [close]}, index=pd.DatetimeIndex([datetime(2024, 10, 10)])
+        ),
+    )
+
+
+class TestQuoteHandler:
+    @pytest.fixture
+    def quote_handler(self):
+        exchange_handler = MagicMock()
+        exchange_handler.get_history_data.return_value = get_history_data(100)
+        return QuoteHandler(exchange_handler=exchange_handler)
+
+    def test_get_price_is_cached(self, quote_handler):
+        for _ in range(3):
+            assert quote_handler.get_price("BTC/USD", IntervalType.HOUR_1) == 100
+
+        assert quote_handler._exchange_handler.get_history_data.call_count == 1
+
+    def test_get_price_per_price_type(self, quote_handler):
+        quote_handler.get_price("BTC/USD", IntervalType.HOUR_1, PriceType.BID)
+        quote_handler.get_price("BTC/USD", IntervalType.HOUR_1, PriceType.ASK)
+
+        assert quote_handler._exchange_handler.get_history_data.call_count == 2
+
+    @patch("trading_core.handler.time.monotonic")
+    def test_get_price_expired(self, mock_monotonic, quote_handler):
+        mock_monotonic.return_value = 0
+        quote_handler.get_price("BTC/USD", IntervalType.HOUR_1)
+
+        mock_monotonic.return_value = QuoteHandler.TTL
+        quote_handler.get_price("BTC/USD", IntervalType.HOUR_1)
+
+        assert quote_handler._exchange_handler.get_history_data.call_count == 2
+
+    def test_set_price_by_history_data(self, quote_handler):
+        quote_handler.set_price_by_history_data(get_history_data(105))
+
+        assert quote_handler.get_price("BTC/USD", IntervalType.HOUR_1) == 105
+        assert not quote_handler._exchange_handler.get_history_data.called
@@ -0,0 +1,516 @@
+import pytest
+from unittest.mock import patch, MagicMock
+import threading
+
+from trading_core.common import (
+    APIException,
+    LeverageModel,
+    OrderCloseModel,
+    OrderReason,
+    OrderSideType,
+    OrderStatus,
+)
+from trading_core.api import OrderConfirmation, ByBitComApi
+
+
+@pytest.fixture(autouse=True)
+def no_delay():
+    with patch.object(OrderConfirmation, "INITIAL_DELAY", 0), patch(
+        "trading_core.api.time.sleep"
+    ):
+        yield
+
+
+def test_wait_polls_until_confirmed():
+    check = MagicMock(side_effect=[None, None, "position"])
+    count = OrderConfirmation.get_metrics()[OrderConfirmation.FLD_COUNT]
+
+    assert OrderConfirmation.wait(check) == "position"
+    assert check.call_count == 3
+
+    metrics = OrderConfirmation.get_metrics()
+    assert metrics[OrderConfirmation.FLD_COUNT] == min(
+        count + 1, OrderConfirmation.LATENCY_HISTORY
+    )
+    assert metrics[OrderConfirmation.FLD_LAST] >= 0
+
+
+def test_wait_timeout():
+    failed = OrderConfirmation.get_metrics()[OrderConfirmation.FLD_FAILED]
+
+    assert OrderConfirmation.wait(lambda: None, timeout=-1) is None
+    assert OrderConfirmation.get_metrics()[OrderConfirmation.FLD_FAILED] == failed + 1
+
+
+def test_submit_calls_on_confirm():
+    on_confirm = MagicMock()
+
+    future = OrderConfirmation.submit(lambda: "position", on_confirm)
+
+    assert future.result(timeout=5) == "position"
+    on_confirm.assert_called_once_with("position")
+
+
+class LocalWebSocket:
+    # Private topics of the exchange are pushed by the test
+    def __init__(self):
+        self.callbacks = {}
+        self.connected = True
+        self.ws = object()
+
+    def position_stream(self, callback):
+        self.callbacks["position"] = callback
+
+    def execution_stream(self, callback):
+        self.callbacks["execution"] = callback
+
+    def is_connected(self):
+        return self.connected
+
+    def reconnect(self):
+        # A new connection is created by the websocket, the subscriptions are restored
+        self.ws = object()
+
+    def exit(self):
+        self.connected = False
+
+
+def get_position_info(size: str = "0.02"):
+    return {
+        "symbol": "BTCUSDT",
+        "side": "Buy" if size != "0" else "",
+        "size": size,
+        "avgPrice": "60000",
+        "stopLoss": "59000",
+        "takeProfit": "62000",
+    }
+
+
+def get_execution(order_id: str = "order_1", quantity: str = "0.01"):
+    return {
+        "symbol": "BTCUSDT",
+        "orderId": order_id,
+        "orderLinkId": "position_1",
+        "side": "Buy",
+        "execType": "Trade",
+        "execPrice": "60000",
+        "execQty": quantity,
+        "execFee": "0.3",
+        "execTime": "1728554400000",
+        "closedSize": "0",
+    }
+
+
+class TestByBitPositionStream:
+    @pytest.fixture
+    def websocket(self):
+        return LocalWebSocket()
+
+    @pytest.fixture
+    def stream(self, websocket):
+        stream = ByBitComApi(trader_model=None).get_position_stream(websocket)
+        stream.start()
+        yield stream
+        stream.stop()
+
+    def test_get_open_position(self, stream, websocket):
+        assert not stream.is_known(symbol="BTCUSDT", order_id="order_1")
+
+        websocket.callbacks["execution"]({"data": [get_execution(), get_execution()]})
+        websocket.callbacks["position"]({"data": [get_position_info()]})
+
+        assert stream.is_known(symbol="BTCUSDT", order_id="order_1")
+        assert not stream.is_known(symbol="BTCUSDT", order_id="order_2")
+
+        position_mdl = stream.get_open_position(symbol="BTCUSDT", order_id="order_1")
+        assert position_mdl.position_id == "position_1"
+        assert position_mdl.side == OrderSideType.buy
+        assert position_mdl.quantity == 0.02
+        assert position_mdl.open_price == 60000
+        assert position_mdl.stop_loss == 59000
+        assert position_mdl.take_profit == 62000
+        assert position_mdl.fee == pytest.approx(-0.6)
+
+    def test_closed_position_is_notified(self, stream, websocket):
+        listener = MagicMock()
+        stream.add_listener(key="session_1", callback=listener)
+
+        websocket.callbacks["execution"]({"data": [get_execution()]})
+        websocket.callbacks["position"]({"data": [get_position_info()]})
+        websocket.callbacks["position"]({"data": [get_position_info(size="0")]})
+
+        assert stream.is_known(symbol="BTCUSDT", order_id="order_1")
+        assert stream.get_open_position(symbol="BTCUSDT", order_id="order_1") is None
+
+        stream._executor.shutdown(wait=True)
+        listener.assert_called_once_with("BTCUSDT")
+
+    def test_disconnect_resets_positions(self, stream, websocket):
+        websocket.callbacks["position"]({"data": [get_position_info(size="0")]})
+        assert stream.is_known(symbol="BTCUSDT")
+
+        websocket.connected = False
+        assert not stream.is_known(symbol="BTCUSDT")
+
+        websocket.connected = True
+        assert not stream.is_known(symbol="BTCUSDT")
+
+    def test_reconnect_resets_positions(self, stream, websocket):
+        websocket.callbacks["execution"]({"data": [get_execution()]})
+        websocket.callbacks["position"]({"data": [get_position_info()]})
+        assert stream.is_known(symbol="BTCUSDT", order_id="order_1")
+
+        # The connection is restored between the checks
+        websocket.reconnect()
+        assert not stream.is_known(symbol="BTCUSDT", order_id="order_1")
+        assert stream.get_open_position(symbol="BTCUSDT", order_id="order_1") is None
+
+        # Messages of the new connection are kept
+        websocket.callbacks["execution"]({"data": [get_execution()]})
+        websocket.callbacks["position"]({"data": [get_position_info()]})
+        assert stream.is_known(symbol="BTCUSDT", order_id="order_1")
+
+    def test_message_after_reconnect_drops_previous_state(self, stream, websocket):
+        websocket.callbacks["execution"]({"data": [get_execution()]})
+        websocket.callbacks["position"]({"data": [get_position_info()]})
+
+        websocket.reconnect()
+        websocket.callbacks["position"]({"data": [get_position_info()]})
+
+        # The execution of the previous connection isn't used
+        assert not stream.is_known(symbol="BTCUSDT", order_id="order_1")
+        assert stream.get_open_position(symbol="BTCUSDT", order_id="order_1") is None
+
+    def test_removed_listener_isnt_notified(self, stream, websocket):
+        listener = MagicMock()
+        stream.add_listener(key="session_1", callback=listener)
+        stream.remove_listener(key="session_1")
+
+        websocket.callbacks["position"]({"data": [get_position_info()]})
+        websocket.callbacks["position"]({"data": [get_position_info(size="0")]})
+
+        if stream._executor:
+            stream._executor.shutdown(wait=True)
+        listener.assert_not_called()
+
+
+def get_leverage(
+    symbol: str,
+    order_id: str,
+    position_id: str = "",
+    fee: float = 0,
+    close_reason: OrderReason = OrderReason.NONE,
+) -> LeverageModel:
+    return LeverageModel(
+        session_id="session_1",
+        account_id="account_1",
+        symbol=symbol,
+        side=OrderSideType.buy,
+        quantity=0.01,
+        order_id=order_id,
+        position_id=position_id,
+        fee=fee,
+        close_reason=close_reason,
+    )
+
+
+def get_closed_pnl(symbol: str, order_id: str, closed_pnl: str = "10"):
+    return {
+        "symbol": symbol,
+        "orderId": order_id,
+        "updatedTime": "1728554400000",
+        "avgExitPrice": "61000",
+        "closedPnl": closed_pnl,
+    }
+
+
+class TestByBitBulkPositions:
+    @pytest.fixture
+    def api(self):
+        return ByBitComApi(trader_model=None)
+
+    def test_find_order(self, api):
+        order_mdls = [
+            get_leverage("BTCUSDT", "order_1", "position_1"),
+            get_leverage("ETHUSDT", "order_2", "position_2"),
+        ]
+
+        assert api._find_order(order_mdls, "ETHUSDT") is order_mdls[1]
+        assert api._find_order(order_mdls, "BTCUSDT", order_id="order_1") is (
+            order_mdls[0]
+        )
+        assert api._find_order(order_mdls, "BTCUSDT", position_id="position_1") is (
+            order_mdls[0]
+        )
+        assert api._find_order(order_mdls, "BTCUSDT", order_id="order_2") is None
+        assert (
+            api._find_order(
+                order_mdls, "BTCUSDT", order_id="order_1", position_id="position_2"
+            )
+            is None
+        )
+        assert api._find_order(order_mdls, "XRPUSDT") is None
+
+    def test_get_open_positions(self, api):
+        positions = [
+            # Matched by the latest orders of the account
+            get_leverage("BTCUSDT", "order_1", "position_1"),
+            # Closed on the exchange
+            get_leverage("ETHUSDT", "order_2"),
+            # Open, but older than the latest orders of the account
+            get_leverage("SOLUSDT", "order_3"),
+            # Open, but the order isn't found
+            get_leverage("XRPUSDT", "order_4"),
+        ]
+        positions_info = [
+            get_position_info() | {"symbol": symbol}
+            for symbol in ["BTCUSDT", "SOLUSDT", "XRPUSDT"]
+        ] + [get_position_info(size="0") | {"symbol": "ETHUSDT"}]
+
+        def get_order_history(symbol=None, order_id=None, position_id=None, limit=1):
+            if not symbol:
+                return [
+                    get_leverage("ETHUSDT", "order_0"),
+                    get_leverage("BTCUSDT", "order_1", "position_1"),
+                ]
+            elif symbol == "SOLUSDT":
+                return [get_leverage("SOLUSDT", order_id)]
+            return []
+
+        with patch.object(
+            api, "_get_positions_info", return_value=positions_info
+        ) as get_positions_info, patch.object(
+            api, "_get_order_history", side_effect=get_order_history
+        ) as get_order_history:
+            open_positions = api.get_open_positions(positions)
+
+        get_positions_info.assert_called_once_with()
+        assert get_order_history.call_args_list[0].kwargs == {
+            "limit": ByBitComApi.ORDER_HISTORY_LIMIT
+        }
+        # Only the orders which aren't in the latest orders are requested by symbol
+        assert [
+            call.kwargs["symbol"] for call in get_order_history.call_args_list[1:]
+        ] == ["SOLUSDT", "XRPUSDT"]
+
+        assert list(open_positions.keys()) == ["BTCUSDT", "SOLUSDT"]
+        assert open_positions["BTCUSDT"].order_id == "order_1"
+        assert open_positions["SOLUSDT"].order_id == "order_3"
+        # Values of the position info are applied
+        assert open_positions["BTCUSDT"].quantity == 0.02
+        assert open_positions["BTCUSDT"].open_price == 60000
+        assert open_positions["BTCUSDT"].stop_loss == 59000
+        assert open_positions["BTCUSDT"].take_profit == 62000
+
+    def test_get_open_positions_without_open_positions(self, api):
+        with patch.object(
+            api,
+            "_get_positions_info",
+            return_value=[get_position_info(size="0")],
+        ), patch.object(api, "_get_order_history") as get_order_history:
+            assert api.get_open_positions([get_leverage("BTCUSDT", "order_1")]) == {}
+
+        get_order_history.assert_not_called()
+
+    def test_get_close_positions(self, api):
+        positions = [
+            # The close order is found in the latest orders of the account
+            get_leverage("BTCUSDT", "order_1"),
+            # The close order is requested by symbol
+            get_leverage("ETHUSDT", "order_2"),
+            # Closed before the latest closed PnL of the account
+            get_leverage("SOLUSDT", "order_3"),
+            # Not closed
+            get_leverage("XRPUSDT", "order_4"),
+        ]
+        closed_pnls = [
+            get_closed_pnl("BTCUSDT", "close_1", closed_pnl="10"),
+            get_closed_pnl("ETHUSDT", "close_2", closed_pnl="-5"),
+            # An earlier closed PnL of the symbol
+            get_closed_pnl("BTCUSDT", "close_0", closed_pnl="1"),
+        ]
+        history_order_mdls = [
+            get_leverage(
+                "BTCUSDT", "close_1", fee=-0.3, close_reason=OrderReason.STOP_LOSS
+            )
+        ]
+        sol_close_mdl = OrderCloseModel(close_order_id="close_3")
+
+        with patch.object(
+            api, "_get_closed_pnls", return_value=closed_pnls
+        ) as get_closed_pnls, patch.object(
+            api, "_get_order_history", return_value=history_order_mdls
+        ), patch.object(
+            api,
+            "get_position",
+            return_value=get_leverage("ETHUSDT", "close_2", fee=-0.2),
+        ) as get_position, patch.object(
+            api,
+            "get_close_position",
+            side_effect=lambda symbol, **kwargs: (
+                sol_close_mdl if symbol == "SOLUSDT" else None
+            ),
+        ) as get_close_position:
+            close_positions = api.get_close_positions(positions)
+
+        get_closed_pnls.assert_called_once_with(limit=ByBitComApi.CLOSED_PNL_LIMIT)
+        get_position.assert_called_once_with(symbol="ETHUSDT", order_id="close_2")
+        assert [
+            call.kwargs["symbol"] for call in get_close_position.call_args_list
+        ] == ["SOLUSDT", "XRPUSDT"]
+
+        assert list(close_positions.keys()) == ["BTCUSDT", "ETHUSDT", "SOLUSDT"]
+        assert close_positions["BTCUSDT"].close_order_id == "close_1"
+        assert close_positions["BTCUSDT"].total_profit == 10
+        assert close_positions["BTCUSDT"].close_price == 61000
+        assert close_positions["BTCUSDT"].fee == -0.3
+        assert close_positions["BTCUSDT"].close_reason == OrderReason.STOP_LOSS
+        assert close_positions["ETHUSDT"].total_profit == -5
+        assert close_positions["ETHUSDT"].fee == -0.2
+        assert close_positions["ETHUSDT"].close_reason == OrderReason.TRADER
+        assert close_positions["SOLUSDT"] is sol_close_mdl
+
+    def test_get_close_positions_without_positions(self, api):
+        with patch.object(api, "_get_closed_pnls") as get_closed_pnls:
+            assert api.get_close_positions([]) == {}
+
+        get_closed_pnls.assert_not_called()
+
+
+class TestByBitOrderConfirmation:
+    @pytest.fixture
+    def api(self):
+        return ByBitComApi(trader_model=MagicMock())
+
+    @pytest.fixture
+    def position_mdl(self):
+        return get_leverage("BTCUSDT", order_id="").model_copy(
+            update={"open_price": 60000, "leverage": 2}
+        )
+
+    def get_confirmed_position(self):
+        return get_leverage("BTCUSDT", "order_1", fee=-0.3).model_copy(
+            update={"open_price": 60010, "quantity": 0.0099}
+        )
+
+    def test_create_leverage_with_callback(self, api, position_mdl):
+        confirmed = threading.Event()
+        on_confirm = MagicMock(side_effect=lambda _: confirmed.set())
+
+        with patch.object(
+            api,
+            "_place_order",
+            return_value={"orderId": "order_1", "orderLinkId": "position_1"},
+        ), patch.object(
+            api,
+            "get_open_position",
+            side_effect=[None, self.get_confirmed_position()],
+        ) as get_open_position:
+            created_position_mdl = api.create_leverage(
+                position_mdl, on_confirm=on_confirm
+            )
+
+            # The placed position is returned before the confirmation
+            assert created_position_mdl.order_id == "order_1"
+            assert created_position_mdl.position_id == "position_1"
+            assert created_position_mdl.status == OrderStatus.opened
+            assert created_position_mdl.open_price == 60000
+            assert created_position_mdl.quantity == 0.01
+
+            assert confirmed.wait(timeout=5)
+
+        get_open_position.assert_called_with(symbol="BTCUSDT", order_id="order_1")
+        confirmed_position_mdl = on_confirm.call_args.args[0]
+        assert confirmed_position_mdl.order_id == "order_1"
+        assert confirmed_position_mdl.position_id == "position_1"
+        assert confirmed_position_mdl.session_id == position_mdl.session_id
+        assert confirmed_position_mdl.leverage == 2
+        assert confirmed_position_mdl.open_price == 60010
+        assert confirmed_position_mdl.quantity == 0.0099
+
+    def test_create_leverage_without_callback(self, api, position_mdl):
+        with patch.object(
+            api,
+            "_place_order",
+            return_value={"orderId": "order_1", "orderLinkId": "position_1"},
+        ), patch.object(
+            api,
+            "get_open_position",
+            side_effect=[None, None, self.get_confirmed_position()],
+        ):
+            created_position_mdl = api.create_leverage(position_mdl)
+
+        assert created_position_mdl.open_price == 60010
+
+    def test_create_leverage_isnt_confirmed(self, api, position_mdl):
+        with patch.object(
+            api,
+            "_place_order",
+            return_value={"orderId": "order_1", "orderLinkId": "position_1"},
+        ), patch.object(
+            api, "get_open_position", return_value=None
+        ), patch.object(
+            OrderConfirmation, "TIMEOUT", 0.01
+        ):
+            with pytest.raises(APIException):
+                api.create_leverage(position_mdl)
+
+    def test_close_leverage_waits_for_the_closing_order(self, api):
+        closed_pnls = [
+            # The closed PnL of the previous position is returned until the order is settled
+            [get_closed_pnl("BTCUSDT", "close_0", closed_pnl="1")],
+            [get_closed_pnl("BTCUSDT", "close_0", closed_pnl="1")],
+            [get_closed_pnl("BTCUSDT", "close_1", closed_pnl="10")],
+        ]
+
+        with patch.object(
+            api, "_check_open_position", return_value=get_position_info()
+        ), patch.object(
+            api,
+            "_place_order",
+            return_value={"orderId": "close_1", "orderLinkId": "position_2"},
+        ) as place_order, patch.object(
+            api, "_get_closed_pnls", side_effect=closed_pnls
+        ) as get_closed_pnls, patch.object(
+            api,
+            "get_position",
+            return_value=get_leverage(
+                "BTCUSDT", "close_1", fee=-0.3, close_reason=OrderReason.TRADER
+            ),
+        ):
+            closed_order_mdl = api.close_leverage(symbol="BTCUSDT")
+
+        # The closing order is opposite to the position
+        closing_position_mdl = place_order.call_args.kwargs["position_mdl"]
+        assert closing_position_mdl.side == OrderSideType.sell
+        assert closing_position_mdl.quantity == 0.02
+
+        assert get_closed_pnls.call_count == 3
+        assert closed_order_mdl.close_order_id == "close_1"
+        assert closed_order_mdl.total_profit == 10
+        assert closed_order_mdl.fee == -0.3
+
+    def test_close_leverage_isnt_confirmed(self, api):
+        with patch.object(
+            api, "_check_open_position", return_value=get_position_info()
+        ), patch.object(
+            api,
+            "_place_order",
+            return_value={"orderId": "close_1", "orderLinkId": "position_2"},
+        ), patch.object(
+            api,
+            "_get_closed_pnls",
+            return_value=[get_closed_pnl("BTCUSDT", "close_0")],
+        ), patch.object(
+            OrderConfirmation, "TIMEOUT", 0.01
+        ):
+            with pytest.raises(APIException):
+                api.close_leverage(symbol="BTCUSDT")
+
+    def test_close_leverage_without_open_position(self, api):
+        with patch.object(api, "_check_open_position", return_value=None), patch.object(
+            api, "_place_order"
+        ) as place_order:
+            assert api.close_leverage(symbol="BTCUSDT") is None
+
+        place_order.assert_not_called()
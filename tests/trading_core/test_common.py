@@ -391,6 +391,7 @@ def test_strategy_param_model():
     assert model.limit == 100
     assert model.from_buffer == True
     assert model.closed_bars == False
+    assert model.latest_only == False
 
 
 ############################
@@ -48,6 +48,59 @@ def test_get_config_value_string(mock_config_ini):
     assert config.get_config_value("some_other_property") == "some_value"
 
 
+def test_get_config_value_warm_up_tolerance(mock_config_ini):
+    config = Config()
+    # Test for float config value and its default
+    assert (
+        config.get_config_value(Const.CONF_PROPERTY_WARM_UP_TOLERANCE)
+        == Const.DEFAULT_WARM_UP_TOLERANCE
+    )
+
+    mock_config_ini[Config.CONFIG_GROUP_NAME_PROPERTY][
+        Const.CONF_PROPERTY_WARM_UP_TOLERANCE
+    ] = "0.01"
+    assert config.get_config_value(Const.CONF_PROPERTY_WARM_UP_TOLERANCE) == 0.01
+
+
+def test_get_config_value_signal_store(mock_config_ini):
+    config = Config()
+    # Test for the signal store backend and its default
+    assert (
+        config.get_config_value(Const.CONF_PROPERTY_SIGNAL_STORE)
+        == Const.SIGNAL_STORE_LOCAL
+    )
+
+    mock_config_ini[Config.CONFIG_GROUP_NAME_PROPERTY][
+        Const.CONF_PROPERTY_SIGNAL_STORE
+    ] = Const.SIGNAL_STORE_MONGO
+    assert (
+        config.get_config_value(Const.CONF_PROPERTY_SIGNAL_STORE)
+        == Const.SIGNAL_STORE_MONGO
+    )
+
+
+def test_get_config_value_position_stream(mock_config_ini):
+    config = Config()
+    # Test for the optional position stream and its default
+    assert config.get_config_value(Const.CONF_PROPERTY_POSITION_STREAM) is False
+
+    mock_config_ini[Config.CONFIG_GROUP_NAME_PROPERTY][
+        Const.CONF_PROPERTY_POSITION_STREAM
+    ] = "True"
+    assert config.get_config_value(Const.CONF_PROPERTY_POSITION_STREAM) is True
+
+
+def test_get_config_value_simulation_workers(mock_config_ini):
+    config = Config()
+    # Test for the worker count of the simulation grid and its default
+    assert config.get_config_value(Const.CONF_PROPERTY_SIMULATION_WORKERS) == 0
+
+    mock_config_ini[Config.CONFIG_GROUP_NAME_PROPERTY][
+        Const.CONF_PROPERTY_SIMULATION_WORKERS
+    ] = "4"
+    assert config.get_config_value(Const.CONF_PROPERTY_SIMULATION_WORKERS) == 4
+
+
 def test_get_env_value_exists(mock_env):
     config = Config()
     # Test when env var exists
@@ -114,6 +167,10 @@ def test_update_config(mock_config_ini, caplog):
             Const.CONF_PROPERTY_ROBOT_LOG: True,
             Const.CONF_PROPERTY_HIST_SIMULATION_LOG: False,
             "hs_trader_id": "658dab8b3b0719ad3f9b53dd",
+            "warm_up_tolerance": 0.001,
+            "signal_store": "local",
+            "position_stream": False,
+            "simulation_workers": 0,
         }
     )
 
@@ -29,6 +29,7 @@ def test_const_db_collections():
     assert Const.DB_COLLECTION_ORDERS == "orders"
     assert Const.DB_COLLECTION_LEVERAGES == "leverages"
     assert Const.DB_COLLECTION_TRANSACTIONS == "transactions"
+    assert Const.DB_COLLECTION_SIGNALS == "signals"
 
 
 def test_const_db_fields():
@@ -0,0 +1,89 @@
+import pytest
+import math
+
+# Indicators are calculated by pandas_ta
+pytest.importorskip("pandas_ta")
+
+from trading_core.indicator import IndicatorWarmUp
+
+
+class TestIndicatorWarmUp:
+    @pytest.mark.parametrize(
+        "kind, length, alpha",
+        [
+            ("ema", 30, 2 / 31),
+            ("ema", 100, 2 / 101),
+            ("atr", 14, 1 / 14),
+            ("rma", 20, 1 / 20),
+            ("cci", 14, 0),
+        ],
+    )
+    def test_alpha(self, kind, length, alpha):
+        assert IndicatorWarmUp.get_alpha(kind=kind, length=length) == pytest.approx(
+            alpha
+        )
+
+    def test_window_indicator_is_exact_after_the_window(self):
+        assert IndicatorWarmUp.get_warm_up(kind="cci", length=14, tolerance=0.001) == 13
+        assert IndicatorWarmUp.get_warm_up(kind="cci", length=50, tolerance=0.5) == 49
+
+    @pytest.mark.parametrize(
+        "kind, length, alpha",
+        [("ema", 100, 2 / 101), ("ema", 8, 2 / 9), ("atr", 14, 1 / 14)],
+    )
+    @pytest.mark.parametrize("tolerance", [0.001, 0.05])
+    def test_recursive_indicator_decays_within_the_tolerance(
+        self, kind, length, alpha, tolerance
+    ):
+        warm_up = IndicatorWarmUp.get_warm_up(
+            kind=kind, length=length, tolerance=tolerance
+        )
+
+        assert warm_up == (length - 1) + math.ceil(
+            math.log(tolerance) / math.log(1 - alpha)
+        )
+        assert (1 - alpha) ** (warm_up - length + 1) <= tolerance
+        assert (1 - alpha) ** (warm_up - length) > tolerance
+
+    def test_default_tolerance_is_read_from_the_config(self):
+        assert IndicatorWarmUp.get_warm_up(
+            kind="ema", length=100
+        ) == IndicatorWarmUp.get_warm_up(
+            kind="ema", length=100, tolerance=IndicatorWarmUp.get_tolerance()
+        )
+
+    def test_accuracy_cost(self):
+        # Less bars than the window - the first value isn't calculated at all
+        assert (
+            IndicatorWarmUp.get_accuracy_cost(kind="ema", length=100, warm_up=98)
+            == 1.0
+        )
+        assert (
+            IndicatorWarmUp.get_accuracy_cost(kind="cci", length=14, warm_up=12)
+            == 1.0
+        )
+
+        # Window indicators are exact after the window
+        assert (
+            IndicatorWarmUp.get_accuracy_cost(kind="cci", length=14, warm_up=13)
+            == 0.0
+        )
+
+        # Recursive indicators keep the weight of the truncated history
+        assert IndicatorWarmUp.get_accuracy_cost(
+            kind="ema", length=100, warm_up=99
+        ) == pytest.approx(1.0)
+        assert IndicatorWarmUp.get_accuracy_cost(
+            kind="ema", length=100, warm_up=299
+        ) == pytest.approx((99 / 101) ** 200)
+        assert IndicatorWarmUp.get_accuracy_cost(
+            kind="atr", length=14, warm_up=20
+        ) == pytest.approx((13 / 14) ** 7)
+
+    def test_accuracy_cost_of_the_warm_up_is_within_the_tolerance(self):
+        warm_up = IndicatorWarmUp.get_warm_up(kind="ema", length=100, tolerance=0.001)
+
+        assert (
+            IndicatorWarmUp.get_accuracy_cost(kind="ema", length=100, warm_up=warm_up)
+            <= 0.001
+        )
@@ -3,7 +3,9 @@ from unittest.mock import MagicMock, patch
 from datetime import datetime
 from bson import ObjectId
 
-from trading_core.mongodb import MongoBase, Const
+import pymongo
+
+from trading_core.mongodb import MongoBase, MongoUnitOfWork, Const
 
 
 @pytest.fixture
@@ -153,3 +155,54 @@ class TestMongoBase:
             mongo_base._convert_id(None)
 
         assert isinstance(mongo_base._convert_id(str(ObjectId())), ObjectId)
+
+
+def get_mongo_db(name: str):
+    mongo_db = MongoBase()
+    mongo_db._collection = MagicMock()
+    mongo_db._collection.name = name
+    mongo_db._collection.bulk_write.return_value.matched_count = 0
+    return mongo_db
+
+
+class TestMongoUnitOfWork:
+    def test_flush_one_bulk_write_per_collection(self):
+        transactions_db = get_mongo_db("transactions")
+        leverages_db = get_mongo_db("leverages")
+        leverages_db._collection.bulk_write.return_value.matched_count = 1
+
+        uow = MongoUnitOfWork()
+        leverage_id = uow.insert_one(leverages_db, {"status": "opened"})
+        uow.insert_one(transactions_db, {"type": "DB_CREATE_POSITION"})
+        uow.update_one(leverages_db, id=leverage_id, query={"status": "closed"})
+        uow.insert_one(transactions_db, {"type": "DB_CLOSE_POSITION"})
+
+        assert ObjectId.is_valid(leverage_id)
+        assert uow.flush() == 4
+        assert not uow.has_requests()
+
+        requests = leverages_db._collection.bulk_write.call_args[0][0]
+        assert leverages_db._collection.bulk_write.call_count == 1
+        assert leverages_db._collection.bulk_write.call_args[1] == {"ordered": True}
+        assert isinstance(requests[0], pymongo.InsertOne)
+        assert isinstance(requests[1], pymongo.UpdateOne)
+
+        requests = transactions_db._collection.bulk_write.call_args[0][0]
+        assert transactions_db._collection.bulk_write.call_count == 1
+        assert [request._doc["type"] for request in requests] == [
+            "DB_CREATE_POSITION",
+            "DB_CLOSE_POSITION",
+        ]
+
+    def test_flush_all_collections_on_error(self):
+        balances_db = get_mongo_db("balances")
+        transactions_db = get_mongo_db("transactions")
+
+        uow = MongoUnitOfWork()
+        uow.update_one(balances_db, id=str(ObjectId()), query={"total_balance": 1})
+        uow.insert_one(transactions_db, {"type": "DB_UPDATE_BALANCE"})
+
+        with pytest.raises(Exception, match="DB: FLUSH - balances"):
+            uow.flush()
+
+        assert transactions_db._collection.bulk_write.called
@@ -0,0 +1,1033 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from datetime import datetime, timedelta, timezone
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.triggers.cron import CronTrigger
+import http.server
+import json
+import os
+import re
+import smtplib
+import threading
+import time
+import urllib.parse
+
+from trading_core.constants import Const
+from trading_core.common import (
+    AlertModel,
+    AlertType,
+    ExchangeId,
+    IntervalType,
+    SignalModel,
+    SignalParamModel,
+    SignalType,
+    StrategyType,
+    StreamLimitException,
+    TransactionRecordingType,
+)
+
+# Strategies of the signals are calculated by pandas_ta
+pytest.importorskip("pandas_ta")
+
+from trading_core.responser import (
+    AlertSignalPlanner,
+    IntervalTickPipeline,
+    JobScheduler,
+    MessageEmail,
+    Messages,
+    NotificationBot,
+    NotificationEmail,
+    OffsetTrigger,
+    RateLimiter,
+    ResponserEmail,
+    ResponserWeb,
+    SmtpSender,
+)
+import trading_core.responser as responser_module
+from trading_core.strategy import SignalFactory, StrategyFactory
+from trading_core.simulation import SimulationGrid
+
+
+def get_alert(
+    trader_id: str,
+    channel_id: str,
+    symbols: list,
+    signals: list = [],
+    intervals: list = [IntervalType.HOUR_1],
+) -> AlertModel:
+    return AlertModel(
+        _id=f"{channel_id}_{trader_id}",
+        user_id="user_1",
+        trader_id=trader_id,
+        channel_id=channel_id,
+        type=AlertType.SIGNAL,
+        symbols=symbols,
+        intervals=intervals,
+        strategies=[StrategyType.CCI_20_CROSS_100],
+        signals=signals,
+    )
+
+
+def get_signal(param, signal: SignalType) -> SignalModel:
+    return SignalModel(
+        trader_id=param.trader_id,
+        symbol=param.symbol,
+        interval=param.interval,
+        strategy=param.strategy,
+        date_time=datetime(2024, 10, 10, 10),
+        open=1,
+        high=2,
+        low=0.5,
+        close=1.5,
+        volume=100,
+        signal=signal,
+    )
+
+
+@pytest.fixture
+def trader_handler():
+    # Traders 1 and 2 are accounts of the same exchange
+    exchanges = {
+        "trader_1": ExchangeId.demo_bybit_com,
+        "trader_2": ExchangeId.demo_bybit_com,
+        "trader_3": ExchangeId.bybit_com,
+    }
+
+    trader_handler = MagicMock()
+    trader_handler.get_trader.side_effect = lambda id: MagicMock(
+        exchange_id=exchanges[id]
+    )
+
+    with patch("trading_core.responser.buffer_runtime_handler") as handler:
+        handler.get_trader_handler.return_value = trader_handler
+        yield trader_handler
+
+
+class TestAlertSignalPlanner:
+    def test_signal_keys_are_unique_per_exchange(self, trader_handler):
+        planner = AlertSignalPlanner(
+            alert_mdls=[
+                get_alert("trader_1", "channel_1", ["BTC/USD", "ETH/USD"]),
+                get_alert("trader_2", "channel_2", ["BTC/USD"]),
+                get_alert("trader_3", "channel_3", ["BTC/USD"]),
+            ],
+            interval=IntervalType.HOUR_1,
+        )
+
+        assert planner.get_signal_keys() == [
+            (
+                ExchangeId.demo_bybit_com,
+                "BTC/USD",
+                IntervalType.HOUR_1,
+                StrategyType.CCI_20_CROSS_100,
+            ),
+            (
+                ExchangeId.demo_bybit_com,
+                "ETH/USD",
+                IntervalType.HOUR_1,
+                StrategyType.CCI_20_CROSS_100,
+            ),
+            (
+                ExchangeId.bybit_com,
+                "BTC/USD",
+                IntervalType.HOUR_1,
+                StrategyType.CCI_20_CROSS_100,
+            ),
+        ]
+        # The signal of the exchange is evaluated by the first trader
+        assert [param.trader_id for param in planner.get_signal_params()] == [
+            "trader_1",
+            "trader_1",
+            "trader_3",
+        ]
+        assert len(planner.get_alerts(planner.get_signal_keys()[0])) == 2
+        # Traders are read once
+        assert trader_handler.get_trader.call_count == 3
+
+    def test_interval_of_the_job_overrides_alert_intervals(self, trader_handler):
+        alert_mdl = get_alert(
+            "trader_1",
+            "channel_1",
+            ["BTC/USD"],
+            intervals=[IntervalType.HOUR_1, IntervalType.HOUR_4],
+        )
+
+        assert len(AlertSignalPlanner(alert_mdls=[alert_mdl]).get_signal_keys()) == 2
+        assert (
+            len(
+                AlertSignalPlanner(
+                    alert_mdls=[alert_mdl], interval=IntervalType.HOUR_4
+                ).get_signal_keys()
+            )
+            == 1
+        )
+
+    def test_run_evaluates_once_and_fans_out(self, trader_handler):
+        planner = AlertSignalPlanner(
+            alert_mdls=[
+                get_alert("trader_1", "channel_1", ["BTC/USD", "ETH/USD"]),
+                get_alert(
+                    "trader_2", "channel_2", ["BTC/USD"], signals=[SignalType.SELL]
+                ),
+                get_alert(
+                    "trader_2",
+                    "channel_1",
+                    ["BTC/USD"],
+                    signals=[SignalType.BUY],
+                ),
+            ],
+            interval=IntervalType.HOUR_1,
+        )
+
+        signals = {"BTC/USD": SignalType.BUY, "ETH/USD": SignalType.NONE}
+
+        with patch("trading_core.responser.SignalFactory") as signal_factory:
+            signal_factory.return_value.evaluate_signals.side_effect = (
+                lambda params: [
+                    (param, get_signal(param, signals[param.symbol]), None)
+                    for param in params
+                ]
+            )
+
+            results = planner.run()
+
+        evaluate_signals = signal_factory.return_value.evaluate_signals
+        evaluate_signals.assert_called_once()
+        assert len(evaluate_signals.call_args.kwargs["params"]) == 2
+
+        # The NONE signal isn't sent, the SELL alert doesn't get the BUY signal
+        # and the channel gets the signal once
+        assert [
+            (signal_mdl.symbol, channel_ids) for signal_mdl, channel_ids in results
+        ] == [("BTC/USD", ["channel_1"])]
+
+    def test_run_skips_failed_signals(self, trader_handler):
+        planner = AlertSignalPlanner(
+            alert_mdls=[get_alert("trader_1", "channel_1", ["BTC/USD", "ETH/USD"])],
+            interval=IntervalType.HOUR_1,
+        )
+
+        def evaluate_signals(params):
+            return [
+                (params[0], None, Exception("API error")),
+                (params[1], get_signal(params[1], SignalType.STRONG_SELL), None),
+            ]
+
+        with patch("trading_core.responser.SignalFactory") as signal_factory:
+            signal_factory.return_value.evaluate_signals.side_effect = evaluate_signals
+
+            results = planner.run()
+
+        assert [
+            (signal_mdl.symbol, channel_ids) for signal_mdl, channel_ids in results
+        ] == [("ETH/USD", ["channel_1"])]
+
+
+class LocalBotApi(http.server.ThreadingHTTPServer):
+    # Telegram API fake: the first requests of the failing chats are throttled
+    def __init__(self, throttled_chats: list = []):
+        super().__init__(("127.0.0.1", 0), LocalBotApiHandler)
+        self.messages = []
+        self.throttled_chats = list(throttled_chats)
+        self.lock = threading.Lock()
+
+    def get_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class LocalBotApiHandler(http.server.BaseHTTPRequestHandler):
+    def do_POST(self):
+        length = int(self.headers["Content-Length"])
+        params = urllib.parse.parse_qs(self.rfile.read(length).decode())
+        chat_id = params["chat_id"][0]
+
+        with self.server.lock:
+            if chat_id in self.server.throttled_chats:
+                self.server.throttled_chats.remove(chat_id)
+                status = 429
+                body = {"ok": False, "parameters": {"retry_after": 0}}
+            else:
+                self.server.messages.append((chat_id, params["text"][0]))
+                status = 200
+                body = {"ok": True}
+
+        content = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestNotificationBot:
+    @pytest.fixture
+    def bot_api(self):
+        bot_api = LocalBotApi(throttled_chats=["chat_2"])
+        thread = threading.Thread(target=bot_api.serve_forever, daemon=True)
+        thread.start()
+
+        channels = {
+            "channel_1": MagicMock(channel="chat_1"),
+            "channel_2": MagicMock(channel="chat_2"),
+        }
+
+        with patch.dict(
+            os.environ, {"BOT_TOKEN": "token", "BOT_API_URL": bot_api.get_url()}
+        ), patch(
+            "trading_core.responser.ChannelHandler"
+        ) as channel_handler, patch.object(
+            NotificationBot, "CHAT_RATE_LIMIT", 1000
+        ), patch.object(
+            NotificationBot, "RETRY_DELAY", 0
+        ):
+            channel_handler.get_channels_by_ids.side_effect = lambda ids: {
+                id: channels[id] for id in ids if id in channels
+            }
+            yield bot_api
+
+        bot_api.shutdown()
+        bot_api.server_close()
+
+    def test_send_retries_throttled_chats_in_order(self, bot_api):
+        messages_inst = Messages()
+        messages_inst.add_message_text(channel_id="channel_1", text="signal 1\n")
+        messages_inst.add_message_text(
+            channel_id="channel_2", text="a" * 4000 + "\n" + "b" * 200 + "\n"
+        )
+        messages_inst.add_message_text(channel_id="channel_3", text="unknown\n")
+
+        NotificationBot().send(messages_inst)
+
+        assert bot_api.messages.count(("chat_1", "signal 1\n")) == 1
+        assert [text for chat_id, text in bot_api.messages if chat_id == "chat_2"] == [
+            "a" * 4000 + "\n",
+            "b" * 200 + "\n",
+        ]
+        assert len(bot_api.messages) == 3
+
+    def test_global_rate_limiter_is_shared(self):
+        assert (
+            NotificationBot()._global_rate_limiter
+            is NotificationBot()._global_rate_limiter
+        )
+
+    def test_rate_limiter(self):
+        rate_limiter = RateLimiter(rate=100)
+
+        start_time = time.monotonic()
+        for _ in range(6):
+            rate_limiter.wait()
+
+        assert time.monotonic() - start_time >= 0.05
+
+    def test_split_message_text_by_lines(self):
+        bot = NotificationBot()
+        lines = [f"<b>line {index}</b>\n" for index in range(1000)]
+
+        texts = bot.split_message_text("".join(lines))
+
+        assert len(texts) > 1
+        assert all(len(text) <= NotificationBot.MESSAGE_MAX_LENGTH for text in texts)
+        assert "".join(texts) == "".join(lines)
+        # Parts are cut at the line ends
+        assert all(text.endswith("</b>\n") for text in texts)
+
+    def test_split_long_line_keeps_tags_and_entities(self):
+        bot = NotificationBot()
+        line = "<b>" + "x &amp; <i>y</i> " * 1000 + "</b>\n"
+
+        texts = bot.split_message_text(line)
+
+        assert len(texts) > 1
+        for text in texts:
+            assert len(text) <= NotificationBot.MESSAGE_MAX_LENGTH
+            # Every part is valid HTML on its own
+            assert text.startswith("<b>")
+            assert text.count("<b>") == text.count("</b>")
+            assert text.count("<i>") == text.count("</i>")
+            assert re.search(r"&(?!amp;)", text) is None
+            assert re.search(r"<[^<>]*$", text) is None
+
+        # Without the reopened tags the text is the original line
+        assert re.sub(r"</?[bi]>", "", "".join(texts)) == re.sub(r"</?[bi]>", "", line)
+
+
+class LocalSmtp:
+    # smtplib.SMTP stub: records the commands of all connections
+    def __init__(self, extensions: list = ["starttls"], disconnects: int = 0):
+        self.extensions = extensions
+        self.disconnects = disconnects
+        self.commands = []
+        self.emails = []
+        self.connections = 0
+
+    def __call__(self, host, port, timeout=None):
+        self.connections += 1
+        return LocalSmtpConnection(self)
+
+
+class LocalSmtpConnection:
+    def __init__(self, smtp: LocalSmtp):
+        self.smtp = smtp
+        self.tls = False
+
+    def ehlo(self):
+        self.smtp.commands.append("ehlo")
+
+    def has_extn(self, name):
+        return name in self.smtp.extensions
+
+    def starttls(self):
+        self.smtp.commands.append("starttls")
+        self.tls = True
+
+    def login(self, username, password):
+        self.smtp.commands.append(f"login tls={self.tls}")
+
+    def sendmail(self, sender, receivers, message):
+        if self.smtp.disconnects:
+            self.smtp.disconnects -= 1
+            raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+        if "fail" in message:
+            raise smtplib.SMTPDataError(554, "Rejected")
+
+        self.smtp.commands.append("sendmail")
+        self.smtp.emails.append(message)
+
+    def quit(self):
+        self.smtp.commands.append("quit")
+
+    def close(self):
+        self.smtp.commands.append("close")
+
+
+class TestSmtpSender:
+    def get_sender(self, starttls: bool = True) -> SmtpSender:
+        return SmtpSender(
+            host="localhost",
+            port=25,
+            username="user",
+            password="password",
+            starttls=starttls,
+        )
+
+    def test_login_after_starttls(self):
+        smtp = LocalSmtp()
+
+        with patch("trading_core.responser.smtplib.SMTP", smtp):
+            with self.get_sender() as sender:
+                sender.send(sender="from", receivers=["to"], message="email 1")
+                sender.send(sender="from", receivers=["to"], message="email 2")
+
+        assert smtp.connections == 1
+        assert smtp.commands == [
+            "ehlo",
+            "starttls",
+            "ehlo",
+            "login tls=True",
+            "sendmail",
+            "sendmail",
+            "quit",
+        ]
+
+    def test_missing_starttls_is_rejected(self):
+        smtp = LocalSmtp(extensions=[])
+
+        with patch("trading_core.responser.smtplib.SMTP", smtp):
+            with pytest.raises(smtplib.SMTPNotSupportedError):
+                self.get_sender().send(sender="from", receivers=["to"], message="email")
+
+        # The credentials aren't sent over the plain connection
+        assert smtp.commands == ["ehlo", "close"]
+
+    def test_plain_connection_by_opt_out(self):
+        smtp = LocalSmtp(extensions=[])
+
+        with patch("trading_core.responser.smtplib.SMTP", smtp):
+            with self.get_sender(starttls=False) as sender:
+                sender.send(sender="from", receivers=["to"], message="email")
+
+        assert smtp.commands == ["ehlo", "login tls=False", "sendmail", "quit"]
+
+    def test_reconnect_on_disconnect(self):
+        smtp = LocalSmtp(disconnects=1)
+
+        with patch("trading_core.responser.smtplib.SMTP", smtp):
+            with self.get_sender() as sender:
+                sender.send(sender="from", receivers=["to"], message="email")
+
+        assert smtp.connections == 2
+        assert smtp.emails == ["email"]
+        assert smtp.commands.count("login tls=True") == 2
+
+    def test_reconnect_limit(self):
+        smtp = LocalSmtp(disconnects=SmtpSender.RECONNECT_LIMIT + 1)
+
+        with patch("trading_core.responser.smtplib.SMTP", smtp):
+            with pytest.raises(smtplib.SMTPServerDisconnected):
+                self.get_sender().send(sender="from", receivers=["to"], message="email")
+
+        assert smtp.connections == SmtpSender.RECONNECT_LIMIT + 1
+
+
+class TestNotificationEmail:
+    def test_queue_is_drained_over_one_connection(self):
+        smtp = LocalSmtp()
+
+        messages_inst = Messages()
+        for index, text in enumerate(["signal 1", "fail", "signal 2"]):
+            messages_inst.add_message(
+                MessageEmail(
+                    channel_id=f"channel_{index}", subject="Signals", message_text=text
+                )
+            )
+
+        with patch("trading_core.responser.smtplib.SMTP", smtp), patch.dict(
+            os.environ,
+            {
+                "SMTP_USERNAME": "sender@local",
+                "SMTP_PASSWORD": "password",
+                "RECEIVER_EMAIL": "receiver@local",
+            },
+        ):
+            notification = NotificationEmail()
+            notification.send(messages_inst, wait=True)
+            notification.send(Messages(), wait=True)
+
+        assert NotificationEmail._queue.unfinished_tasks == 0
+        assert smtp.connections == 1
+        # The rejected email doesn't stop the rest of the batch
+        assert len(smtp.emails) == 2
+        assert "signal 1" in smtp.emails[0] and "signal 2" in smtp.emails[1]
+        assert smtp.commands[-1] == "quit"
+
+
+class TestHistorySimulation:
+    def test_results_keep_the_order_of_cells(self):
+        def evaluate(cells):
+            # The cells are finished in the reverse order, the second one has failed
+            for cell in reversed(cells):
+                if cell.strategy == StrategyType.CCI_20_CROSS_100:
+                    yield (cell, None, Exception("Simulation error"))
+                else:
+                    yield (cell, {"strategy": cell.strategy}, None)
+
+        strategies = [
+            StrategyType.CCI_50_CROSS_0,
+            StrategyType.CCI_20_CROSS_100,
+            StrategyType.CCI_14_CROSS_100,
+        ]
+
+        with patch.object(SimulationGrid, "evaluate", side_effect=evaluate):
+            response, status = ResponserWeb().get_history_simulation(
+                trader_id="trader_1",
+                trading_type="LEVERAGE",
+                symbol="BTC/USD",
+                intervals=[IntervalType.HOUR_1],
+                strategies=strategies,
+                stop_loss_rate=0,
+                is_trailing_stop=False,
+                take_profit_rate=0,
+                init_balance=1000,
+                limit=100,
+            )
+
+        assert status == 200
+        results = json.loads(response)
+        assert [result["strategy"] for result in results] == strategies
+        assert [result.get(SimulationGrid.FLD_ERROR) for result in results] == [
+            None,
+            "Simulation error",
+            None,
+        ]
+        # The failed cell is reported with its parameters
+        assert results[1]["symbol"] == "BTC/USD"
+        assert results[1]["limit"] == 100
+
+    def test_transactions_are_full_by_default(self):
+        transaction_recordings = []
+
+        def evaluate(simulation_grid, cells):
+            transaction_recordings.append(simulation_grid.transaction_recording)
+            return []
+
+        with patch.object(
+            SimulationGrid, "evaluate", autospec=True, side_effect=evaluate
+        ):
+            response, status = ResponserWeb().get_history_simulation(
+                trader_id="trader_1",
+                trading_type="LEVERAGE",
+                symbol="BTC/USD",
+                intervals=[IntervalType.HOUR_1],
+                strategies=[StrategyType.CCI_20_CROSS_100],
+                stop_loss_rate=0,
+                is_trailing_stop=False,
+                take_profit_rate=0,
+                init_balance=1000,
+                limit=100,
+            )
+
+        assert status == 200
+        assert transaction_recordings == [TransactionRecordingType.FULL]
+
+
+class TestHistorySimulationStream:
+    def get_stream(self, responser: ResponserWeb):
+        return responser.stream_history_simulation(
+            trader_id="trader_1",
+            trading_type="LEVERAGE",
+            symbol="BTC/USD",
+            intervals=[IntervalType.HOUR_1],
+            strategies=[StrategyType.CCI_20_CROSS_100],
+            stop_loss_rate=0,
+            is_trailing_stop=False,
+            take_profit_rate=0,
+            init_balance=1000,
+            limit=100,
+        )
+
+    def test_lines_are_typed(self):
+        def evaluate(simulation_grid, cells):
+            for cell in cells:
+                if cell.strategy == StrategyType.CCI_14_CROSS_100:
+                    yield (cell, None, Exception("Simulation error"))
+                    continue
+
+                transaction_file = os.path.join(
+                    simulation_grid.transaction_dir, f"{cell.strategy}.ndjson"
+                )
+                with open(transaction_file, "w") as stream:
+                    stream.write(json.dumps({"type": "DB_CLOSE_POSITION"}) + "\n")
+                    stream.write(json.dumps({"type": "ERROR"}) + "\n")
+
+                yield (
+                    cell,
+                    {
+                        "strategy": cell.strategy,
+                        SimulationGrid.FLD_TRANSACTIONS_FILE: transaction_file,
+                    },
+                    None,
+                )
+
+        with patch.object(
+            SimulationGrid, "evaluate", autospec=True, side_effect=evaluate
+        ):
+            stream = ResponserWeb().stream_history_simulation(
+                trader_id="trader_1",
+                trading_type="LEVERAGE",
+                symbol="BTC/USD",
+                intervals=[IntervalType.HOUR_1],
+                strategies=[
+                    StrategyType.CCI_20_CROSS_100,
+                    StrategyType.CCI_14_CROSS_100,
+                ],
+                stop_loss_rate=0,
+                is_trailing_stop=False,
+                take_profit_rate=0,
+                init_balance=1000,
+                limit=100,
+            )
+            lines = [json.loads(line) for line in stream]
+
+        assert lines == [
+            {
+                "type": ResponserWeb.STREAM_TYPE_SESSION,
+                "data": {"strategy": StrategyType.CCI_20_CROSS_100},
+            },
+            {
+                "type": ResponserWeb.STREAM_TYPE_TRANSACTION,
+                "data": {"type": "DB_CLOSE_POSITION"},
+            },
+            {"type": ResponserWeb.STREAM_TYPE_TRANSACTION, "data": {"type": "ERROR"}},
+            {
+                "type": ResponserWeb.STREAM_TYPE_ERROR,
+                "data": {
+                    "symbol": "BTC/USD",
+                    "interval": IntervalType.HOUR_1,
+                    "strategy": StrategyType.CCI_14_CROSS_100,
+                    "limit": 100,
+                    SimulationGrid.FLD_ERROR: "Simulation error",
+                },
+            },
+        ]
+
+    def test_stream_limit(self):
+        responser = ResponserWeb()
+
+        with patch.object(
+            responser, "_get_simulation_grid", return_value=(MagicMock(), [])
+        ) as get_simulation_grid:
+            get_simulation_grid.return_value[0].evaluate.return_value = []
+
+            streams = [
+                self.get_stream(responser)
+                for _ in range(ResponserWeb.SIMULATION_STREAM_LIMIT)
+            ]
+            with pytest.raises(StreamLimitException):
+                self.get_stream(responser)
+
+            # A closed stream releases its slot
+            streams.pop().close()
+            streams.append(self.get_stream(responser))
+
+            assert list(streams.pop()) == []
+            for stream in streams:
+                stream.close()
+
+            streams.append(self.get_stream(responser))
+            streams[-1].close()
+
+
+class TestSessionStateInvalidation:
+    @pytest.fixture
+    def session_state_cache(self):
+        with patch(
+            "trading_core.responser.SessionStateCache"
+        ) as session_state_cache, patch(
+            "trading_core.responser.SessionHandler"
+        ) as session_handler, patch(
+            "trading_core.responser.BalanceHandler"
+        ) as balance_handler:
+            session_handler.get_sessions.return_value = []
+            session_handler.update_session.return_value = True
+            session_handler.delete_session.return_value = True
+            balance_handler.create_balance.return_value = "balance_1"
+            yield session_state_cache
+
+    @pytest.mark.parametrize(
+        "method", ["activate_session", "inactivate_session", "delete_session"]
+    )
+    def test_session_changes(self, session_state_cache, method):
+        response, status = getattr(ResponserWeb(), method)("session_1")
+
+        assert status == 200
+        session_state_cache.invalidate.assert_called_once_with("session_1")
+
+    def test_create_balance(self, session_state_cache):
+        balance_mdl = MagicMock(session_id="session_1")
+
+        response, status = ResponserWeb().create_balance(balance_mdl)
+
+        assert status == 200
+        session_state_cache.invalidate.assert_called_once_with("session_1")
+
+
+class TestOffsetTrigger:
+    # Tick of the 5 minutes interval is triggered right after the bar close
+    def get_tick_trigger(self) -> CronTrigger:
+        return CronTrigger(
+            minute="*/5", second=str(JobScheduler.BAR_CLOSE_DELAY), timezone="UTC"
+        )
+
+    def get_pre_close_trigger(self) -> OffsetTrigger:
+        return OffsetTrigger(
+            trigger=self.get_tick_trigger(),
+            offset=-timedelta(
+                seconds=JobScheduler.PRE_CLOSE_LEAD + JobScheduler.BAR_CLOSE_DELAY
+            ),
+        )
+
+    def get_fire_times(self, trigger, now: datetime, count: int) -> list[datetime]:
+        fire_times = []
+        fire_time = None
+
+        for _ in range(count):
+            fire_time = trigger.get_next_fire_time(fire_time, fire_time or now)
+            fire_times.append(fire_time)
+
+        return fire_times
+
+    def test_fire_times_are_before_the_bar_close(self):
+        now = datetime(2024, 10, 10, 10, 1, tzinfo=timezone.utc)
+
+        fire_times = self.get_fire_times(self.get_pre_close_trigger(), now, count=3)
+
+        assert [fire_time.strftime("%H:%M:%S") for fire_time in fire_times] == [
+            "10:04:50",
+            "10:09:50",
+            "10:14:50",
+        ]
+
+    def test_fire_times_follow_the_trigger(self):
+        now = datetime(2024, 10, 10, 23, 52, tzinfo=timezone.utc)
+
+        tick_times = self.get_fire_times(self.get_tick_trigger(), now, count=5)
+        pre_close_times = self.get_fire_times(
+            self.get_pre_close_trigger(), now, count=5
+        )
+
+        assert [
+            tick_time - pre_close_time
+            for tick_time, pre_close_time in zip(tick_times, pre_close_times)
+        ] == [timedelta(seconds=11)] * 5
+        # The ticks are continued on the next day
+        assert tick_times[-1] == datetime(2024, 10, 11, 0, 15, 1, tzinfo=timezone.utc)
+
+    def test_fire_time_between_pre_close_and_tick(self):
+        now = datetime(2024, 10, 10, 10, 4, 55, tzinfo=timezone.utc)
+
+        # The tick of the bar is still pending, the pre-close of the next bar is fired
+        assert self.get_tick_trigger().get_next_fire_time(None, now) == datetime(
+            2024, 10, 10, 10, 5, 1, tzinfo=timezone.utc
+        )
+        assert self.get_pre_close_trigger().get_next_fire_time(None, now) == datetime(
+            2024, 10, 10, 10, 9, 50, tzinfo=timezone.utc
+        )
+
+
+class TestIntervalTickPipeline:
+    @pytest.fixture(autouse=True)
+    def consumers(self):
+        with patch.dict(IntervalTickPipeline._consumers, clear=True), patch.dict(
+            IntervalTickPipeline._timings, clear=True
+        ):
+            yield IntervalTickPipeline._consumers
+
+    @pytest.fixture
+    def sources(self, trader_handler):
+        robot_params = [
+            self.get_param("trader_1", "BTC/USD"),
+            self.get_param("trader_3", "BTC/USD"),
+        ]
+        bot_params = [
+            # The same exchange as trader_1
+            self.get_param("trader_2", "BTC/USD"),
+            self.get_param("trader_2", "ETH/USD"),
+        ]
+        email_params = [
+            self.get_param("trader_1", "BTC/USD"),
+            self.get_param("trader_1", "XRP/USD"),
+        ]
+
+        with patch("trading_core.responser.Robot") as robot, patch(
+            "trading_core.responser.get_bot_alerts", return_value=[MagicMock()]
+        ), patch(
+            "trading_core.responser.AlertSignalPlanner"
+        ) as alert_signal_planner, patch.object(
+            ResponserEmail, "get_signal_params", return_value=email_params
+        ) as email_signal_params:
+            robot.return_value.get_signal_params.return_value = robot_params
+            alert_signal_planner.return_value.get_signal_params.return_value = (
+                bot_params
+            )
+            yield MagicMock(
+                robot=robot,
+                alert_signal_planner=alert_signal_planner,
+                email_signal_params=email_signal_params,
+            )
+
+    def get_param(self, trader_id: str, symbol: str) -> SignalParamModel:
+        return SignalParamModel(
+            trader_id=trader_id,
+            symbol=symbol,
+            interval=IntervalType.HOUR_1,
+            strategy=StrategyType.CCI_20_CROSS_100,
+        )
+
+    def add_consumers(self, interval: str = IntervalType.HOUR_1):
+        job_types = [Const.JOB_TYPE_EMAIL, Const.JOB_TYPE_BOT, Const.JOB_TYPE_ROBOT]
+        for job_type in job_types:
+            IntervalTickPipeline.add_consumer(
+                interval=interval, job_id=f"job_{job_type}", job_type=job_type
+            )
+
+    def test_add_and_remove_consumers(self):
+        self.add_consumers()
+        IntervalTickPipeline.add_consumer(
+            interval=IntervalType.MIN_5, job_id="job_5m", job_type=Const.JOB_TYPE_BOT
+        )
+
+        # Consumers are ordered by the pipeline
+        assert IntervalTickPipeline.get_job_types(IntervalType.HOUR_1) == [
+            Const.JOB_TYPE_ROBOT,
+            Const.JOB_TYPE_BOT,
+            Const.JOB_TYPE_EMAIL,
+        ]
+
+        assert IntervalTickPipeline.remove_consumer("job_5m") == (
+            IntervalType.MIN_5,
+            False,
+        )
+        assert IntervalTickPipeline.remove_consumer(f"job_{Const.JOB_TYPE_BOT}") == (
+            IntervalType.HOUR_1,
+            True,
+        )
+        assert IntervalTickPipeline.remove_consumer("job_unknown") == (None, False)
+        assert IntervalTickPipeline.get_job_types(IntervalType.HOUR_1) == [
+            Const.JOB_TYPE_ROBOT,
+            Const.JOB_TYPE_EMAIL,
+        ]
+
+    def test_signal_params_are_unique_per_exchange(self, trader_handler, sources):
+        self.add_consumers()
+
+        params = IntervalTickPipeline.get_signal_params(IntervalType.HOUR_1)
+
+        assert [(param.trader_id, param.symbol) for param in params] == [
+            ("trader_1", "BTC/USD"),
+            ("trader_3", "BTC/USD"),
+            ("trader_2", "ETH/USD"),
+            ("trader_1", "XRP/USD"),
+        ]
+        # The exchange is read once per trader
+        assert trader_handler.get_trader.call_count == 3
+
+    def test_signal_params_of_the_job_types(self, trader_handler, sources):
+        params = IntervalTickPipeline.get_signal_params(
+            IntervalType.HOUR_1, job_types=[Const.JOB_TYPE_EMAIL]
+        )
+
+        assert [(param.trader_id, param.symbol) for param in params] == [
+            ("trader_1", "BTC/USD"),
+            ("trader_1", "XRP/USD"),
+        ]
+        sources.email_signal_params.assert_called_once_with(IntervalType.HOUR_1)
+        sources.robot.return_value.get_signal_params.assert_not_called()
+        sources.alert_signal_planner.assert_not_called()
+
+    def test_email_consumer_sends_signals_of_the_union(self, trader_handler):
+        IntervalTickPipeline.add_consumer(
+            interval=IntervalType.HOUR_1,
+            job_id="job_email",
+            job_type=Const.JOB_TYPE_EMAIL,
+        )
+        symbol_handler = (
+            responser_module.buffer_runtime_handler.get_symbol_handler.return_value
+        )
+        symbol_handler.get_symbol_id_list.return_value = ["BTC/USD"]
+
+        signals = {}
+
+        def get_signal_stored(param):
+            # The first stage calculates the signal, the consumer reads it from the store
+            key = (param.trader_id, param.symbol, param.strategy)
+            if key not in signals:
+                signals[key] = get_signal(
+                    param,
+                    (
+                        SignalType.BUY
+                        if param.strategy == StrategyType.CCI_20_CROSS_100
+                        else SignalType.NONE
+                    ),
+                )
+            return signals[key]
+
+        with patch(
+            "trading_core.responser.ExchangeHandler.get_handler"
+        ) as exchange_handler, patch.object(
+            SignalFactory, "_get_signal", side_effect=get_signal_stored
+        ) as get_signal_mock, patch.object(
+            SignalFactory, "_get_exchange_id", return_value=ExchangeId.demo_bybit_com
+        ), patch.object(
+            NotificationEmail, "send"
+        ) as send:
+            exchange_handler.return_value.get_trader_id.return_value = "trader_1"
+
+            timings = IntervalTickPipeline.run(IntervalType.HOUR_1)
+
+        assert Const.JOB_TYPE_EMAIL in timings
+        # Every strategy of the default trader is evaluated once and read by the consumer
+        assert len(signals) == len(StrategyFactory.get_strategies())
+        assert get_signal_mock.call_count == 2 * len(signals)
+
+        messages = send.call_args[0][0].get_messages()
+        assert list(messages) == ["None"]
+
+        message = messages["None"]
+        assert message.get_subject() == "[TradingTool]: Alert signals for 1h"
+        assert "<td>BTC/USD</td>" in message.get_message_text()
+        assert f"<td>{StrategyType.CCI_20_CROSS_100.value}</td>" in (
+            message.get_message_text()
+        )
+        # Signals without a type aren't sent
+        assert message.get_message_text().count("<td>BTC/USD</td>") == 1
+
+    def test_consumers_run_concurrently(self):
+        self.add_consumers()
+        # Every consumer waits for the others, it fails if they run one by one
+        barrier = threading.Barrier(3, timeout=5)
+        calls = []
+
+        def get_consumer(job_type: str, error: Exception = None):
+            def consumer(interval):
+                barrier.wait()
+                calls.append((job_type, interval))
+                if error:
+                    raise error
+
+            return consumer
+
+        with patch.dict(
+            IntervalTickPipeline.CONSUMERS,
+            {
+                Const.JOB_TYPE_ROBOT: get_consumer(Const.JOB_TYPE_ROBOT),
+                Const.JOB_TYPE_BOT: get_consumer(
+                    Const.JOB_TYPE_BOT, Exception("Bot error")
+                ),
+                Const.JOB_TYPE_EMAIL: get_consumer(Const.JOB_TYPE_EMAIL),
+            },
+        ), patch.object(
+            IntervalTickPipeline, "get_signal_params", return_value=[]
+        ), patch(
+            "trading_core.responser.SignalFactory"
+        ) as signal_factory:
+            timings = IntervalTickPipeline.run(IntervalType.HOUR_1)
+
+        signal_factory.return_value.get_signals.assert_called_once_with([])
+        assert sorted(calls) == sorted(
+            (job_type, IntervalType.HOUR_1)
+            for job_type in IntervalTickPipeline.CONSUMERS
+        )
+        # A failed consumer doesn't stop the tick
+        assert list(timings) == [
+            IntervalTickPipeline.STAGE_COLLECT,
+            IntervalTickPipeline.STAGE_SIGNALS,
+            Const.JOB_TYPE_ROBOT,
+            Const.JOB_TYPE_BOT,
+            Const.JOB_TYPE_EMAIL,
+            IntervalTickPipeline.STAGE_TOTAL,
+        ]
+        assert IntervalTickPipeline.get_timings() == {IntervalType.HOUR_1: timings}
+
+
+class TestJobScheduler:
+    @pytest.fixture
+    def job_scheduler(self):
+        # The scheduler is paused, the jobs aren't run by the test
+        scheduler = BackgroundScheduler()
+        scheduler.start(paused=True)
+
+        job_scheduler = object.__new__(JobScheduler)
+        job_scheduler._JobScheduler__db_inst = MagicMock()
+        job_scheduler._JobScheduler__scheduler = scheduler
+        job_scheduler._JobScheduler__db_inst.create_job.side_effect = [
+            "job_robot",
+            "job_bot",
+        ]
+
+        with patch.dict(IntervalTickPipeline._consumers, clear=True), patch(
+            "trading_core.responser.buffer_runtime_handler"
+        ):
+            yield job_scheduler
+
+        scheduler.shutdown(wait=False)
+
+    def get_job_ids(self, job_scheduler: JobScheduler) -> list[str]:
+        return sorted(job.id for job in job_scheduler.get().get_jobs())
+
+    def test_tick_jobs_are_shared_by_the_consumers(self, job_scheduler):
+        job_scheduler.create_job(job_type=Const.JOB_TYPE_ROBOT, interval="5m")
+        job_scheduler.create_job(job_type=Const.JOB_TYPE_BOT, interval="5m")
+
+        assert self.get_job_ids(job_scheduler) == ["tick_5m", "tick_5m_pre_close"]
+
+        job_scheduler.remove_job("job_robot")
+        assert self.get_job_ids(job_scheduler) == ["tick_5m", "tick_5m_pre_close"]
+
+        # The tick jobs are removed with the last consumer
+        job_scheduler.remove_job("job_bot")
+        assert self.get_job_ids(job_scheduler) == []
+        assert IntervalTickPipeline.get_job_types("5m") == []
@@ -0,0 +1,734 @@
+import io
+import pytest
+import threading
+import time
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+import numpy as np
+import pandas as pd
+from bson import ObjectId
+import bson.json_util as json_util
+
+from trading_core.constants import Const
+from trading_core.common import (
+    LeverageModel,
+    OrderCloseModel,
+    OrderSideType,
+    SessionModel,
+    SessionType,
+    SignalType,
+    StrategyType,
+    TradingType,
+    TransactionType,
+    TransactionRecordingType,
+    IntervalType,
+)
+
+# Strategies of the robot are calculated by pandas_ta
+pytest.importorskip("pandas_ta")
+
+from trading_core.robot import (
+    HistorySimulatorManager,
+    HistorySimulationEngine,
+    LeverageApiManager,
+    LeverageDatabaseManager,
+    PositionSnapshot,
+    SimulationPosition,
+    SessionExecutor,
+    SessionManager,
+    SessionStateCache,
+    SimulationTransaction,
+    TraderManager,
+    TransactionStreamSink,
+)
+from trading_core.handler import UnitOfWorkHandler
+from trading_core.mongodb import MongoBase
+
+
+def get_strategy_data(bars: int = 3000, seed: int = 1) -> pd.DataFrame:
+    random = np.random.default_rng(seed)
+
+    close = np.round(100 + np.cumsum(random.normal(0, 0.5, bars)), 2)
+    open = np.round(np.roll(close, 1), 2)
+    open[0] = close[0]
+    high = np.round(np.maximum(open, close) + random.uniform(0, 0.6, bars), 2)
+    low = np.round(np.minimum(open, close) - random.uniform(0, 0.6, bars), 2)
+
+    signal_types = [
+        SignalType.STRONG_BUY,
+        SignalType.STRONG_SELL,
+        SignalType.BUY,
+        SignalType.SELL,
+        SignalType.NONE,
+    ]
+    signals = [
+        signal_types[index]
+        for index in random.choice(
+            len(signal_types), size=bars, p=[0.02, 0.02, 0.03, 0.03, 0.9]
+        )
+    ]
+
+    return pd.DataFrame(
+        {
+            "Open": open,
+            "High": high,
+            "Low": low,
+            "Close": close,
+            "Volume": random.uniform(100, 1000, bars),
+            Const.FLD_STOP_LOSS_VALUE: np.round(random.uniform(0.5, 1.5, bars), 2),
+            Const.FLD_TAKE_PROFIT_VALUE: np.round(random.uniform(1, 3, bars), 2),
+            Const.PARAM_SIGNAL: signals,
+        },
+        index=pd.date_range("2024-01-01", periods=bars, freq="h"),
+    )
+
+
+def get_session(
+    strategy: StrategyType, is_trailing_stop: bool, stop_loss_rate: float = 0
+) -> SessionModel:
+    return SessionModel(
+        _id=ObjectId(),
+        trader_id="trader_1",
+        user_id="temporary_user",
+        trading_type=TradingType.LEVERAGE,
+        session_type=SessionType.HISTORY,
+        symbol="BTC/USD",
+        interval=IntervalType.HOUR_1,
+        strategy=strategy,
+        stop_loss_rate=stop_loss_rate,
+        take_profit_rate=2 * stop_loss_rate,
+        is_trailing_stop=is_trailing_stop,
+    )
+
+
+def get_results(trader_mng: HistorySimulatorManager) -> dict:
+    # Local ids are generated for every position
+    exclude = {"id", "local_order_id"}
+    return {
+        "positions": [
+            position_mdl.model_dump(exclude=exclude)
+            for position_mdl in trader_mng.get_positions()
+        ],
+        "balance": trader_mng.balance_mng.get_balance_model().model_dump(),
+        "transactions": [
+            transaction_mdl.model_dump(exclude=exclude | {"data"})
+            | {"data": {k: v for k, v in transaction_mdl.data.items() if k != "id"}}
+            for transaction_mdl in trader_mng.transaction_mng.get_transactions()
+        ],
+    }
+
+
+@pytest.fixture
+def handlers():
+    symbol_handler = MagicMock()
+    symbol_handler.get_symbol.return_value.quote_precision = 3
+    symbol_handler.get_symbol_fee.return_value = 0.1
+
+    with patch("trading_core.robot.ExchangeHandler"), patch(
+        "trading_core.robot.buffer_runtime_handler"
+    ) as buffer_runtime_handler:
+        buffer_runtime_handler.get_symbol_handler.return_value = symbol_handler
+        yield
+
+
+@pytest.mark.usefixtures("handlers")
+class TestHistorySimulationEngine:
+    @pytest.mark.parametrize(
+        "strategy, is_trailing_stop, stop_loss_rate",
+        [
+            (StrategyType.CCI_20_CROSS_100, True, 0),
+            (StrategyType.CCI_20_CROSS_100, False, 0),
+            (StrategyType.CCI_20_CROSS_100, False, 1),
+            (StrategyType.EMA_50_CROSS_EMA_100_FILTER_UP_LEVEL_TREND_TP, True, 0),
+        ],
+    )
+    def test_parity_with_simulation_by_bars(
+        self, strategy, is_trailing_stop, stop_loss_rate
+    ):
+        strategy_df = get_strategy_data()
+        session_mdl = get_session(strategy, is_trailing_stop, stop_loss_rate)
+
+        engine_mng = HistorySimulatorManager(session_mdl)
+        HistorySimulationEngine(trader_mng=engine_mng).run(strategy_df)
+
+        bars_mng = HistorySimulatorManager(session_mdl)
+        bars_mng.run_by_bars(strategy_df)
+
+        engine_results = get_results(engine_mng)
+        assert engine_results["positions"]
+        assert engine_results == get_results(bars_mng)
+
+
+class TestSimulationRecord:
+    def get_position_data(self) -> dict:
+        return {
+            "session_id": "session_1",
+            "account_id": "1",
+            "symbol": "BTC/USD",
+            "side": OrderSideType.buy,
+            "quantity": 0.5,
+            "open_price": 100.0,
+            "stop_loss": 98.5,
+            "take_profit": 103.0,
+        }
+
+    def test_position_is_converted_to_model(self):
+        position_data = self.get_position_data()
+        position = SimulationPosition(id="position_1", **position_data)
+
+        assert not hasattr(position, "__dict__")
+
+        position.calculate_high_price(101.5)
+        position.calculate_low_price(99.0)
+        assert position.calculate_stop_loss_percent() == -1.5
+        assert position.calculate_take_profit_percent() == 3.0
+
+        position_mdl = LeverageModel(_id="position_1", **position_data)
+        position_mdl.calculate_high_price(101.5)
+        position_mdl.calculate_low_price(99.0)
+        position_mdl.calculate_stop_loss_percent()
+        position_mdl.calculate_take_profit_percent()
+
+        assert position.to_model() == position_mdl
+        assert position.model_dump() == position_mdl.model_dump()
+
+    def test_transaction_is_converted_to_model(self):
+        transaction = SimulationTransaction(
+            session_id="session_1",
+            user_id="temporary_user",
+            date_time=pd.Timestamp("2024-01-01"),
+            type=TransactionType.DB_UPDATE_POSITION.value,
+            data={"stop_loss": 98.5},
+        )
+
+        transaction_mdl = transaction.to_model()
+
+        # The model is validated by the conversion
+        assert transaction_mdl.id == "None"
+        assert transaction_mdl.type is TransactionType.DB_UPDATE_POSITION
+        assert transaction_mdl.data == {"stop_loss": 98.5}
+
+
+@pytest.mark.usefixtures("handlers")
+class TestTransactionRecording:
+    def run_simulation(
+        self, recording: TransactionRecordingType, sink: TransactionStreamSink = None
+    ) -> HistorySimulatorManager:
+        trader_mng = HistorySimulatorManager(
+            get_session(StrategyType.CCI_20_CROSS_100, is_trailing_stop=True)
+        )
+        trader_mng.transaction_mng.set_recording(recording, sink=sink)
+        HistorySimulationEngine(trader_mng=trader_mng).run(get_strategy_data())
+        return trader_mng
+
+    def get_types(self, trader_mng: HistorySimulatorManager) -> set:
+        return {item.type for item in trader_mng.transaction_mng.get_transactions()}
+
+    def test_full(self):
+        trader_mng = self.run_simulation(TransactionRecordingType.FULL)
+
+        assert self.get_types(trader_mng) == {
+            TransactionType.DB_CREATE_POSITION,
+            TransactionType.DB_UPDATE_POSITION,
+            TransactionType.DB_CLOSE_POSITION,
+        }
+
+    def test_summary_per_trade(self):
+        trader_mng = self.run_simulation(TransactionRecordingType.SUMMARY)
+
+        closed_positions = [
+            position_mdl
+            for position_mdl in trader_mng.get_positions()
+            if position_mdl.close_price
+        ]
+        assert self.get_types(trader_mng) == {TransactionType.DB_CLOSE_POSITION}
+        assert len(trader_mng.transaction_mng.get_transactions()) == len(
+            closed_positions
+        )
+
+    def test_none(self):
+        trader_mng = self.run_simulation(TransactionRecordingType.NONE)
+
+        assert trader_mng.get_positions()
+        assert trader_mng.transaction_mng.get_transactions() == []
+
+    def test_stream_sink(self):
+        full_transactions = self.run_simulation(
+            TransactionRecordingType.FULL
+        ).transaction_mng.get_transactions()
+
+        stream = io.StringIO()
+        sink = TransactionStreamSink(stream)
+        trader_mng = self.run_simulation(TransactionRecordingType.FULL, sink=sink)
+
+        # Transactions are written by the sink and aren't kept by the manager
+        assert trader_mng.transaction_mng.get_transactions() == []
+
+        lines = stream.getvalue().splitlines()
+        assert sink.get_count() == len(lines) == len(full_transactions)
+        assert [json_util.loads(line)["type"] for line in lines] == [
+            item.type for item in full_transactions
+        ]
+
+
+class TestSessionExecutor:
+    @pytest.fixture(autouse=True)
+    def in_flight(self):
+        with patch.dict(SessionExecutor._in_flight, clear=True):
+            yield SessionExecutor._in_flight
+
+    def get_sessions(self, trader_ids: list) -> list[SessionModel]:
+        return [
+            get_session(
+                StrategyType.CCI_20_CROSS_100, is_trailing_stop=False
+            ).model_copy(update={"trader_id": trader_id})
+            for trader_id in trader_ids
+        ]
+
+    def test_sessions_of_a_trader_run_in_order(self):
+        session_mdls = self.get_sessions(
+            ["trader_1", "trader_2", "trader_1", "trader_2", "trader_1"]
+        )
+        # The first sessions of both traders have to run at the same time
+        barrier = threading.Barrier(2, timeout=5)
+        lock = threading.Lock()
+        started = []
+
+        def run_session(session_mdl):
+            with lock:
+                started.append(session_mdl.id)
+            if session_mdl.id in (session_mdls[0].id, session_mdls[1].id):
+                barrier.wait()
+
+        errors = SessionExecutor(run_session=run_session).run(session_mdls)
+
+        assert errors == {}
+        for trader_id in ["trader_1", "trader_2"]:
+            trader_session_ids = self.get_ids(session_mdls, trader_id)
+            assert [id for id in started if id in trader_session_ids] == (
+                trader_session_ids
+            )
+
+    def test_traders_are_limited_by_max_workers(self):
+        session_mdls = self.get_sessions([f"trader_{index}" for index in range(6)])
+        lock = threading.Lock()
+        running = [0]
+        max_running = [0]
+
+        def run_session(session_mdl):
+            with lock:
+                running[0] += 1
+                max_running[0] = max(max_running[0], running[0])
+            time.sleep(0.02)
+            with lock:
+                running[0] -= 1
+
+        errors = SessionExecutor(run_session=run_session, max_workers=2).run(
+            session_mdls
+        )
+
+        assert errors == {}
+        assert max_running[0] == 2
+
+    def test_timeout_skips_the_trader_until_the_session_is_finished(self):
+        session_mdls = self.get_sessions(["trader_1", "trader_1", "trader_2"])
+        hung_session_mdl = session_mdls[0]
+        release = threading.Event()
+        finished = threading.Event()
+        runs = []
+
+        def run_session(session_mdl):
+            runs.append(session_mdl.id)
+            if session_mdl.id == hung_session_mdl.id:
+                release.wait(timeout=5)
+                finished.set()
+
+        executor = SessionExecutor(run_session=run_session, session_timeout=0.05)
+
+        errors = executor.run(session_mdls)
+
+        assert set(errors.keys()) == {session_mdls[0].id, session_mdls[1].id}
+        assert "timeout" in errors[session_mdls[0].id]
+        assert sorted(runs) == sorted([session_mdls[0].id, session_mdls[2].id])
+        assert SessionExecutor.get_in_flight_session_id("trader_1") == (
+            hung_session_mdl.id
+        )
+
+        # The next tick skips the trader while its session is still running
+        runs.clear()
+        errors = executor.run(session_mdls[1:])
+
+        assert list(errors.keys()) == [session_mdls[1].id]
+        assert hung_session_mdl.id in errors[session_mdls[1].id]
+        assert runs == [session_mdls[2].id]
+
+        # The trader is run again after the session is finished
+        release.set()
+        finished.wait(timeout=5)
+        for _ in range(100):
+            if not SessionExecutor.get_in_flight_session_id("trader_1"):
+                break
+            time.sleep(0.01)
+        assert SessionExecutor.get_in_flight_session_id("trader_1") is None
+
+        runs.clear()
+        assert executor.run(session_mdls[1:]) == {}
+        assert sorted(runs) == sorted([session_mdls[1].id, session_mdls[2].id])
+
+    def get_ids(self, session_mdls: list[SessionModel], trader_id: str) -> list[str]:
+        return [
+            session_mdl.id
+            for session_mdl in session_mdls
+            if session_mdl.trader_id == trader_id
+        ]
+
+
+class TestSessionStateCache:
+    @pytest.fixture(autouse=True)
+    def get_manager(self):
+        with patch.dict(SessionStateCache._trader_managers, clear=True), patch(
+            "trading_core.robot.TraderBase.get_manager",
+            side_effect=lambda session_mdl: MagicMock(session_mdl=session_mdl),
+        ) as get_manager:
+            yield get_manager
+
+    def get_session(self, changed_at: datetime = datetime(2024, 10, 10)):
+        return get_session(
+            StrategyType.CCI_20_CROSS_100, is_trailing_stop=False
+        ).model_copy(
+            update={"session_type": SessionType.TRADING, "changed_at": changed_at}
+        )
+
+    def test_state_is_reused(self, get_manager):
+        session_mdl = self.get_session()
+
+        trader_mng = SessionManager(session_mdl)._trader_mng
+        assert SessionManager(session_mdl)._trader_mng is trader_mng
+
+        get_manager.assert_called_once()
+        # Changes of the exchange are taken by every run
+        assert trader_mng.synchronize.call_count == 2
+
+    def test_changed_session_is_reloaded(self, get_manager):
+        session_mdl = self.get_session()
+        trader_mng = SessionManager(session_mdl)._trader_mng
+
+        changed_session_mdl = session_mdl.model_copy(
+            update={"changed_at": datetime(2024, 10, 11)}
+        )
+
+        assert SessionManager(changed_session_mdl)._trader_mng is not trader_mng
+        assert get_manager.call_count == 2
+        trader_mng.release.assert_called_once()
+
+    def test_invalidate(self, get_manager):
+        session_mdl = self.get_session()
+        trader_mng = SessionManager(session_mdl)._trader_mng
+
+        SessionStateCache.invalidate(session_mdl.id)
+
+        trader_mng.release.assert_called_once()
+        assert SessionManager(session_mdl)._trader_mng is not trader_mng
+
+    def test_clear(self, get_manager):
+        trader_mng = SessionManager(self.get_session())._trader_mng
+
+        SessionStateCache.clear()
+
+        trader_mng.release.assert_called_once()
+        assert SessionStateCache._trader_managers == {}
+
+    def test_failed_synchronization_is_not_cached(self, get_manager):
+        session_mdl = self.get_session()
+        trader_mng = SessionManager(session_mdl)._trader_mng
+        trader_mng.synchronize.side_effect = Exception("API error")
+
+        with pytest.raises(Exception, match="API error"):
+            SessionManager(session_mdl)
+
+        assert session_mdl.id not in SessionStateCache._trader_managers
+        assert SessionManager(session_mdl)._trader_mng is not trader_mng
+
+    def test_failed_run_is_not_cached(self, get_manager):
+        session_mdl = self.get_session()
+        session_mng = SessionManager(session_mdl)
+        trader_mng = session_mng._trader_mng
+        trader_mng.run.side_effect = Exception("Order error")
+
+        with pytest.raises(Exception, match="Order error"):
+            session_mng.run()
+
+        # The failed status and the writes of the run are sent
+        trader_mng.uow.update_session.assert_called_once()
+        trader_mng.uow.flush.assert_called_once()
+        assert SessionManager(session_mdl)._trader_mng is not trader_mng
+
+    def get_failed_uow(self) -> UnitOfWorkHandler:
+        session_db = MongoBase()
+        session_db._collection = MagicMock()
+        session_db._collection.name = "sessions"
+        session_db._collection.bulk_write.side_effect = Exception("DB is unavailable")
+
+        uow = UnitOfWorkHandler()
+        uow._uow.update_one(session_db, id=str(ObjectId()), query={"status": "active"})
+        return uow
+
+    @pytest.mark.parametrize(
+        "method, args",
+        [
+            ("run", ()),
+            ("get_positions", ()),
+            ("open_position", (MagicMock(),)),
+            ("close_position", ()),
+            ("flush", ()),
+        ],
+    )
+    def test_failed_flush_is_not_cached(self, get_manager, method, args):
+        session_mdl = self.get_session()
+        session_mng = SessionManager(session_mdl)
+        trader_mng = session_mng._trader_mng
+        trader_mng.uow = self.get_failed_uow()
+
+        with pytest.raises(Exception, match="DB: FLUSH - sessions - DB is unavailable"):
+            getattr(session_mng, method)(*args)
+
+        # The writes are dropped by the flush, the state is loaded again from the DB
+        assert not trader_mng.uow._uow.has_requests()
+        trader_mng.release.assert_called_once()
+        assert SessionManager(session_mdl)._trader_mng is not trader_mng
+
+    def test_history_session_is_not_cached(self, get_manager):
+        session_mdl = get_session(StrategyType.CCI_20_CROSS_100, is_trailing_stop=False)
+
+        SessionManager(session_mdl)
+        SessionManager(session_mdl)
+
+        assert get_manager.call_count == 2
+        assert SessionStateCache._trader_managers == {}
+
+
+class TestPositionSnapshot:
+    @pytest.fixture
+    def exchange(self):
+        positions = [
+            LeverageModel(
+                session_id=f"session_{index}",
+                account_id="account_1",
+                symbol=symbol,
+                side=OrderSideType.buy,
+                quantity=0.01,
+                order_id=f"order_{index}",
+            )
+            for index, symbol in enumerate(["BTC/USD", "ETH/USD", "XRP/USD"])
+        ]
+
+        with patch("trading_core.robot.LeverageHandler") as leverage_handler, patch(
+            "trading_core.robot.ExchangeHandler"
+        ) as exchange_handler, patch(
+            "trading_core.robot.buffer_runtime_handler"
+        ) as buffer_runtime_handler:
+            leverage_handler.get_leverages.return_value = positions
+            buffer_runtime_handler.get_position_stream.return_value = None
+
+            exchange_handler.return_value.get_open_positions.side_effect = (
+                lambda positions: {
+                    position_mdl.symbol: position_mdl
+                    for position_mdl in positions
+                    if position_mdl.symbol == "BTC/USD"
+                }
+            )
+            exchange_handler.return_value.get_close_positions.side_effect = (
+                lambda positions: {
+                    position_mdl.symbol: OrderCloseModel(close_order_id="close_1")
+                    for position_mdl in positions
+                    if position_mdl.symbol == "ETH/USD"
+                }
+            )
+
+            yield MagicMock(
+                leverage_handler=leverage_handler,
+                exchange_handler=exchange_handler.return_value,
+                buffer_runtime_handler=buffer_runtime_handler,
+            )
+
+    def get_sessions(self) -> list[SessionModel]:
+        session_mdl = get_session(StrategyType.CCI_20_CROSS_100, is_trailing_stop=False)
+        return [
+            session_mdl.model_copy(update={"session_type": SessionType.TRADING}),
+            # History sessions aren't reconciled
+            session_mdl,
+        ]
+
+    def test_positions_are_reconciled_once(self, exchange):
+        session_mdls = self.get_sessions()
+
+        snapshot = PositionSnapshot(trader_id="trader_1", session_mdls=session_mdls)
+
+        exchange.leverage_handler.get_leverages.assert_called_once()
+        assert exchange.leverage_handler.get_leverages.call_args.kwargs[
+            "session_ids"
+        ] == [session_mdls[0].id]
+        exchange.exchange_handler.get_open_positions.assert_called_once()
+        # Only positions which aren't open are checked for the close details
+        get_close_positions = exchange.exchange_handler.get_close_positions
+        close_positions = get_close_positions.call_args.args[0]
+        assert [position_mdl.symbol for position_mdl in close_positions] == [
+            "ETH/USD",
+            "XRP/USD",
+        ]
+
+        assert snapshot.is_reconciled("BTC/USD", order_id="order_0")
+        assert not snapshot.is_reconciled("BTC/USD", order_id="order_9")
+        assert not snapshot.is_reconciled("SOL/USD", order_id="order_0")
+
+        # Open
+        assert snapshot.get_open_position("BTC/USD").order_id == "order_0"
+        assert snapshot.get_close_position("BTC/USD") is None
+        # Closed
+        assert snapshot.get_open_position("ETH/USD") is None
+        assert snapshot.get_close_position("ETH/USD").close_order_id == "close_1"
+        # Unmatched on the exchange
+        assert snapshot.is_reconciled("XRP/USD", order_id="order_2")
+        assert snapshot.get_open_position("XRP/USD") is None
+        assert snapshot.get_close_position("XRP/USD") is None
+
+    def test_positions_of_the_stream_are_skipped(self, exchange):
+        position_stream = MagicMock()
+        position_stream.is_known.side_effect = lambda symbol, order_id: True
+        exchange.buffer_runtime_handler.get_position_stream.return_value = (
+            position_stream
+        )
+
+        snapshot = PositionSnapshot(
+            trader_id="trader_1", session_mdls=self.get_sessions()
+        )
+
+        exchange.exchange_handler.get_open_positions.assert_not_called()
+        assert not snapshot.is_reconciled("BTC/USD", order_id="order_0")
+
+    def test_without_trading_sessions(self, exchange):
+        session_mdls = self.get_sessions()[1:]
+
+        snapshot = PositionSnapshot(trader_id="trader_1", session_mdls=session_mdls)
+
+        exchange.leverage_handler.get_leverages.assert_not_called()
+        assert not snapshot.is_reconciled("BTC/USD", order_id="order_0")
+
+
+@pytest.mark.usefixtures("handlers")
+class TestOpenConfirmation:
+    @pytest.fixture
+    def session_mdl(self):
+        session_mdl = get_session(StrategyType.CCI_20_CROSS_100, is_trailing_stop=False)
+        return session_mdl.model_copy(update={"session_type": SessionType.TRADING})
+
+    @pytest.fixture
+    def position_mdl(self, session_mdl):
+        # The placed position is stored with the requested values
+        return LeverageModel(
+            _id=ObjectId(),
+            session_id=session_mdl.id,
+            account_id="account_1",
+            symbol=session_mdl.symbol,
+            side=OrderSideType.buy,
+            order_id="order_1",
+            position_id="position_1",
+            quantity=0.01,
+            open_price=60000,
+            stop_loss=59000,
+            take_profit=62000,
+        )
+
+    @pytest.fixture
+    def trader_mng(self, session_mdl, position_mdl):
+        trader_mng = MagicMock(session_mdl=session_mdl)
+
+        with patch(
+            "trading_core.robot.LeverageHandler.get_leverages",
+            return_value=[position_mdl],
+        ), patch("trading_core.robot.buffer_runtime_handler") as buffer_runtime_handler:
+            buffer_runtime_handler.get_position_stream.return_value = None
+
+            trader_mng.data_mng = LeverageDatabaseManager(trader_mng)
+            trader_mng.api_mng = LeverageApiManager(trader_mng)
+            yield trader_mng
+
+    def get_confirmed_position(self, position_mdl, **kwargs) -> LeverageModel:
+        return position_mdl.model_copy(
+            update={
+                "open_price": 60010,
+                "quantity": 0.0099,
+                "fee": -0.3,
+                "stop_loss": 59010,
+                "take_profit": 62010,
+            }
+            | kwargs
+        )
+
+    def test_confirmed_values_are_applied(self, trader_mng, position_mdl):
+        trader_mng.uow.update_leverage.return_value = True
+
+        trader_mng.api_mng._on_open_confirmed(
+            self.get_confirmed_position(position_mdl)
+        )
+
+        trader_mng.uow.update_leverage.assert_called_once_with(
+            id=position_mdl.id,
+            query={
+                Const.DB_OPEN_PRICE: 60010,
+                Const.DB_QUANTITY: 0.0099,
+                Const.DB_FEE: -0.3,
+                Const.DB_STOP_LOSS: 59010,
+                Const.DB_TAKE_PROFIT: 62010,
+            },
+        )
+        trader_mng.uow.flush.assert_called_once()
+        transaction_type = trader_mng.transaction_mng.add_transaction.call_args.kwargs[
+            "type"
+        ]
+        assert transaction_type == TransactionType.DB_SYNC_POSITION
+
+        current_position_mdl = trader_mng.data_mng.get_current_position()
+        assert current_position_mdl.open_price == 60010
+        assert current_position_mdl.quantity == 0.0099
+        assert current_position_mdl.fee == -0.3
+
+    def test_position_of_another_order_isnt_updated(self, trader_mng, position_mdl):
+        trader_mng.api_mng._on_open_confirmed(
+            self.get_confirmed_position(
+                position_mdl, order_id="order_2", position_id="position_2"
+            )
+        )
+
+        trader_mng.uow.update_leverage.assert_not_called()
+        trader_mng.uow.flush.assert_called_once()
+        assert trader_mng.data_mng.get_current_position().open_price == 60000
+
+    def test_listener_is_removed_with_the_session_state(self, session_mdl):
+        position_stream = MagicMock()
+
+        with patch(
+            "trading_core.robot.LeverageHandler.get_leverages", return_value=[]
+        ), patch("trading_core.robot.BalanceHandler"), patch(
+            "trading_core.robot.buffer_runtime_handler"
+        ) as buffer_runtime_handler:
+            buffer_runtime_handler.get_position_stream.return_value = position_stream
+            trader_mng = TraderManager(session_mdl)
+
+        position_stream.add_listener.assert_called_once_with(
+            key=session_mdl.id, callback=trader_mng.api_mng._on_position_closed
+        )
+
+        with patch.dict(
+            SessionStateCache._trader_managers, {session_mdl.id: trader_mng}
+        ):
+            SessionStateCache.invalidate(session_mdl.id)
+
+        position_stream.remove_listener.assert_called_once_with(key=session_mdl.id)
+
+    def test_unconfirmed_position_invalidates_the_session(self, trader_mng):
+        with patch.object(SessionStateCache, "invalidate") as invalidate:
+            trader_mng.api_mng._on_open_confirmed(None)
+
+        invalidate.assert_called_once_with(trader_mng.session_mdl.id)
+        trader_mng.uow.update_leverage.assert_not_called()
@@ -0,0 +1,155 @@
+import pytest
+from unittest.mock import patch
+from datetime import datetime
+import pandas as pd
+
+from trading_core.constants import Const
+from trading_core.common import (
+    ExchangeId,
+    IntervalType,
+    StrategyType,
+    SignalType,
+    SignalModel,
+)
+from trading_core.signal_store import (
+    SignalStoreBase,
+    SignalStoreLocal,
+    SignalStoreMongo,
+    SignalStoreFactory,
+)
+
+
+def get_signal(date_time: datetime, signal: SignalType = SignalType.BUY):
+    return SignalModel(
+        trader_id="trader_1",
+        symbol="BTC/USD",
+        interval=IntervalType.HOUR_1,
+        strategy=StrategyType.CCI_20_CROSS_100,
+        date_time=date_time,
+        open=1,
+        high=2,
+        low=0.5,
+        close=1.5,
+        volume=100,
+        signal=signal,
+    )
+
+
+def get_key(date_time: datetime):
+    return SignalStoreBase.get_key(
+        exchange_id=ExchangeId.bybit_com,
+        symbol="BTC/USD",
+        interval=IntervalType.HOUR_1,
+        strategy=StrategyType.CCI_20_CROSS_100,
+        date_time=date_time,
+    )
+
+
+def test_get_key():
+    key = get_key(pd.Timestamp("2024-10-10 10:00"))
+    assert key == (
+        ExchangeId.bybit_com.value,
+        "BTC/USD",
+        IntervalType.HOUR_1.value,
+        StrategyType.CCI_20_CROSS_100.value,
+        datetime(2024, 10, 10, 10),
+    )
+    assert (
+        SignalStoreBase.get_key_id(key)
+        == f"{ExchangeId.bybit_com.value}|BTC/USD|1h|CCI_20_CROSS_100|2024-10-10T10:00:00"
+    )
+
+
+class TestSignalStoreLocal:
+    @pytest.fixture
+    def store(self):
+        return SignalStoreLocal()
+
+    def test_set_and_get(self, store):
+        date_time = datetime(2024, 10, 10, 10)
+        assert store.get(get_key(date_time)) is None
+
+        assert store.set(get_key(date_time), get_signal(date_time)) is True
+        assert store.get(get_key(date_time)).signal == SignalType.BUY
+
+    def test_signal_is_written_once(self, store):
+        date_time = datetime(2024, 10, 10, 10)
+        store.set(get_key(date_time), get_signal(date_time))
+
+        assert (
+            store.set(get_key(date_time), get_signal(date_time, SignalType.SELL))
+            is False
+        )
+        assert store.get(get_key(date_time)).signal == SignalType.BUY
+
+    def test_get_range(self, store):
+        signals = {
+            get_key(datetime(2024, 10, 10, hour)): get_signal(
+                datetime(2024, 10, 10, hour)
+            )
+            for hour in [12, 10, 11]
+        }
+        assert store.set_many(signals) == 3
+
+        result = store.get_range(
+            exchange_id=ExchangeId.bybit_com,
+            symbol="BTC/USD",
+            interval=IntervalType.HOUR_1,
+            strategy=StrategyType.CCI_20_CROSS_100,
+            date_from=datetime(2024, 10, 10, 11),
+        )
+        assert [signal_mdl.date_time.hour for signal_mdl in result] == [11, 12]
+
+    @patch("trading_core.core.config.get_config_value")
+    def test_clear_buffer(self, mock_get_config_value, store):
+        mock_get_config_value.return_value = False
+        date_time = datetime(2024, 10, 10, 10)
+        store.set(get_key(date_time), get_signal(date_time))
+
+        store.clear_buffer()
+        assert store.get(get_key(date_time)) is None
+
+
+class TestSignalStoreMongo:
+    @pytest.fixture
+    def store(self):
+        with patch("trading_core.signal_store.MongoSignals") as mock_mongo:
+            store = SignalStoreMongo()
+            store._db = mock_mongo.return_value
+            yield store
+
+    def test_get(self, store):
+        date_time = datetime(2024, 10, 10, 10)
+        store._db.get_one.return_value = {
+            Const.DB_SIGNAL: get_signal(date_time).model_dump(
+                mode="json", exclude_none=True
+            )
+        }
+
+        result = store.get(get_key(date_time))
+
+        store._db.get_one.assert_called_once_with(
+            SignalStoreBase.get_key_id(get_key(date_time))
+        )
+        assert result.date_time == date_time
+        assert result.signal == SignalType.BUY
+
+    def test_set_many(self, store):
+        date_time = datetime(2024, 10, 10, 10)
+        store._db.insert_signals.return_value = 1
+
+        assert store.set(get_key(date_time), get_signal(date_time)) is True
+
+        entries = store._db.insert_signals.call_args[0][0]
+        entry = entries[SignalStoreBase.get_key_id(get_key(date_time))]
+        assert entry[Const.DB_SYMBOL] == "BTC/USD"
+        assert entry[Const.DB_DATE_TIME] == date_time
+
+
+def test_signal_store_factory():
+    assert isinstance(
+        SignalStoreFactory.create_store(Const.SIGNAL_STORE_LOCAL), SignalStoreLocal
+    )
+
+    with pytest.raises(Exception):
+        SignalStoreFactory.create_store("unknown")
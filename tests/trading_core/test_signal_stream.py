@@ -0,0 +1,98 @@
+import pytest
+from unittest.mock import patch
+import json
+from datetime import datetime
+
+from trading_core.common import (
+    IntervalType,
+    StrategyType,
+    SignalType,
+    SignalModel,
+    StreamLimitException,
+)
+from trading_core.signal_stream import SignalBroker
+
+
+def get_signal(symbol: str, signal: SignalType = SignalType.BUY):
+    return SignalModel(
+        trader_id="trader_1",
+        symbol=symbol,
+        interval=IntervalType.HOUR_1,
+        strategy=StrategyType.CCI_20_CROSS_100,
+        date_time=datetime(2024, 10, 10, 10),
+        open=1,
+        high=2,
+        low=0.5,
+        close=1.5,
+        volume=100,
+        stop_loss_value=0.5,
+        take_profit_value=2,
+        signal=signal,
+    )
+
+
+@pytest.fixture
+def subscription():
+    subscription = SignalBroker.subscribe(
+        symbols=["BTC/USD"], intervals=[IntervalType.HOUR_1]
+    )
+    yield subscription
+    SignalBroker.unsubscribe(subscription)
+
+
+def test_publish_filters_subscriptions(subscription):
+    assert SignalBroker.publish(get_signal("ETH/USD")) == 0
+    assert SignalBroker.publish(get_signal("BTC/USD", SignalType.NONE)) == 0
+    assert SignalBroker.publish(get_signal("BTC/USD")) == 1
+
+    assert subscription.queue.get_nowait().symbol == "BTC/USD"
+    assert subscription.queue.empty()
+
+
+def test_stream_sse(subscription):
+    SignalBroker.publish(get_signal("BTC/USD"))
+
+    stream = SignalBroker.stream(subscription, format=SignalBroker.FORMAT_SSE)
+    event = next(stream)
+
+    assert event.startswith("event: signal\ndata: ")
+    assert event.endswith("\n\n")
+    data = json.loads(event.split("data: ")[1])
+    assert data["symbol"] == "BTC/USD"
+    assert data["signal"] == SignalType.BUY.value
+
+    stream.close()
+    assert subscription not in SignalBroker._subscriptions
+
+
+def test_stream_ndjson(subscription):
+    SignalBroker.publish(get_signal("BTC/USD"))
+
+    stream = SignalBroker.stream(subscription, format=SignalBroker.FORMAT_NDJSON)
+    line = next(stream)
+
+    assert line.endswith("\n")
+    assert json.loads(line)["symbol"] == "BTC/USD"
+    stream.close()
+
+
+def test_subscription_limit(subscription):
+    with patch.object(SignalBroker, "MAX_SUBSCRIPTIONS", 1):
+        with pytest.raises(StreamLimitException):
+            SignalBroker.subscribe(symbols=["ETH/USD"])
+
+    SignalBroker.unsubscribe(subscription)
+    other_subscription = SignalBroker.subscribe(symbols=["ETH/USD"])
+    SignalBroker.unsubscribe(other_subscription)
+
+
+def test_stream_is_closed_after_max_duration(subscription):
+    with patch.object(SignalBroker, "STREAM_MAX_DURATION", 0.05), patch.object(
+        SignalBroker, "HEARTBEAT_INTERVAL", 0.01
+    ):
+        lines = list(
+            SignalBroker.stream(subscription, format=SignalBroker.FORMAT_NDJSON)
+        )
+
+    assert lines and all(line == "\n" for line in lines)
+    assert subscription not in SignalBroker._subscriptions
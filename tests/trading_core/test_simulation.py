@@ -0,0 +1,235 @@
+import pytest
+from unittest.mock import MagicMock, patch
+import os
+import numpy as np
+import pandas as pd
+
+from trading_core.common import (
+    HistoryDataModel,
+    IntervalType,
+    StrategyType,
+    TradingType,
+    TransactionModel,
+    TransactionType,
+)
+
+# Strategies of the simulation are calculated by pandas_ta
+pytest.importorskip("pandas_ta")
+
+from trading_core.simulation import SharedHistoryData, SimulationGrid
+
+
+class StubSimulationGrid(SimulationGrid):
+    # Workers import the grid by the module, the simulation reads the shared data only
+    def simulate(self, cell, history_data_mdl):
+        if cell.symbol == "ETH/USD" and cell.strategy == StrategyType.CCI_14_CROSS_100:
+            raise Exception("Simulation error")
+
+        return {
+            "symbol": cell.symbol,
+            "strategy": cell.strategy,
+            "history_symbol": history_data_mdl.symbol,
+            "bars": len(history_data_mdl.data),
+            "close": float(history_data_mdl.data["Close"].iloc[-1]),
+            "pid": os.getpid(),
+        }
+
+
+def get_history_data(symbol: str, interval: IntervalType, bars: int = 50):
+    close = np.linspace(100, 150, bars)
+    return HistoryDataModel(
+        symbol=symbol,
+        interval=interval,
+        limit=bars,
+        data=pd.DataFrame(
+            {
+                "Open": close,
+                "High": close + 1,
+                "Low": close - 1,
+                "Close": close,
+                "Volume": np.full(bars, 10.0),
+            },
+            index=pd.date_range(
+                "2024-01-01", periods=bars, freq="h", name="Datetime"
+            ),
+        ),
+    )
+
+
+def test_shared_history_data_round_trip():
+    history_data_mdl = get_history_data("BTC/USD", IntervalType.HOUR_1)
+    shared_history_data = SharedHistoryData(history_data_mdl)
+
+    try:
+        attached_mdl = SharedHistoryData.attach(shared_history_data.get_descriptor())
+
+        assert attached_mdl.symbol == "BTC/USD"
+        assert attached_mdl.interval == IntervalType.HOUR_1
+        pd.testing.assert_frame_equal(
+            attached_mdl.data, history_data_mdl.data, check_freq=False
+        )
+
+        # The data is a view of the shared block
+        with pytest.raises(ValueError):
+            attached_mdl.data.iloc[0, 0] = 0
+    finally:
+        shared_memory, _ = SharedHistoryData._attached.pop(
+            shared_history_data.get_descriptor()[SharedHistoryData.FLD_NAME]
+        )
+        shared_memory.close()
+        shared_history_data.close()
+
+
+class TestSimulationGrid:
+    @pytest.fixture
+    def history_data_handler(self):
+        history_data_handler = MagicMock()
+        history_data_handler.get_history_data.side_effect = (
+            lambda param: get_history_data(param.symbol, param.interval)
+        )
+
+        with patch(
+            "trading_core.simulation.buffer_runtime_handler"
+        ) as buffer_runtime_handler:
+            buffer_runtime_handler.get_history_data_handler.return_value = (
+                history_data_handler
+            )
+            yield history_data_handler
+
+    def get_grid(self, **kwargs) -> SimulationGrid:
+        return SimulationGrid(
+            trader_id="trader_1",
+            trading_type=TradingType.LEVERAGE,
+            stop_loss_rate=0,
+            is_trailing_stop=True,
+            take_profit_rate=0,
+            init_balance=1000,
+            details=False,
+            max_workers=1,
+            **kwargs,
+        )
+
+    def test_history_data_is_loaded_once_per_symbol_interval(
+        self, history_data_handler
+    ):
+        grid = self.get_grid()
+        cells = grid.get_cells(
+            symbols=["BTC/USD", "ETH/USD"],
+            intervals=[IntervalType.HOUR_1],
+            strategies=[StrategyType.CCI_14_CROSS_100, StrategyType.CCI_20_CROSS_100],
+            limits={IntervalType.HOUR_1: 20},
+        )
+
+        with patch("trading_core.simulation.Robot") as robot, patch.object(
+            grid, "_get_session_result", side_effect=lambda session_mng: {}
+        ):
+            results = list(grid.run(cells))
+
+        assert len(results) == 4
+        assert history_data_handler.get_history_data.call_count == 2
+
+        simulations = robot.return_value.run_history_simulation.call_args_list
+        assert [call.kwargs["strategy"] for call in simulations] == [
+            StrategyType.CCI_14_CROSS_100,
+            StrategyType.CCI_20_CROSS_100,
+        ] * 2
+        assert all(
+            call.kwargs["history_data_mdl"].symbol == call.kwargs["symbol"]
+            for call in simulations
+        )
+
+    def test_transactions_are_written_to_files(self, history_data_handler, tmp_path):
+        def run_history_simulation(**kwargs):
+            kwargs["transaction_sink"].write(
+                TransactionModel(
+                    session_id="session_1",
+                    user_id="temporary_user",
+                    date_time=pd.Timestamp("2024-01-01"),
+                    type=TransactionType.DB_CLOSE_POSITION,
+                    data={"symbol": kwargs["symbol"]},
+                )
+            )
+
+        grid = self.get_grid(transaction_dir=str(tmp_path))
+        cells = grid.get_cells(
+            symbols=["BTC/USD", "ETH/USD"],
+            intervals=[IntervalType.HOUR_1],
+            strategies=[StrategyType.CCI_20_CROSS_100],
+            limits={IntervalType.HOUR_1: 20},
+        )
+
+        with patch("trading_core.simulation.Robot") as robot, patch.object(
+            grid, "_get_session_result", side_effect=lambda session_mng: {}
+        ):
+            robot.return_value.run_history_simulation.side_effect = (
+                run_history_simulation
+            )
+            results = list(grid.run(cells))
+
+        transaction_files = [
+            result[SimulationGrid.FLD_TRANSACTIONS_FILE] for result in results
+        ]
+        assert len(set(transaction_files)) == 2
+
+        for transaction_file, symbol in zip(
+            transaction_files, ["BTC/USD", "ETH/USD"]
+        ):
+            with open(transaction_file) as stream:
+                lines = stream.read().splitlines()
+
+            assert len(lines) == 1
+            assert symbol in lines[0]
+
+
+class TestSimulationGridWorkers:
+    @pytest.fixture
+    def history_data_handler(self):
+        history_data_handler = MagicMock()
+        history_data_handler.get_history_data.side_effect = lambda param: (
+            get_history_data(param.symbol, param.interval, bars=30)
+        )
+
+        with patch(
+            "trading_core.simulation.buffer_runtime_handler"
+        ) as buffer_runtime_handler:
+            buffer_runtime_handler.get_history_data_handler.return_value = (
+                history_data_handler
+            )
+            yield history_data_handler
+
+    def test_cells_are_simulated_by_workers(self, history_data_handler):
+        grid = StubSimulationGrid(
+            trader_id="trader_1",
+            trading_type=TradingType.LEVERAGE,
+            stop_loss_rate=0,
+            is_trailing_stop=True,
+            take_profit_rate=0,
+            init_balance=1000,
+            max_workers=2,
+        )
+        cells = grid.get_cells(
+            symbols=["BTC/USD", "ETH/USD"],
+            intervals=[IntervalType.HOUR_1],
+            strategies=[StrategyType.CCI_14_CROSS_100, StrategyType.CCI_20_CROSS_100],
+            limits={IntervalType.HOUR_1: 20},
+        )
+
+        results = list(grid.evaluate(cells))
+
+        assert history_data_handler.get_history_data.call_count == 2
+        assert len(results) == 4
+        errors = [(cell.symbol, f"{error}") for cell, _, error in results if error]
+        assert errors == [("ETH/USD", "Simulation error")]
+
+        for cell, session_result, error in results:
+            if error:
+                continue
+
+            # The history data is read from the shared memory by the worker process
+            assert session_result["pid"] != os.getpid()
+            assert session_result["history_symbol"] == cell.symbol
+            assert session_result["bars"] == 30
+            assert session_result["close"] == 150
+
+        # The failed cell is skipped by the results
+        assert len(list(grid.run(cells))) == 3
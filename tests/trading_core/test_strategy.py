@@ -0,0 +1,231 @@
+import pytest
+from unittest.mock import patch
+from datetime import datetime
+import threading
+import time
+import numpy as np
+import pandas as pd
+
+from trading_core.common import (
+    ExchangeId,
+    HistoryDataModel,
+    IntervalType,
+    SignalModel,
+    SignalParamModel,
+    SignalType,
+    StrategyParamModel,
+    StrategyType,
+)
+
+# Strategies are calculated by pandas_ta
+pytest.importorskip("pandas_ta")
+
+from trading_core.indicator import IndicatorWarmUp
+from trading_core.strategy import SignalFactory, StrategyFactory
+
+
+def get_param(symbol: str, trader_id: str = "trader_1") -> SignalParamModel:
+    return SignalParamModel(
+        trader_id=trader_id,
+        symbol=symbol,
+        interval=IntervalType.HOUR_1,
+        strategy=StrategyType.CCI_20_CROSS_100,
+        from_buffer=True,
+        closed_bars=True,
+    )
+
+
+def get_signal(param: SignalParamModel) -> SignalModel:
+    return SignalModel(
+        trader_id=param.trader_id,
+        symbol=param.symbol,
+        interval=param.interval,
+        strategy=param.strategy,
+        date_time=datetime(2024, 10, 10, 10),
+        open=1,
+        high=2,
+        low=0.5,
+        close=1.5,
+        volume=100,
+        signal=SignalType.BUY,
+    )
+
+
+class TestSignalFactoryConcurrency:
+    @pytest.fixture(autouse=True)
+    def exchanges(self):
+        exchanges = {
+            "trader_1": ExchangeId.demo_bybit_com,
+            "trader_2": ExchangeId.bybit_com,
+        }
+
+        with patch.object(
+            SignalFactory, "_get_exchange_id", side_effect=lambda id: exchanges[id]
+        ), patch.dict(SignalFactory._exchange_semaphores, clear=True):
+            yield exchanges
+
+    def test_results_keep_the_order_of_params(self):
+        params = [get_param(f"SYMBOL_{index}") for index in range(20)]
+
+        def get_signal_delayed(param):
+            # Later params are completed first
+            time.sleep(0.001 * (20 - int(param.symbol.split("_")[1])))
+            return get_signal(param)
+
+        with patch.object(SignalFactory, "_get_signal", side_effect=get_signal_delayed):
+            results = SignalFactory().evaluate_signals(params)
+
+        assert [param.symbol for param, _, _ in results] == [
+            param.symbol for param in params
+        ]
+        assert all(
+            signal_mdl.symbol == param.symbol and error is None
+            for param, signal_mdl, error in results
+        )
+
+    def test_errors_are_returned_per_param(self):
+        params = [get_param("BTC/USD"), get_param("ETH/USD"), get_param("XRP/USD")]
+
+        def get_signal_or_fail(param):
+            if param.symbol == "ETH/USD":
+                raise Exception("API error")
+            return get_signal(param)
+
+        with patch.object(SignalFactory, "_get_signal", side_effect=get_signal_or_fail):
+            results = SignalFactory().evaluate_signals(params)
+            signal_mdls = SignalFactory().get_signals(params)
+
+        assert [str(error) if error else None for _, _, error in results] == [
+            None,
+            "API error",
+            None,
+        ]
+        assert [signal_mdl.symbol for signal_mdl in signal_mdls] == [
+            "BTC/USD",
+            "XRP/USD",
+        ]
+
+    def test_concurrency_is_limited_per_exchange(self):
+        params = [get_param(f"SYMBOL_{index}", "trader_1") for index in range(12)]
+        params += [get_param(f"SYMBOL_{index}", "trader_2") for index in range(4)]
+
+        lock = threading.Lock()
+        running = {}
+        max_running = {}
+
+        def get_signal_counted(param):
+            with lock:
+                running[param.trader_id] = running.get(param.trader_id, 0) + 1
+                max_running[param.trader_id] = max(
+                    max_running.get(param.trader_id, 0), running[param.trader_id]
+                )
+            time.sleep(0.02)
+            with lock:
+                running[param.trader_id] -= 1
+            return get_signal(param)
+
+        with patch.object(SignalFactory, "_get_signal", side_effect=get_signal_counted):
+            results = SignalFactory().evaluate_signals(params, max_workers=16)
+
+        assert len(results) == 16
+        assert max_running["trader_1"] == SignalFactory.EXCHANGE_MAX_CONCURRENCY
+        assert max_running["trader_2"] <= SignalFactory.EXCHANGE_MAX_CONCURRENCY
+
+
+def get_strategy_param(strategy: StrategyType, limit: int = 1) -> StrategyParamModel:
+    return StrategyParamModel(
+        trader_id="trader_1",
+        symbol="BTC/USD",
+        interval=IntervalType.HOUR_1,
+        strategy=strategy,
+        limit=limit,
+    )
+
+
+class TestStrategyHistoryLimit:
+    # Rows of the history data which are requested for limit = 1 with the default tolerance
+    HISTORY_LIMITS = {
+        StrategyType.CCI_14_CROSS_100: 17,
+        StrategyType.CCI_20_CROSS_100: 23,
+        StrategyType.CCI_50_CROSS_100: 53,
+        StrategyType.CCI_50_CROSS_0: 53,
+        StrategyType.EMA_30_CROSS_EMA_100: 301,
+        StrategyType.EMA_8_CROSS_EMA_30_FILTER_CCI_14: 101,
+        StrategyType.EMA_8_CROSS_EMA_30_FILTER_EMA_100: 301,
+        StrategyType.EMA_30_CROSS_EMA_100_FILTER_CCI_50: 301,
+        StrategyType.EMA_50_CROSS_EMA_100_FILTER_UP_LEVEL_TREND: 301,
+        StrategyType.EMA_50_CROSS_EMA_100_FILTER_UP_LEVEL_TREND_TP: 301,
+    }
+
+    @pytest.fixture(autouse=True)
+    def tolerance(self):
+        with patch.object(IndicatorWarmUp, "get_tolerance", return_value=0.001):
+            yield
+
+    @pytest.mark.parametrize("strategy", list(StrategyType))
+    def test_history_limit_of_strategy(self, strategy):
+        strategy_inst = StrategyFactory.get_strategy_instance(strategy)
+
+        assert (
+            strategy_inst.get_history_limit(get_strategy_param(strategy))
+            == self.HISTORY_LIMITS[strategy]
+        )
+        assert (
+            strategy_inst.get_history_limit(get_strategy_param(strategy, limit=10))
+            == self.HISTORY_LIMITS[strategy] + 9
+        )
+
+    @pytest.mark.parametrize("strategy", list(StrategyType))
+    def test_history_limit_is_capped_by_the_config(self, strategy):
+        strategy_inst = StrategyFactory.get_strategy_instance(strategy)
+        param = get_strategy_param(strategy)
+
+        assert (
+            strategy_inst.get_history_limit(param)
+            <= param.limit + strategy_inst.get_strategy_config().history_limit
+        )
+
+    def test_looser_tolerance_reduces_history_limit(self):
+        with patch.object(IndicatorWarmUp, "get_tolerance", return_value=0.05):
+            for strategy in [
+                StrategyType.EMA_30_CROSS_EMA_100,
+                StrategyType.EMA_8_CROSS_EMA_30_FILTER_CCI_14,
+                StrategyType.EMA_50_CROSS_EMA_100_FILTER_UP_LEVEL_TREND,
+            ]:
+                assert (
+                    StrategyFactory.get_strategy_instance(strategy).get_history_limit(
+                        get_strategy_param(strategy)
+                    )
+                    < self.HISTORY_LIMITS[strategy]
+                )
+
+    @pytest.mark.parametrize(
+        "strategy", [StrategyType.CCI_14_CROSS_100, StrategyType.CCI_50_CROSS_0]
+    )
+    def test_cci_strategy_data_rows(self, strategy):
+        bars = 200
+        close = 100 + 10 * np.sin(np.linspace(0, 20, bars))
+        history_data_mdl = HistoryDataModel(
+            symbol="BTC/USD",
+            interval=IntervalType.HOUR_1,
+            limit=bars,
+            data=pd.DataFrame(
+                {
+                    "Open": close,
+                    "High": close + 1,
+                    "Low": close - 1,
+                    "Close": close,
+                    "Volume": np.full(bars, 10.0),
+                },
+                index=pd.date_range(
+                    "2024-01-01", periods=bars, freq="h", name="Datetime"
+                ),
+            ),
+        )
+
+        strategy_inst = StrategyFactory.get_strategy_instance(strategy)
+        strategy_df = strategy_inst.get_strategy_data(
+            get_strategy_param(strategy, limit=5), history_data_mdl=history_data_mdl
+        )
+
+        assert len(strategy_df) == 5 + 3
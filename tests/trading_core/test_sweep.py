@@ -0,0 +1,177 @@
+import pytest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+
+from trading_core.constants import Const
+from trading_core.common import (
+    HistoryDataModel,
+    IntervalType,
+    StrategyParamModel,
+    StrategyType,
+)
+
+# Indicators of the sweep are calculated by pandas_ta
+pytest.importorskip("pandas_ta")
+
+from trading_core.strategy import StrategyFactory
+from trading_core.sweep import StrategySweep
+
+
+def get_history_df(bars: int, seed: int = 1) -> pd.DataFrame:
+    random = np.random.default_rng(seed)
+
+    close = np.round(100 + np.cumsum(random.normal(0, 0.5, bars)), 2)
+    open = np.round(np.roll(close, 1), 2)
+    open[0] = close[0]
+
+    return pd.DataFrame(
+        {
+            "Open": open,
+            "High": np.maximum(open, close) + 0.2,
+            "Low": np.minimum(open, close) - 0.2,
+            "Close": close,
+            "Volume": np.full(bars, 10.0),
+        },
+        index=pd.date_range("2024-01-01", periods=bars, freq="h", name="Datetime"),
+    )
+
+
+def get_param(strategy: StrategyType, limit: int = 50) -> StrategyParamModel:
+    return StrategyParamModel(
+        trader_id="trader_1",
+        symbol="BTC/USD",
+        interval=IntervalType.HOUR_1,
+        strategy=strategy,
+        limit=limit,
+    )
+
+
+class TestStrategySweepIndicators:
+    @pytest.mark.parametrize(
+        "strategy, family, combination, columns",
+        [
+            (
+                StrategyType.CCI_20_CROSS_100,
+                StrategySweep.FAMILY_CCI,
+                {"length": 20},
+                {(Const.FLD_CCI, 20): Const.FLD_CCI},
+            ),
+            (
+                StrategyType.EMA_30_CROSS_EMA_100,
+                StrategySweep.FAMILY_EMA_CROSS,
+                {"ema_short": 30, "ema_long": 100},
+                {
+                    (Const.FLD_EMA, 30): Const.FLD_EMA_30,
+                    (Const.FLD_EMA, 100): Const.FLD_EMA_100,
+                },
+            ),
+            (
+                StrategyType.EMA_8_CROSS_EMA_30_FILTER_CCI_14,
+                StrategySweep.FAMILY_EMA_CROSS_FILTER_CCI,
+                {"ema_short": 8, "ema_long": 30, "length": 14},
+                {
+                    (Const.FLD_EMA, 8): Const.FLD_EMA_8,
+                    (Const.FLD_EMA, 30): Const.FLD_EMA_30,
+                    (Const.FLD_CCI, 14): Const.FLD_CCI,
+                },
+            ),
+        ],
+    )
+    def test_indicators_equal_strategy_data(
+        self, strategy, family, combination, columns
+    ):
+        param = get_param(strategy)
+        strategy_inst = StrategyFactory.get_strategy_instance(strategy)
+
+        # The sweep and the strategy calculate the indicators over the same history data
+        history_df = get_history_df(strategy_inst.get_history_limit(param))
+        history_data_mdl = HistoryDataModel(
+            symbol=param.symbol,
+            interval=param.interval,
+            limit=len(history_df),
+            data=history_df,
+        )
+
+        strategy_df = strategy_inst.get_strategy_data(
+            param, history_data_mdl=history_data_mdl
+        )
+        indicators = StrategySweep()._get_indicators(history_df, family, [combination])
+
+        assert set(indicators) == set(columns)
+        for key, column in columns.items():
+            np.testing.assert_allclose(
+                indicators[key][-len(strategy_df) :],
+                strategy_df[column].to_numpy(dtype=float),
+            )
+
+
+class TestStrategySweepRanking:
+    GRID = {"length": [14, 20, 30], "max_value": [50, 100, 150]}
+
+    @pytest.fixture(autouse=True)
+    def history_df(self):
+        history_df = get_history_df(500, seed=7)
+
+        with patch.object(StrategySweep, "_get_history_data", return_value=history_df):
+            yield history_df
+
+    def get_signal_return(self, close, signals) -> float:
+        # Signal-only position which is held until an opposite signal
+        equity = 1.0
+        position = 0
+        for index in range(1, len(close)):
+            if signals[index - 1]:
+                position = signals[index - 1]
+            equity *= 1 + position * (close[index] / close[index - 1] - 1)
+
+        return equity - 1
+
+    def test_ranking_is_in_a_fixed_order(self, history_df):
+        param = get_param(StrategyType.CCI_20_CROSS_100, limit=300)
+
+        results = StrategySweep().run(param=param, grid=self.GRID)
+
+        assert len(results) == 9
+        assert all(result[StrategySweep.FLD_TRADES] for result in results)
+        assert results == StrategySweep().run(param=param, grid=self.GRID)
+        assert StrategySweep().run(param=param, grid=self.GRID, top=3) == results[:3]
+
+        signal_returns = [result[StrategySweep.FLD_SIGNAL_RETURN] for result in results]
+        assert signal_returns == sorted(signal_returns, reverse=True)
+
+        # Combinations with the same return keep the order of the grid
+        grid_order = [
+            (length, max_value)
+            for length in self.GRID["length"]
+            for max_value in self.GRID["max_value"]
+        ]
+        for result, next_result in zip(results, results[1:]):
+            if (
+                result[StrategySweep.FLD_SIGNAL_RETURN]
+                == next_result[StrategySweep.FLD_SIGNAL_RETURN]
+            ):
+                assert grid_order.index(
+                    (result["length"], result["max_value"])
+                ) < grid_order.index((next_result["length"], next_result["max_value"]))
+
+    def test_signal_return_of_the_combinations(self, history_df):
+        param = get_param(StrategyType.CCI_20_CROSS_100, limit=300)
+        sweep = StrategySweep()
+
+        results = sweep.run(param=param, grid=self.GRID)
+
+        close = history_df[Const.COLUMN_CLOSE].to_numpy(dtype=float)[-param.limit :]
+        for result in results:
+            cci = sweep._get_indicators(
+                history_df, StrategySweep.FAMILY_CCI, [{"length": result["length"]}]
+            )[(Const.FLD_CCI, result["length"])]
+            signals = sweep._get_cci_signals(
+                cci=cci,
+                min_value=result["miv_value"],
+                max_value=result["max_value"],
+            )[-param.limit :]
+
+            assert result[StrategySweep.FLD_SIGNAL_RETURN] == pytest.approx(
+                self.get_signal_return(close, signals)
+            )
@@ -1,5 +1,8 @@
 from datetime import datetime, timedelta
 import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
 import requests
 from requests.models import RequestEncodingMixin
 import json
@@ -8,7 +11,7 @@ import math
 import hmac
 import hashlib
 from bson import ObjectId
-from pybit.unified_trading import HTTP
+from pybit.unified_trading import HTTP, WebSocket
 
 from trading_core.common import TraderModel
 
@@ -39,6 +42,107 @@ import logging
 logger = logging.getLogger("api")
 
 
+class OrderConfirmation:
+    """
+    Confirms placed orders by polling the exchange with increasing delays, in place or in the background,
+    and measures the order-to-confirmation latency
+    """
+
+    INITIAL_DELAY = 0.05
+    MAX_DELAY = 1
+    TIMEOUT = 10
+    MAX_WORKERS = 4
+    LATENCY_HISTORY = 1000
+
+    FLD_COUNT = "count"
+    FLD_FAILED = "failed"
+    FLD_LAST = "last"
+    FLD_AVERAGE = "average"
+    FLD_P95 = "p95"
+    FLD_MAX = "max"
+
+    _executor: ThreadPoolExecutor = None
+    _latencies: deque = deque(maxlen=LATENCY_HISTORY)
+    _failed: int = 0
+    _lock = threading.Lock()
+
+    @staticmethod
+    def wait(check, timeout: float = None):
+        # check - returns the confirmed result or None if the order isn't visible yet
+        timeout = timeout or OrderConfirmation.TIMEOUT
+        delay = OrderConfirmation.INITIAL_DELAY
+        start_time = time.monotonic()
+
+        while True:
+            result = check()
+            elapsed = time.monotonic() - start_time
+
+            if result:
+                OrderConfirmation._add_latency(elapsed)
+                return result
+
+            if elapsed + delay > timeout:
+                with OrderConfirmation._lock:
+                    OrderConfirmation._failed += 1
+                return None
+
+            time.sleep(delay)
+            delay = min(delay * 2, OrderConfirmation.MAX_DELAY)
+
+    @staticmethod
+    def submit(check, on_confirm, timeout: float = None) -> Future:
+        # on_confirm gets the confirmed result or None if the order hasn't been confirmed in time
+        def confirm():
+            result = None
+            try:
+                result = OrderConfirmation.wait(check, timeout=timeout)
+            except Exception as error:
+                logger.error(f"OrderConfirmation: Order confirmation has failed - {error}")
+
+            try:
+                on_confirm(result)
+            except Exception as error:
+                logger.error(f"OrderConfirmation: Confirmation callback has failed - {error}")
+
+            return result
+
+        with OrderConfirmation._lock:
+            if not OrderConfirmation._executor:
+                OrderConfirmation._executor = ThreadPoolExecutor(
+                    max_workers=OrderConfirmation.MAX_WORKERS,
+                    thread_name_prefix="order_confirmation",
+                )
+
+        return OrderConfirmation._executor.submit(confirm)
+
+    @staticmethod
+    def get_metrics() -> dict:
+        with OrderConfirmation._lock:
+            latencies = sorted(OrderConfirmation._latencies)
+            metrics = {
+                OrderConfirmation.FLD_COUNT: len(latencies),
+                OrderConfirmation.FLD_FAILED: OrderConfirmation._failed,
+            }
+
+            if latencies:
+                metrics[OrderConfirmation.FLD_LAST] = OrderConfirmation._latencies[-1]
+                metrics[OrderConfirmation.FLD_AVERAGE] = sum(latencies) / len(latencies)
+                metrics[OrderConfirmation.FLD_P95] = latencies[
+                    min(len(latencies) - 1, int(len(latencies) * 0.95))
+                ]
+                metrics[OrderConfirmation.FLD_MAX] = latencies[-1]
+
+        return metrics
+
+    @staticmethod
+    def _add_latency(latency: float) -> None:
+        with OrderConfirmation._lock:
+            OrderConfirmation._latencies.append(latency)
+
+        if config.get_config_value(Const.CONF_PROPERTY_API_LOG):
+            logger.info(f"OrderConfirmation: Order has been confirmed in {latency:.3f}s")
+
+
 class ExchangeApiBase:
 
     BATCH_SIZE = 1000
@@ -152,6 +256,42 @@ class ExchangeApiBase:
     ) -> LeverageModel:
         pass
 
+    def get_position_stream(self, websocket=None):
+        # Positions of the exchanges without a private stream are requested by REST
+        return None
+
+    def get_open_positions(
+        self, positions: list[LeverageModel]
+    ) -> dict[str, LeverageModel]:
+        # Open positions on the exchange for the positions of the sessions by symbols
+        open_positions = {}
+        for position_mdl in positions:
+            open_position_mdl = self.get_open_position(
+                symbol=position_mdl.symbol,
+                order_id=position_mdl.order_id,
+                position_id=position_mdl.position_id,
+            )
+            if open_position_mdl:
+                open_positions[position_mdl.symbol] = open_position_mdl
+
+        return open_positions
+
+    def get_close_positions(
+        self, positions: list[LeverageModel]
+    ) -> dict[str, OrderCloseModel]:
+        # Close details of the positions which aren't open on the exchange anymore by symbols
+        close_positions = {}
+        for position_mdl in positions:
+            close_position_mdl = self.get_close_position(
+                symbol=position_mdl.symbol,
+                order_id=position_mdl.order_id,
+                position_id=position_mdl.position_id,
+            )
+            if close_position_mdl:
+                close_positions[position_mdl.symbol] = close_position_mdl
+
+        return close_positions
+
     def get_position(
         self, symbol: str = None, order_id: str = None, position_id: str = None
     ) -> LeverageModel:
@@ -160,7 +300,11 @@ class ExchangeApiBase:
     def create_order(self, position_mdl: OrderModel) -> OrderModel:
         pass
 
-    def create_leverage(self, position_mdl: LeverageModel) -> LeverageModel:
+    def create_leverage(
+        self, position_mdl: LeverageModel, on_confirm=None
+    ) -> LeverageModel:
+        # on_confirm - the placed position is returned right away and the callback gets the confirmed one.
+        # It's ignored by the exchanges which return the executed order by the response
         pass
 
     def close_order(self, position_id: str) -> OrderModel:
@@ -482,6 +626,10 @@ class ByBitComApi(ExchangeApiBase):
 
     COIN_BASE = "USDT"
 
+    # The latest records of the account which are requested for all symbols at once
+    ORDER_HISTORY_LIMIT = 50
+    CLOSED_PNL_LIMIT = 50
+
     def get_api_endpoints(self) -> str:
         return "https://api.bybit.com/v5/"
 
@@ -633,24 +781,60 @@ class ByBitComApi(ExchangeApiBase):
             )
 
             if history_order_mdls:
-                history_order_mdl = history_order_mdls[0]
-                # Get current values from position info API
-                history_order_mdl.stop_loss = self.get_float_from_dict(
-                    name=Const.API_FLD_STOP_LOSS, dictionary=current_open_order
+                return self._set_position_info(
+                    position_mdl=history_order_mdls[0], position_info=current_open_order
                 )
-                history_order_mdl.take_profit = self.get_float_from_dict(
-                    name=Const.API_FLD_TAKE_PROFIT, dictionary=current_open_order
-                )
-                history_order_mdl.quantity = self.get_float_from_dict(
-                    name=Const.API_FLD_SIZE, dictionary=current_open_order
+
+        return None
+
+    def get_position_stream(self, websocket=None) -> "ByBitPositionStream":
+        return ByBitPositionStream(api=self, websocket=websocket)
+
+    def get_open_positions(
+        self, positions: list[LeverageModel]
+    ) -> dict[str, LeverageModel]:
+        # Position info and the latest filled orders of the account are requested once for all positions
+        open_position_infos = {
+            position_info[Const.API_FLD_SYMBOL]: position_info
+            for position_info in self._get_positions_info()
+            if position_info[Const.API_FLD_SIZE] != "0"
+        }
+
+        open_positions = {}
+        history_order_mdls = None
+
+        for position_mdl in positions:
+            position_info = open_position_infos.get(position_mdl.symbol)
+            if not position_info:
+                continue
+
+            if history_order_mdls is None:
+                history_order_mdls = self._get_order_history(
+                    limit=self.ORDER_HISTORY_LIMIT
                 )
-                history_order_mdl.open_price = self.get_float_from_dict(
-                    name="avgPrice", dictionary=current_open_order
+
+            history_order_mdl = self._find_order(
+                order_mdls=history_order_mdls,
+                symbol=position_mdl.symbol,
+                order_id=position_mdl.order_id,
+                position_id=position_mdl.position_id,
+            )
+
+            if not history_order_mdl:
+                # The order is older than the latest orders of the account
+                symbol_order_mdls = self._get_order_history(
+                    symbol=position_mdl.symbol,
+                    order_id=position_mdl.order_id,
+                    position_id=position_mdl.position_id,
                 )
+                history_order_mdl = symbol_order_mdls[0] if symbol_order_mdls else None
 
-                return history_order_mdl
+            if history_order_mdl:
+                open_positions[position_mdl.symbol] = self._set_position_info(
+                    position_mdl=history_order_mdl, position_info=position_info
+                )
 
-        return None
+        return open_positions
 
     def get_position(
         self, symbol: str, order_id: str = None, position_id: str = None
@@ -698,67 +882,173 @@ class ByBitComApi(ExchangeApiBase):
 
             return None
 
-    def create_leverage(self, position_mdl: LeverageModel) -> LeverageModel:
-        created_ids = self._place_order(position_mdl=position_mdl)
+    def get_close_positions(
+        self, positions: list[LeverageModel]
+    ) -> dict[str, OrderCloseModel]:
+        # Closed PnL and the latest filled orders of the account are requested once for all positions
+        if not positions:
+            return {}
+
+        closed_pnls = {}
+        for closed_pnl in self._get_closed_pnls(limit=self.CLOSED_PNL_LIMIT):
+            # The latest closed PnL of the symbol goes first
+            if closed_pnl[Const.API_FLD_SYMBOL] not in closed_pnls:
+                closed_pnls[closed_pnl[Const.API_FLD_SYMBOL]] = closed_pnl
+
+        history_order_mdls = self._get_order_history(limit=self.ORDER_HISTORY_LIMIT)
+
+        close_positions = {}
+        for position_mdl in positions:
+            closed_pnl = closed_pnls.get(position_mdl.symbol)
+            if not closed_pnl:
+                # The position has been closed before the latest closed PnL of the account
+                close_position_mdl = self.get_close_position(
+                    symbol=position_mdl.symbol,
+                    order_id=position_mdl.order_id,
+                    position_id=position_mdl.position_id,
+                )
+                if close_position_mdl:
+                    close_positions[position_mdl.symbol] = close_position_mdl
+                continue
+
+            closed_order_mdl = self._convert_closed_pnl(closed_pnl)
+
+            closed_position_mdl = self._find_order(
+                order_mdls=history_order_mdls,
+                symbol=position_mdl.symbol,
+                order_id=closed_order_mdl.close_order_id,
+            ) or self.get_position(
+                symbol=position_mdl.symbol,
+                order_id=closed_order_mdl.close_order_id,
+            )
+
+            closed_order_mdl.fee = closed_position_mdl.fee
+            closed_order_mdl.close_reason = (
+                closed_position_mdl.close_reason
+                if closed_position_mdl.close_reason
+                else OrderReason.TRADER
+            )
+            close_positions[position_mdl.symbol] = closed_order_mdl
 
-        time.sleep(0.50)
+        return close_positions
+
+    def create_leverage(
+        self, position_mdl: LeverageModel, on_confirm=None
+    ) -> LeverageModel:
+        created_ids = self._place_order(position_mdl=position_mdl)
 
         # Check - https://bybit-exchange.github.io/docs/v5/order/open-order
 
-        if created_ids:
-            if config.get_config_value(Const.CONF_PROPERTY_API_LOG):
-                logger.info(
-                    f"{self.__class__.__name__}: {self._trader_model.exchange_id.value} ({self._trader_model.id}) - Position has been created with ids: {created_ids}"
-                )
+        if not created_ids:
+            raise APIException(
+                f"{self.__class__.__name__}: {self._trader_model.exchange_id.value} ({self._trader_model.id}) - Error during creation a leverage position. Place Order haven't return ids"
+            )
 
-            created_position_mdl = self.get_open_position(
-                symbol=position_mdl.symbol, order_id=created_ids[Const.API_FLD_ORDER_ID]
+        if config.get_config_value(Const.CONF_PROPERTY_API_LOG):
+            logger.info(
+                f"{self.__class__.__name__}: {self._trader_model.exchange_id.value} ({self._trader_model.id}) - Position has been created with ids: {created_ids}"
             )
 
-            if created_position_mdl:
-                created_position_mdl.session_id = position_mdl.session_id
-                created_position_mdl.open_reason = position_mdl.open_reason
-                created_position_mdl.position_id = created_ids[
-                    Const.API_FLD_ORDER_LINK_ID
-                ]
-                created_position_mdl.leverage = position_mdl.leverage
-                return created_position_mdl
-            else:
-                raise APIException(
-                    f"{self.__class__.__name__}: {self._trader_model.exchange_id.value} ({self._trader_model.id}) - Error during creation a leverage position. Position haven't found for ids: {created_ids}"
-                )
-        else:
+        # The order is visible in the position and order history a moment after the placement
+        def check() -> LeverageModel:
+            return self._get_created_position(
+                position_mdl=position_mdl, created_ids=created_ids
+            )
+
+        if on_confirm:
+            OrderConfirmation.submit(check, on_confirm)
+
+            # The placed position with the requested values until it's confirmed
+            return position_mdl.model_copy(
+                update={
+                    Const.DB_ORDER_ID: created_ids[Const.API_FLD_ORDER_ID],
+                    Const.DB_POSITION_ID: created_ids[Const.API_FLD_ORDER_LINK_ID],
+                    Const.DB_STATUS: OrderStatus.opened,
+                }
+            )
+
+        created_position_mdl = OrderConfirmation.wait(check)
+        if not created_position_mdl:
             raise APIException(
-                f"{self.__class__.__name__}: {self._trader_model.exchange_id.value} ({self._trader_model.id}) - Error during creation a leverage position. Place Order haven't return ids"
+                f"{self.__class__.__name__}: {self._trader_model.exchange_id.value} ({self._trader_model.id}) - Error during creation a leverage position. Position haven't found for ids: {created_ids}"
             )
 
+        return created_position_mdl
+
     def close_leverage(
         self, symbol: str, order_id: str = None, position_id: str = None
     ) -> OrderCloseModel:
-        openned_posision_mdl = self.get_open_position(
-            symbol=symbol, order_id=order_id, position_id=position_id
-        )
-        if not openned_posision_mdl:
+        # Position info has enough details to place the closing order
+        position_info = self._check_open_position(symbol)
+        if not position_info:
             return None
 
-        openned_posision_mdl.side = self._convert_side_for_closing_order(
-            openned_posision_mdl.side
+        closing_position_mdl = LeverageModel(
+            **{
+                Const.DB_SESSION_ID: "1",
+                Const.DB_ACCOUNT_ID: self.COIN_BASE,
+                Const.DB_SYMBOL: symbol,
+                Const.DB_STATUS: OrderStatus.opened,
+                Const.DB_SIDE: self._convert_side_for_closing_order(
+                    self._map_side(api_side=position_info[Const.API_FLD_SIDE])
+                ),
+                Const.DB_TYPE: OrderType.market,
+                Const.DB_OPEN_PRICE: self.get_float_from_dict(
+                    name="avgPrice", dictionary=position_info
+                ),
+                Const.DB_OPEN_DATETIME: datetime.now(),
+                Const.DB_QUANTITY: self.get_float_from_dict(
+                    name=Const.API_FLD_SIZE, dictionary=position_info
+                ),
+                Const.DB_LEVERAGE: 0,
+            }
         )
-        openned_posision_mdl.leverage = 0
-        openned_posision_mdl.take_profit = 0
-        openned_posision_mdl.stop_loss = 0
 
-        closed_position_ids = self._place_order(position_mdl=openned_posision_mdl)
+        closed_position_ids = self._place_order(position_mdl=closing_position_mdl)
 
         if config.get_config_value(Const.CONF_PROPERTY_API_LOG):
             logger.info(
                 f"{self.__class__.__name__}: {self._trader_model.exchange_id.value} ({self._trader_model.id}) - Position has been closed with ids: {closed_position_ids}"
             )
 
-        return self._get_close_position(
-            symbol=symbol, order_id=closed_position_ids[Const.API_FLD_ORDER_ID]
+        close_order_id = closed_position_ids[Const.API_FLD_ORDER_ID]
+
+        # Closed PnL of the closing order is available a moment after the placement
+        def check() -> OrderCloseModel:
+            closed_pnls = self._get_closed_pnls(symbol=symbol, limit=1)
+            if closed_pnls and closed_pnls[0][Const.API_FLD_ORDER_ID] == close_order_id:
+                return self._convert_closed_pnl(closed_pnls[0])
+            return None
+
+        closed_order_mdl = OrderConfirmation.wait(check)
+        if not closed_order_mdl:
+            raise APIException(
+                f"{self.__class__.__name__}: {self._trader_model.exchange_id.value} ({self._trader_model.id}) - Closed Postion couldn't be detected for the order {close_order_id}"
+            )
+
+        closed_position_mdl = self.get_position(symbol=symbol, order_id=close_order_id)
+        if closed_position_mdl:
+            closed_order_mdl.fee = closed_position_mdl.fee
+            if closed_position_mdl.close_reason:
+                closed_order_mdl.close_reason = closed_position_mdl.close_reason
+
+        return closed_order_mdl
+
+    def _get_created_position(
+        self, position_mdl: LeverageModel, created_ids: dict
+    ) -> LeverageModel:
+        created_position_mdl = self.get_open_position(
+            symbol=position_mdl.symbol, order_id=created_ids[Const.API_FLD_ORDER_ID]
         )
 
+        if created_position_mdl:
+            created_position_mdl.session_id = position_mdl.session_id
+            created_position_mdl.open_reason = position_mdl.open_reason
+            created_position_mdl.position_id = created_ids[Const.API_FLD_ORDER_LINK_ID]
+            created_position_mdl.leverage = position_mdl.leverage
+
+        return created_position_mdl
+
     def _convertResponseToDataFrame(self, api_response: list) -> pd.DataFrame:
         """
         Converts the API response into a DataFrame containing historical data.
@@ -890,7 +1180,7 @@ class ByBitComApi(ExchangeApiBase):
 
     def _get_order_history(
         self,
-        symbol: str,
+        symbol: str = None,
         order_id: str = None,
         position_id: str = None,
         limit: int = 1,
@@ -899,11 +1189,16 @@ class ByBitComApi(ExchangeApiBase):
 
         params = {
             "category": self.CATEGORY_LINEAR,
-            "symbol": symbol,
             "orderStatus": "Filled",
             "limit": limit,
         }
 
+        # Orders of all symbols of the account if the symbol isn't passed
+        if symbol:
+            params[Const.API_FLD_SYMBOL] = symbol
+        else:
+            params["settleCoin"] = self.COIN_BASE
+
         if order_id:
             params[Const.API_FLD_ORDER_ID] = order_id
 
@@ -967,28 +1262,41 @@ class ByBitComApi(ExchangeApiBase):
 
         return position_models
 
-    def _get_close_position(
+    def _find_order(
         self,
+        order_mdls: list[LeverageModel],
         symbol: str,
         order_id: str = None,
-    ) -> OrderCloseModel:
-        closed_position_mdl = self.get_position(
-            symbol=symbol,
-            order_id=order_id,
-        )
+        position_id: str = None,
+    ) -> LeverageModel:
+        for order_mdl in order_mdls:
+            if (
+                order_mdl.symbol == symbol
+                and (not order_id or order_mdl.order_id == order_id)
+                and (not position_id or order_mdl.position_id == position_id)
+            ):
+                return order_mdl
 
-        closed_order_mdl = self._get_closed_pnl(symbol=symbol)
+        return None
 
-        if closed_order_mdl:
-            closed_order_mdl.fee = closed_position_mdl.fee
-            closed_order_mdl.close_reason = (
-                closed_position_mdl.close_reason
-                if closed_position_mdl.close_reason
-                else OrderReason.TRADER
-            )
-            return closed_order_mdl
+    def _set_position_info(
+        self, position_mdl: LeverageModel, position_info: dict
+    ) -> LeverageModel:
+        # Get current values from position info API
+        position_mdl.stop_loss = self.get_float_from_dict(
+            name=Const.API_FLD_STOP_LOSS, dictionary=position_info
+        )
+        position_mdl.take_profit = self.get_float_from_dict(
+            name=Const.API_FLD_TAKE_PROFIT, dictionary=position_info
+        )
+        position_mdl.quantity = self.get_float_from_dict(
+            name=Const.API_FLD_SIZE, dictionary=position_info
+        )
+        position_mdl.open_price = self.get_float_from_dict(
+            name="avgPrice", dictionary=position_info
+        )
 
-        return None
+        return position_mdl
 
     def _check_open_position(self, symbol: str) -> bool:
         position_info = self._get_position_info(symbol=symbol)
@@ -1000,10 +1308,21 @@ class ByBitComApi(ExchangeApiBase):
             return None
 
     def _get_position_info(self, symbol: str) -> dict:
-        params = {
-            "category": self.CATEGORY_LINEAR,
-            "symbol": symbol,
-        }
+        positions = self._get_positions_info(symbol=symbol)
+        if positions:
+            for position in positions:
+                return position
+
+        return None
+
+    def _get_positions_info(self, symbol: str = None) -> list:
+        params = {"category": self.CATEGORY_LINEAR}
+
+        # Positions of all symbols of the account if the symbol isn't passed
+        if symbol:
+            params[Const.API_FLD_SYMBOL] = symbol
+        else:
+            params["settleCoin"] = self.COIN_BASE
 
         if config.get_config_value(Const.CONF_PROPERTY_API_LOG):
             logger.info(
@@ -1017,13 +1336,7 @@ class ByBitComApi(ExchangeApiBase):
         # Validate Response format and Code/Message
         self._validate_response(json_api_response)
 
-        # There are some open positions is size is not equal 0
-        positions = json_api_response["result"]["list"]
-        if positions:
-            for position in positions:
-                return position
-
-        return None
+        return json_api_response["result"]["list"]
 
     def _place_order(self, position_mdl: LeverageModel) -> dict:
         position_id = str(ObjectId())
@@ -1087,7 +1400,20 @@ class ByBitComApi(ExchangeApiBase):
         return created_ids
 
     def _get_closed_pnl(self, symbol: str, limit: int = 1) -> dict:
-        params = {"category": self.CATEGORY_LINEAR, "symbol": symbol, "limit": limit}
+        api_positions = self._get_closed_pnls(symbol=symbol, limit=limit)
+        if not api_positions:
+            raise APIException(
+                f"{self.__class__.__name__}: {self._trader_model.exchange_id.value} ({self._trader_model.id}) - Closed Postion couldn't be detected"
+            )
+
+        return self._convert_closed_pnl(api_positions[0])
+
+    def _get_closed_pnls(self, symbol: str = None, limit: int = 1) -> list:
+        params = {"category": self.CATEGORY_LINEAR, "limit": limit}
+
+        # Closed PnL of all symbols of the account if the symbol isn't passed
+        if symbol:
+            params[Const.API_FLD_SYMBOL] = symbol
 
         if config.get_config_value(Const.CONF_PROPERTY_API_LOG):
             logger.info(
@@ -1101,14 +1427,9 @@ class ByBitComApi(ExchangeApiBase):
         # Validate Response format and Code/Message
         self._validate_response(json_api_response)
 
-        api_positions = json_api_response[Const.API_FLD_RESULT][Const.API_FLD_LIST]
-        if not api_positions:
-            raise APIException(
-                f"{self.__class__.__name__}: {self._trader_model.exchange_id.value} ({self._trader_model.id}) - Closed Postion couldn't be detected"
-            )
-
-        position = api_positions[0]
+        return json_api_response[Const.API_FLD_RESULT][Const.API_FLD_LIST]
 
+    def _convert_closed_pnl(self, position: dict) -> OrderCloseModel:
         close_details_data = {
             Const.DB_STATUS: OrderStatus.closed,
             Const.DB_CLOSE_ORDER_ID: position[Const.API_FLD_ORDER_ID],
@@ -1207,6 +1528,14 @@ class ByBitComApi(ExchangeApiBase):
             )
         return api_session
 
+    def _get_api_websocket(self, tesnet: bool = False) -> WebSocket:
+        return WebSocket(
+            testnet=tesnet,
+            channel_type="private",
+            api_key=self._trader_model.decrypt_key(self._trader_model.api_key),
+            api_secret=self._trader_model.decrypt_key(self._trader_model.api_secret),
+        )
+
     def _validate_response(self, response: dict, response_log: bool = True):
         message_text = f"{self.__class__.__name__}: {self._trader_model.exchange_id.value} ({self._trader_model.id}) - "
         if Const.API_FLD_RET_CODE in response and Const.API_FLD_RET_MESSAGE in response:
@@ -1245,6 +1574,200 @@ class DemoByBitComApi(ByBitComApi):
     def _get_api_http_session(self, private_mode: bool = False) -> HTTP:
         return super()._get_api_http_session(private_mode=private_mode, tesnet=True)
 
+    def _get_api_websocket(self) -> WebSocket:
+        return super()._get_api_websocket(tesnet=True)
+
+
+class ByBitPositionStream:
+    """
+    Positions and opening executions of a trader kept in memory by the private websocket topics.
+    The exchange sends a position on changes only, so a symbol is known after its first message
+    and the unknown positions are requested by REST.
+    Messages can be missed while the connection is restored, so the state is dropped by every reconnect.
+    """
+
+    ORDER_HISTORY = 100
+
+    def __init__(self, api: ByBitComApi, websocket=None):
+        self._api = api
+        self._websocket = websocket
+        self._positions: dict[str, dict] = {}
+        self._orders: dict[str, dict] = {}
+        self._listeners: dict = {}
+        self._connection = None
+        self._executor: ThreadPoolExecutor = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        if not self._websocket:
+            self._websocket = self._api._get_api_websocket()
+
+        self._websocket.position_stream(callback=self.on_position)
+        self._websocket.execution_stream(callback=self.on_execution)
+
+    def stop(self) -> None:
+        if self._websocket:
+            self._websocket.exit()
+
+        if self._executor:
+            self._executor.shutdown(wait=False)
+
+        with self._lock:
+            self._reset()
+            self._listeners.clear()
+
+    def add_listener(self, key: str, callback) -> None:
+        # callback(symbol) is called when a position of the symbol has been closed on the exchange
+        with self._lock:
+            self._listeners[key] = callback
+
+    def remove_listener(self, key: str) -> None:
+        with self._lock:
+            self._listeners.pop(key, None)
+
+    def on_position(self, message: dict) -> None:
+        closed_symbols = []
+
+        with self._lock:
+            self._check_connection()
+
+            for position_info in message.get(Const.API_FLD_DATA, []):
+                symbol = position_info[Const.API_FLD_SYMBOL]
+                previous_info = self._positions.get(symbol)
+                self._positions[symbol] = position_info
+
+                if position_info[Const.API_FLD_SIZE] == "0" and (
+                    not previous_info or previous_info[Const.API_FLD_SIZE] != "0"
+                ):
+                    closed_symbols.append(symbol)
+
+        for symbol in closed_symbols:
+            self._notify(symbol)
+
+    def on_execution(self, message: dict) -> None:
+        with self._lock:
+            self._check_connection()
+
+            for execution in message.get(Const.API_FLD_DATA, []):
+                # Closing executions are read with the closed PnL
+                if execution.get("execType", "Trade") != "Trade" or float(
+                    execution.get("closedSize") or 0
+                ):
+                    continue
+
+                order = self._orders.setdefault(
+                    execution[Const.API_FLD_ORDER_ID],
+                    {
+                        Const.API_FLD_ORDER_ID: execution[Const.API_FLD_ORDER_ID],
+                        Const.API_FLD_ORDER_LINK_ID: execution[
+                            Const.API_FLD_ORDER_LINK_ID
+                        ],
+                        Const.API_FLD_SYMBOL: execution[Const.API_FLD_SYMBOL],
+                        Const.API_FLD_SIDE: execution[Const.API_FLD_SIDE],
+                        "execTime": execution["execTime"],
+                        "qty": 0,
+                        "value": 0,
+                        "fee": 0,
+                    },
+                )
+
+                quantity = float(execution["execQty"])
+                order["qty"] += quantity
+                order["value"] += quantity * float(execution["execPrice"])
+                order["fee"] += float(execution["execFee"])
+
+            while len(self._orders) > self.ORDER_HISTORY:
+                self._orders.pop(next(iter(self._orders)))
+
+    def is_known(self, symbol: str, order_id: str = None) -> bool:
+        with self._lock:
+            if not self._check_connection():
+                return False
+
+            position_info = self._positions.get(symbol)
+            if not position_info:
+                return False
+
+            if position_info[Const.API_FLD_SIZE] == "0":
+                return True
+
+            return order_id in self._orders
+
+    def _check_connection(self) -> bool:
+        # The websocket creates a new connection by every reconnect, the state of the previous one is dropped
+        if not self._websocket or not self._websocket.is_connected():
+            self._reset()
+            return False
+
+        connection = getattr(self._websocket, "ws", None)
+        if connection is not self._connection:
+            self._reset()
+            self._connection = connection
+
+        return True
+
+    def _reset(self) -> None:
+        self._positions.clear()
+        self._orders.clear()
+        self._connection = None
+
+    def get_open_position(
+        self, symbol: str, order_id: str = None, position_id: str = None
+    ) -> LeverageModel:
+        with self._lock:
+            position_info = self._positions.get(symbol)
+            order = self._orders.get(order_id)
+
+        if not position_info or position_info[Const.API_FLD_SIZE] == "0" or not order:
+            return None
+
+        if position_id and order[Const.API_FLD_ORDER_LINK_ID] != position_id:
+            return None
+
+        position_mdl = LeverageModel(
+            **{
+                Const.DB_SESSION_ID: "1",
+                Const.DB_POSITION_ID: order[Const.API_FLD_ORDER_LINK_ID],
+                Const.DB_ORDER_ID: order[Const.API_FLD_ORDER_ID],
+                Const.DB_ACCOUNT_ID: self._api.COIN_BASE,
+                Const.DB_SYMBOL: symbol,
+                Const.DB_STATUS: OrderStatus.opened,
+                Const.DB_SIDE: self._api._map_side(api_side=order[Const.API_FLD_SIDE]),
+                Const.DB_TYPE: OrderType.market,
+                Const.DB_OPEN_PRICE: order["value"] / order["qty"],
+                Const.DB_OPEN_DATETIME: self._api.getDatetimeByUnixTimeMs(
+                    float(order["execTime"])
+                ),
+                Const.DB_QUANTITY: order["qty"],
+                Const.DB_FEE: -1 * order["fee"],
+            }
+        )
+
+        return self._api._set_position_info(
+            position_mdl=position_mdl, position_info=position_info
+        )
+
+    def _notify(self, symbol: str) -> None:
+        with self._lock:
+            listeners = list(self._listeners.values())
+
+            # Listeners aren't run by the websocket thread
+            if listeners and not self._executor:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="position_stream"
+                )
+
+        for callback in listeners:
+            self._executor.submit(self._run_listener, callback, symbol)
+
+    def _run_listener(self, callback, symbol: str) -> None:
+        try:
+            callback(symbol)
+        except Exception as error:
+            logger.error(
+                f"{self.__class__.__name__}: Listener of the closed position {symbol} has failed - {error}"
+            )
+
 
 class DzengiComApi(ExchangeApiBase):
     """
@@ -1446,7 +1969,9 @@ class DzengiComApi(ExchangeApiBase):
     def create_order(self, position_mdl: OrderModel) -> OrderModel:
         pass
 
-    def create_leverage(self, position_mdl: LeverageModel) -> LeverageModel:
+    def create_leverage(
+        self, position_mdl: LeverageModel, on_confirm=None
+    ) -> LeverageModel:
         created_position = self._create_position(
             account_id=position_mdl.account_id,
             symbol=position_mdl.symbol,
@@ -1650,6 +2175,27 @@ class DzengiComApi(ExchangeApiBase):
             ):
                 return position
 
+    def get_open_positions(
+        self, positions: list[LeverageModel]
+    ) -> dict[str, LeverageModel]:
+        # Trading positions endpoint returns positions of all symbols by one request
+        api_positions = self.get_open_leverages(symbol=None)
+
+        open_positions = {}
+        for position_mdl in positions:
+            for api_position_mdl in api_positions:
+                if (
+                    position_mdl.order_id
+                    and position_mdl.order_id == api_position_mdl.order_id
+                ) or (
+                    position_mdl.position_id
+                    and position_mdl.position_id == api_position_mdl.position_id
+                ):
+                    open_positions[position_mdl.symbol] = api_position_mdl
+                    break
+
+        return open_positions
+
     # Leverage
     def get_close_leverages(
         self,
@@ -122,6 +122,12 @@ class TransactionType(str, Enum):
     API_CLOSE_POSITION = "API: Position Close"
 
 
+class TransactionRecordingType(str, Enum):
+    NONE = "none"
+    SUMMARY = "summary"
+    FULL = "full"
+
+
 class SignalType(str, Enum):
     STRONG_BUY = "Strong Buy"
     BUY = "Buy"
@@ -262,7 +268,8 @@ class HistoryDataOptionsModel(BaseModel):
 class StrategyParamModel(
     TraderSymbolIntervalStrategyLimitModel, HistoryDataOptionsModel
 ):
-    pass
+    # Derive signal, SL and TP only for the latest bars, indicators are still calculated over the warm-up window
+    latest_only: bool = False
 
 
 class SignalParamModel(StrategyParamModel):
@@ -846,3 +853,7 @@ class RobotException(Exception):
 
 class JobException(Exception):
     pass
+
+
+class StreamLimitException(Exception):
+    pass
@@ -8,6 +8,18 @@ class Const:
     CONF_PROPERTY_ROBOT_LOG = "ROBOT_LOG"
     CONF_PROPERTY_HIST_SIMULATION_LOG = "HISTORY_SIMULATION_LOG"
     CONF_PROPERTY_HS_TRADER_ID = "HS_TRADER_ID"
+    CONF_PROPERTY_WARM_UP_TOLERANCE = "WARM_UP_TOLERANCE"
+    CONF_PROPERTY_SIGNAL_STORE = "SIGNAL_STORE"
+    CONF_PROPERTY_POSITION_STREAM = "POSITION_STREAM"
+    CONF_PROPERTY_SIMULATION_WORKERS = "SIMULATION_WORKERS"
+
+    # Share of the truncated history which is allowed in the first indicator value
+    DEFAULT_WARM_UP_TOLERANCE = 0.001
+
+    # Backends of the signal store
+    SIGNAL_STORE_LOCAL = "local"
+    SIGNAL_STORE_MONGO = "mongo"
+    SIGNAL_STORE_REDIS = "redis"
 
     # Database Name
     DATABASE_NAME = "ClusterShared"
@@ -24,6 +36,7 @@ class Const:
     DB_COLLECTION_ORDERS = "orders"
     DB_COLLECTION_LEVERAGES = "leverages"
     DB_COLLECTION_TRANSACTIONS = "transactions"
+    DB_COLLECTION_SIGNALS = "signals"
 
     # DB fields
     DB_ID = "_id"
@@ -86,6 +99,7 @@ class Const:
     FLD_SIGNAL = "signal"
     FLD_ATR = "ATR"
     FLD_CCI = "CCI"
+    FLD_EMA = "EMA"
     FLD_EMA_SHORT = "EMA_SHORT"
     FLD_EMA_MEDIUM = "EMA_MEDIUM"
     FLD_EMA_LONG = "EMA_LONG"
@@ -140,6 +154,7 @@ class Const:
     API_FLD_RET_CODE = "retCode"
     API_FLD_RET_MESSAGE = "retMsg"
     API_FLD_SIZE = "size"
+    API_FLD_DATA = "data"
 
     ########################### Legacy code ####################################
 
@@ -150,6 +165,7 @@ class Const:
     DB_STRATEGIES = "strategies"
     DB_STRATEGY = "strategy"
     DB_SIGNALS = "signals"
+    DB_SIGNAL = "signal"
     DB_COMMENT = "comment"
     DB_ORDER_TYPE = "order_type"
     DB_OPEN_PRICE = "open_price"
@@ -256,3 +272,4 @@ class Const:
     SRV_IS_TRAILING_STOP_LOSS = "is_trailing_stop"
     SRV_TAKE_PROFIT_RATE = "take_profit_rate"
     SRV_FEE_RATE = "fee_rate"
+    SRV_TRANSACTIONS = "transactions"
@@ -51,6 +51,27 @@ class Config:
             return self._config_ini.getboolean(
                 self.CONFIG_GROUP_NAME_PROPERTY, property
             )
+        elif property == Const.CONF_PROPERTY_WARM_UP_TOLERANCE:
+            return self._config_ini.getfloat(
+                self.CONFIG_GROUP_NAME_PROPERTY,
+                property,
+                fallback=Const.DEFAULT_WARM_UP_TOLERANCE,
+            )
+        elif property == Const.CONF_PROPERTY_SIGNAL_STORE:
+            return self._config_ini.get(
+                self.CONFIG_GROUP_NAME_PROPERTY,
+                property,
+                fallback=Const.SIGNAL_STORE_LOCAL,
+            )
+        elif property == Const.CONF_PROPERTY_POSITION_STREAM:
+            return self._config_ini.getboolean(
+                self.CONFIG_GROUP_NAME_PROPERTY, property, fallback=False
+            )
+        elif property == Const.CONF_PROPERTY_SIMULATION_WORKERS:
+            # 0 - a worker per CPU core
+            return self._config_ini.getint(
+                self.CONFIG_GROUP_NAME_PROPERTY, property, fallback=0
+            )
         else:
             return self._config_ini.get(self.CONFIG_GROUP_NAME_PROPERTY, property)
 
@@ -1,5 +1,6 @@
 from datetime import datetime, timedelta
 import time
+import threading
 import requests
 from requests.models import RequestEncodingMixin
 import json
@@ -30,6 +31,7 @@ from .common import (
     TraderStatus,
     OrderStatus,
     SessionStatus,
+    PriceType,
     ExchangeId,
     SymbolModel,
     HistoryDataModel,
@@ -45,6 +47,7 @@ from .common import (
     TransactionModel,
     TrailingStopModel,
 )
+from .signal_store import SignalStoreBase, SignalStoreFactory
 from .mongodb import (
     MongoUser,
     MongoChannel,
@@ -55,6 +58,7 @@ from .mongodb import (
     MongoOrder,
     MongoLeverage,
     MongoTransaction,
+    MongoUnitOfWork,
 )
 
 logger = logging.getLogger("handler")
@@ -157,6 +161,29 @@ class BufferHistoryDataHandler(BufferBaseHandler):
 
             self._buffer[buffer_key] = buffer
 
+    def append_buffer(self, history_data_mdl: HistoryDataModel):
+        # Bars are added to the buffered bars, a bar of the same datetime is replaced
+        buffer_key = self.get_buffer_key(
+            symbol=history_data_mdl.symbol,
+            interval=history_data_mdl.interval,
+        )
+        buffer_mdl: HistoryDataModel = self._buffer[buffer_key]
+
+        df = pd.concat([buffer_mdl.data, history_data_mdl.data])
+        df = df[~df.index.duplicated(keep="last")].sort_index()
+
+        self.set_buffer(
+            HistoryDataModel(
+                symbol=buffer_mdl.symbol,
+                interval=buffer_mdl.interval,
+                limit=buffer_mdl.limit,
+                data=df.tail(max(buffer_mdl.limit, len(buffer_mdl.data))),
+            )
+        )
+
+    def get_buffer_mdl(self, buffer_key: tuple) -> HistoryDataModel:
+        return self._buffer[buffer_key]
+
     def validate_data_in_buffer(
         self, buffer_key: tuple, limit: int, end_datetime: datetime
     ) -> bool:
@@ -454,6 +481,16 @@ class ChannelHandler:
             raise Exception(f"Channel {id} doesn't exists")
         return ChannelModel(**entry)
 
+    @staticmethod
+    def get_channels_by_ids(ids: list) -> dict[str, ChannelModel]:
+        if not ids:
+            return {}
+
+        entries_db = MongoChannel().get_many_by_ids(list(set(ids)))
+        channels = [ChannelModel(**entry) for entry in entries_db]
+
+        return {channel_mdl.id: channel_mdl for channel_mdl in channels}
+
     @staticmethod
     def get_channels_by_email(user_email: str):
         user_id = None
@@ -753,12 +790,16 @@ class LeverageHandler:
         return count > 0
 
     @staticmethod
-    def get_leverages(session_id: str = None, status: OrderStatus = None):
+    def get_leverages(
+        session_id: str = None, status: OrderStatus = None, session_ids: list = None
+    ):
         query = {}
         result = []
 
         if session_id:
             query[Const.DB_SESSION_ID] = session_id
+        elif session_ids:
+            query[Const.DB_SESSION_ID] = {"$in": session_ids}
         if status:
             query[Const.DB_STATUS] = status
 
@@ -822,6 +863,46 @@ class TransactionHandler:
         return result
 
 
+class UnitOfWorkHandler:
+    """
+    Writes of a robot session run which are sent to the DB together by flush()
+    """
+
+    def __init__(self):
+        self._uow = MongoUnitOfWork()
+
+    def create_transaction(self, transaction: TransactionModel) -> str:
+        return self._uow.insert_one(MongoTransaction(), transaction.to_mongodb_doc())
+
+    def update_balance(self, id: str, query: dict) -> bool:
+        self._uow.update_one(MongoBalance(), id=id, query=query)
+        return True
+
+    def create_leverage(self, leverage: LeverageModel) -> LeverageModel:
+        leverage_doc = leverage.to_mongodb_doc()
+        self._uow.insert_one(MongoLeverage(), leverage_doc)
+        return LeverageModel(**leverage_doc)
+
+    def update_leverage(self, id: str, query: dict) -> bool:
+        self._uow.update_one(MongoLeverage(), id=id, query=query)
+        return True
+
+    def update_session(self, id: str, query: dict) -> bool:
+        self._uow.update_one(MongoSession(), id=id, query=query)
+        return True
+
+    def flush(self) -> int:
+        if not self._uow.has_requests():
+            return 0
+
+        count = self._uow.flush()
+
+        if config.get_config_value(Const.CONF_PROPERTY_HANDLER_LOG):
+            logger.info(f"{self.__class__.__name__}: {count} writes have been flushed")
+
+        return count
+
+
 class ExchangeHandler:
     def __init__(self, trader_id: str):
         self._api: ExchangeApiBase = None
@@ -941,6 +1022,14 @@ class ExchangeHandler:
             symbol=symbol, order_id=order_id, position_id=position_id
         )
 
+    def get_open_positions(
+        self, positions: list[LeverageModel]
+    ) -> dict[str, LeverageModel]:
+        return self._api.get_open_positions(positions)
+
+    def get_close_positions(self, positions: list[LeverageModel]) -> dict:
+        return self._api.get_close_positions(positions)
+
     def get_position(
         self,
         symbol: str,
@@ -954,8 +1043,13 @@ class ExchangeHandler:
     def create_order(self, position_mdl: OrderModel):
         return self._api.create_order(position_mdl)
 
-    def create_leverage(self, position_mdl: LeverageModel) -> LeverageModel:
-        return self._api.create_leverage(position_mdl)
+    def create_leverage(
+        self, position_mdl: LeverageModel, on_confirm=None
+    ) -> LeverageModel:
+        return self._api.create_leverage(position_mdl, on_confirm=on_confirm)
+
+    def get_position_stream(self, websocket=None):
+        return self._api.get_position_stream(websocket=websocket)
 
     def close_order(self, position_id: str) -> OrderModel:
         return self._api.close_order(position_id)
@@ -984,8 +1078,10 @@ class ExchangeHandler:
             position_id=position_id,
         )
 
-    def get_end_datetime(self, interval: str, **kwargs) -> datetime:
-        original_datetime = datetime.now()
+    def get_end_datetime(
+        self, interval: str, original_datetime: datetime = None, **kwargs
+    ) -> datetime:
+        original_datetime = original_datetime or datetime.now()
         return self._api.get_end_datetime(interval, original_datetime, **kwargs)
 
     def calculate_trading_timeframe(self, trading_time: str, **kwargs) -> dict:
@@ -1251,10 +1347,71 @@ class SymbolHandler(BaseOnExchangeHandler):
         return symbol_mdl.trading_fee if symbol_mdl.trading_fee else 0
 
 
-class HistoryDataHandler(BaseOnExchangeHandler):
+class QuoteHandler(BaseOnExchangeHandler):
+    """
+    Last prices of the symbols per price type. A price is requested from the exchange once per TTL,
+    the live bars of the fetched history data refresh the prices in between.
+    """
+
+    TTL = 10
+
     def __init__(self, exchange_handler: ExchangeHandler = None):
+        super().__init__(exchange_handler)
+        self.__quotes: dict[tuple, tuple[float, float]] = {}
+        self.__lock = threading.Lock()
+
+    def get_price(
+        self,
+        symbol: str,
+        interval: IntervalType,
+        price_type: PriceType = PriceType.BID,
+    ) -> float:
+        with self.__lock:
+            quote = self.__quotes.get((symbol, price_type))
+
+        if quote and time.monotonic() - quote[1] < self.TTL:
+            return quote[0]
+
+        param = HistoryDataParamModel(interval=interval, symbol=symbol, limit=1)
+        history_data = self._exchange_handler.get_history_data(
+            param, price_type=price_type
+        )
+        price = history_data.data.tail(1)["Close"].values[0]
+
+        self.set_price(symbol=symbol, price=price, price_type=price_type)
+
+        return price
+
+    def set_price(
+        self, symbol: str, price: float, price_type: PriceType = PriceType.BID
+    ) -> None:
+        with self.__lock:
+            self.__quotes[(symbol, price_type)] = (price, time.monotonic())
+
+    def set_price_by_history_data(self, history_data_mdl: HistoryDataModel) -> None:
+        # The last bar of not closed bars is the live bar
+        if not history_data_mdl.data.empty:
+            self.set_price(
+                symbol=history_data_mdl.symbol,
+                price=history_data_mdl.data.tail(1)["Close"].values[0],
+            )
+
+
+class HistoryDataHandler(BaseOnExchangeHandler):
+    # Closed bars are requested right after the bar close, the exchange can publish the bar a moment later
+    BAR_CLOSE_RETRY_LIMIT = 5
+    BAR_CLOSE_RETRY_DELAY = 0.5
+    # Bars requested to add the latest bars to the buffered history data
+    INCREMENT_LIMIT = 2
+
+    def __init__(
+        self,
+        exchange_handler: ExchangeHandler = None,
+        quote_handler: QuoteHandler = None,
+    ):
         super().__init__(exchange_handler)
         self.__buffer_inst = BufferHistoryDataHandler()
+        self.__quote_handler = quote_handler
 
     def get_history_data(
         self, param: HistoryDataParamModel, **kwargs
@@ -1285,19 +1442,101 @@ class HistoryDataHandler(BaseOnExchangeHandler):
                 history_data_mdl = self.__buffer_inst.get_buffer(
                     history_data_param=param, end_datetime=end_datetime
                 )
+            elif is_buffer and self.__is_buffer_increment(
+                buffer_key=buffer_key, limit=limit, end_datetime=end_datetime
+            ):
+                # The buffer is prepared before the bar close, just the latest bars are requested
+                history_data_mdl = self.__get_history_data_increment(
+                    param=param, end_datetime=end_datetime
+                )
 
         # If history data from the buffer doesn't exist
         if not history_data_mdl:
             # Send a request to an API to get history data
+            history_data_mdl = self.__fetch_history_data(param)
+            # Set fetched history data to the buffer
+            self.__buffer_inst.set_buffer(history_data_mdl)
+
+        return history_data_mdl
+
+    def __fetch_history_data(self, param: HistoryDataParamModel) -> HistoryDataModel:
+        closed_bars = param.closed_bars
+        limit = param.limit
+
+        for attempt in range(self.BAR_CLOSE_RETRY_LIMIT + 1):
             history_data_mdl = self._exchange_handler.get_history_data(
                 history_data_param=param,
                 closed_bar=closed_bars,
             )
-            # Set fetched history data to the buffer
-            self.__buffer_inst.set_buffer(history_data_mdl)
+
+            if (
+                not closed_bars
+                or attempt == self.BAR_CLOSE_RETRY_LIMIT
+                or self.__is_bar_published(history_data_mdl)
+            ):
+                break
+
+            time.sleep(self.BAR_CLOSE_RETRY_DELAY)
+            # The limit of the parameter is changed by the batches of the request
+            param.set_limit(limit)
+
+        if self.__quote_handler and not closed_bars:
+            self.__quote_handler.set_price_by_history_data(history_data_mdl)
 
         return history_data_mdl
 
+    def __is_buffer_increment(
+        self, buffer_key: tuple, limit: int, end_datetime: datetime
+    ) -> bool:
+        # The buffer is the same or one bar behind the required bars
+        history_data_mdl: HistoryDataModel = self.__buffer_inst.get_buffer_mdl(
+            buffer_key
+        )
+        return (
+            limit <= history_data_mdl.limit
+            and history_data_mdl.end_date_time
+            >= self.__get_previous_datetime(
+                interval=history_data_mdl.interval, end_datetime=end_datetime
+            )
+        )
+
+    def __get_history_data_increment(
+        self, param: HistoryDataParamModel, end_datetime: datetime
+    ) -> HistoryDataModel:
+        increment_param = HistoryDataParamModel(**param.model_dump())
+        increment_param.limit = self.INCREMENT_LIMIT
+
+        self.__buffer_inst.append_buffer(self.__fetch_history_data(increment_param))
+
+        return self.__buffer_inst.get_buffer(
+            history_data_param=param, end_datetime=end_datetime
+        )
+
+    def __get_previous_datetime(
+        self, interval: IntervalType, end_datetime: datetime
+    ) -> datetime:
+        return self._exchange_handler.get_end_datetime(
+            interval=interval, original_datetime=end_datetime - timedelta(seconds=1)
+        )
+
+    def __is_bar_published(self, history_data_mdl: HistoryDataModel) -> bool:
+        if history_data_mdl.data.empty:
+            return True
+
+        interval = history_data_mdl.interval
+        last_datetime = history_data_mdl.data.index[-1]
+
+        end_datetime = self._exchange_handler.get_end_datetime(
+            interval=interval, closed_bars=True
+        )
+        if last_datetime >= end_datetime:
+            return True
+
+        # Symbols without trading don't get the bar at all, only the bar right before the closed one is waited for
+        return last_datetime < self.__get_previous_datetime(
+            interval=interval, end_datetime=end_datetime
+        )
+
 
 class BufferRuntimeHandlers:
     _instance = None
@@ -1307,8 +1546,10 @@ class BufferRuntimeHandlers:
             class_._instance = object.__new__(class_, *args, **kwargs)
             class_.__symbol_handler = {}
             class_.__history_data_handler = {}
-            class_.__signal_handler = BufferSingleDictionary()
             class_.__interval_handler = {}
+            class_.__quote_handler = {}
+            class_.__position_stream = {}
+            class_.__position_stream_lock = threading.Lock()
             class_.__user_handler = UserHandler()
             class_.__trader_handler = TraderHandler()
             class_.__job_handler = BufferSingleDictionary()
@@ -1335,13 +1576,53 @@ class BufferRuntimeHandlers:
         )
         trader_id = exchange_handler.get_trader_id()
         if not trader_id in self.__history_data_handler:
-            history_data_handler = HistoryDataHandler(exchange_handler=exchange_handler)
+            history_data_handler = HistoryDataHandler(
+                exchange_handler=exchange_handler,
+                quote_handler=self.get_quote_handler(trader_id=trader_id),
+            )
             self.__history_data_handler[trader_id] = history_data_handler
 
         return self.__history_data_handler[trader_id]
 
-    def get_signal_handler(self) -> BufferSingleDictionary:
-        return self.__signal_handler
+    def get_quote_handler(
+        self, trader_id: str = None, user_id: str = None
+    ) -> QuoteHandler:
+        exchange_handler = ExchangeHandler.get_handler(
+            trader_id=trader_id, user_id=user_id
+        )
+        trader_id = exchange_handler.get_trader_id()
+        if not trader_id in self.__quote_handler:
+            quote_handler = QuoteHandler(exchange_handler=exchange_handler)
+            self.__quote_handler[trader_id] = quote_handler
+
+        return self.__quote_handler[trader_id]
+
+    def get_position_stream(self, trader_id: str):
+        # The private stream is optional, the positions are requested by REST without it
+        if not config.get_config_value(Const.CONF_PROPERTY_POSITION_STREAM):
+            return None
+
+        with self.__position_stream_lock:
+            if not trader_id in self.__position_stream:
+                position_stream = ExchangeHandler.get_handler(
+                    trader_id=trader_id
+                ).get_position_stream()
+
+                if position_stream:
+                    try:
+                        position_stream.start()
+                    except Exception as error:
+                        logger.error(
+                            f"{self.__class__.__name__}: Position stream of the trader {trader_id} hasn't started - {error}"
+                        )
+                        return None
+
+                self.__position_stream[trader_id] = position_stream
+
+        return self.__position_stream[trader_id]
+
+    def get_signal_handler(self) -> SignalStoreBase:
+        return SignalStoreFactory.get_store()
 
     def get_user_handler(self):
         return self.__user_handler
@@ -1368,8 +1649,14 @@ class BufferRuntimeHandlers:
     def clear_buffer(self):
         self.__symbol_handler = {}
         self.__history_data_handler = {}
-        self.__signal_handler.clear_buffer()
+        self.get_signal_handler().clear_buffer()
         self.__interval_handler = {}
+        self.__quote_handler = {}
+        with self.__position_stream_lock:
+            for position_stream in self.__position_stream.values():
+                if position_stream:
+                    position_stream.stop()
+            self.__position_stream = {}
         self.__user_handler.get_buffer().clear_buffer()
         self.__trader_handler.get_buffer().clear_buffer()
 
@@ -1,3 +1,4 @@
+import math
 import pandas_ta as ta
 import pandas as pd
 
@@ -12,9 +13,63 @@ from .common import (
 from .handler import buffer_runtime_handler
 
 
+class IndicatorWarmUp:
+    """
+    Warm-up of the technical indicators - count of the bars before the first value.
+    Window indicators (CCI, SMA) are exact after the window.
+    Recursive indicators (EMA, ATR) keep the weight (1 - alpha) ^ n of the truncated history after n bars.
+    """
+
+    @staticmethod
+    def get_tolerance() -> float:
+        """Return the tolerance from the config."""
+        return config.get_config_value(Const.CONF_PROPERTY_WARM_UP_TOLERANCE)
+
+    @staticmethod
+    def get_alpha(kind: str, length: int) -> float:
+        """Return the smoothing factor of recursive indicators, 0 for window indicators."""
+        if kind == "ema":
+            return 2 / (length + 1)
+        elif kind in ["atr", "rma"]:
+            return 1 / length
+        else:
+            return 0
+
+    @staticmethod
+    def get_warm_up(kind: str, length: int, tolerance: float = None) -> int:
+        """Return count of the bars which is required before the first value within the tolerance."""
+        if not tolerance:
+            tolerance = IndicatorWarmUp.get_tolerance()
+
+        # The first value is calculated over the window
+        warm_up = length - 1
+
+        alpha = IndicatorWarmUp.get_alpha(kind=kind, length=length)
+        if 0 < alpha < 1:
+            # Weight of the truncated history decays as (1 - alpha) ^ n
+            warm_up += math.ceil(math.log(tolerance) / math.log(1 - alpha))
+
+        return warm_up
+
+    @staticmethod
+    def get_accuracy_cost(kind: str, length: int, warm_up: int) -> float:
+        """Return the weight of the truncated history in the first value after the warm-up."""
+        if warm_up < length - 1:
+            return 1.0
+
+        alpha = IndicatorWarmUp.get_alpha(kind=kind, length=length)
+        if not 0 < alpha < 1:
+            return 0.0
+
+        return (1 - alpha) ** (warm_up - length + 1)
+
+
 class IndicatorBase:
     """The base class for all technical indicators."""
 
+    # Bars which are requested in addition to the length of the indicator by the fixed sizing
+    FIXED_LEAD = 2
+
     def __init__(self):
         """Initialize the indicator with an empty code and name."""
         self._code: IndicatorType = ""
@@ -28,6 +83,10 @@ class IndicatorBase:
         """Return the name of the indicator."""
         return self._name
 
+    def get_warm_up(self, tolerance: float = None) -> int:
+        """Return count of the bars which is required before the first value of the indicator."""
+        return 0
+
     def get_indicator(self, param: IndicatorParamModel) -> HistoryDataModel:
         """
         Get the indicator for a specific symbol, interval, and time period.
@@ -72,15 +131,19 @@ class Indicator_CCI(IndicatorBase):
         """Return the length of the CCI indicator."""
         return self.__length
 
+    def get_warm_up(self, tolerance: float = None) -> int:
+        """Return the warm-up of the CCI indicator."""
+        return IndicatorWarmUp.get_warm_up(
+            kind="cci", length=self.__length, tolerance=tolerance
+        )
+
     def get_indicator(self, param: IndicatorParamModel) -> pd.DataFrame:
         """
         Get the CCI indicator for a specific symbol, interval, and time period.
         """
-        # Calculate the default limit to ensure there is enough data to calculate the indicator
-        default_length = self.__length + 2
-
-        # If the given limit is less than the default limit, use the default limit instead
-        param.limit += default_length
+        # Add the warm-up to ensure there is enough data to calculate the indicator within the tolerance,
+        # the tolerance can reduce the fixed lead of the length + 2 bars only
+        param.limit += min(self.get_warm_up(), self.get_length() + self.FIXED_LEAD)
 
         # Get the historical data for the given symbol and interval up to the given limit
         history_data_mdl = super().get_indicator(param)
@@ -143,15 +206,19 @@ class Indicator_ATR(IndicatorBase):
         """Return the length of the ATR indicator"""
         return self.__length
 
+    def get_warm_up(self, tolerance: float = None) -> int:
+        """Return the warm-up of the ATR indicator"""
+        return IndicatorWarmUp.get_warm_up(
+            kind="atr", length=self.__length, tolerance=tolerance
+        )
+
     def get_indicator(self, param: IndicatorParamModel) -> pd.DataFrame:
         """
         Get the ATR indicator for a specific symbol, interval, and time period.
         """
-        # Calculate the default limit to ensure there is enough data to calculate the indicator
-        default_length = self.__length + 2
-
-        # If the given limit is less than the default limit, use the default limit instead
-        param.limit += default_length
+        # Add the warm-up to ensure there is enough data to calculate the indicator within the tolerance,
+        # the tolerance can reduce the fixed lead of the length + 2 bars only
+        param.limit += min(self.get_warm_up(), self.get_length() + self.FIXED_LEAD)
 
         # Get the historical data for the given symbol and interval up to the given limit
         history_data_mdl = super().get_indicator(param)
@@ -197,6 +264,8 @@ class Indicator_ATR(IndicatorBase):
 class Indicator_CCI_ATR(IndicatorBase):
     """A class for the CCI and ATR technical indicators"""
 
+    ATR_LENGTH = 14
+
     def __init__(self, length: int):
         """
         Initialize the CCI and ATR indicators with a specific length.
@@ -214,15 +283,24 @@ class Indicator_CCI_ATR(IndicatorBase):
         """Return the length of the CCI and ATR indicators"""
         return self.__length
 
+    def get_indicator_lengths(self) -> list[tuple]:
+        """Return kinds and lengths of the calculated indicators"""
+        return [("cci", self.__length), ("atr", self.ATR_LENGTH)]
+
+    def get_warm_up(self, tolerance: float = None) -> int:
+        """Return the warm-up of the CCI and ATR indicators"""
+        return max(
+            IndicatorWarmUp.get_warm_up(kind=kind, length=length, tolerance=tolerance)
+            for kind, length in self.get_indicator_lengths()
+        )
+
     def get_indicator(self, param: IndicatorParamModel) -> pd.DataFrame:
         """
         Get the indicators for a specific symbol, interval, and time period.
         """
-        # Calculate the default limit to ensure there is enough data to calculate the indicator
-        default_length = self.__length + 2
-
-        # If the given limit is less than the default limit, use the default limit instead
-        param.limit += default_length
+        # Add the warm-up to ensure there is enough data to calculate the indicator within the tolerance,
+        # the tolerance can reduce the fixed lead of the length + 2 bars only
+        param.limit += min(self.get_warm_up(), self.get_length() + self.FIXED_LEAD)
 
         # Get the historical data for the given symbol and interval up to the given limit
         history_data_mdl = super().get_indicator(param)
@@ -256,7 +334,7 @@ class Indicator_CCI_ATR(IndicatorBase):
         cci_df = cci_series.to_frame(name=IndicatorType.CCI.value)
 
         # Calculate the ATR using the length specified in the constructor
-        atr_series = history_data.ta.atr(length=14)
+        atr_series = history_data.ta.atr(length=self.ATR_LENGTH)
 
         # Convert the series to a DataFrame with the indicator code as the column name
         atr_df = atr_series.to_frame(name=IndicatorType.ATR.value)
@@ -13,6 +13,7 @@ database = client[Const.DATABASE_NAME]
 # indexes:
 # users -> email_asc | REGULAR | UNIQUE
 # traders -> user_id_exchange_asc | REGULAR | UNIQUE/COMPOUND
+# signals -> exchange_id_symbol_interval_strategy_date_time_asc | REGULAR | COMPOUND
 
 logger = logging.getLogger("db")
 
@@ -112,6 +113,9 @@ class MongoBase:
             )
         return list(self._collection.find(query))
 
+    def get_many_by_ids(self, ids: list) -> list:
+        return self.get_many({Const.DB_ID: {"$in": [self._convert_id(id) for id in ids]}})
+
     def get_count(self, query: dict = {}) -> int:
         if config.get_config_value(Const.CONF_PROPERTY_MONGODB_LOG):
             logger.info(
@@ -140,6 +144,33 @@ class MongoBase:
 
         return query
 
+    def get_insert_request(self, query: dict) -> pymongo.InsertOne:
+        if not query:
+            raise Exception(f"DB: INSERT_ONE - Query is empty")
+
+        # Id is generated on the client to be used before the request is written
+        if not query.get(Const.DB_ID):
+            query[Const.DB_ID] = ObjectId()
+        query[Const.DB_CREATED_AT] = datetime.utcnow()
+        query[Const.DB_CHANGED_AT] = datetime.utcnow()
+
+        return pymongo.InsertOne(query)
+
+    def get_update_request(self, id: str, query: dict) -> pymongo.UpdateOne:
+        if not query:
+            raise Exception(f"DB: UPDATE_ONE - Query is empty")
+
+        query[Const.DB_CHANGED_AT] = datetime.utcnow()
+
+        return pymongo.UpdateOne({Const.DB_ID: self._convert_id(id)}, {"$set": query})
+
+    def bulk_write(self, requests: list, ordered: bool = True):
+        if config.get_config_value(Const.CONF_PROPERTY_MONGODB_LOG):
+            logger.info(
+                f"{self.__class__.__name__}: {self._collection.name} - bulk_write({len(requests)})"
+            )
+        return self._collection.bulk_write(requests, ordered=ordered)
+
     def __update_one(self, id: str, query: dict, upsert: bool = False) -> bool:
         if not query:
             raise Exception(f"DB: INSERT_ONE - Query is empty")
@@ -162,6 +193,66 @@ class MongoBase:
         return ObjectId(id)
 
 
+class MongoUnitOfWork:
+    """
+    Collects the writes and flushes them with one ordered bulk_write per collection.
+    Collections are flushed in the order of their first write.
+    """
+
+    def __init__(self):
+        self._requests: dict[str, tuple[MongoBase, list]] = {}
+
+    def insert_one(self, db: MongoBase, query: dict) -> str:
+        request = db.get_insert_request(query)
+        self._add_request(db, request)
+        return str(query[Const.DB_ID])
+
+    def update_one(self, db: MongoBase, id: str, query: dict) -> None:
+        request = db.get_update_request(id=id, query=query)
+        self._add_request(db, request)
+
+    def has_requests(self) -> bool:
+        return len(self._requests) > 0
+
+    def flush(self) -> int:
+        requests = self._requests
+        self._requests = {}
+
+        count = 0
+        errors = []
+
+        # Every collection is flushed even if a previous one has failed
+        for name, (db, collection_requests) in requests.items():
+            try:
+                result = db.bulk_write(collection_requests, ordered=True)
+                count += len(collection_requests)
+
+                updates = len(
+                    [
+                        request
+                        for request in collection_requests
+                        if isinstance(request, pymongo.UpdateOne)
+                    ]
+                )
+                if result.matched_count < updates:
+                    errors.append(
+                        f"{name} - {updates - result.matched_count} of {updates} documents for update are missed"
+                    )
+            except Exception as error:
+                errors.append(f"{name} - {error}")
+
+        if errors:
+            raise Exception(f"DB: FLUSH - {'; '.join(errors)}")
+
+        return count
+
+    def _add_request(self, db: MongoBase, request) -> None:
+        name = db._collection.name
+        if name not in self._requests:
+            self._requests[name] = (db, [])
+        self._requests[name][1].append(request)
+
+
 class MongoJobs(MongoBase):
     def __init__(self):
         MongoBase.__init__(self)
@@ -265,3 +356,60 @@ class MongoTransaction(MongoBase):
     def __init__(self):
         super().__init__()
         self._collection = self.get_collection(Const.DB_COLLECTION_TRANSACTIONS)
+
+
+class MongoSignals(MongoBase):
+    def __init__(self):
+        super().__init__()
+        self._collection = self.get_collection(Const.DB_COLLECTION_SIGNALS)
+
+    def _convert_id(self, id: str) -> str:
+        if not id:
+            raise Exception(f"DB: _id is missed")
+
+        return id
+
+    def insert_signals(self, entries: dict) -> int:
+        # A signal is written once, existing signals of the bars are kept
+        if config.get_config_value(Const.CONF_PROPERTY_MONGODB_LOG):
+            logger.info(
+                f"{self.__class__.__name__}: {self._collection.name} - insert_signals({len(entries)})"
+            )
+
+        requests = []
+        for id, entry in entries.items():
+            entry[Const.DB_CREATED_AT] = datetime.utcnow()
+            requests.append(
+                pymongo.UpdateOne(
+                    {Const.DB_ID: id}, {"$setOnInsert": entry}, upsert=True
+                )
+            )
+
+        result = self._collection.bulk_write(requests, ordered=False)
+        return result.upserted_count
+
+    def get_signals(
+        self,
+        exchange_id: str,
+        symbol: str,
+        interval: str,
+        strategy: str,
+        date_from: datetime = None,
+        date_to: datetime = None,
+    ) -> list:
+        query = {
+            Const.DB_EXCHANGE_ID: exchange_id,
+            Const.DB_SYMBOL: symbol,
+            Const.DB_INTERVAL: interval,
+            Const.DB_STRATEGY: strategy,
+        }
+
+        date_time_query = {}
+        if date_from:
+            date_time_query["$gte"] = date_from
+        if date_to:
+            date_time_query["$lte"] = date_to
+        if date_time_query:
+            query[Const.DB_DATE_TIME] = date_time_query
+
+        return list(self._collection.find(query).sort(Const.DB_DATE_TIME, 1))
@@ -1,4 +1,5 @@
 import json
+from datetime import datetime, timedelta
 import bson.json_util as json_util
 import pandas as pd
 import numpy as np
@@ -6,10 +7,17 @@ from flask import jsonify
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.schedulers.base import JobLookupError
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.base import BaseTrigger
 from apscheduler.job import Job
 from dotenv import load_dotenv
 import requests
 import os
+import re
+import tempfile
+import time
+import threading
+import queue
+from concurrent.futures import ThreadPoolExecutor
 import smtplib
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
@@ -19,6 +27,7 @@ from .constants import Const
 from .core import config
 from .mongodb import MongoJobs, MongoSimulations
 from .handler import ExchangeHandler, AlertHandler
+from .api import OrderConfirmation
 from .trend import TrendCCI
 
 from trading_core.common import (
@@ -28,7 +37,11 @@ from trading_core.common import (
     AlertType,
     HistoryDataParamModel,
     StrategyParamModel,
+    SignalParamModel,
+    SignalModel,
+    SignalType,
     SymbolIntervalLimitModel,
+    TraderSymbolIntervalLimitModel,
     BaseModel,
     UserModel,
     ChannelModel,
@@ -39,13 +52,16 @@ from trading_core.common import (
     BalanceModel,
     OrderModel,
     TransactionModel,
+    TransactionRecordingType,
     SessionStatus,
     OrderOpenModel,
     OrderSideType,
     TradingType,
     JobException,
+    StreamLimitException,
 )
 from trading_core.strategy import StrategyFactory, SignalFactory
+from trading_core.sweep import StrategySweep
 from trading_core.handler import (
     UserHandler,
     ChannelHandler,
@@ -57,7 +73,8 @@ from trading_core.handler import (
     TransactionHandler,
     buffer_runtime_handler,
 )
-from trading_core.robot import Robot, SessionManager
+from trading_core.robot import Robot, SessionManager, SessionStateCache
+from trading_core.simulation import SimulationGrid
 
 load_dotenv()
 
@@ -116,6 +133,7 @@ def job_func_initialise_runtime_data():
         logger.info(f"JOB: {Const.JOB_TYPE_INIT} - Refresh runtime buffer")
 
     buffer_runtime_handler.clear_buffer()
+    SessionStateCache.clear()
     # buffer_runtime_handler.get_symbol_handler().get_symbols()
 
 
@@ -126,11 +144,7 @@ def job_func_send_bot_notification(interval):
     responser = ResponserBot()
     notificator = NotificationBot()
 
-    channels = ChannelHandler.get_channels(type=ChannelType.TELEGRAM_BOT)
-    channel_ids = [channel_mdl.id for channel_mdl in channels]
-
-    if channel_ids:
-        alerts = AlertHandler.get_alerts(interval=interval, channel_ids=channel_ids)
+    alerts = get_bot_alerts(interval)
 
     if alerts:
         alert_messages = responser.get_signals_for_alerts(
@@ -145,17 +159,29 @@ def job_func_send_email_notification(interval):
             f"JOB: {Const.JOB_TYPE_EMAIL} is triggered for interval - {interval}"
         )
 
-    messages = ResponserEmail().get_signals(
-        symbols=[],
-        intervals=[interval],
-        strategies=[],
-        signals_config=[],
-        closed_bars=True,
-    )
+    messages = ResponserEmail().get_signals_for_interval(interval)
 
     NotificationEmail().send(messages)
 
 
+def job_func_interval_pre_close(interval):
+    IntervalTickPipeline.prepare(interval)
+
+
+def job_func_interval_tick(interval):
+    IntervalTickPipeline.run(interval)
+
+
+def get_bot_alerts(interval) -> list[AlertModel]:
+    channels = ChannelHandler.get_channels(type=ChannelType.TELEGRAM_BOT)
+    channel_ids = [channel_mdl.id for channel_mdl in channels]
+
+    if not channel_ids:
+        return []
+
+    return AlertHandler.get_alerts(interval=interval, channel_ids=channel_ids)
+
+
 def job_func_trading_robot(interval):
     if config.get_config_value(Const.CONF_PROPERTY_RESPONSER_LOG):
         logger.info(
@@ -196,42 +222,30 @@ def job_func_run_history_simulation(
     # 2. SL and TP static
     # 3. list of limits for interval
 
-    sessions = []
-
-    for symbol in symbols:
-        for interval in intervals:
-            for strategy in strategies:
-
-                session_mng = Robot().run_history_simulation(
-                    trader_id=trader_id,
-                    trading_type=trading_type,
-                    symbol=symbol,
-                    interval=interval,
-                    strategy=strategy,
-                    stop_loss_rate=0,
-                    is_trailing_stop=True,
-                    take_profit_rate=0,
-                    init_balance=1000,
-                    limit=get_job_limit_by_interval(interval),
-                )
-
-                balance_mdl = session_mng.get_balance_manager().get_balance_model()
-                # transactions = [
-                #     item.model_dump() for item in session_mng.get_transactions()
-                # ]
-
-                positions = [item.model_dump() for item in session_mng.get_positions()]
-
-                session = session_mng.get_session().model_dump()
-                session["balance"] = balance_mdl.model_dump()
-                # session["positions"] = positions
-                # session_response["transactions"] = transactions
-
-                sessions.append(session)
+    simulation_grid = SimulationGrid(
+        trader_id=trader_id,
+        trading_type=trading_type,
+        stop_loss_rate=0,
+        is_trailing_stop=True,
+        take_profit_rate=0,
+        init_balance=1000,
+        details=False,
+        transaction_recording=TransactionRecordingType.NONE,
+    )
+    cells = simulation_grid.get_cells(
+        symbols=symbols,
+        intervals=intervals,
+        strategies=strategies,
+        limits={
+            interval: get_job_limit_by_interval(interval) for interval in intervals
+        },
+    )
 
     mongo_instance = MongoSimulations()
 
-    mongo_instance.insert_many(sessions)
+    # Sessions are saved as soon as the simulations are finished
+    for session in simulation_grid.run(cells):
+        mongo_instance.insert_one(session)
 
 
 class MessageBase:
@@ -338,6 +352,27 @@ class ResponserBase:
     def get_strategy_data(self, param: StrategyParamModel) -> pd.DataFrame:
         return StrategyFactory.get_strategy_data(param)
 
+    def get_strategy_sweep(
+        self, param: StrategyParamModel, grid: dict, top: int = None
+    ) -> list[dict]:
+        return StrategySweep().run(param=param, grid=grid, top=top)
+
+    def get_strategy_warm_up(self, tolerance: float = None) -> list[dict]:
+        return StrategyFactory.get_warm_up_report(tolerance)
+
+    def get_signal_history(
+        self,
+        param: SignalParamModel,
+        date_from: datetime = None,
+        date_to: datetime = None,
+    ) -> list:
+        return SignalFactory().get_signal_history(
+            param=param, date_from=date_from, date_to=date_to
+        )
+
+    def backfill_signals(self, param: StrategyParamModel) -> int:
+        return SignalFactory().backfill_signals(param)
+
     def get_signals(
         self,
         trader_id: str,
@@ -387,6 +422,17 @@ class ResponserBase:
 
 
 class ResponserWeb(ResponserBase):
+    # Every history simulation stream holds a server thread and the simulation workers
+    SIMULATION_STREAM_LIMIT = 2
+    # Lines of the history simulation stream are {"type": ..., "data": ...}
+    STREAM_FLD_TYPE = "type"
+    STREAM_FLD_DATA = "data"
+    STREAM_TYPE_SESSION = "session"
+    STREAM_TYPE_TRANSACTION = "transaction"
+    STREAM_TYPE_ERROR = "error"
+
+    _simulation_streams = threading.BoundedSemaphore(SIMULATION_STREAM_LIMIT)
+
     @decorator_json
     def get_config(self) -> json:
         return config.get_config_values()
@@ -426,6 +472,31 @@ class ResponserWeb(ResponserBase):
     def get_strategy_data(self, param: StrategyParamModel) -> json:
         return super().get_strategy_data(param)
 
+    @decorator_json
+    def get_strategy_sweep(
+        self, param: StrategyParamModel, grid: dict, top: int = None
+    ) -> json:
+        return super().get_strategy_sweep(param=param, grid=grid, top=top)
+
+    @decorator_json
+    def get_strategy_warm_up(self, tolerance: float = None) -> json:
+        return super().get_strategy_warm_up(tolerance)
+
+    @decorator_json
+    def get_signal_history(
+        self,
+        param: SignalParamModel,
+        date_from: datetime = None,
+        date_to: datetime = None,
+    ) -> json:
+        return super().get_signal_history(
+            param=param, date_from=date_from, date_to=date_to
+        )
+
+    @decorator_json
+    def backfill_signals(self, param: StrategyParamModel) -> json:
+        return {"count": super().backfill_signals(param)}
+
     @decorator_json
     def get_signals(
         self,
@@ -696,6 +767,8 @@ class ResponserWeb(ResponserBase):
                 f"Only one session for symbol {session_mdl.symbol} can be active"
             )
 
+        SessionStateCache.invalidate(session_id)
+
         if SessionHandler.update_session(
             id=session_id, query={"status": SessionStatus.active}
         ):
@@ -705,6 +778,8 @@ class ResponserWeb(ResponserBase):
 
     @decorator_json
     def inactivate_session(self, session_id: str) -> json:
+        SessionStateCache.invalidate(session_id)
+
         if SessionHandler.update_session(
             id=session_id, query={"status": SessionStatus.closed}
         ):
@@ -714,6 +789,8 @@ class ResponserWeb(ResponserBase):
 
     @decorator_json
     def delete_session(self, session_id: str) -> json:
+        SessionStateCache.invalidate(session_id)
+
         if SessionHandler.delete_session(id=session_id):
             return {"message": f"Session {session_id} has been deleted"}
         else:
@@ -729,6 +806,7 @@ class ResponserWeb(ResponserBase):
 
     @decorator_json
     def create_balance(self, balance_model: BalanceModel) -> json:
+        SessionStateCache.invalidate(balance_model.session_id)
         return BalanceHandler.create_balance(balance_model)
 
     @decorator_json
@@ -739,6 +817,10 @@ class ResponserWeb(ResponserBase):
     def get_orders(self, session_id: str = None) -> json:
         return OrderHandler.get_orders(session_id)
 
+    @decorator_json
+    def get_order_metrics(self) -> json:
+        return OrderConfirmation.get_metrics()
+
     @decorator_json
     def create_order(self, order_model: OrderModel) -> json:
         return OrderHandler.create_order(order_model)
@@ -799,6 +881,25 @@ class ResponserWeb(ResponserBase):
     def get_trend(self, param: SymbolIntervalLimitModel) -> json:
         return TrendCCI().calculate_trends(param)
 
+    @decorator_json
+    def get_trends(self, trader_id: str, symbols: list, intervals: list) -> json:
+        heatmap = {}
+
+        params = [
+            TraderSymbolIntervalLimitModel(
+                trader_id=trader_id, symbol=symbol, interval=interval
+            )
+            for symbol in symbols
+            for interval in intervals
+        ]
+
+        for trend in TrendCCI().detect_trends(params):
+            heatmap.setdefault(trend[Const.PARAM_SYMBOL], {})[
+                trend[Const.INTERVAL]
+            ] = trend[Const.PARAM_TREND]
+
+        return heatmap
+
     @decorator_json
     def get_history_simulation(
         self,
@@ -812,135 +913,357 @@ class ResponserWeb(ResponserBase):
         take_profit_rate: float,
         init_balance: float,
         limit: int,
+        transaction_recording: TransactionRecordingType = TransactionRecordingType.FULL,
     ) -> json:
-        response = []
+        simulation_grid, cells = self._get_simulation_grid(
+            trader_id=trader_id,
+            trading_type=trading_type,
+            symbol=symbol,
+            intervals=intervals,
+            strategies=strategies,
+            stop_loss_rate=stop_loss_rate,
+            is_trailing_stop=is_trailing_stop,
+            take_profit_rate=take_profit_rate,
+            init_balance=init_balance,
+            limit=limit,
+            transaction_recording=transaction_recording,
+        )
+
+        # The cells are finished in any order, the results are returned in the order of the request
+        results = [None] * len(cells)
+        positions = {
+            (cell.symbol, cell.interval, cell.strategy): position
+            for position, cell in enumerate(cells)
+        }
+
+        for cell, session_result, error in simulation_grid.evaluate(cells):
+            if error:
+                session_result = cell.model_dump()
+                session_result[SimulationGrid.FLD_ERROR] = f"{error}"
+
+            results[positions[(cell.symbol, cell.interval, cell.strategy)]] = (
+                session_result
+            )
+
+        return results
+
+    def stream_history_simulation(
+        self,
+        trader_id: str,
+        trading_type: str,
+        symbol: str,
+        intervals: list,
+        strategies: list,
+        stop_loss_rate: float,
+        is_trailing_stop: bool,
+        take_profit_rate: float,
+        init_balance: float,
+        limit: int,
+        transaction_recording: TransactionRecordingType = TransactionRecordingType.SUMMARY,
+    ):
+        stream = self._stream_history_simulation(
+            trader_id=trader_id,
+            trading_type=trading_type,
+            symbol=symbol,
+            intervals=intervals,
+            strategies=strategies,
+            stop_loss_rate=stop_loss_rate,
+            is_trailing_stop=is_trailing_stop,
+            take_profit_rate=take_profit_rate,
+            init_balance=init_balance,
+            limit=limit,
+            transaction_recording=transaction_recording,
+        )
+
+        # The stream slot is taken before the response is started, so the limit is reported
+        # to the client and the slot is released when the response is closed
+        next(stream)
+
+        return stream
+
+    def _stream_history_simulation(
+        self,
+        trader_id: str,
+        trading_type: str,
+        symbol: str,
+        intervals: list,
+        strategies: list,
+        stop_loss_rate: float,
+        is_trailing_stop: bool,
+        take_profit_rate: float,
+        init_balance: float,
+        limit: int,
+        transaction_recording: TransactionRecordingType,
+    ):
+        if not ResponserWeb._simulation_streams.acquire(blocking=False):
+            raise StreamLimitException(
+                f"Limit of {self.SIMULATION_STREAM_LIMIT} history simulation streams is reached"
+            )
 
-        for interval in intervals:
-            for strategy in strategies:
-                positions = []
-                high_rates = []
-                low_rates = []
+        try:
+            yield ""
 
-                session_mng = Robot().run_history_simulation(
+            # Transactions are written to the files by the simulations and aren't kept in the memory
+            with tempfile.TemporaryDirectory() as transaction_dir:
+                simulation_grid, cells = self._get_simulation_grid(
                     trader_id=trader_id,
                     trading_type=trading_type,
                     symbol=symbol,
-                    interval=interval,
-                    strategy=strategy,
+                    intervals=intervals,
+                    strategies=strategies,
                     stop_loss_rate=stop_loss_rate,
                     is_trailing_stop=is_trailing_stop,
                     take_profit_rate=take_profit_rate,
                     init_balance=init_balance,
                     limit=limit,
+                    transaction_recording=transaction_recording,
+                    transaction_dir=transaction_dir,
                 )
 
-                balance_mdl = session_mng.get_balance_manager().get_balance_model()
-                transactions = [
-                    item.model_dump() for item in session_mng.get_transactions()
-                ]
-
-                for position in session_mng.get_positions():
-                    positions.append(position.model_dump())
-
-                    if position.side == OrderSideType.buy:
-                        high_rates.append(position.high_percent)
-                        low_rates.append(-1 * position.low_percent)
-                    else:
-                        high_rates.append(-1 * position.low_percent)
-                        low_rates.append(position.high_percent)
-
-                session_response = session_mng.get_session().model_dump()
-                session_response["optimal_take_profit_rate"] = np.percentile(
-                    high_rates, 80
-                )
-                session_response["optimal_stop_loss_rate"] = np.percentile(
-                    low_rates, 80
-                )
-                session_response["balance"] = balance_mdl.model_dump()
-                session_response["positions"] = positions
-                session_response["transactions"] = transactions
-
-                response.append(session_response)
+                # A session is sent as a line of NDJSON as soon as it's simulated, its transactions follow as lines
+                for cell, session_response, error in simulation_grid.evaluate(cells):
+                    if error:
+                        error_response = cell.model_dump()
+                        error_response[SimulationGrid.FLD_ERROR] = f"{error}"
+                        yield self._get_stream_line(
+                            self.STREAM_TYPE_ERROR, json_util.dumps(error_response)
+                        )
+                        continue
+
+                    transaction_file = session_response.pop(
+                        SimulationGrid.FLD_TRANSACTIONS_FILE
+                    )
+                    yield self._get_stream_line(
+                        self.STREAM_TYPE_SESSION, json_util.dumps(session_response)
+                    )
 
-        return response
+                    # The transaction lines of the file are JSON already, they aren't parsed again
+                    with open(transaction_file) as stream:
+                        for line in stream:
+                            yield self._get_stream_line(
+                                self.STREAM_TYPE_TRANSACTION, line.rstrip("\n")
+                            )
+                    os.remove(transaction_file)
+        finally:
+            ResponserWeb._simulation_streams.release()
 
+    def _get_stream_line(self, type: str, data: str) -> str:
+        return f'{{"{self.STREAM_FLD_TYPE}": "{type}", "{self.STREAM_FLD_DATA}": {data}}}\n'
 
-class ResponserEmail(ResponserBase):
-    def get_signals(
+    def _get_simulation_grid(
         self,
-        symbols: list,
+        trader_id: str,
+        trading_type: str,
+        symbol: str,
         intervals: list,
         strategies: list,
-        signals_config: list,
-        closed_bars: bool,
-    ) -> Messages:
-        signals_list = super().get_signals(
-            symbols=symbols,
+        stop_loss_rate: float,
+        is_trailing_stop: bool,
+        take_profit_rate: float,
+        init_balance: float,
+        limit: int,
+        transaction_recording: TransactionRecordingType,
+        transaction_dir: str = None,
+    ) -> tuple[SimulationGrid, list]:
+        simulation_grid = SimulationGrid(
+            trader_id=trader_id,
+            trading_type=trading_type,
+            stop_loss_rate=stop_loss_rate,
+            is_trailing_stop=is_trailing_stop,
+            take_profit_rate=take_profit_rate,
+            init_balance=init_balance,
+            transaction_recording=transaction_recording,
+            transaction_dir=transaction_dir,
+        )
+        cells = simulation_grid.get_cells(
+            symbols=[symbol],
             intervals=intervals,
             strategies=strategies,
-            signals_config=signals_config,
-            closed_bars=closed_bars,
+            limits={interval: limit for interval in intervals},
+        )
+
+        return simulation_grid, cells
+
+
+class ResponserEmail(ResponserBase):
+    def get_signal_params(self, interval: IntervalType) -> list[SignalParamModel]:
+        # Signals of all strategies for the symbols of the default trader
+        trader_id = ExchangeHandler.get_handler().get_trader_id()
+
+        return SignalFactory.get_signal_params_by_list(
+            trader_id=trader_id,
+            symbols=buffer_runtime_handler.get_symbol_handler(
+                trader_id=trader_id
+            ).get_symbol_id_list(),
+            intervals=[interval],
+            strategies=StrategyFactory.get_strategies(),
+            signal_types=[],
+            closed_bars=True,
         )
 
+    def get_signals_for_interval(self, interval: IntervalType) -> Messages:
+        messages_inst = Messages()
+
+        # Signals of the closed bar are read from the signal store
+        signal_mdls = SignalFactory().get_signals(self.get_signal_params(interval))
+        if not signal_mdls:
+            return messages_inst
+
         # Create the HTML table
         table_html = '<table border="1">'
         table_html += "<tr><th>DateTime</th><th>Symbol</th><th>Interval</th><th>Strategy</th><th>Signal</th></tr>"
-        for signal_inst in signals_list:
+        for signal_mdl in signal_mdls:
             table_html += "<tr>"
-            table_html += f"<td>{signal_inst.get_date_time().isoformat()}</td>"
-            table_html += f"<td>{signal_inst.get_symbol()}</td>"
-            table_html += f"<td>{signal_inst.get_interval()}</td>"
-            table_html += f"<td>{signal_inst.get_strategy()}</td>"
-            table_html += f"<td>{signal_inst.get_signal()}</td>"
+            table_html += f"<td>{signal_mdl.date_time.isoformat()}</td>"
+            table_html += f"<td>{signal_mdl.symbol}</td>"
+            table_html += f"<td>{signal_mdl.interval.value}</td>"
+            table_html += f"<td>{signal_mdl.strategy.value}</td>"
+            table_html += f"<td>{signal_mdl.signal.value}</td>"
             table_html += "</tr>"
         table_html += "</table>"
 
         # Create the email body as HTML
         message_text = (
-            f"<h4>Alert signals for {signal_inst.get_interval()}</h4>{table_html}"
+            f"<h4>Alert signals for {signal_mdls[0].interval.value}</h4>{table_html}"
         )
 
         message_inst = MessageEmail(
             channel_id="None",
-            subject=f"[TradingTool]: Alert signals for {intervals[0]}",
+            subject=f"[TradingTool]: Alert signals for {signal_mdls[0].interval.value}",
             message_text=message_text,
         )
 
-        messages_inst = Messages()
         messages_inst.add_message(message_inst)
 
         return messages_inst
 
 
+class AlertSignalPlanner:
+    """
+    Collects the distinct signal keys (exchange, symbol, interval, strategy) of the alerts,
+    evaluates every key once and fans the signal out to the alerts which are subscribed to it.
+    """
+
+    def __init__(self, alert_mdls: list[AlertModel], interval: IntervalType = None):
+        # Signal key -> SignalParamModel of the first trader of the exchange
+        self._signal_params: dict[tuple, SignalParamModel] = {}
+        # Signal key -> alerts which are subscribed to the key
+        self._alert_index: dict[tuple, list[AlertModel]] = {}
+        self._exchanges: dict[str, ExchangeId] = {}
+
+        for alert_mdl in alert_mdls:
+            exchange_id = self._get_exchange_id(alert_mdl.trader_id)
+            intervals = [interval] if interval else alert_mdl.intervals
+
+            for symbol in alert_mdl.symbols:
+                for alert_interval in intervals:
+                    for strategy in alert_mdl.strategies:
+                        signal_param = SignalParamModel(
+                            trader_id=alert_mdl.trader_id,
+                            symbol=symbol,
+                            interval=alert_interval,
+                            strategy=strategy,
+                            from_buffer=True,
+                            closed_bars=True,
+                            # Every calculated signal is returned, the types are checked per alert
+                            types=[SignalType.DEBUG_SIGNAL],
+                        )
+                        key = (
+                            exchange_id,
+                            signal_param.symbol,
+                            signal_param.interval,
+                            signal_param.strategy,
+                        )
+
+                        if key not in self._signal_params:
+                            self._signal_params[key] = signal_param
+                            self._alert_index[key] = []
+
+                        if alert_mdl not in self._alert_index[key]:
+                            self._alert_index[key].append(alert_mdl)
+
+    def get_signal_keys(self) -> list[tuple]:
+        return list(self._signal_params.keys())
+
+    def get_signal_params(self) -> list[SignalParamModel]:
+        return list(self._signal_params.values())
+
+    def get_alerts(self, key: tuple) -> list[AlertModel]:
+        return self._alert_index.get(key, [])
+
+    def run(self) -> list[tuple[SignalModel, list[str]]]:
+        """
+        Returns the signals with channel ids of the alerts which accept the signal type
+        """
+        if config.get_config_value(Const.CONF_PROPERTY_RESPONSER_LOG):
+            logger.info(
+                f"{self.__class__.__name__}: {len(self._signal_params)} unique signals for {sum(len(alerts) for alerts in self._alert_index.values())} alert subscriptions"
+            )
+
+        signal_mdls = self._evaluate()
+
+        results = []
+        for key, signal_mdl in signal_mdls.items():
+            if not signal_mdl:
+                continue
+
+            channel_ids = []
+            for alert_mdl in self._alert_index[key]:
+                if (
+                    signal_mdl.is_compatible(signal_types=alert_mdl.signals)
+                    and alert_mdl.channel_id not in channel_ids
+                ):
+                    channel_ids.append(alert_mdl.channel_id)
+
+            if channel_ids:
+                results.append((signal_mdl, channel_ids))
+
+        return results
+
+    def _evaluate(self) -> dict[tuple, SignalModel]:
+        signal_mdls = {}
+
+        results = SignalFactory().evaluate_signals(
+            params=list(self._signal_params.values())
+        )
+
+        for key, (signal_param, signal_mdl, error) in zip(
+            self._signal_params.keys(), results
+        ):
+            if error:
+                logger.error(
+                    f"{self.__class__.__name__}: Error during signal calculation for {key} - {error}"
+                )
+
+            signal_mdls[key] = signal_mdl
+
+        return signal_mdls
+
+    def _get_exchange_id(self, trader_id: str) -> ExchangeId:
+        # Traders of the same exchange share the same market data
+        if trader_id not in self._exchanges:
+            trader_mdl = buffer_runtime_handler.get_trader_handler().get_trader(
+                id=trader_id
+            )
+            self._exchanges[trader_id] = trader_mdl.exchange_id
+
+        return self._exchanges[trader_id]
+
+
 class ResponserBot(ResponserBase):
     def get_signals_for_alerts(
         self, alert_mdls: list[AlertModel], interval: IntervalType = None
     ) -> Messages:
         messages_inst = Messages()
 
-        for alert_mdl in alert_mdls:
-            trader_id = alert_mdl.trader_id
-            channel_id = alert_mdl.channel_id
-            symbols = alert_mdl.symbols
-            if interval:
-                intervals = [interval]
-            else:
-                intervals = alert_mdl.intervals
-            strategies = alert_mdl.strategies
-            signal_types = alert_mdl.signals
-
-            signals_mdls = super().get_signals(
-                trader_id=trader_id,
-                symbols=symbols,
-                intervals=intervals,
-                strategies=strategies,
-                signal_types=signal_types,
-                closed_bars=True,
-            )
+        planner = AlertSignalPlanner(alert_mdls=alert_mdls, interval=interval)
 
-            for signal_mdl in signals_mdls:
-                signal_text = f"<b>{signal_mdl.signal.value}</b>"
-                message_text = f"{signal_mdl.date_time.isoformat()} - <b>{signal_mdl.symbol} - {signal_mdl.interval.value}</b>: ({signal_mdl.strategy.value}) - {signal_text}\n\n"
+        for signal_mdl, channel_ids in planner.run():
+            signal_text = f"<b>{signal_mdl.signal.value}</b>"
+            signal_message_text = f"{signal_mdl.date_time.isoformat()} - <b>{signal_mdl.symbol} - {signal_mdl.interval.value}</b>: ({signal_mdl.strategy.value}) - {signal_text}\n\n"
+
+            for channel_id in channel_ids:
+                message_text = signal_message_text
 
                 # Add header of the message before the first content
                 if not messages_inst.check_message(channel_id):
@@ -970,7 +1293,200 @@ class ResponserBot(ResponserBase):
         return messages_inst
 
 
+class OffsetTrigger(BaseTrigger):
+    """
+    Fires at the fire times of the trigger shifted by the offset
+    """
+
+    def __init__(self, trigger: BaseTrigger, offset: timedelta):
+        self._trigger = trigger
+        self._offset = offset
+
+    def get_next_fire_time(self, previous_fire_time, now):
+        if previous_fire_time:
+            previous_fire_time = previous_fire_time - self._offset
+
+        next_fire_time = self._trigger.get_next_fire_time(
+            previous_fire_time, now - self._offset
+        )
+        return next_fire_time + self._offset if next_fire_time else None
+
+    def __str__(self):
+        return f"offset[{self._trigger}, {self._offset}]"
+
+
+class IntervalTickPipeline:
+    """
+    One tick per interval: the union of the signals required by the robot, bot and email jobs
+    of the interval is calculated once, then the jobs consume the signals from the signal store.
+    The consumers only read the store, so they run concurrently and the tick takes as long as
+    the slowest consumer instead of the sum of them.
+    """
+
+    STAGE_COLLECT = "collect"
+    STAGE_SIGNALS = "signals"
+    STAGE_TOTAL = "total"
+
+    # Consumers run after the signals are calculated, the timings are reported in this order
+    CONSUMERS = {
+        Const.JOB_TYPE_ROBOT: job_func_trading_robot,
+        Const.JOB_TYPE_BOT: job_func_send_bot_notification,
+        Const.JOB_TYPE_EMAIL: job_func_send_email_notification,
+    }
+
+    # Interval -> {job_id: job_type}
+    _consumers: dict[str, dict[str, str]] = {}
+    # Interval -> {stage: seconds} of the latest tick
+    _timings: dict[str, dict[str, float]] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def add_consumer(cls, interval: str, job_id: str, job_type: str) -> None:
+        with cls._lock:
+            cls._consumers.setdefault(interval, {})[job_id] = job_type
+
+    @classmethod
+    def remove_consumer(cls, job_id: str) -> tuple[str, bool]:
+        """
+        Returns the interval of the consumer and whether the interval has other consumers
+        """
+        with cls._lock:
+            for interval, consumers in cls._consumers.items():
+                if job_id in consumers:
+                    consumers.pop(job_id)
+                    return (interval, bool(consumers))
+
+        return (None, False)
+
+    @classmethod
+    def get_job_types(cls, interval: str) -> list[str]:
+        with cls._lock:
+            job_types = set(cls._consumers.get(interval, {}).values())
+
+        return [job_type for job_type in cls.CONSUMERS if job_type in job_types]
+
+    @classmethod
+    def get_signal_params(
+        cls, interval: str, job_types: list[str] = None
+    ) -> list[SignalParamModel]:
+        if job_types is None:
+            job_types = cls.get_job_types(interval)
+
+        params = []
+        if Const.JOB_TYPE_ROBOT in job_types:
+            params.extend(Robot().get_signal_params(interval))
+
+        if Const.JOB_TYPE_BOT in job_types:
+            alerts = get_bot_alerts(interval)
+            if alerts:
+                params.extend(
+                    AlertSignalPlanner(
+                        alert_mdls=alerts, interval=interval
+                    ).get_signal_params()
+                )
+
+        if Const.JOB_TYPE_EMAIL in job_types:
+            params.extend(ResponserEmail().get_signal_params(interval))
+
+        # Traders of the same exchange share the same signal in the store
+        exchanges = {}
+        unique_params = {}
+        for param in params:
+            if param.trader_id not in exchanges:
+                exchanges[param.trader_id] = (
+                    buffer_runtime_handler.get_trader_handler()
+                    .get_trader(id=param.trader_id)
+                    .exchange_id
+                )
+
+            key = (
+                exchanges[param.trader_id],
+                param.symbol,
+                param.interval,
+                param.strategy,
+            )
+            unique_params.setdefault(key, param)
+
+        return list(unique_params.values())
+
+    @classmethod
+    def prepare(cls, interval: str) -> int:
+        count = SignalFactory().prepare_signals(cls.get_signal_params(interval))
+
+        if config.get_config_value(Const.CONF_PROPERTY_RESPONSER_LOG):
+            logger.info(
+                f"{cls.__name__}: {count} signals are prepared for interval - {interval}"
+            )
+
+        return count
+
+    @classmethod
+    def run(cls, interval: str) -> dict[str, float]:
+        timings = {}
+        start_time = time.perf_counter()
+
+        job_types = cls.get_job_types(interval)
+
+        stage_time = time.perf_counter()
+        params = cls.get_signal_params(interval=interval, job_types=job_types)
+        timings[cls.STAGE_COLLECT] = time.perf_counter() - stage_time
+
+        # Signals of the closed bar are put to the signal store
+        stage_time = time.perf_counter()
+        SignalFactory().get_signals(params)
+        timings[cls.STAGE_SIGNALS] = time.perf_counter() - stage_time
+
+        if job_types:
+            with ThreadPoolExecutor(
+                max_workers=len(job_types), thread_name_prefix=f"tick_{interval}"
+            ) as executor:
+                durations = executor.map(
+                    lambda job_type: cls._run_consumer(interval, job_type), job_types
+                )
+                timings.update(zip(job_types, durations))
+
+        timings[cls.STAGE_TOTAL] = time.perf_counter() - start_time
+
+        with cls._lock:
+            cls._timings[interval] = timings
+
+        if config.get_config_value(Const.CONF_PROPERTY_RESPONSER_LOG):
+            logger.info(
+                f"{cls.__name__}: Tick of interval {interval} with {len(params)} signals - "
+                + ", ".join(
+                    f"{stage}: {duration:.3f}s" for stage, duration in timings.items()
+                )
+            )
+
+        return timings
+
+    @classmethod
+    def _run_consumer(cls, interval: str, job_type: str) -> float:
+        start_time = time.perf_counter()
+
+        try:
+            cls.CONSUMERS[job_type](interval)
+        except Exception as error:
+            logger.error(
+                f"{cls.__name__}: Error during {job_type} job for interval {interval} - {error}"
+            )
+
+        return time.perf_counter() - start_time
+
+    @classmethod
+    def get_timings(cls) -> dict[str, dict[str, float]]:
+        with cls._lock:
+            return {interval: dict(timings) for interval, timings in cls._timings.items()}
+
+
 class JobScheduler:
+    # Seconds after the bar close, the closed bar is waited for by the history data handler
+    BAR_CLOSE_DELAY = 1
+    # Seconds before the bar close to prepare the signal data of the robot and bot jobs
+    PRE_CLOSE_LEAD = 10
+    PRE_CLOSE_JOB_SUFFIX = "_pre_close"
+    TICK_JOB_PREFIX = "tick_"
+
     _instance = None
 
     def __new__(class_, *args, **kwargs):
@@ -1039,14 +1555,14 @@ class JobScheduler:
         return self.__db_inst.activate_job(job_id)
 
     def deactivate_job(self, job_id: str) -> bool:
-        self.__scheduler.remove_job(job_id)
+        self.__remove_scheduled_job(job_id)
         buffer_runtime_handler.get_job_handler().remove_from_buffer(key=job_id)
 
         return self.__db_inst.deactivate_job(job_id)
 
     def remove_job(self, job_id: str) -> bool:
         try:
-            self.__scheduler.remove_job(job_id)
+            self.__remove_scheduled_job(job_id)
             buffer_runtime_handler.get_job_handler().remove_from_buffer(key=job_id)
             return self.__db_inst.delete_job(job_id)
         except JobLookupError as error:
@@ -1066,38 +1582,23 @@ class JobScheduler:
 
     def __add_job(self, job_id: str, job_type: str, interval: str) -> Job:
         # Schedule a job based on a job type
-        if job_type == Const.JOB_TYPE_BOT:
-            job = self.__scheduler.add_job(
-                job_func_send_bot_notification,
-                self.__generateCronTrigger(interval),
-                id=job_id,
-                args=(interval,),
-            )
-        elif job_type == Const.JOB_TYPE_EMAIL:
-            job = self.__scheduler.add_job(
-                job_func_send_email_notification,
-                self.__generateCronTrigger(interval),
-                id=job_id,
-                args=(interval,),
+        if job_type in IntervalTickPipeline.CONSUMERS:
+            # Robot, bot and email jobs of the interval are consumers of the same tick
+            IntervalTickPipeline.add_consumer(
+                interval=interval, job_id=job_id, job_type=job_type
             )
+            job = self.__add_tick_job(interval)
         elif job_type == Const.JOB_TYPE_INIT:
             job = self.__scheduler.add_job(
                 job_func_initialise_runtime_data,
                 CronTrigger(day_of_week="mon-fri", hour="2", jitter=60, timezone="UTC"),
                 id=job_id,
             )
-        elif job_type == Const.JOB_TYPE_ROBOT:
-            job = self.__scheduler.add_job(
-                job_func_trading_robot,
-                self.__generateCronTrigger(interval),
-                id=job_id,
-                args=(interval,),
-            )
         else:
             raise Exception(f"Job type {job_type} can't be detected")
 
         # Add job to the runtime buffer
-        buffer_runtime_handler.get_job_handler().set_buffer(key=job.id, data=job)
+        buffer_runtime_handler.get_job_handler().set_buffer(key=job_id, data=job)
 
         if config.get_config_value(Const.CONF_PROPERTY_RESPONSER_LOG):
             logger.info(
@@ -1106,37 +1607,71 @@ class JobScheduler:
 
         return job
 
+    def __add_tick_job(self, interval: str) -> Job:
+        tick_job_id = f"{self.TICK_JOB_PREFIX}{interval}"
+
+        job = self.__scheduler.get_job(tick_job_id)
+        if job:
+            return job
+
+        job = self.__scheduler.add_job(
+            job_func_interval_tick,
+            self.__generateCronTrigger(interval),
+            id=tick_job_id,
+            args=(interval,),
+        )
+
+        # Signal data is prepared a few seconds before the bar close, so the tick at the close
+        # requests just the latest bar
+        self.__scheduler.add_job(
+            job_func_interval_pre_close,
+            OffsetTrigger(
+                trigger=self.__generateCronTrigger(interval),
+                offset=-timedelta(seconds=self.PRE_CLOSE_LEAD + self.BAR_CLOSE_DELAY),
+            ),
+            id=f"{tick_job_id}{self.PRE_CLOSE_JOB_SUFFIX}",
+            args=(interval,),
+            replace_existing=True,
+        )
+
+        return job
+
+    def __remove_scheduled_job(self, job_id: str) -> None:
+        interval, has_consumers = IntervalTickPipeline.remove_consumer(job_id)
+
+        if not interval:
+            self.__scheduler.remove_job(job_id)
+        elif not has_consumers:
+            tick_job_id = f"{self.TICK_JOB_PREFIX}{interval}"
+            self.__scheduler.remove_job(tick_job_id)
+
+            pre_close_job_id = f"{tick_job_id}{self.PRE_CLOSE_JOB_SUFFIX}"
+            if self.__scheduler.get_job(pre_close_job_id):
+                self.__scheduler.remove_job(pre_close_job_id)
+
     def __generateCronTrigger(self, interval) -> CronTrigger:
+        # Jobs are triggered at the bar close
         day_of_week = "*"
         hour = None
         minute = "0"
-        second = "40"
-        jitter = 20
 
         if interval == IntervalType.MIN_1:
             minute = "*"
-            second = "20"
-            jitter = 5
         elif interval == IntervalType.MIN_5:
             minute = "*/5"
-            jitter = 10
         elif interval == IntervalType.MIN_15:
             minute = "*/15"
         elif interval == IntervalType.MIN_30:
             minute = "*/30"
         elif interval == IntervalType.HOUR_1:
             hour = "*"
-            minute = "1"
         elif interval == IntervalType.HOUR_4:
             hour = "0,4,8,12,16,20"
-            minute = "1"
         elif interval == IntervalType.DAY_1:
             hour = "8"
-            minute = "1"
         elif interval == IntervalType.WEEK_1:
             day_of_week = "mon"
             hour = "8"
-            minute = "1"
         else:
             raise Exception("Incorrect interval for subscription")
 
@@ -1144,9 +1679,8 @@ class JobScheduler:
             day_of_week=day_of_week,
             hour=hour,
             minute=minute,
-            second=second,
+            second=str(self.BAR_CLOSE_DELAY),
             timezone="UTC",
-            jitter=jitter,
         )
 
 
@@ -1155,21 +1689,105 @@ class NotificationBase:
         pass
 
 
+class SmtpSender:
+    """
+    Keeps one authenticated SMTP connection for a batch of messages and reconnects on failure
+    """
+
+    RECONNECT_LIMIT = 1
+    TIMEOUT = 30
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: str = None,
+        password: str = None,
+        starttls: bool = True,
+    ) -> None:
+        self._host = host
+        self._port = port
+        self._username = username
+        self._password = password
+        # Plain text connections are allowed only explicitly, e.g. for a local SMTP stub
+        self._starttls = starttls
+        self._server: smtplib.SMTP = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def connect(self) -> smtplib.SMTP:
+        if not self._server:
+            server = smtplib.SMTP(self._host, self._port, timeout=self.TIMEOUT)
+
+            try:
+                server.ehlo()
+                if self._starttls:
+                    # Credentials are never sent if the server doesn't offer STARTTLS
+                    if not server.has_extn("starttls"):
+                        raise smtplib.SMTPNotSupportedError(
+                            f"SMTP: STARTTLS isn't supported by the server {self._host}"
+                        )
+                    server.starttls()
+                    server.ehlo()
+                if self._username and self._password:
+                    server.login(self._username, self._password)
+            except Exception:
+                server.close()
+                raise
+
+            self._server = server
+
+        return self._server
+
+    def send(self, sender: str, receivers: list, message: str) -> None:
+        for attempt in range(self.RECONNECT_LIMIT + 1):
+            try:
+                self.connect().sendmail(sender, receivers, message)
+                return
+            except (
+                smtplib.SMTPServerDisconnected,
+                ConnectionError,
+                TimeoutError,
+            ) as error:
+                # The connection is dropped by the server or network - open a new one
+                self._reset()
+                if attempt == self.RECONNECT_LIMIT:
+                    raise error
+
+    def close(self) -> None:
+        if self._server:
+            try:
+                self._server.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._server = None
+
+    def _reset(self) -> None:
+        if self._server:
+            try:
+                self._server.close()
+            except OSError:
+                pass
+            self._server = None
+
+
 class NotificationEmail(NotificationBase):
-    def send(self, messages_inst: Messages):
+    # Messages are sent by a background worker, so the scheduler thread isn't blocked
+    _queue: queue.Queue = queue.Queue()
+    _worker: threading.Thread = None
+    _worker_lock = threading.Lock()
+
+    def send(self, messages_inst: Messages, wait: bool = False):
         # Email configuration
         sender_email = os.getenv("SMTP_USERNAME")
+        receiver_email = os.getenv("RECEIVER_EMAIL", "").split(";")
 
-        # SMTP server configuration
-        smtp_server = "smtp.gmail.com"
-        smtp_port = 587
-        smtp_username = sender_email
-        smtp_password = os.getenv("SMTP_PASSWORD")
-
+        emails = []
         for message_inst in messages_inst.get_messages().values():
-            # message_inst.get_channel_id()
-            receiver_email = os.getenv("RECEIVER_EMAIL").split(";")
-
             # Create a MIME message object
             msg = MIMEMultipart()
             msg["From"] = sender_email
@@ -1178,49 +1796,285 @@ class NotificationEmail(NotificationBase):
             body = MIMEText(message_inst.get_message_text(), "html")
             msg.attach(body)
 
-            try:
-                # Create a secure connection with the SMTP server
-                server = smtplib.SMTP(smtp_server, smtp_port)
-                server.starttls()
-                server.login(smtp_username, smtp_password)
+            emails.append((sender_email, receiver_email, msg.as_string()))
 
-                # Send the email
-                server.sendmail(sender_email, receiver_email, msg.as_string())
-                if config.get_config_value(Const.CONF_PROPERTY_RESPONSER_LOG):
-                    logger.info(
-                        f"NOTIFICATION: EMAIL - Sent successfully to {receiver_email}."
-                    )
+        if not emails:
+            return
 
-            except Exception as e:
-                logger.error(
-                    "NOTIFICATION: EMAIL - An error occurred while sending the email:",
-                    str(e),
+        self._start_worker()
+        NotificationEmail._queue.put(emails)
+
+        if wait:
+            NotificationEmail._queue.join()
+
+    def get_sender(self) -> SmtpSender:
+        # SMTP server configuration
+        return SmtpSender(
+            host=os.getenv("SMTP_SERVER", "smtp.gmail.com"),
+            port=int(os.getenv("SMTP_PORT", 587)),
+            username=os.getenv("SMTP_USERNAME"),
+            password=os.getenv("SMTP_PASSWORD"),
+            starttls=os.getenv("SMTP_STARTTLS", "true").lower() != "false",
+        )
+
+    def _start_worker(self) -> None:
+        with NotificationEmail._worker_lock:
+            if not NotificationEmail._worker or not NotificationEmail._worker.is_alive():
+                NotificationEmail._worker = threading.Thread(
+                    target=self._run_worker, name="NotificationEmail", daemon=True
                 )
+                NotificationEmail._worker.start()
 
+    def _run_worker(self) -> None:
+        while True:
+            emails = NotificationEmail._queue.get()
+
+            try:
+                # One authenticated connection is used for all emails of the batch
+                with self.get_sender() as sender:
+                    for sender_email, receiver_email, message in emails:
+                        try:
+                            sender.send(
+                                sender=sender_email,
+                                receivers=receiver_email,
+                                message=message,
+                            )
+                            if config.get_config_value(
+                                Const.CONF_PROPERTY_RESPONSER_LOG
+                            ):
+                                logger.info(
+                                    f"NOTIFICATION: EMAIL - Sent successfully to {receiver_email}."
+                                )
+                        except Exception as error:
+                            logger.error(
+                                f"NOTIFICATION: EMAIL - An error occurred while sending the email: {error}"
+                            )
+            except Exception as error:
+                logger.error(
+                    f"NOTIFICATION: EMAIL - An error occurred while connecting to the SMTP server: {error}"
+                )
             finally:
-                # Close the SMTP server connection
-                server.quit()
+                NotificationEmail._queue.task_done()
+
+
+class RateLimiter:
+    """
+    Spaces calls so that not more than rate calls per second are made
+    """
+
+    def __init__(self, rate: float) -> None:
+        self._interval = 1 / rate
+        self._next_time = 0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            wait_time = self._next_time - now
+            self._next_time = max(now, self._next_time) + self._interval
+
+        if wait_time > 0:
+            time.sleep(wait_time)
 
 
 class NotificationBot(NotificationBase):
+    MAX_WORKERS = 8
+    MESSAGE_MAX_LENGTH = 4096
+    # Telegram limits: about 30 messages per second in total and 1 message per second per chat
+    GLOBAL_RATE_LIMIT = 30
+    CHAT_RATE_LIMIT = 1
+    RETRY_LIMIT = 3
+    RETRY_DELAY = 1
+    TIMEOUT = 10
+
+    # HTML tags, entities and text between them, a long line is cut between these tokens
+    HTML_TOKEN = re.compile(r"<[^<>]*>|&#?\w+;|[^<&]+|[<&]")
+    HTML_TAG = re.compile(r"<(/?)(\w+)[^<>]*>")
+
+    _session: requests.Session = None
+    _session_lock = threading.Lock()
+    # The global limit of the bot is shared by all jobs and instances
+    _global_rate_limiter = RateLimiter(GLOBAL_RATE_LIMIT)
+
+    @classmethod
+    def get_session(cls) -> requests.Session:
+        # The session and its connection pool are shared by all dispatchers
+        with cls._session_lock:
+            if not cls._session:
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(
+                    pool_connections=1, pool_maxsize=cls.MAX_WORKERS
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                cls._session = session
+
+        return cls._session
+
     def send(self, messages_inst: Messages):
         bot_token = os.getenv("BOT_TOKEN")
-        bot_url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
+        bot_api_url = os.getenv("BOT_API_URL", "https://api.telegram.org")
+        bot_url = f"{bot_api_url}/bot{bot_token}/sendMessage"
 
         if not bot_token:
             logger.error("Bot token is not maintained in the environment values")
 
-        for message_inst in messages_inst.get_messages().values():
+        messages = list(messages_inst.get_messages().values())
+        if not messages:
+            return
+
+        # All channels are resolved by one query
+        channels = ChannelHandler.get_channels_by_ids(
+            [message_inst.get_channel_id() for message_inst in messages]
+        )
+
+        chat_messages = []
+        for message_inst in messages:
             channel_id = message_inst.get_channel_id()
+            if channel_id not in channels:
+                logger.error(
+                    f"NOTIFICATION: BOT - Channel {channel_id} doesn't exists"
+                )
+                continue
 
-            channel_mdl = ChannelHandler.get_channel(id=channel_id)
+            chat_messages.append(
+                (
+                    channel_id,
+                    channels[channel_id].channel,
+                    self.split_message_text(message_inst.get_message_text()),
+                )
+            )
+
+        retry_queue = self._dispatch(bot_url=bot_url, chat_messages=chat_messages)
+
+        for attempt in range(1, self.RETRY_LIMIT + 1):
+            if not retry_queue:
+                break
+
+            if config.get_config_value(Const.CONF_PROPERTY_RESPONSER_LOG):
+                logger.info(
+                    f"NOTIFICATION: BOT - Retry {attempt} for {len(retry_queue)} chats"
+                )
+
+            time.sleep(self.RETRY_DELAY * attempt)
+            retry_queue = self._dispatch(bot_url=bot_url, chat_messages=retry_queue)
+
+        for channel_id, chat_id, texts in retry_queue:
+            logger.error(
+                f"NOTIFICATION: BOT - Failed to send {len(texts)} messages to chat bot: {channel_id}"
+            )
+
+    def split_message_text(self, text: str) -> list[str]:
+        # Messages are split by the signal lines to keep HTML tags closed
+        texts = []
+        current = ""
+
+        for line in text.splitlines(keepends=True):
+            if len(line) > self.MESSAGE_MAX_LENGTH:
+                if current:
+                    texts.append(current)
+                    current = ""
+
+                parts = self.split_long_line(line)
+                texts.extend(parts[:-1])
+                line = parts[-1]
+
+            if len(current) + len(line) > self.MESSAGE_MAX_LENGTH:
+                texts.append(current)
+                current = ""
+
+            current += line
+
+        if current:
+            texts.append(current)
+
+        return texts
+
+    def split_long_line(self, line: str) -> list[str]:
+        # The line is cut between tags and entities, tags which are open at the cut are
+        # closed at the end of the part and reopened at the start of the next part
+        texts = []
+        current = ""
+        open_tags: list[tuple[str, str]] = []
+
+        for token in self.HTML_TOKEN.findall(line):
+            tag = self.HTML_TAG.fullmatch(token)
+            is_text = not tag and not token.startswith("&")
+
+            while token:
+                closing_tags = "".join(f"</{name}>" for name, _ in reversed(open_tags))
+                free_length = (
+                    self.MESSAGE_MAX_LENGTH - len(current) - len(closing_tags)
+                )
+                if tag and not tag.group(1):
+                    # The opening tag requires room for its closing tag
+                    free_length -= len(f"</{tag.group(2)}>")
+
+                if is_text:
+                    part = token[: max(free_length, 0)]
+                else:
+                    part = token if len(token) <= free_length else ""
+
+                if not part:
+                    texts.append(current + closing_tags)
+                    current = "".join(open_tag for _, open_tag in open_tags)
+                    continue
+
+                current += part
+                token = token[len(part) :]
+
+            if tag and tag.group(1):
+                for index in range(len(open_tags) - 1, -1, -1):
+                    if open_tags[index][0] == tag.group(2):
+                        del open_tags[index]
+                        break
+            elif tag:
+                open_tags.append((tag.group(2), tag.group()))
+
+        texts.append(current)
+
+        return texts
+
+    def _dispatch(self, bot_url: str, chat_messages: list[tuple]) -> list[tuple]:
+        # Chats are sent concurrently, the parts of the same chat are sent in order
+        retry_queue = []
+
+        with ThreadPoolExecutor(
+            max_workers=min(self.MAX_WORKERS, len(chat_messages) or 1)
+        ) as executor:
+            futures = [
+                executor.submit(self._send_chat, bot_url, channel_id, chat_id, texts)
+                for channel_id, chat_id, texts in chat_messages
+            ]
+
+            for (channel_id, chat_id, texts), future in zip(chat_messages, futures):
+                failed_texts = future.result()
+                if failed_texts:
+                    retry_queue.append((channel_id, chat_id, failed_texts))
+
+        return retry_queue
+
+    def _send_chat(
+        self, bot_url: str, channel_id: str, chat_id: str, texts: list[str]
+    ) -> list[str]:
+        chat_rate_limiter = RateLimiter(self.CHAT_RATE_LIMIT)
+
+        for index, text in enumerate(texts):
+            chat_rate_limiter.wait()
+            self._global_rate_limiter.wait()
+
+            params = {"chat_id": chat_id, "text": text, "parse_mode": "HTML"}
+
+            try:
+                response = self.get_session().post(
+                    bot_url, data=params, timeout=self.TIMEOUT
+                )
+            except requests.RequestException as error:
+                logger.error(
+                    f"NOTIFICATION: BOT - Failed to send message to chat bot: {channel_id} - {error}"
+                )
+                return texts[index:]
 
-            params = {
-                "chat_id": channel_mdl.channel,
-                "text": message_inst.get_message_text(),
-                "parse_mode": "HTML",
-            }
-            response = requests.post(bot_url, data=params)
             if response.ok:
                 if config.get_config_value(Const.CONF_PROPERTY_RESPONSER_LOG):
                     logger.info(
@@ -1231,6 +2085,21 @@ class NotificationBot(NotificationBase):
                     f"NOTIFICATION: BOT - Failed to send message to chat bot: {channel_id} - {response.text}"
                 )
 
+                # Only throttled and server errors are retried, the rest parts are kept in order
+                if response.status_code == 429 or response.status_code >= 500:
+                    retry_after = self._get_retry_after(response)
+                    if retry_after:
+                        time.sleep(retry_after)
+                    return texts[index:]
+
+        return []
+
+    def _get_retry_after(self, response: requests.Response) -> int:
+        try:
+            return int(response.json()["parameters"]["retry_after"])
+        except Exception:
+            return 0
+
 
 # def getLogs(start_date, end_date):
 #     # date_format = "%Y-%m-%d"
@@ -1,6 +1,19 @@
 from decimal import Decimal, ROUND_DOWN
 from datetime import datetime
+from collections import namedtuple
+from concurrent.futures import (
+    Future,
+    ThreadPoolExecutor,
+    TimeoutError as FutureTimeoutError,
+)
+import time
+import threading
+from typing import TextIO
 from bson import ObjectId
+import bson.json_util as json_util
+from pydantic import BaseModel
+import numpy as np
+import pandas as pd
 import logging
 
 from .core import Const, config
@@ -13,6 +26,7 @@ from .handler import (
     LeverageHandler,
     TransactionHandler,
     ExchangeHandler,
+    UnitOfWorkHandler,
     buffer_runtime_handler,
 )
 
@@ -30,10 +44,124 @@ def is_write_log(session_type: cmn.SessionType = cmn.SessionType.TRADING) -> boo
         return robot_log
 
 
+class SimulationRecord:
+    """
+    Lightweight record of a history simulation with the fields of the pydantic model as slots.
+    The record isn't validated, the model is built only when the record is serialized.
+    """
+
+    __slots__ = ()
+
+    MODEL: type[BaseModel] = None
+
+    def __init__(self, **kwargs):
+        for name, field in self.MODEL.model_fields.items():
+            setattr(self, name, kwargs[name] if name in kwargs else field.default)
+
+    def to_model(self) -> BaseModel:
+        # Fields with the default values aren't passed, so the model is the same as built from the data
+        return self.MODEL(
+            **{
+                field.alias or name: getattr(self, name)
+                for name, field in self.MODEL.model_fields.items()
+                if getattr(self, name) is not field.default
+            }
+        )
+
+    def model_dump(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class SimulationTrailingStop(SimulationRecord):
+    __slots__ = tuple(cmn.TrailingStopModel.model_fields)
+
+    MODEL = cmn.TrailingStopModel
+
+    # Calculations of the model are applied to the record
+    _calculate_delta = cmn.TrailingStopModel._calculate_delta
+    calculate_stop_loss_percent = cmn.TrailingStopModel.calculate_stop_loss_percent
+    calculate_take_profit_percent = cmn.TrailingStopModel.calculate_take_profit_percent
+
+
+class SimulationPosition(SimulationRecord):
+    __slots__ = tuple(cmn.LeverageModel.model_fields)
+
+    MODEL = cmn.LeverageModel
+
+    _calculate_delta = cmn.LeverageModel._calculate_delta
+    calculate_high_price = cmn.LeverageModel.calculate_high_price
+    calculate_low_price = cmn.LeverageModel.calculate_low_price
+    calculate_percent = cmn.LeverageModel.calculate_percent
+    calculate_high_percent = cmn.LeverageModel.calculate_high_percent
+    calculate_low_percent = cmn.LeverageModel.calculate_low_percent
+    calculate_balance = cmn.LeverageModel.calculate_balance
+
+    def calculate_stop_loss_percent(self) -> float:
+        return cmn.TrailingStopModel.calculate_stop_loss_percent(
+            self, open_price=self.open_price, side=self.side
+        )
+
+    def calculate_take_profit_percent(self) -> float:
+        return cmn.TrailingStopModel.calculate_take_profit_percent(
+            self, open_price=self.open_price, side=self.side
+        )
+
+
+class SimulationTransaction(SimulationRecord):
+    __slots__ = tuple(cmn.TransactionModel.model_fields)
+
+    MODEL = cmn.TransactionModel
+
+
+class TransactionStreamSink:
+    """
+    Writes the transactions as NDJSON lines to the text stream as soon as they are added.
+    """
+
+    def __init__(self, stream: TextIO):
+        self._stream = stream
+        self._count = 0
+
+    def write(self, transaction_mdl: cmn.TransactionModel) -> None:
+        self._stream.write(f"{json_util.dumps(transaction_mdl.model_dump())}\n")
+        self._count += 1
+
+    def get_count(self) -> int:
+        return self._count
+
+
 class TransactionManager:
-    def __init__(self, session_mdl: cmn.SessionModel):
+    # Summary level records a transaction per trade, open details of the trade are kept by the position
+    SUMMARY_TRANSACTION_TYPES = [
+        cmn.TransactionType.ERROR,
+        cmn.TransactionType.DB_CLOSE_POSITION,
+    ]
+
+    def __init__(self, session_mdl: cmn.SessionModel, uow: UnitOfWorkHandler):
         self.__session_mdl: cmn.SessionModel = session_mdl
+        self.__uow: UnitOfWorkHandler = uow
         self.__transaction_models: list[cmn.TransactionModel] = []
+        self.__is_write_log = is_write_log(session_type=session_mdl.session_type)
+
+        # Recording level and sink are applied to the local transactions only
+        self.__recording = cmn.TransactionRecordingType.FULL
+        self.__sink: TransactionStreamSink = None
+
+    def set_recording(
+        self,
+        recording: cmn.TransactionRecordingType,
+        sink: TransactionStreamSink = None,
+    ):
+        self.__recording = recording
+        self.__sink = sink
+
+    def is_recorded(self, type: cmn.TransactionType) -> bool:
+        if self.__recording == cmn.TransactionRecordingType.FULL:
+            return True
+        elif self.__recording == cmn.TransactionRecordingType.SUMMARY:
+            return type in self.SUMMARY_TRANSACTION_TYPES
+        else:
+            return False
 
     def add_transaction(
         self,
@@ -44,56 +172,70 @@ class TransactionManager:
         data: dict = {},
         save: bool = True,
     ):
-        transaction_mdl = cmn.TransactionModel(
-            **{
-                Const.DB_LOCAL_ORDER_ID: local_order_id,
-                Const.DB_ORDER_ID: order_id,
-                Const.DB_SESSION_ID: self.__session_mdl.id,
-                Const.DB_USER_ID: self.__session_mdl.user_id,
-                Const.DB_DATE_TIME: date_time,
-                Const.DB_TYPE: type,
-                Const.DB_TRANSACTION_DATA: data,
-            }
-        )
+        transaction_data = {
+            Const.DB_LOCAL_ORDER_ID: local_order_id,
+            Const.DB_ORDER_ID: order_id,
+            Const.DB_SESSION_ID: self.__session_mdl.id,
+            Const.DB_USER_ID: self.__session_mdl.user_id,
+            Const.DB_DATE_TIME: date_time,
+            Const.DB_TYPE: type,
+            Const.DB_TRANSACTION_DATA: data,
+        }
         if save:
-            self.create_transaction(transaction_mdl)
+            self.create_transaction(cmn.TransactionModel(**transaction_data))
+        elif not self.is_recorded(type):
+            return
+        elif self.__sink:
+            # Transactions are written as soon as they are added, they aren't kept in the memory
+            self.__sink.write(SimulationTransaction(**transaction_data).to_model())
         else:
-            self.add_transaction_model(transaction_mdl)
+            # Local transactions are kept as records until they are requested
+            self.add_transaction_model(SimulationTransaction(**transaction_data))
 
-    def add_transaction_model(self, transaction_mdl: cmn.TransactionModel):
+    def add_transaction_model(
+        self, transaction_mdl: cmn.TransactionModel | SimulationTransaction
+    ):
         if transaction_mdl:
             self.__transaction_models.append(transaction_mdl)
-            if is_write_log(session_type=self.__session_mdl.session_type):
+            if self.__is_write_log:
                 logger.info(
                     f"{self.__class__.__name__} ({self.__session_mdl.id}):  - Add transaction {transaction_mdl.type} for {transaction_mdl.date_time}"
                 )
 
     def create_transaction(self, transaction_mdl: cmn.TransactionModel):
-        TransactionHandler().create_transaction(transaction_mdl)
-        if is_write_log(session_type=self.__session_mdl.session_type):
+        self.__uow.create_transaction(transaction_mdl)
+        if self.__is_write_log:
             logger.info(
-                f"{self.__class__.__name__} ({self.__session_mdl.id}):  - The transaction {transaction_mdl.type} for {transaction_mdl.date_time} have been saved"
+                f"{self.__class__.__name__} ({self.__session_mdl.id}):  - The transaction {transaction_mdl.type} for {transaction_mdl.date_time} have been registered for saving"
             )
 
     def get_transactions(self) -> list:
-        return self.__transaction_models
+        return [
+            (
+                transaction_mdl.to_model()
+                if isinstance(transaction_mdl, SimulationRecord)
+                else transaction_mdl
+            )
+            for transaction_mdl in self.__transaction_models
+        ]
 
     def save_transactions(self):
         if self.__transaction_models:
-            TransactionHandler().create_transactions(self.__transaction_models)
+            TransactionHandler().create_transactions(self.get_transactions())
 
             # Clear transactions buffer
             self.__transaction_models = []
 
-            if is_write_log(session_type=self.__session_mdl.session_type):
+            if self.__is_write_log:
                 logger.info(
                     f"{self.__class__.__name__} ({self.__session_mdl.id}):  - The transactions have been saved"
                 )
 
 
 class BalanceManager:
-    def __init__(self, balance_mdl: cmn.BalanceModel):
+    def __init__(self, balance_mdl: cmn.BalanceModel, uow: UnitOfWorkHandler):
         self.__balance_mdl: cmn.BalanceModel = balance_mdl
+        self.__uow: UnitOfWorkHandler = uow
         self.__change_indicator: bool = False
 
     def get_balance_model(self):
@@ -143,20 +285,192 @@ class BalanceManager:
                 "total_profit": self.__balance_mdl.total_profit,
                 "total_fee": self.__balance_mdl.total_fee,
             }
-            BalanceHandler.update_balance(self.__balance_mdl.id, query=query)
+            self.__uow.update_balance(self.__balance_mdl.id, query=query)
 
             self.__change_indicator = False
 
             if is_write_log():
                 logger.info(
-                    f"{self.__class__.__name__} ({self.__balance_mdl.session_id}):  - The balance has been saved"
+                    f"{self.__class__.__name__} ({self.__balance_mdl.session_id}):  - The balance has been registered for saving"
+                )
+
+
+class PositionSnapshot:
+    """
+    Positions of a trader on the exchange which are requested once for the open positions of all
+    trading sessions of the trader in a robot run
+    """
+
+    def __init__(self, trader_id: str, session_mdls: list[cmn.SessionModel]):
+        self._positions: dict[str, cmn.LeverageModel] = {}
+        self._open_positions: dict[str, cmn.LeverageModel] = {}
+        self._close_positions: dict[str, cmn.OrderCloseModel] = {}
+
+        session_ids = [
+            session_mdl.id
+            for session_mdl in session_mdls
+            if session_mdl.session_type == cmn.SessionType.TRADING
+            and session_mdl.trading_type == cmn.TradingType.LEVERAGE
+        ]
+        if not session_ids:
+            return
+
+        positions = LeverageHandler.get_leverages(
+            session_ids=session_ids, status=cmn.OrderStatus.opened
+        )
+        if not positions:
+            return
+
+        # Positions known by the private stream aren't requested
+        position_stream = buffer_runtime_handler.get_position_stream(trader_id)
+        if position_stream:
+            positions = [
+                position_mdl
+                for position_mdl in positions
+                if not position_stream.is_known(
+                    symbol=position_mdl.symbol, order_id=position_mdl.order_id
+                )
+            ]
+            if not positions:
+                return
+
+        exchange_handler = ExchangeHandler(trader_id)
+
+        self._positions = {
+            position_mdl.symbol: position_mdl for position_mdl in positions
+        }
+        self._open_positions = exchange_handler.get_open_positions(positions)
+        self._close_positions = exchange_handler.get_close_positions(
+            [
+                position_mdl
+                for position_mdl in positions
+                if position_mdl.symbol not in self._open_positions
+            ]
+        )
+
+        if is_write_log():
+            logger.info(
+                f"{self.__class__.__name__} ({trader_id}): {len(self._open_positions)} of {len(positions)} positions are open on the exchange"
+            )
+
+    def is_reconciled(self, symbol: str, order_id: str = None) -> bool:
+        position_mdl = self._positions.get(symbol)
+        return position_mdl is not None and position_mdl.order_id == order_id
+
+    def get_open_position(self, symbol: str) -> cmn.LeverageModel:
+        return self._open_positions.get(symbol)
+
+    def get_close_position(self, symbol: str) -> cmn.OrderCloseModel:
+        return self._close_positions.get(symbol)
+
+
+class SessionStateCache:
+    """
+    Trader managers of the sessions are kept between the robot runs together with the balance,
+    the open position and the side/risk managers. The state is rebuilt if the session has been changed.
+    """
+
+    _trader_managers: dict = {}
+    _locks: dict = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get_lock(session_mdl: cmn.SessionModel):
+        # History Simulation is temporary and isn't shared
+        if session_mdl.session_type == cmn.SessionType.HISTORY:
+            return threading.RLock()
+
+        with SessionStateCache._lock:
+            if session_mdl.id not in SessionStateCache._locks:
+                SessionStateCache._locks[session_mdl.id] = threading.RLock()
+            return SessionStateCache._locks[session_mdl.id]
+
+    @staticmethod
+    def get_trader_manager(
+        session_mdl: cmn.SessionModel, position_snapshot: PositionSnapshot = None
+    ):
+        # The session lock has to be acquired by the caller
+        if session_mdl.session_type == cmn.SessionType.HISTORY:
+            return TraderBase.get_manager(session_mdl)
+
+        with SessionStateCache._lock:
+            trader_mng: TraderBase = SessionStateCache._trader_managers.get(
+                session_mdl.id
+            )
+
+        if (
+            not trader_mng
+            or trader_mng.session_mdl.changed_at != session_mdl.changed_at
+        ):
+            if is_write_log():
+                logger.info(
+                    f"SessionStateCache ({session_mdl.id}): The session state is loaded"
                 )
 
+            if trader_mng:
+                trader_mng.release()
+
+            trader_mng = TraderBase.get_manager(session_mdl)
+
+            with SessionStateCache._lock:
+                SessionStateCache._trader_managers[session_mdl.id] = trader_mng
+
+        try:
+            # Changes of the exchange are taken for every use of the state
+            trader_mng.synchronize(position_snapshot=position_snapshot)
+        except Exception:
+            SessionStateCache.invalidate(session_mdl.id)
+            raise
+
+        return trader_mng
+
+    @staticmethod
+    def invalidate(session_id: str) -> None:
+        with SessionStateCache._lock:
+            trader_mng: TraderBase = SessionStateCache._trader_managers.pop(
+                session_id, None
+            )
+
+        if trader_mng:
+            if is_write_log():
+                logger.info(
+                    f"SessionStateCache ({session_id}): The session state is invalidated"
+                )
+
+            trader_mng.release()
+
+    @staticmethod
+    def flush(session_id: str, uow: UnitOfWorkHandler) -> int:
+        try:
+            return uow.flush()
+        except Exception:
+            # The failed writes are dropped, the state is loaded again from the DB by the next use
+            SessionStateCache.invalidate(session_id)
+            raise
+
+    @staticmethod
+    def clear() -> None:
+        with SessionStateCache._lock:
+            trader_mngs = list(SessionStateCache._trader_managers.values())
+            SessionStateCache._trader_managers.clear()
+
+        for trader_mng in trader_mngs:
+            trader_mng.release()
+
 
 class SessionManager:
-    def __init__(self, session_mdl: cmn.SessionModel):
+    def __init__(
+        self,
+        session_mdl: cmn.SessionModel,
+        position_snapshot: PositionSnapshot = None,
+    ):
         self._session_mdl: cmn.SessionModel = session_mdl
-        self._trader_mng: TraderBase = TraderManager.get_manager(self._session_mdl)
+        self._lock = SessionStateCache.get_lock(self._session_mdl)
+
+        with self._lock:
+            self._trader_mng: TraderBase = SessionStateCache.get_trader_manager(
+                self._session_mdl, position_snapshot=position_snapshot
+            )
 
     def run(self, **kwargs):
         if is_write_log(session_type=self._session_mdl.session_type):
@@ -164,32 +478,53 @@ class SessionManager:
                 f"{self.__class__.__name__} ({self._session_mdl.id}):  - The Session Run has started"
             )
 
-        try:
-            self._trader_mng.run(**kwargs)
+        with self._lock:
+            try:
+                self._trader_mng.run(**kwargs)
 
-        except Exception as error:
-            # Add error details in the transactions
-            self._trader_mng.transaction_mng.add_transaction(
-                type=cmn.TransactionType.ERROR,
-                data={"message": f"{error}"},
-                save=(
-                    True
-                    if self._session_mdl.session_type != cmn.SessionType.HISTORY
-                    else False
-                ),
-            )
-            # Set FAILED Session status
-            SessionHandler.update_session(
-                id=self._session_mdl.id, query={"status": cmn.SessionStatus.failed}
-            )
+            except Exception as error:
+                # The state can be changed partially, it's loaded again by the next run
+                SessionStateCache.invalidate(self._session_mdl.id)
+
+                # Add error details in the transactions
+                self._trader_mng.transaction_mng.add_transaction(
+                    type=cmn.TransactionType.ERROR,
+                    data={"message": f"{error}"},
+                    save=(
+                        True
+                        if self._session_mdl.session_type != cmn.SessionType.HISTORY
+                        else False
+                    ),
+                )
+                # Set FAILED Session status, History Simulation isn't stored in the DB
+                if self._session_mdl.session_type != cmn.SessionType.HISTORY:
+                    self._trader_mng.uow.update_session(
+                        id=self._session_mdl.id,
+                        query={"status": cmn.SessionStatus.failed},
+                    )
 
-            raise error
+                raise error
+
+            finally:
+                # All writes of the run are sent together, also if the run has failed
+                self._flush()
 
     def get_session(self) -> cmn.SessionModel:
         return self._session_mdl
 
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        SessionStateCache.flush(self._session_mdl.id, self._trader_mng.uow)
+
     def get_positions(self) -> list:
-        return self._trader_mng.get_positions()
+        with self._lock:
+            try:
+                return self._trader_mng.get_positions()
+            finally:
+                self._flush()
 
     def get_transactions(self) -> list:
         return self._trader_mng.transaction_mng.get_transactions()
@@ -202,23 +537,54 @@ class SessionManager:
             logger.info(
                 f"{self.__class__.__name__} ({self._session_mdl.id}):  - The session has triggered to open a position"
             )
-        return self._trader_mng.open_position(open_mdl)
+        with self._lock:
+            try:
+                return self._trader_mng.open_position(open_mdl)
+            except Exception:
+                SessionStateCache.invalidate(self._session_mdl.id)
+                raise
+            finally:
+                self._flush()
 
     def close_position(self) -> bool:
         if is_write_log(session_type=self._session_mdl.session_type):
             logger.info(
                 f"{self.__class__.__name__} ({self._session_mdl.id}):  - The session has triggered to close positions"
             )
-        return self._trader_mng.close_position()
+        with self._lock:
+            try:
+                return self._trader_mng.close_position()
+            except Exception:
+                SessionStateCache.invalidate(self._session_mdl.id)
+                raise
+            finally:
+                self._flush()
 
 
 class TraderBase:
     def __init__(self, session_mdl: cmn.SessionModel):
         self.session_mdl: cmn.SessionModel = session_mdl
-        self.transaction_mng: TransactionManager = TransactionManager(self.session_mdl)
+        # DB writes of the session are collected and flushed by the SessionManager
+        self.uow: UnitOfWorkHandler = UnitOfWorkHandler()
+        self.transaction_mng: TransactionManager = TransactionManager(
+            self.session_mdl, uow=self.uow
+        )
         self.balance_mng: BalanceManager = None
         self.data_mng: DataManagerBase = None
 
+    @staticmethod
+    def get_signal_param(session_mdl: cmn.SessionModel) -> cmn.SignalParamModel:
+        return cmn.SignalParamModel(
+            trader_id=session_mdl.trader_id,
+            symbol=session_mdl.symbol,
+            interval=session_mdl.interval,
+            strategy=session_mdl.strategy,
+            from_buffer=True,
+            closed_bars=True,
+            # DEBUG type is required because there should be all signals
+            types=[cmn.SignalType.DEBUG_SIGNAL],
+        )
+
     @staticmethod
     def get_manager(session_model: cmn.SessionModel):
         if session_model.session_type == cmn.SessionType.TRADING:
@@ -245,22 +611,20 @@ class TraderBase:
 
         return positions
 
+    def synchronize(self, position_snapshot: PositionSnapshot = None):
+        pass
+
+    def release(self):
+        # Resources of the state are released once it's removed from the SessionStateCache
+        pass
+
     def run(self):
         if is_write_log(session_type=self.session_mdl.session_type):
             logger.info(
                 f"{self.__class__.__name__} ({self.session_mdl.id}):  - The Trader Run has started"
             )
 
-        signal_param = cmn.SignalParamModel(
-            trader_id=self.session_mdl.trader_id,
-            symbol=self.session_mdl.symbol,
-            interval=self.session_mdl.interval,
-            strategy=self.session_mdl.strategy,
-            from_buffer=True,
-            closed_bars=True,
-            # DEBUG type is required because there should be all signals
-            types=[cmn.SignalType.DEBUG_SIGNAL],
-        )
+        signal_param = TraderBase.get_signal_param(self.session_mdl)
 
         signal_mdl = SignalFactory().get_signal(param=signal_param)
 
@@ -366,14 +730,25 @@ class TraderManager(TraderBase):
         super().__init__(session_mdl)
 
         self.balance_mng: BalanceManager = BalanceManager(
-            BalanceHandler.get_balance_4_session(session_id=self.session_mdl.id)
+            BalanceHandler.get_balance_4_session(session_id=self.session_mdl.id),
+            uow=self.uow,
         )
 
         self.api_mng: DataManagerBase = DataManagerBase.get_api_manager(trader_mng=self)
         self.data_mng: DataManagerBase = DataManagerBase.get_db_manager(trader_mng=self)
 
+    def synchronize(self, position_snapshot: PositionSnapshot = None):
         # Make synchronize just for ACTIVE sessions
-        self.data_mng.synchronize(manager=self.api_mng)
+        try:
+            self.data_mng.synchronize(
+                manager=self.api_mng, position_snapshot=position_snapshot
+            )
+        except Exception:
+            self.uow.flush()
+            raise
+
+    def release(self):
+        self.api_mng.release()
 
     def open_position(self, open_mdl: cmn.OrderOpenModel) -> cmn.OrderOpenModel:
         if is_write_log(session_type=self.session_mdl.session_type):
@@ -436,7 +811,8 @@ class SimulatorManager(TraderBase):
         super().__init__(session_mdl)
 
         self.balance_mng: BalanceManager = BalanceManager(
-            BalanceHandler.get_balance_4_session(session_id=self.session_mdl.id)
+            BalanceHandler.get_balance_4_session(session_id=self.session_mdl.id),
+            uow=self.uow,
         )
 
         self.data_mng: DataManagerBase = DataManagerBase.get_db_manager(trader_mng=self)
@@ -456,7 +832,7 @@ class HistorySimulatorManager(TraderBase):
             }
         )
 
-        self.balance_mng = BalanceManager(balance_mdl)
+        self.balance_mng = BalanceManager(balance_mdl, uow=self.uow)
 
         self.data_mng: DataManagerBase = DataManagerBase.get_local_manager(
             trader_mng=self
@@ -478,18 +854,33 @@ class HistorySimulatorManager(TraderBase):
             closed_bars=True,
         )
 
-        strategy_df = StrategyFactory.get_strategy_data(strategy_param)
+        self.transaction_mng.set_recording(
+            recording=kwargs.get("transaction_recording")
+            or cmn.TransactionRecordingType.FULL,
+            sink=kwargs.get("transaction_sink"),
+        )
+
+        # History data can be loaded once for the strategies of a simulation grid
+        strategy_df = StrategyFactory.get_strategy_data(
+            strategy_param, history_data_mdl=kwargs.get("history_data_mdl")
+        )
+
+        if self.session_mdl.trading_type == cmn.TradingType.LEVERAGE:
+            HistorySimulationEngine(trader_mng=self).run(strategy_df)
+        else:
+            self.run_by_bars(strategy_df, limit=strategy_param.limit)
 
-        # Init signal instance
+    def run_by_bars(self, strategy_df: pd.DataFrame, limit: int = 0):
+        # Every bar is processed as a signal of the robot run
         for index, strategy_row in strategy_df.iterrows():
             signal_mdl = cmn.SignalModel(
-                trader_id=strategy_param.trader_id,
-                symbol=strategy_param.symbol,
-                interval=strategy_param.interval,
-                strategy=strategy_param.strategy,
-                limit=strategy_param.limit,
-                from_buffer=strategy_param.from_buffer,
-                closed_bars=strategy_param.closed_bars,
+                trader_id=self.session_mdl.trader_id,
+                symbol=self.session_mdl.symbol,
+                interval=self.session_mdl.interval,
+                strategy=self.session_mdl.strategy,
+                limit=limit,
+                from_buffer=True,
+                closed_bars=True,
                 date_time=index,
                 open=strategy_row["Open"],
                 high=strategy_row["High"],
@@ -503,6 +894,174 @@ class HistorySimulatorManager(TraderBase):
             self._process_signal(signal_mdl)
 
 
+class HistorySimulationEngine:
+    """
+    Runs a history simulation over the NumPy arrays of the strategy data. Bars without events are
+    skipped: the entries and the exits by static SL/TP or by signal are found by array masks, trailing
+    SL/TP is recalculated for every bar of the open position. The positions are opened, recalculated and
+    closed by the data manager, so the results are the same as by the simulation bar by bar.
+    """
+
+    # Bars which are checked at once for the exit of the position
+    EXIT_SEARCH_CHUNK = 512
+
+    OPEN_SIGNALS = [cmn.SignalType.STRONG_BUY, cmn.SignalType.STRONG_SELL]
+    CLOSE_SIGNALS = {
+        cmn.OrderSideType.buy: [cmn.SignalType.STRONG_SELL, cmn.SignalType.SELL],
+        cmn.OrderSideType.sell: [cmn.SignalType.STRONG_BUY, cmn.SignalType.BUY],
+    }
+
+    # Bar of the strategy data with the attributes of the signal model which are used by the managers
+    SimulationBar = namedtuple(
+        "SimulationBar",
+        [
+            "date_time",
+            "open",
+            "high",
+            "low",
+            "close",
+            "volume",
+            "stop_loss_value",
+            "take_profit_value",
+            "signal",
+        ],
+    )
+
+    def __init__(self, trader_mng: TraderBase):
+        self._session_mdl: cmn.SessionModel = trader_mng.session_mdl
+        self._data_mng: DataManagerBase = trader_mng.data_mng
+        self._is_close_by_signal: bool = StrategyFactory.get_strategy_model(
+            self._session_mdl.strategy
+        ).is_close_by_signal
+
+    def run(self, strategy_df: pd.DataFrame) -> None:
+        self._init_arrays(strategy_df)
+
+        count = len(self._dates)
+        open_indices = np.flatnonzero(self._get_signal_mask(self.OPEN_SIGNALS))
+
+        index = 0
+        while index < count:
+            if self._data_mng.has_open_position():
+                # Index of the bar where the position has been closed, a new position can be opened there
+                index = self._process_position(index)
+            else:
+                next_open = np.searchsorted(open_indices, index)
+                if next_open == len(open_indices):
+                    break
+
+                index = int(open_indices[next_open])
+                self._data_mng.open_position_by_signal(self._get_bar(index))
+
+                # The position is checked from the next bar
+                index += 1
+
+        if is_write_log(session_type=self._session_mdl.session_type):
+            logger.info(
+                f"{self.__class__.__name__} ({self._session_mdl.id}): {count} bars have been simulated"
+            )
+
+    def _init_arrays(self, strategy_df: pd.DataFrame) -> None:
+        self._dates = strategy_df.index.tolist()
+        self._signals = strategy_df[Const.PARAM_SIGNAL].tolist()
+        self._highs = strategy_df["High"].to_numpy(dtype=float)
+        self._lows = strategy_df["Low"].to_numpy(dtype=float)
+
+        # Values of the bars are Python floats as in the signal models, SL/TP rounding depends on it
+        self._columns = [self._dates]
+        for column in [
+            "Open",
+            "High",
+            "Low",
+            "Close",
+            "Volume",
+            Const.FLD_STOP_LOSS_VALUE,
+            Const.FLD_TAKE_PROFIT_VALUE,
+        ]:
+            self._columns.append(strategy_df[column].to_numpy(dtype=float).tolist())
+        self._columns.append(self._signals)
+
+        self._close_signal_masks = {
+            side: self._get_signal_mask(signals)
+            for side, signals in self.CLOSE_SIGNALS.items()
+        }
+
+    def _get_signal_mask(self, signals: list) -> np.ndarray:
+        # Signals are compared by value, the strategy data has both enum members and strings
+        return np.array([signal in signals for signal in self._signals], dtype=bool)
+
+    def _get_bar(self, index: int) -> SimulationBar:
+        return self.SimulationBar(*[column[index] for column in self._columns])
+
+    def _process_position(self, start: int) -> int:
+        if self._session_mdl.is_trailing_stop:
+            return self._process_trailing_stop(start)
+        else:
+            return self._process_static_stop(start)
+
+    def _process_trailing_stop(self, start: int) -> int:
+        # SL/TP depends on the previous bars, every bar is processed as by the robot run
+        for index in range(start, len(self._dates)):
+            bar = self._get_bar(index)
+
+            self._data_mng.recalculate_analytics(bar)
+            if self._data_mng.is_required_to_close_position(bar):
+                self._data_mng.close_position_by_signal(bar)
+                return index
+
+            self._data_mng.recalculate_position(bar)
+
+        return len(self._dates)
+
+    def _process_static_stop(self, start: int) -> int:
+        count = len(self._dates)
+        position_mdl = self._data_mng.get_current_position()
+
+        for chunk_start in range(start, count, self.EXIT_SEARCH_CHUNK):
+            chunk_end = min(chunk_start + self.EXIT_SEARCH_CHUNK, count)
+
+            exit_mask = self._get_exit_mask(position_mdl, chunk_start, chunk_end)
+            if exit_mask.any():
+                index = chunk_start + int(np.argmax(exit_mask))
+
+                self._recalculate_analytics(position_mdl, start, index + 1)
+                self._data_mng.close_position_by_signal(self._get_bar(index))
+                return index
+
+        self._recalculate_analytics(position_mdl, start, count)
+        return count
+
+    def _get_exit_mask(
+        self, position_mdl: cmn.OrderModel, start: int, end: int
+    ) -> np.ndarray:
+        highs = self._highs[start:end]
+        lows = self._lows[start:end]
+
+        if position_mdl.side == cmn.OrderSideType.buy:
+            stop_loss_mask = lows <= position_mdl.stop_loss
+            take_profit_mask = highs >= position_mdl.take_profit
+        else:
+            stop_loss_mask = highs >= position_mdl.stop_loss
+            take_profit_mask = lows <= position_mdl.take_profit
+
+        exit_mask = np.zeros(end - start, dtype=bool)
+        if position_mdl.stop_loss != 0:
+            exit_mask |= stop_loss_mask
+        if position_mdl.take_profit != 0:
+            exit_mask |= take_profit_mask
+        if self._is_close_by_signal:
+            exit_mask |= self._close_signal_masks[position_mdl.side][start:end]
+
+        return exit_mask
+
+    def _recalculate_analytics(
+        self, position_mdl: cmn.OrderModel, start: int, end: int
+    ) -> None:
+        if start < end:
+            position_mdl.calculate_high_price(float(self._highs[start:end].max()))
+            position_mdl.calculate_low_price(float(self._lows[start:end].min()))
+
+
 class DataManagerBase:
     def __init__(self, trader_mng: TraderBase):
         self._trader_mng = trader_mng
@@ -516,6 +1075,10 @@ class DataManagerBase:
             self._session_mdl.trader_id
         )
 
+        self._quote_handler = buffer_runtime_handler.get_quote_handler(
+            self._session_mdl.trader_id
+        )
+
         self._side_mng: SideManager = None
 
         self._open_positions: dict(cmn.OrderModel) = None  # type: ignore
@@ -525,6 +1088,9 @@ class DataManagerBase:
 
         self._init_open_positions()
 
+    def release(self):
+        pass
+
     @staticmethod
     def get_api_manager(trader_mng: TraderBase):
         if trader_mng.session_mdl.trading_type == cmn.TradingType.SPOT:
@@ -729,14 +1295,17 @@ class DataManagerBase:
         return None
 
     def get_position(
-        self, order_id: str = None, position_id: str = None
+        self,
+        order_id: str = None,
+        position_id: str = None,
+        position_snapshot: PositionSnapshot = None,
     ) -> cmn.OrderModel:
         return None
 
     def has_open_position(self) -> bool:
         return True if self._current_position else False
 
-    def synchronize(self, manager):
+    def synchronize(self, manager, position_snapshot: PositionSnapshot = None):
         self._trader_mng.save()
 
     def _init_open_positions(self):
@@ -896,20 +1465,12 @@ class DataManagerBase:
     def _get_current_price(
         self, price_type: cmn.PriceType = cmn.PriceType.BID
     ) -> float:
-        # Get current price from exchnage handler
-        param = cmn.HistoryDataParamModel(
-            interval=self._session_mdl.interval,
+        # Get current price from the quotes of the exchange
+        return self._quote_handler.get_price(
             symbol=self._session_mdl.symbol,
-            limit=1,
-        )
-        history_data = self._exchange_handler.get_history_data(
-            param, price_type=price_type
+            interval=self._session_mdl.interval,
+            price_type=price_type,
         )
-        candle_bar = history_data.data.tail(1)
-
-        price = candle_bar["Close"].values[0]
-
-        return price
 
     def _get_current_balance(self, fee: float = 0) -> float:
         # Take Total Balance from Balance Model and take into account Fee if it's required
@@ -949,6 +1510,8 @@ class OrderLocalDataManager(OrderManagerBase):
 
 
 class LeverageManagerBase(DataManagerBase):
+    POSITION_TYPE = cmn.LeverageModel
+
     def is_required_to_open_position(self, signal_mdl: cmn.SignalModel) -> bool:
         return signal_mdl.signal in [
             cmn.SignalType.STRONG_BUY,
@@ -973,27 +1536,77 @@ class LeverageManagerBase(DataManagerBase):
                 f"{self.__class__.__name__} ({self._session_mdl.id}): An position template for openning - {position_data}"
             )
 
-        return cmn.LeverageModel(**position_data)
+        return self.POSITION_TYPE(**position_data)
 
     def _get_current_balance(self, fee: float = 0) -> float:
         return super()._get_current_balance(fee) * self._session_mdl.leverage
 
 
 class LeverageApiManager(LeverageManagerBase):
+    def __init__(self, trader_mng: TraderBase):
+        super().__init__(trader_mng)
+
+        self._position_stream = buffer_runtime_handler.get_position_stream(
+            self._session_mdl.trader_id
+        )
+        if self._position_stream:
+            # Positions closed by SL/TP on the exchange are synchronized right away
+            self._position_stream.add_listener(
+                key=self._session_mdl.id, callback=self._on_position_closed
+            )
+
+    def release(self):
+        if self._position_stream:
+            self._position_stream.remove_listener(key=self._session_mdl.id)
+
     def get_position(
-        self, order_id: str = None, position_id: str = None
+        self,
+        order_id: str = None,
+        position_id: str = None,
+        position_snapshot: PositionSnapshot = None,
     ) -> cmn.OrderModel:
-        position_mdl = self._exchange_handler.get_open_position(
-            symbol=self._session_mdl.symbol,
-            order_id=order_id,
-            position_id=position_id,
-        )
+        if self._position_stream and self._position_stream.is_known(
+            symbol=self._session_mdl.symbol, order_id=order_id
+        ):
+            position_mdl = self._position_stream.get_open_position(
+                symbol=self._session_mdl.symbol,
+                order_id=order_id,
+                position_id=position_id,
+            )
+        elif position_snapshot and position_snapshot.is_reconciled(
+            symbol=self._session_mdl.symbol, order_id=order_id
+        ):
+            position_mdl = position_snapshot.get_open_position(self._session_mdl.symbol)
+        else:
+            position_mdl = self._exchange_handler.get_open_position(
+                symbol=self._session_mdl.symbol,
+                order_id=order_id,
+                position_id=position_id,
+            )
+
         if position_mdl:
             position_mdl.session_id = self._session_mdl.id
             position_mdl.leverage = self._session_mdl.leverage
 
         return position_mdl
 
+    def get_close_position(
+        self,
+        order_id: str = None,
+        position_id: str = None,
+        position_snapshot: PositionSnapshot = None,
+    ) -> cmn.OrderCloseModel:
+        if position_snapshot and position_snapshot.is_reconciled(
+            symbol=self._session_mdl.symbol, order_id=order_id
+        ):
+            return position_snapshot.get_close_position(self._session_mdl.symbol)
+
+        return self._exchange_handler.get_close_position(
+            symbol=self._session_mdl.symbol,
+            order_id=order_id,
+            position_id=position_id,
+        )
+
     def open_position(self, open_mdl: cmn.LeverageModel) -> cmn.LeverageModel:
         # Prepate model for opennig
         position_mdl = self._prepare_open_position(open_mdl)
@@ -1084,7 +1697,10 @@ class LeverageApiManager(LeverageManagerBase):
                 f"{self.__class__.__name__} ({self._session_mdl.id}): An position template for openning via API - {position_mdl.model_dump()}"
             )
 
-        created_position_mdl = self._exchange_handler.create_leverage(position_mdl)
+        # The placed position is returned without waiting for the execution, it's confirmed in the background
+        created_position_mdl = self._exchange_handler.create_leverage(
+            position_mdl, on_confirm=self._on_open_confirmed
+        )
 
         self._trader_mng.transaction_mng.add_transaction(
             order_id=created_position_mdl.order_id,
@@ -1095,8 +1711,61 @@ class LeverageApiManager(LeverageManagerBase):
 
         return created_position_mdl
 
+    def _on_open_confirmed(self, position_mdl: cmn.LeverageModel):
+        if not position_mdl:
+            logger.error(
+                f"{self.__class__.__name__} ({self._session_mdl.id}): The opened position hasn't been confirmed by the exchange"
+            )
+            # The position is synchronized with the exchange by the next run
+            SessionStateCache.invalidate(self._session_mdl.id)
+            return
+
+        if self._is_write_log:
+            logger.info(
+                f"{self.__class__.__name__} ({self._session_mdl.id}): Position {position_mdl.order_id} has been confirmed by the exchange"
+            )
+
+        # The position is updated once the run has released the session
+        with SessionStateCache.get_lock(self._session_mdl):
+            try:
+                if not self._trader_mng.data_mng.confirm_position(position_mdl):
+                    logger.error(
+                        f"{self.__class__.__name__} ({self._session_mdl.id}): The confirmed position {position_mdl.order_id} isn't open in the session"
+                    )
+            finally:
+                SessionStateCache.flush(self._session_mdl.id, self._trader_mng.uow)
+
+    def _on_position_closed(self, symbol: str):
+        if symbol != self._session_mdl.symbol:
+            return
+
+        if self._is_write_log:
+            logger.info(
+                f"{self.__class__.__name__} ({self._session_mdl.id}): Position {symbol} has been closed on the exchange"
+            )
+
+        Robot().get_session_manager(self._session_mdl.id).flush()
+
 
 class LeverageDatabaseManager(LeverageManagerBase):
+    # Fields of the open position which are taken from the exchange by every run
+    SYNCHRONIZED_FIELDS = [
+        Const.DB_STOP_LOSS,
+        Const.DB_TAKE_PROFIT,
+        Const.DB_QUANTITY,
+        Const.DB_OPEN_PRICE,
+        Const.DB_OPEN_DATETIME,
+    ]
+    # Fields of the placed position which are taken from the executed order
+    CONFIRMED_FIELDS = [
+        Const.DB_ORDER_ID,
+        Const.DB_OPEN_PRICE,
+        Const.DB_QUANTITY,
+        Const.DB_FEE,
+        Const.DB_STOP_LOSS,
+        Const.DB_TAKE_PROFIT,
+    ]
+
     def get_positions(self) -> list[cmn.LeverageModel]:
         position: cmn.LeverageModel = None
         positions = LeverageHandler.get_leverages(session_id=self._session_mdl.id)
@@ -1123,12 +1792,15 @@ class LeverageDatabaseManager(LeverageManagerBase):
             session_id=self._session_mdl.id, status=cmn.OrderStatus.opened
         )
 
-    def synchronize(self, manager: LeverageManagerBase):
+    def synchronize(
+        self, manager: LeverageManagerBase, position_snapshot: PositionSnapshot = None
+    ):
         # manager - api data manager works with the Trader
         if self._current_position:
             api_position_mdl = manager.get_position(
                 order_id=self._current_position.order_id,
                 position_id=self._current_position.position_id,
+                position_snapshot=position_snapshot,
             )
 
             manager._set_current_postion(api_position_mdl)
@@ -1141,54 +1813,66 @@ class LeverageDatabaseManager(LeverageManagerBase):
                         f"{self.__class__.__name__} ({self._session_mdl.id}): Close the leverage {self._current_position.id} by the ref api position {self._current_position.position_id}"
                     )
 
-                api_order_closed_mdl = self._exchange_handler.get_close_position(
-                    symbol=self._current_position.symbol,
+                api_order_closed_mdl = manager.get_close_position(
                     order_id=self._current_position.order_id,
                     position_id=self._current_position.position_id,
+                    position_snapshot=position_snapshot,
                 )
 
                 self.close_position(api_order_closed_mdl)
 
                 super().synchronize(manager)
             else:
-                query = {}
-
-                if api_position_mdl.stop_loss != self._current_position.stop_loss:
-                    query[Const.DB_STOP_LOSS] = api_position_mdl.stop_loss
-
-                if api_position_mdl.take_profit != self._current_position.take_profit:
-                    query[Const.DB_TAKE_PROFIT] = api_position_mdl.take_profit
-
-                if api_position_mdl.quantity != self._current_position.quantity:
-                    query[Const.DB_QUANTITY] = api_position_mdl.quantity
-
-                if api_position_mdl.open_price != self._current_position.open_price:
-                    query[Const.DB_OPEN_PRICE] = api_position_mdl.open_price
-
-                if (
-                    api_position_mdl.open_datetime
-                    != self._current_position.open_datetime
-                ):
-                    query[Const.DB_OPEN_DATETIME] = api_position_mdl.open_datetime
-
-                if query:
-                    # Open position exists in the Exhange Trader -> update the position in the Database
-                    if self._is_write_log:
-                        logger.info(
-                            f"{self.__class__.__name__} ({self._session_mdl.id}): Update the leverage {self._current_position.id} with API position"
-                        )
-
-                    self._trader_mng.transaction_mng.add_transaction(
-                        order_id=self._current_position.order_id,
-                        local_order_id=self._current_position.id,
-                        type=cmn.TransactionType.DB_SYNC_POSITION,
-                        data=query,
-                    )
+                # Open position exists in the Exhange Trader -> update the position in the Database
+                self._update_position_by_ref(
+                    api_position_mdl, fields=self.SYNCHRONIZED_FIELDS
+                )
+
+    def confirm_position(self, api_position_mdl: cmn.LeverageModel) -> bool:
+        # The executed values of the placed order replace the requested values of the open position
+        if not self._current_position or (
+            self._current_position.position_id != api_position_mdl.position_id
+            and self._current_position.order_id != api_position_mdl.order_id
+        ):
+            return False
+
+        self._update_position_by_ref(api_position_mdl, fields=self.CONFIRMED_FIELDS)
+
+        return True
+
+    def _update_position_by_ref(
+        self, api_position_mdl: cmn.LeverageModel, fields: list[str]
+    ) -> dict:
+        query = {}
+
+        for field in fields:
+            value = getattr(api_position_mdl, field)
+            if value != getattr(self._current_position, field):
+                query[field] = value
+
+        if query:
+            if self._is_write_log:
+                logger.info(
+                    f"{self.__class__.__name__} ({self._session_mdl.id}): Update the leverage {self._current_position.id} with API position"
+                )
+
+            self._trader_mng.transaction_mng.add_transaction(
+                order_id=self._current_position.order_id,
+                local_order_id=self._current_position.id,
+                type=cmn.TransactionType.DB_SYNC_POSITION,
+                data=query,
+            )
+
+            if not self._update_position(query):
+                raise cmn.RobotException(
+                    f"DataManagerBase: _update_position() - Error during update position {self._current_position.id}"
+                )
 
-                    if not self._update_position(query):
-                        raise cmn.RobotException(
-                            f"DataManagerBase: _update_position() - Error during update position {self._current_position.id}"
-                        )
+            # The session state is kept between runs, the same diff isn't synchronized again
+            for field, value in query.items():
+                setattr(self._current_position, field, value)
+
+        return query
 
     def recalculate_position(
         self, signal_mdl: cmn.SignalModel
@@ -1236,7 +1920,7 @@ class LeverageDatabaseManager(LeverageManagerBase):
                 f"{self.__class__.__name__} ({self._session_mdl.id}): An position template for openning in the DB - {position_mdl.model_dump()}"
             )
 
-        created_position_mdl = LeverageHandler.create_leverage(position_mdl)
+        created_position_mdl = self._trader_mng.uow.create_leverage(position_mdl)
         created_position_mdl.calculate_stop_loss_percent()
         created_position_mdl.calculate_take_profit_percent()
 
@@ -1255,7 +1939,7 @@ class LeverageDatabaseManager(LeverageManagerBase):
                 f"{self.__class__.__name__} ({self._session_mdl.id}): Update the leverage {self._current_position.id} in the DB"
             )
 
-        result = LeverageHandler.update_leverage(
+        result = self._trader_mng.uow.update_leverage(
             id=self._current_position.id, query=query
         )
 
@@ -1269,7 +1953,7 @@ class LeverageDatabaseManager(LeverageManagerBase):
                 f"{self.__class__.__name__} ({self._session_mdl.id}): Update/Close the leverage {self._current_position.id} in the DB"
             )
 
-        LeverageHandler.update_leverage(
+        self._trader_mng.uow.update_leverage(
             id=self._current_position.id, query=order_close_mdl.to_mongodb_doc()
         )
 
@@ -1284,13 +1968,16 @@ class LeverageDatabaseManager(LeverageManagerBase):
 
 
 class LeverageLocalDataManager(LeverageManagerBase):
+    # Positions of the history simulation are updated by every bar, they are kept as records
+    POSITION_TYPE = SimulationPosition
+
     def __init__(self, session_mdl: cmn.SessionModel):
         super().__init__(session_mdl)
 
-        self._local_positions: dict(cmn.LeverageModel) = {}  # type: ignore
+        self._local_positions: dict(SimulationPosition) = {}  # type: ignore
 
     def get_positions(self) -> list[cmn.LeverageModel]:
-        return [pos_mdl for pos_mdl in self._local_positions.values()]
+        return [pos_mdl.to_model() for pos_mdl in self._local_positions.values()]
 
     def recalculate_position(
         self, signal_mdl: cmn.SignalModel
@@ -1302,16 +1989,22 @@ class LeverageLocalDataManager(LeverageManagerBase):
             self._current_position.take_profit = trailing_stop_mdl.take_profit
             self._current_position.tp_increment = trailing_stop_mdl.tp_increment
 
-            transaction_data = trailing_stop_mdl.model_dump()
-            transaction_data[Const.DB_OPEN_PRICE] = self._current_position.open_price
+            # Trailing stop can be updated by every bar, the data isn't prepared if it isn't recorded
+            if self._trader_mng.transaction_mng.is_recorded(
+                cmn.TransactionType.DB_UPDATE_POSITION
+            ):
+                transaction_data = trailing_stop_mdl.model_dump()
+                transaction_data[Const.DB_OPEN_PRICE] = (
+                    self._current_position.open_price
+                )
 
-            self._trader_mng.transaction_mng.add_transaction(
-                local_order_id=self._current_position.id,
-                type=cmn.TransactionType.DB_UPDATE_POSITION,
-                date_time=signal_mdl.date_time,
-                data=transaction_data,
-                save=False,
-            )
+                self._trader_mng.transaction_mng.add_transaction(
+                    local_order_id=self._current_position.id,
+                    type=cmn.TransactionType.DB_UPDATE_POSITION,
+                    date_time=signal_mdl.date_time,
+                    data=transaction_data,
+                    save=False,
+                )
 
         return trailing_stop_mdl
 
@@ -1754,6 +2447,13 @@ class RiskManagerBase:
         self._session_mdl: cmn.SessionModel = session_mdl
         self._strategy_model = strategy_mdl
 
+        # Trailing stop is recalculated by every bar of the history simulation
+        self._trailing_stop_type = (
+            SimulationTrailingStop
+            if session_mdl.session_type == cmn.SessionType.HISTORY
+            else cmn.TrailingStopModel
+        )
+
     def is_close_by_signal(self) -> bool:
         return self._strategy_model.is_close_by_signal
 
@@ -1849,7 +2549,7 @@ class RiskManagerBase:
             if stop_loss > new_stop_loss:
                 stop_loss = new_stop_loss
 
-        trailing_stop_mdl = cmn.TrailingStopModel(
+        trailing_stop_mdl = self._trailing_stop_type(
             stop_loss=stop_loss, take_profit=take_profit, tp_increment=tp_increment
         )
 
@@ -1899,7 +2599,7 @@ class RiskManagerBase:
             if stop_loss < new_stop_loss:
                 stop_loss = new_stop_loss
 
-        trailing_stop_mdl = cmn.TrailingStopModel(
+        trailing_stop_mdl = self._trailing_stop_type(
             stop_loss=stop_loss, take_profit=take_profit, tp_increment=tp_increment
         )
 
@@ -2003,7 +2703,7 @@ class RiskManager_SL_BOUND_TO_TP(RiskManagerBase):
             if stop_loss > new_stop_loss:
                 stop_loss = new_stop_loss
 
-        trailing_stop_mdl = cmn.TrailingStopModel(
+        trailing_stop_mdl = self._trailing_stop_type(
             stop_loss=stop_loss, take_profit=take_profit, tp_increment=tp_increment
         )
 
@@ -2067,7 +2767,7 @@ class RiskManager_SL_BOUND_TO_TP(RiskManagerBase):
             if stop_loss < new_stop_loss:
                 stop_loss = new_stop_loss
 
-        trailing_stop_mdl = cmn.TrailingStopModel(
+        trailing_stop_mdl = self._trailing_stop_type(
             stop_loss=stop_loss, take_profit=take_profit, tp_increment=tp_increment
         )
 
@@ -2075,6 +2775,9 @@ class RiskManager_SL_BOUND_TO_TP(RiskManagerBase):
 
 
 class Robot:
+    def __init__(self):
+        self._position_snapshots: dict[str, PositionSnapshot] = {}
+
     def get_session_manager(self, session_id: str) -> SessionManager:
         session_mdl = self._get_session_mdl(session_id)
         return SessionManager(session_mdl)
@@ -2087,8 +2790,6 @@ class Robot:
         self._run(session_mdl)
 
     def run_job(self, interval: str) -> dict:
-        errors = {}
-
         if is_write_log():
             logger.info(
                 f"{self.__class__.__name__}: Robot has started for the interval {interval}"
@@ -2098,19 +2799,30 @@ class Robot:
             interval=interval, status=cmn.SessionStatus.active
         )
 
-        for session_mdl in active_sessions:
+        session_executor = SessionExecutor(
+            run_session=self._run_active_session,
+            prepare_trader=self._reconcile_positions,
+        )
+        errors = session_executor.run(active_sessions)
 
-            # Check traiding time and skip closed symbols
-            if buffer_runtime_handler.get_symbol_handler(trader_id=session_mdl.trader_id).is_trading_available(interval=session_mdl.interval, symbol=session_mdl.symbol):
-                try:
-                    self._run(session_mdl)
-                except Exception as error:
-                    error_message = f"{self.__class__.__name__} ({session_mdl.id}): Error during session run - {error}"
-                    logger.error(error_message)
-                    errors[session_mdl.id] = error_message
+        if is_write_log():
+            for session_id, latency in session_executor.get_latencies().items():
+                logger.info(
+                    f"{self.__class__.__name__} ({session_id}): Session has finished in {latency[SessionExecutor.FLD_DURATION]:.3f}s, {latency[SessionExecutor.FLD_LATENCY]:.3f}s after the job start"
+                )
 
         return errors
 
+    def get_signal_params(self, interval: str) -> list[cmn.SignalParamModel]:
+        # Signals required by the active sessions of the interval
+        active_sessions = SessionHandler.get_sessions(
+            interval=interval, status=cmn.SessionStatus.active
+        )
+
+        return [
+            TraderBase.get_signal_param(session_mdl) for session_mdl in active_sessions
+        ]
+
     def run_history_simulation(
         self,
         trader_id: str,
@@ -2123,6 +2835,9 @@ class Robot:
         take_profit_rate: float,
         init_balance: float,
         limit: int,
+        history_data_mdl: cmn.HistoryDataModel = None,
+        transaction_recording: cmn.TransactionRecordingType = None,
+        transaction_sink: TransactionStreamSink = None,
     ) -> SessionManager:
 
         if is_write_log():
@@ -2147,7 +2862,13 @@ class Robot:
         try:
             session_mdl = cmn.SessionModel(**session_data)
             session_mng = SessionManager(session_mdl)
-            session_mng.run(init_balance=init_balance, limit=limit)
+            session_mng.run(
+                init_balance=init_balance,
+                limit=limit,
+                history_data_mdl=history_data_mdl,
+                transaction_recording=transaction_recording,
+                transaction_sink=transaction_sink,
+            )
 
         except Exception as error:
             logger.error(
@@ -2160,5 +2881,174 @@ class Robot:
         return SessionHandler.get_session(session_id)
 
     def _run(self, session_mdl: cmn.SessionModel):
-        session_manager = SessionManager(session_mdl)
+        session_manager = SessionManager(
+            session_mdl,
+            position_snapshot=self._position_snapshots.get(session_mdl.trader_id),
+        )
         session_manager.run()
+
+    def _reconcile_positions(self, trader_id: str, session_mdls: list):
+        # Positions of all sessions of the trader are requested from the exchange at once
+        self._position_snapshots[trader_id] = PositionSnapshot(
+            trader_id=trader_id, session_mdls=session_mdls
+        )
+
+    def _run_active_session(self, session_mdl: cmn.SessionModel):
+        # Check traiding time and skip closed symbols
+        if buffer_runtime_handler.get_symbol_handler(
+            trader_id=session_mdl.trader_id
+        ).is_trading_available(interval=session_mdl.interval, symbol=session_mdl.symbol):
+            self._run(session_mdl)
+
+
+class SessionExecutor:
+    """
+    Runs sessions of different traders concurrently, sessions of the same trader are run one after another
+    in the original order, so the orders of a trader and its symbols aren't interleaved.
+    """
+
+    MAX_WORKERS = 8
+    SESSION_TIMEOUT = 120
+
+    FLD_LATENCY = "latency"
+    FLD_DURATION = "duration"
+
+    # Trader id -> (session id, future) of the session which has exceeded the timeout, other sessions
+    # of the trader are skipped by the next runs until the session is finished
+    _in_flight: dict[str, tuple[str, Future]] = {}
+    _in_flight_lock = threading.Lock()
+
+    def __init__(
+        self,
+        run_session,
+        prepare_trader=None,
+        max_workers: int = None,
+        session_timeout: float = None,
+    ):
+        self._run_session = run_session
+        self._prepare_trader = prepare_trader
+        self._max_workers = max_workers or self.MAX_WORKERS
+        self._session_timeout = session_timeout or self.SESSION_TIMEOUT
+        self._latencies: dict = {}
+        self._start_time: float = None
+
+    def get_latencies(self) -> dict:
+        return self._latencies
+
+    def run(self, session_mdls: list[cmn.SessionModel]) -> dict:
+        errors = {}
+        self._latencies = {}
+        self._start_time = time.monotonic()
+
+        trader_sessions: dict[str, list[cmn.SessionModel]] = {}
+        for session_mdl in session_mdls:
+            trader_sessions.setdefault(session_mdl.trader_id, []).append(session_mdl)
+
+        for trader_id in list(trader_sessions.keys()):
+            in_flight_session_id = self.get_in_flight_session_id(trader_id)
+            if not in_flight_session_id:
+                continue
+
+            for session_mdl in trader_sessions.pop(trader_id):
+                error_message = f"Robot ({session_mdl.id}): Session run is skipped, the session {in_flight_session_id} of the trader is still running"
+                logger.error(error_message)
+                errors[session_mdl.id] = error_message
+
+        if not trader_sessions:
+            return errors
+
+        # Sessions run on a separate pool, so a trader worker can stop waiting for a hanging session.
+        # A trader has at most one hanging session, so the session pool never queues the sessions.
+        session_executor = ThreadPoolExecutor(max_workers=len(trader_sessions))
+
+        try:
+            with ThreadPoolExecutor(
+                max_workers=min(self._max_workers, len(trader_sessions))
+            ) as trader_executor:
+                futures = [
+                    trader_executor.submit(
+                        self._run_trader_sessions, session_executor, sessions
+                    )
+                    for sessions in trader_sessions.values()
+                ]
+
+                for future in futures:
+                    errors.update(future.result())
+        finally:
+            # The job doesn't wait for the sessions which have exceeded the timeout
+            session_executor.shutdown(wait=False)
+
+        return errors
+
+    def _run_trader_sessions(
+        self, session_executor: ThreadPoolExecutor, session_mdls: list
+    ) -> dict:
+        errors = {}
+
+        if self._prepare_trader:
+            trader_id = session_mdls[0].trader_id
+            try:
+                session_executor.submit(
+                    self._prepare_trader, trader_id, session_mdls
+                ).result(timeout=self._session_timeout)
+            except Exception as error:
+                # The sessions are run without the prepared data of the trader
+                logger.error(
+                    f"Robot ({trader_id}): Preparation of the trader sessions has failed - {error}"
+                )
+
+        for index, session_mdl in enumerate(session_mdls):
+            session_start_time = time.monotonic()
+
+            try:
+                future = session_executor.submit(self._run_session, session_mdl)
+                future.result(timeout=self._session_timeout)
+            except FutureTimeoutError:
+                error_message = f"Robot ({session_mdl.id}): Session run has exceeded the timeout {self._session_timeout}s"
+                logger.error(error_message)
+                errors[session_mdl.id] = error_message
+
+                self._set_in_flight(session_mdl, future)
+
+                # The next sessions of the trader aren't run while the previous one is still active
+                for skipped_session_mdl in session_mdls[index + 1 :]:
+                    error_message = f"Robot ({skipped_session_mdl.id}): Session run is skipped due to the timeout of the session {session_mdl.id}"
+                    logger.error(error_message)
+                    errors[skipped_session_mdl.id] = error_message
+                break
+            except Exception as error:
+                error_message = (
+                    f"Robot ({session_mdl.id}): Error during session run - {error}"
+                )
+                logger.error(error_message)
+                errors[session_mdl.id] = error_message
+            finally:
+                end_time = time.monotonic()
+                self._latencies[session_mdl.id] = {
+                    self.FLD_LATENCY: end_time - self._start_time,
+                    self.FLD_DURATION: end_time - session_start_time,
+                }
+
+        return errors
+
+    @classmethod
+    def get_in_flight_session_id(cls, trader_id: str) -> str:
+        with cls._in_flight_lock:
+            in_flight = cls._in_flight.get(trader_id)
+
+        return in_flight[0] if in_flight else None
+
+    @classmethod
+    def _set_in_flight(cls, session_mdl: cmn.SessionModel, future: Future) -> None:
+        trader_id = session_mdl.trader_id
+
+        with cls._in_flight_lock:
+            cls._in_flight[trader_id] = (session_mdl.id, future)
+
+        def release(_):
+            with cls._in_flight_lock:
+                if cls._in_flight.get(trader_id, (None, None))[1] is future:
+                    cls._in_flight.pop(trader_id)
+
+        # The callback is called at once if the session has been finished in the meantime
+        future.add_done_callback(release)
@@ -0,0 +1,267 @@
+from datetime import datetime
+import threading
+import json
+import logging
+
+from .constants import Const
+from .core import config
+from .common import ExchangeId, SignalModel
+from .mongodb import MongoSignals
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+logger = logging.getLogger("signal_store")
+
+
+class SignalStoreBase:
+    """
+    Signals of the bars keyed by (exchange, symbol, interval, strategy, bar datetime).
+    A signal of a bar is written once and is read by every worker which uses the same backend.
+    """
+
+    @staticmethod
+    def get_key(
+        exchange_id: ExchangeId,
+        symbol: str,
+        interval: str,
+        strategy: str,
+        date_time: datetime,
+    ) -> tuple:
+        # Bar datetimes of the strategy data are pandas timestamps
+        if hasattr(date_time, "to_pydatetime"):
+            date_time = date_time.to_pydatetime()
+
+        return (
+            getattr(exchange_id, "value", exchange_id),
+            symbol,
+            getattr(interval, "value", interval),
+            getattr(strategy, "value", strategy),
+            date_time,
+        )
+
+    @staticmethod
+    def get_key_id(key: tuple) -> str:
+        exchange_id, symbol, interval, strategy, date_time = key
+        return f"{exchange_id}|{symbol}|{interval}|{strategy}|{date_time.isoformat()}"
+
+    def get(self, key: tuple) -> SignalModel:
+        pass
+
+    def set(self, key: tuple, signal_mdl: SignalModel) -> bool:
+        return self.set_many({key: signal_mdl}) > 0
+
+    def set_many(self, signals: dict[tuple, SignalModel]) -> int:
+        pass
+
+    def get_range(
+        self,
+        exchange_id: ExchangeId,
+        symbol: str,
+        interval: str,
+        strategy: str,
+        date_from: datetime = None,
+        date_to: datetime = None,
+    ) -> list[SignalModel]:
+        pass
+
+    def clear_buffer(self) -> None:
+        # Shared backends keep the signals when the runtime buffer is refreshed
+        pass
+
+
+class SignalStoreLocal(SignalStoreBase):
+    def __init__(self) -> None:
+        self._signals: dict[tuple, SignalModel] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> SignalModel:
+        return self._signals.get(key)
+
+    def set_many(self, signals: dict[tuple, SignalModel]) -> int:
+        count = 0
+        with self._lock:
+            for key, signal_mdl in signals.items():
+                if key not in self._signals:
+                    self._signals[key] = signal_mdl
+                    count += 1
+        return count
+
+    def get_range(
+        self,
+        exchange_id: ExchangeId,
+        symbol: str,
+        interval: str,
+        strategy: str,
+        date_from: datetime = None,
+        date_to: datetime = None,
+    ) -> list[SignalModel]:
+        prefix = self.get_key(exchange_id, symbol, interval, strategy, None)[:4]
+
+        signals = [
+            signal_mdl
+            for key, signal_mdl in list(self._signals.items())
+            if key[:4] == prefix
+            and (not date_from or key[4] >= date_from)
+            and (not date_to or key[4] <= date_to)
+        ]
+
+        return sorted(signals, key=lambda signal_mdl: signal_mdl.date_time)
+
+    def clear_buffer(self) -> None:
+        if config.get_config_value(Const.CONF_PROPERTY_HANDLER_LOG):
+            logger.info(f"{self.__class__.__name__}: clear_buffer()")
+
+        with self._lock:
+            self._signals.clear()
+
+
+class SignalStoreMongo(SignalStoreBase):
+    def __init__(self) -> None:
+        self._db = MongoSignals()
+
+    def get(self, key: tuple) -> SignalModel:
+        entry = self._db.get_one(self.get_key_id(key))
+        return SignalModel(**entry[Const.DB_SIGNAL]) if entry else None
+
+    def set_many(self, signals: dict[tuple, SignalModel]) -> int:
+        if not signals:
+            return 0
+
+        entries = {
+            self.get_key_id(key): self._get_entry(key, signal_mdl)
+            for key, signal_mdl in signals.items()
+        }
+        return self._db.insert_signals(entries)
+
+    def get_range(
+        self,
+        exchange_id: ExchangeId,
+        symbol: str,
+        interval: str,
+        strategy: str,
+        date_from: datetime = None,
+        date_to: datetime = None,
+    ) -> list[SignalModel]:
+        exchange_id, symbol, interval, strategy, _ = self.get_key(
+            exchange_id, symbol, interval, strategy, None
+        )
+
+        entries = self._db.get_signals(
+            exchange_id=exchange_id,
+            symbol=symbol,
+            interval=interval,
+            strategy=strategy,
+            date_from=date_from,
+            date_to=date_to,
+        )
+        return [SignalModel(**entry[Const.DB_SIGNAL]) for entry in entries]
+
+    def _get_entry(self, key: tuple, signal_mdl: SignalModel) -> dict:
+        exchange_id, symbol, interval, strategy, date_time = key
+        return {
+            Const.DB_EXCHANGE_ID: exchange_id,
+            Const.DB_SYMBOL: symbol,
+            Const.DB_INTERVAL: interval,
+            Const.DB_STRATEGY: strategy,
+            Const.DB_DATE_TIME: date_time,
+            Const.DB_SIGNAL: signal_mdl.model_dump(mode="json", exclude_none=True),
+        }
+
+
+class SignalStoreRedis(SignalStoreBase):
+    """
+    Any Redis-compatible server, the signals of a market are indexed by a sorted set of the bar timestamps
+    """
+
+    KEY_PREFIX = "signal"
+
+    def __init__(self, client=None) -> None:
+        if not client:
+            if not redis:
+                raise Exception(
+                    f"{self.__class__.__name__}: Package redis is required for the Redis signal store"
+                )
+            client = redis.Redis.from_url(config.get_env_value("REDIS_URL"))
+
+        self._client = client
+
+    def get(self, key: tuple) -> SignalModel:
+        value = self._client.get(self._get_signal_key(key))
+        return SignalModel(**json.loads(value)) if value else None
+
+    def set_many(self, signals: dict[tuple, SignalModel]) -> int:
+        count = 0
+        for key, signal_mdl in signals.items():
+            if self._client.set(
+                self._get_signal_key(key),
+                json.dumps(signal_mdl.model_dump(mode="json", exclude_none=True)),
+                nx=True,
+            ):
+                self._client.zadd(
+                    self._get_index_key(key[:4]),
+                    {self.get_key_id(key): key[4].timestamp()},
+                )
+                count += 1
+        return count
+
+    def get_range(
+        self,
+        exchange_id: ExchangeId,
+        symbol: str,
+        interval: str,
+        strategy: str,
+        date_from: datetime = None,
+        date_to: datetime = None,
+    ) -> list[SignalModel]:
+        market = self.get_key(exchange_id, symbol, interval, strategy, None)[:4]
+
+        key_ids = self._client.zrangebyscore(
+            self._get_index_key(market),
+            date_from.timestamp() if date_from else "-inf",
+            date_to.timestamp() if date_to else "+inf",
+        )
+        if not key_ids:
+            return []
+
+        values = self._client.mget(
+            [
+                f"{self.KEY_PREFIX}:{key_id.decode() if isinstance(key_id, bytes) else key_id}"
+                for key_id in key_ids
+            ]
+        )
+        return [SignalModel(**json.loads(value)) for value in values if value]
+
+    def _get_signal_key(self, key: tuple) -> str:
+        return f"{self.KEY_PREFIX}:{self.get_key_id(key)}"
+
+    def _get_index_key(self, market: tuple) -> str:
+        return f"{self.KEY_PREFIX}_index:{'|'.join(market)}"
+
+
+class SignalStoreFactory:
+    _store: SignalStoreBase = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get_store() -> SignalStoreBase:
+        with SignalStoreFactory._lock:
+            if not SignalStoreFactory._store:
+                SignalStoreFactory._store = SignalStoreFactory.create_store(
+                    config.get_config_value(Const.CONF_PROPERTY_SIGNAL_STORE)
+                )
+
+        return SignalStoreFactory._store
+
+    @staticmethod
+    def create_store(backend: str) -> SignalStoreBase:
+        if backend == Const.SIGNAL_STORE_LOCAL:
+            return SignalStoreLocal()
+        elif backend == Const.SIGNAL_STORE_MONGO:
+            return SignalStoreMongo()
+        elif backend == Const.SIGNAL_STORE_REDIS:
+            return SignalStoreRedis()
+        else:
+            raise Exception(f"SignalStoreFactory: Signal store {backend} isn't supported")
@@ -0,0 +1,138 @@
+import queue
+import threading
+import time
+import json
+import logging
+
+from .constants import Const
+from .core import config
+from .common import SignalModel, StreamLimitException
+
+logger = logging.getLogger("signal_stream")
+
+
+class SignalSubscription:
+    def __init__(
+        self,
+        symbols: list = None,
+        intervals: list = None,
+        strategies: list = None,
+        signal_types: list = None,
+    ) -> None:
+        self.symbols = symbols or []
+        self.intervals = [getattr(item, "value", item) for item in intervals or []]
+        self.strategies = [getattr(item, "value", item) for item in strategies or []]
+        self.signal_types = signal_types or []
+        self.queue: queue.Queue = queue.Queue(maxsize=SignalBroker.QUEUE_MAX_SIZE)
+
+    def is_relevant(self, signal_mdl: SignalModel) -> bool:
+        if self.symbols and signal_mdl.symbol not in self.symbols:
+            return False
+        if self.intervals and signal_mdl.interval.value not in self.intervals:
+            return False
+        if self.strategies and signal_mdl.strategy.value not in self.strategies:
+            return False
+
+        return signal_mdl.is_compatible(signal_types=self.signal_types)
+
+
+class SignalBroker:
+    """
+    Pushes signals of the closed bars to the subscribed clients of the process
+    """
+
+    QUEUE_MAX_SIZE = 1000
+    HEARTBEAT_INTERVAL = 15
+    # Every stream holds a server thread, the limit keeps threads for other requests
+    MAX_SUBSCRIPTIONS = 8
+    # Seconds, the stream is closed after the duration and the client reconnects
+    STREAM_MAX_DURATION = 3600
+
+    FORMAT_SSE = "sse"
+    FORMAT_NDJSON = "ndjson"
+
+    _subscriptions: list[SignalSubscription] = []
+    _lock = threading.Lock()
+
+    @staticmethod
+    def subscribe(
+        symbols: list = None,
+        intervals: list = None,
+        strategies: list = None,
+        signal_types: list = None,
+    ) -> SignalSubscription:
+        subscription = SignalSubscription(
+            symbols=symbols,
+            intervals=intervals,
+            strategies=strategies,
+            signal_types=signal_types,
+        )
+
+        with SignalBroker._lock:
+            if len(SignalBroker._subscriptions) >= SignalBroker.MAX_SUBSCRIPTIONS:
+                raise StreamLimitException(
+                    f"SignalBroker: Limit of {SignalBroker.MAX_SUBSCRIPTIONS} subscriptions is reached"
+                )
+
+            SignalBroker._subscriptions.append(subscription)
+
+        return subscription
+
+    @staticmethod
+    def unsubscribe(subscription: SignalSubscription) -> None:
+        with SignalBroker._lock:
+            if subscription in SignalBroker._subscriptions:
+                SignalBroker._subscriptions.remove(subscription)
+
+    @staticmethod
+    def publish(signal_mdl: SignalModel) -> int:
+        with SignalBroker._lock:
+            subscriptions = list(SignalBroker._subscriptions)
+
+        count = 0
+        for subscription in subscriptions:
+            if not subscription.is_relevant(signal_mdl):
+                continue
+
+            try:
+                subscription.queue.put_nowait(signal_mdl)
+                count += 1
+            except queue.Full:
+                # A slow client doesn't block signal calculation, the signal is skipped for it
+                logger.error(
+                    f"SignalBroker: Subscription queue is full, signal {signal_mdl.symbol} - {signal_mdl.interval} - {signal_mdl.strategy} is skipped"
+                )
+
+        if count and config.get_config_value(Const.CONF_PROPERTY_CORE_LOG):
+            logger.info(
+                f"SignalBroker: Signal {signal_mdl.symbol} - {signal_mdl.interval} - {signal_mdl.strategy} is pushed to {count} subscriptions"
+            )
+
+        return count
+
+    @staticmethod
+    def stream(subscription: SignalSubscription, format: str = FORMAT_SSE):
+        end_time = time.monotonic() + SignalBroker.STREAM_MAX_DURATION
+
+        try:
+            while time.monotonic() < end_time:
+                try:
+                    signal_mdl = subscription.queue.get(
+                        timeout=min(
+                            SignalBroker.HEARTBEAT_INTERVAL,
+                            max(end_time - time.monotonic(), 0),
+                        )
+                    )
+                except queue.Empty:
+                    # Heartbeat keeps the connection open through proxies
+                    yield ": heartbeat\n\n" if format == SignalBroker.FORMAT_SSE else "\n"
+                    continue
+
+                data = json.dumps(signal_mdl.model_dump(mode="json"))
+
+                if format == SignalBroker.FORMAT_SSE:
+                    yield f"event: signal\ndata: {data}\n\n"
+                else:
+                    yield f"{data}\n"
+        finally:
+            SignalBroker.unsubscribe(subscription)
@@ -0,0 +1,389 @@
+import os
+import tempfile
+import multiprocessing
+from multiprocessing.shared_memory import SharedMemory
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Iterator
+import numpy as np
+import pandas as pd
+import logging
+
+from .constants import Const
+from .core import config
+from .common import (
+    HistoryDataModel,
+    HistoryDataParamModel,
+    SymbolIntervalStrategyLimitModel,
+    StrategyParamModel,
+    OrderSideType,
+    TransactionRecordingType,
+)
+from .handler import buffer_runtime_handler
+from .strategy import StrategyFactory
+from .robot import Robot, SessionManager, TransactionStreamSink, is_write_log
+
+logger = logging.getLogger("simulation")
+
+
+class SharedHistoryData:
+    """
+    History data of a symbol and interval in a shared memory block. Workers of the simulation grid
+    attach to the block by the descriptor instead of receiving a pickled copy of the data.
+    Block layout: datetime index as int64 nanoseconds followed by the float64 values row by row.
+    """
+
+    FLD_NAME = "name"
+    FLD_ROWS = "rows"
+    FLD_COLUMNS = "columns"
+    FLD_INDEX_NAME = "index_name"
+    FLD_TIMEZONE = "timezone"
+    FLD_SYMBOL = "symbol"
+    FLD_INTERVAL = "interval"
+
+    # Blocks which are attached by the worker process are kept for the lifetime of the worker
+    _attached: dict[str, tuple[SharedMemory, HistoryDataModel]] = {}
+
+    def __init__(self, history_data_mdl: HistoryDataModel):
+        df = history_data_mdl.data
+        rows, columns = len(df), len(df.columns)
+
+        self._shared_memory = SharedMemory(
+            create=True, size=max(rows * (columns + 1) * 8, 1)
+        )
+
+        index, values = self._get_arrays(self._shared_memory, rows, columns)
+        index[:] = df.index.asi8
+        values[:] = df.to_numpy(dtype=float)
+
+        self._descriptor = {
+            self.FLD_NAME: self._shared_memory.name,
+            self.FLD_ROWS: rows,
+            self.FLD_COLUMNS: list(df.columns),
+            self.FLD_INDEX_NAME: df.index.name,
+            self.FLD_TIMEZONE: str(df.index.tz) if df.index.tz else None,
+            self.FLD_SYMBOL: history_data_mdl.symbol,
+            self.FLD_INTERVAL: history_data_mdl.interval,
+        }
+
+    def get_descriptor(self) -> dict:
+        return self._descriptor
+
+    def close(self) -> None:
+        self._shared_memory.close()
+        self._shared_memory.unlink()
+
+    @staticmethod
+    def attach(descriptor: dict) -> HistoryDataModel:
+        name = descriptor[SharedHistoryData.FLD_NAME]
+
+        if name not in SharedHistoryData._attached:
+            shared_memory = SharedMemory(name=name)
+            index, values = SharedHistoryData._get_arrays(
+                shared_memory,
+                descriptor[SharedHistoryData.FLD_ROWS],
+                len(descriptor[SharedHistoryData.FLD_COLUMNS]),
+            )
+
+            datetime_index = pd.DatetimeIndex(
+                index.view("datetime64[ns]"),
+                name=descriptor[SharedHistoryData.FLD_INDEX_NAME],
+            )
+            if descriptor[SharedHistoryData.FLD_TIMEZONE]:
+                datetime_index = datetime_index.tz_localize("UTC").tz_convert(
+                    descriptor[SharedHistoryData.FLD_TIMEZONE]
+                )
+
+            # The values aren't copied, the data frame is a read-only view of the block
+            values.flags.writeable = False
+            history_data_mdl = HistoryDataModel(
+                symbol=descriptor[SharedHistoryData.FLD_SYMBOL],
+                interval=descriptor[SharedHistoryData.FLD_INTERVAL],
+                limit=descriptor[SharedHistoryData.FLD_ROWS],
+                data=pd.DataFrame(
+                    values,
+                    index=datetime_index,
+                    columns=descriptor[SharedHistoryData.FLD_COLUMNS],
+                    copy=False,
+                ),
+            )
+
+            SharedHistoryData._attached[name] = (shared_memory, history_data_mdl)
+
+        return SharedHistoryData._attached[name][1]
+
+    @staticmethod
+    def _get_arrays(
+        shared_memory: SharedMemory, rows: int, columns: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        index = np.ndarray((rows,), dtype=np.int64, buffer=shared_memory.buf)
+        values = np.ndarray(
+            (rows, columns),
+            dtype=np.float64,
+            buffer=shared_memory.buf,
+            offset=rows * 8,
+        )
+        return index, values
+
+
+def run_simulation_cell(
+    grid: "SimulationGrid", cell: SymbolIntervalStrategyLimitModel, descriptor: dict
+) -> dict:
+    # Entry point of the worker process
+    return grid.simulate(
+        cell=cell, history_data_mdl=SharedHistoryData.attach(descriptor)
+    )
+
+
+class SimulationGrid:
+    """
+    Runs history simulations of the symbol x interval x strategy grid in a process pool.
+    History data is loaded once per symbol and interval and is shared with the workers by shared memory,
+    the results are returned as the cells are finished.
+    """
+
+    # Workers are started by a fork server, so they don't inherit threads and connections of the app
+    START_METHOD = "forkserver"
+
+    FLD_BALANCE = "balance"
+    FLD_POSITIONS = "positions"
+    FLD_TRANSACTIONS = "transactions"
+    FLD_TRANSACTIONS_FILE = "transactions_file"
+    FLD_OPTIMAL_TAKE_PROFIT_RATE = "optimal_take_profit_rate"
+    FLD_OPTIMAL_STOP_LOSS_RATE = "optimal_stop_loss_rate"
+    FLD_ERROR = "error"
+
+    def __init__(
+        self,
+        trader_id: str,
+        trading_type: str,
+        stop_loss_rate: float,
+        is_trailing_stop: bool,
+        take_profit_rate: float,
+        init_balance: float,
+        details: bool = True,
+        max_workers: int = None,
+        transaction_recording: TransactionRecordingType = TransactionRecordingType.FULL,
+        transaction_dir: str = None,
+    ):
+        self.trader_id = trader_id
+        self.trading_type = trading_type
+        self.stop_loss_rate = stop_loss_rate
+        self.is_trailing_stop = is_trailing_stop
+        self.take_profit_rate = take_profit_rate
+        self.init_balance = init_balance
+        # Positions, transactions and optimal rates are added to the session result
+        self.details = details
+        self.max_workers = max_workers
+        self.transaction_recording = transaction_recording
+        # Transactions of every simulation are written to a NDJSON file of the directory instead of the result
+        self.transaction_dir = transaction_dir
+
+    @staticmethod
+    def get_cells(
+        symbols: list, intervals: list, strategies: list, limits: dict
+    ) -> list[SymbolIntervalStrategyLimitModel]:
+        return [
+            SymbolIntervalStrategyLimitModel(
+                symbol=symbol,
+                interval=interval,
+                strategy=strategy,
+                limit=limits[interval],
+            )
+            for symbol in symbols
+            for interval in intervals
+            for strategy in strategies
+        ]
+
+    def get_max_workers(self) -> int:
+        max_workers = self.max_workers or config.get_config_value(
+            Const.CONF_PROPERTY_SIMULATION_WORKERS
+        )
+        return max_workers or os.cpu_count() or 1
+
+    def run(self, cells: list[SymbolIntervalStrategyLimitModel]) -> Iterator[dict]:
+        for _, session_result, error in self.evaluate(cells):
+            if not error:
+                yield session_result
+
+    def evaluate(
+        self, cells: list[SymbolIntervalStrategyLimitModel]
+    ) -> Iterator[tuple[SymbolIntervalStrategyLimitModel, dict, Exception]]:
+        """
+        Returns (cell, session result, error) as the cells are finished,
+        a failed cell doesn't stop the grid
+        """
+        if not cells:
+            return
+
+        max_workers = min(self.get_max_workers(), len(cells))
+
+        if is_write_log():
+            logger.info(
+                f"{self.__class__.__name__}: {len(cells)} simulations are started by {max_workers} workers"
+            )
+
+        history_data = self._load_history_data(cells)
+
+        if max_workers == 1:
+            for cell in cells:
+                try:
+                    session_result = self.simulate(
+                        cell=cell,
+                        history_data_mdl=history_data[(cell.symbol, cell.interval)],
+                    )
+                except Exception as error:
+                    self._log_error(cell, error)
+                    yield (cell, None, error)
+                else:
+                    yield (cell, session_result, None)
+            return
+
+        shared_history_data = {}
+        try:
+            for key, history_data_mdl in history_data.items():
+                shared_history_data[key] = SharedHistoryData(history_data_mdl)
+
+            with ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context(self.START_METHOD),
+            ) as executor:
+                futures = {
+                    executor.submit(
+                        run_simulation_cell,
+                        self,
+                        cell,
+                        shared_history_data[
+                            (cell.symbol, cell.interval)
+                        ].get_descriptor(),
+                    ): cell
+                    for cell in cells
+                }
+
+                for future in as_completed(futures):
+                    cell = futures[future]
+                    try:
+                        session_result = future.result()
+                    except Exception as error:
+                        self._log_error(cell, error)
+                        yield (cell, None, error)
+                    else:
+                        yield (cell, session_result, None)
+        finally:
+            for item in shared_history_data.values():
+                item.close()
+
+    def _log_error(self, cell: SymbolIntervalStrategyLimitModel, error: Exception):
+        logger.error(
+            f"{self.__class__.__name__}: Simulation {cell.model_dump()} has been failed - {error}"
+        )
+
+    def simulate(
+        self, cell: SymbolIntervalStrategyLimitModel, history_data_mdl: HistoryDataModel
+    ) -> dict:
+        if not self.transaction_dir:
+            return self._get_session_result(
+                self._run_simulation(cell=cell, history_data_mdl=history_data_mdl)
+            )
+
+        file_descriptor, transaction_file = tempfile.mkstemp(
+            suffix=".ndjson", dir=self.transaction_dir
+        )
+        with open(file_descriptor, "w") as stream:
+            session_mng = self._run_simulation(
+                cell=cell,
+                history_data_mdl=history_data_mdl,
+                transaction_sink=TransactionStreamSink(stream),
+            )
+
+        session_result = self._get_session_result(session_mng)
+        session_result[self.FLD_TRANSACTIONS_FILE] = transaction_file
+
+        return session_result
+
+    def _run_simulation(
+        self,
+        cell: SymbolIntervalStrategyLimitModel,
+        history_data_mdl: HistoryDataModel,
+        transaction_sink: TransactionStreamSink = None,
+    ) -> SessionManager:
+        return Robot().run_history_simulation(
+            trader_id=self.trader_id,
+            trading_type=self.trading_type,
+            symbol=cell.symbol,
+            interval=cell.interval,
+            strategy=cell.strategy,
+            stop_loss_rate=self.stop_loss_rate,
+            is_trailing_stop=self.is_trailing_stop,
+            take_profit_rate=self.take_profit_rate,
+            init_balance=self.init_balance,
+            limit=cell.limit,
+            history_data_mdl=history_data_mdl,
+            transaction_recording=self.transaction_recording,
+            transaction_sink=transaction_sink,
+        )
+
+    def _load_history_data(
+        self, cells: list[SymbolIntervalStrategyLimitModel]
+    ) -> dict[tuple, HistoryDataModel]:
+        # The longest history of the strategies of a symbol and interval is loaded once
+        history_limits = {}
+        for cell in cells:
+            key = (cell.symbol, cell.interval)
+            history_limit = StrategyFactory.get_strategy_instance(
+                cell.strategy
+            ).get_history_limit(
+                StrategyParamModel(trader_id=self.trader_id, **cell.model_dump())
+            )
+            history_limits[key] = max(history_limits.get(key, 0), history_limit)
+
+        history_data_handler = buffer_runtime_handler.get_history_data_handler(
+            trader_id=self.trader_id
+        )
+
+        return {
+            (symbol, interval): history_data_handler.get_history_data(
+                HistoryDataParamModel(
+                    symbol=symbol,
+                    interval=interval,
+                    limit=history_limit,
+                    from_buffer=True,
+                    closed_bars=True,
+                )
+            )
+            for (symbol, interval), history_limit in history_limits.items()
+        }
+
+    def _get_session_result(self, session_mng: SessionManager) -> dict:
+        balance_mdl = session_mng.get_balance_manager().get_balance_model()
+
+        session_result = session_mng.get_session().model_dump()
+        session_result[self.FLD_BALANCE] = balance_mdl.model_dump()
+
+        if not self.details:
+            return session_result
+
+        positions = []
+        high_rates = []
+        low_rates = []
+
+        for position in session_mng.get_positions():
+            positions.append(position.model_dump())
+
+            if position.side == OrderSideType.buy:
+                high_rates.append(position.high_percent)
+                low_rates.append(-1 * position.low_percent)
+            else:
+                high_rates.append(-1 * position.low_percent)
+                low_rates.append(position.high_percent)
+
+        session_result[self.FLD_OPTIMAL_TAKE_PROFIT_RATE] = np.percentile(
+            high_rates, 80
+        )
+        session_result[self.FLD_OPTIMAL_STOP_LOSS_RATE] = np.percentile(low_rates, 80)
+        session_result[self.FLD_POSITIONS] = positions
+        if not self.transaction_dir:
+            session_result[self.FLD_TRANSACTIONS] = [
+                item.model_dump() for item in session_mng.get_transactions()
+            ]
+
+        return session_result
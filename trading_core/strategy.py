@@ -1,11 +1,16 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import threading
 import pandas_ta as ta
 import pandas as pd
+import numpy as np
 
 from trading_core.common import StrategyParamModel
 
 from .constants import Const
 from .core import logger, config
 from .common import (
+    ExchangeId,
     IntervalType,
     StrategyType,
     SignalType,
@@ -13,17 +18,28 @@ from .common import (
     StrategyModel,
     StrategyConfigModel,
     SignalModel,
+    HistoryDataModel,
     HistoryDataParamModel,
     StrategyParamModel,
     SignalParamModel,
     RiskType,
 )
 from .handler import buffer_runtime_handler, ExchangeHandler
-from .indicator import Indicator_CCI_ATR
+from .signal_store import SignalStoreBase
+from .signal_stream import SignalBroker
+from .indicator import Indicator_CCI_ATR, IndicatorWarmUp
 from .trend import TrendCCI
 
 
 class SignalFactory:
+    # Signals are evaluated on a bounded thread pool because every item may fetch history data
+    MAX_WORKERS = 8
+    # Max number of concurrent evaluations per exchange to stay within the API rate limits
+    EXCHANGE_MAX_CONCURRENCY = 4
+
+    _exchange_semaphores: dict = {}
+    _exchange_semaphores_lock = threading.Lock()
+
     def get_signal(self, param: SignalParamModel) -> SignalModel:
         signal_mdl = self._get_signal(param)
         if signal_mdl and signal_mdl.is_compatible(signal_types=param.types):
@@ -36,16 +52,101 @@ class SignalFactory:
         else:
             return None
 
-    def get_signals(self, params: list[SignalParamModel]) -> list[SignalModel]:
+    def get_signals(
+        self, params: list[SignalParamModel], max_workers: int = None
+    ) -> list[SignalModel]:
         signal_mdls = []
 
-        for signal_param in params:
-            signal_mdl = self.get_signal(param=signal_param)
-            if signal_mdl:
+        for signal_param, signal_mdl, error in self.evaluate_signals(
+            params=params, max_workers=max_workers
+        ):
+            if error:
+                logger.error(
+                    f"{self.__class__.__name__}: Error during get_signal({signal_param.model_dump()}) - {error}"
+                )
+            elif signal_mdl:
                 signal_mdls.append(signal_mdl)
 
         return signal_mdls
 
+    def evaluate_signals(
+        self, params: list[SignalParamModel], max_workers: int = None
+    ) -> list[tuple[SignalParamModel, SignalModel, Exception]]:
+        """
+        Returns (param, signal, error) for every param in the order of the params
+        """
+        if not max_workers:
+            max_workers = self.MAX_WORKERS
+
+        if max_workers == 1 or len(params) <= 1:
+            return [self._evaluate_signal(param) for param in params]
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(params))) as executor:
+            return list(executor.map(self._evaluate_signal, params))
+
+    def _evaluate_signal(
+        self, param: SignalParamModel
+    ) -> tuple[SignalParamModel, SignalModel, Exception]:
+        try:
+            with self._get_exchange_semaphore(param.trader_id):
+                return (param, self.get_signal(param=param), None)
+        except Exception as error:
+            return (param, None, error)
+
+    def prepare_signals(
+        self, params: list[SignalParamModel], max_workers: int = None
+    ) -> int:
+        """
+        Loads history data, indicators and up-level data of the closed bars before the bar close,
+        so the signal at the close requires just the latest bar from the exchange
+        """
+        if not max_workers:
+            max_workers = self.MAX_WORKERS
+
+        unique_params = {
+            (param.trader_id, param.symbol, param.interval, param.strategy): param
+            for param in params
+        }
+        params = list(unique_params.values())
+
+        if not params:
+            return 0
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(params))) as executor:
+            return sum(executor.map(self._prepare_signal, params))
+
+    def _prepare_signal(self, param: SignalParamModel) -> bool:
+        try:
+            # Skip symbols which aren't traded at the bar close
+            if not buffer_runtime_handler.get_symbol_handler(
+                trader_id=param.trader_id
+            ).is_trading_available(interval=param.interval, symbol=param.symbol):
+                return False
+
+            strategy_param = StrategyParamModel(**param.model_dump())
+            strategy_param.latest_only = True
+
+            with self._get_exchange_semaphore(param.trader_id):
+                StrategyFactory.get_strategy_data(strategy_param)
+
+            return True
+        except Exception as error:
+            logger.error(
+                f"{self.__class__.__name__}: Error during prepare_signal({param.model_dump()}) - {error}"
+            )
+            return False
+
+    def _get_exchange_semaphore(self, trader_id: str) -> threading.Semaphore:
+        exchange_id = self._get_exchange_id(trader_id)
+
+        with SignalFactory._exchange_semaphores_lock:
+            if exchange_id not in SignalFactory._exchange_semaphores:
+                SignalFactory._exchange_semaphores[exchange_id] = threading.Semaphore(
+                    self.EXCHANGE_MAX_CONCURRENCY
+                )
+
+            return SignalFactory._exchange_semaphores[exchange_id]
+
     def get_signals_by_list(
         self,
         trader_id: str,
@@ -55,6 +156,26 @@ class SignalFactory:
         signal_types: list,
         closed_bars: bool,
     ) -> list[SignalModel]:
+        return self.get_signals(
+            params=self.get_signal_params_by_list(
+                trader_id=trader_id,
+                symbols=symbols,
+                intervals=intervals,
+                strategies=strategies,
+                signal_types=signal_types,
+                closed_bars=closed_bars,
+            )
+        )
+
+    @staticmethod
+    def get_signal_params_by_list(
+        trader_id: str,
+        symbols: list,
+        intervals: list,
+        strategies: list,
+        signal_types: list,
+        closed_bars: bool,
+    ) -> list[SignalParamModel]:
         signal_params = []
         for symbol in symbols:
             for interval in intervals:
@@ -71,7 +192,7 @@ class SignalFactory:
 
                     signal_params.append(signal_param)
 
-        return self.get_signals(params=signal_params)
+        return signal_params
 
     def _get_signal(self, param: SignalParamModel) -> SignalModel:
         if config.get_config_value(Const.CONF_PROPERTY_CORE_LOG):
@@ -85,62 +206,51 @@ class SignalFactory:
         ).is_trading_available(interval=param.interval, symbol=param.symbol):
             return None
 
-        # Take signal from buffer
-        if param.from_buffer:
-            buffer_handler = buffer_runtime_handler.get_signal_handler()
-
-            buffer_key = self._get_buffer_key(
-                trader_id=param.trader_id,
-                symbol=param.symbol,
-                interval=param.interval.value,
-                strategy=param.strategy.value,
-            )
+        # Take signal of the closed bar from the signal store, signals of the open bar are recalculated
+        store_key = None
+        if param.from_buffer and param.closed_bars:
+            end_date_time = ExchangeHandler.get_handler(
+                trader_id=param.trader_id
+            ).get_end_datetime(interval=param.interval, closed_bars=param.closed_bars)
 
-            if buffer_handler.is_data_in_buffer(key=buffer_key):
-                signal_mdl = buffer_handler.get_buffer(key=buffer_key)
+            store_key = self._get_store_key(param=param, date_time=end_date_time)
 
+            signal_mdl = buffer_runtime_handler.get_signal_handler().get(store_key)
+            if signal_mdl:
                 if config.get_config_value(Const.CONF_PROPERTY_CORE_LOG):
                     logger.info(
-                        f"{self.__class__.__name__}: Check Signal from Buffer - {signal_mdl.model_dump()}"
+                        f"{self.__class__.__name__}: Signal from Store - {signal_mdl.model_dump()}"
                     )
 
-                end_date_time = ExchangeHandler.get_handler(
-                    trader_id=param.trader_id
-                ).get_end_datetime(
-                    interval=param.interval, closed_bars=param.closed_bars
+                return signal_mdl.model_copy(
+                    update={
+                        "trader_id": param.trader_id,
+                        "limit": param.limit,
+                        "from_buffer": param.from_buffer,
+                        "closed_bars": param.closed_bars,
+                    }
                 )
 
-                if end_date_time == signal_mdl.date_time:
-                    return signal_mdl
+        # Calculate Signal only for the latest bar
+        strategy_param = StrategyParamModel(**param.model_dump())
+        strategy_param.latest_only = True
 
-        # Calculate Signal
-        strategy_df = StrategyFactory.get_strategy_data(param).tail(1)
+        strategy_df = StrategyFactory.get_strategy_data(strategy_param).tail(1)
 
         # Init signal model
         for index, strategy_row in strategy_df.iterrows():
-            signal_mdl = SignalModel(
-                trader_id=param.trader_id,
-                symbol=param.symbol,
-                interval=param.interval,
-                strategy=param.strategy,
-                limit=param.limit,
-                from_buffer=param.from_buffer,
-                closed_bars=param.closed_bars,
-                date_time=index,
-                open=strategy_row["Open"],
-                high=strategy_row["High"],
-                low=strategy_row["Low"],
-                close=strategy_row["Close"],
-                volume=strategy_row["Volume"],
-                stop_loss_value=strategy_row[Const.FLD_STOP_LOSS_VALUE],
-                take_profit_value=strategy_row[Const.FLD_TAKE_PROFIT_VALUE],
-                signal=strategy_row[Const.PARAM_SIGNAL],
+            signal_mdl = self._create_signal_model(
+                param=param, date_time=index, strategy_row=strategy_row
             )
             break
 
         if signal_mdl:
-            if param.from_buffer:
-                buffer_handler.set_buffer(key=buffer_key, data=signal_mdl)
+            if store_key and store_key[-1] == signal_mdl.date_time:
+                # The first calculation of the closed bar is pushed to the stream subscribers
+                if buffer_runtime_handler.get_signal_handler().set(
+                    key=store_key, signal_mdl=signal_mdl
+                ):
+                    SignalBroker.publish(signal_mdl)
 
             return signal_mdl
         else:
@@ -151,27 +261,120 @@ class SignalFactory:
                 f"{self.__class__.__name__}: Error during get_signal({param.model_dump()})"
             )
 
-    def _get_buffer_key(
-        self, trader_id: str, symbol: str, interval: str, strategy: str
-    ) -> tuple:
-        if not symbol or not interval or not strategy:
-            Exception(
-                f"{self.__class__.__name__}: Buffer key is invalid: symbol: {symbol}, interval: {interval}, strategy: {strategy}"
+    def backfill_signals(self, param: StrategyParamModel) -> int:
+        """
+        Calculates signals of the closed bars within the limit and writes them to the signal store
+        """
+        if config.get_config_value(Const.CONF_PROPERTY_CORE_LOG):
+            logger.info(
+                f"{self.__class__.__name__}: backfill_signals({param.model_dump()})"
             )
-        buffer_key = (trader_id, symbol, interval, strategy)
 
-        if config.get_config_value(Const.CONF_PROPERTY_CORE_LOG):
-            logger.info(f"{self.__class__.__name__}: Get Buffer key - {buffer_key}")
+        strategy_param = StrategyParamModel(**param.model_dump())
+        strategy_param.closed_bars = True
+        strategy_param.latest_only = False
+
+        strategy_df = StrategyFactory.get_strategy_data(strategy_param)
+
+        signals = {}
+        for index, strategy_row in strategy_df.iterrows():
+            signal_mdl = self._create_signal_model(
+                param=strategy_param, date_time=index, strategy_row=strategy_row
+            )
+            signals[self._get_store_key(param=strategy_param, date_time=index)] = (
+                signal_mdl
+            )
+
+        return buffer_runtime_handler.get_signal_handler().set_many(signals)
+
+    def get_signal_history(
+        self,
+        param: SignalParamModel,
+        date_from: datetime = None,
+        date_to: datetime = None,
+    ) -> list[SignalModel]:
+        signal_mdls = buffer_runtime_handler.get_signal_handler().get_range(
+            exchange_id=self._get_exchange_id(param.trader_id),
+            symbol=param.symbol,
+            interval=param.interval,
+            strategy=param.strategy,
+            date_from=date_from,
+            date_to=date_to,
+        )
 
-        return buffer_key
+        return [
+            signal_mdl
+            for signal_mdl in signal_mdls
+            if signal_mdl.is_compatible(signal_types=param.types)
+        ]
+
+    def _create_signal_model(
+        self, param: StrategyParamModel, date_time: datetime, strategy_row: pd.Series
+    ) -> SignalModel:
+        return SignalModel(
+            trader_id=param.trader_id,
+            symbol=param.symbol,
+            interval=param.interval,
+            strategy=param.strategy,
+            limit=param.limit,
+            from_buffer=param.from_buffer,
+            closed_bars=param.closed_bars,
+            date_time=date_time,
+            open=strategy_row["Open"],
+            high=strategy_row["High"],
+            low=strategy_row["Low"],
+            close=strategy_row["Close"],
+            volume=strategy_row["Volume"],
+            stop_loss_value=strategy_row[Const.FLD_STOP_LOSS_VALUE],
+            take_profit_value=strategy_row[Const.FLD_TAKE_PROFIT_VALUE],
+            signal=strategy_row[Const.PARAM_SIGNAL],
+        )
+
+    def _get_store_key(self, param: StrategyParamModel, date_time: datetime) -> tuple:
+        # Traders of the same exchange share the signals
+        return SignalStoreBase.get_key(
+            exchange_id=self._get_exchange_id(param.trader_id),
+            symbol=param.symbol,
+            interval=param.interval,
+            strategy=param.strategy,
+            date_time=date_time,
+        )
+
+    def _get_exchange_id(self, trader_id: str) -> ExchangeId:
+        return (
+            buffer_runtime_handler.get_trader_handler()
+            .get_trader(id=trader_id)
+            .exchange_id
+        )
 
 
 class StrategyFactory:
+    # Strategy configs and instances are created once and reused across calls
+    _strategy_configs: dict = None
+    _strategy_instances: dict = {}
+
     @staticmethod
-    def get_strategy_data(param: StrategyParamModel):
-        strategy = param.strategy
-        strategy_instance = None
+    def get_strategy_data(
+        param: StrategyParamModel, history_data_mdl: HistoryDataModel = None
+    ):
+        strategy_instance = StrategyFactory.get_strategy_instance(param.strategy)
+
+        strategy_data = strategy_instance.get_strategy_data(
+            param, history_data_mdl=history_data_mdl
+        )
+        return strategy_data
+
+    @staticmethod
+    def get_strategy_instance(strategy: StrategyType) -> "StrategyBase":
+        if strategy not in StrategyFactory._strategy_instances:
+            StrategyFactory._strategy_instances[strategy] = (
+                StrategyFactory._create_strategy_instance(strategy)
+            )
 
+        return StrategyFactory._strategy_instances[strategy]
+
+    @staticmethod
+    def _create_strategy_instance(strategy: StrategyType) -> "StrategyBase":
         strategy_config_mdl = StrategyFactory.get_strategy_config(strategy)
 
         if strategy in [
@@ -180,48 +383,49 @@ class StrategyFactory:
             StrategyType.CCI_20_CROSS_100,
             StrategyType.CCI_50_CROSS_100,
         ]:
-            strategy_instance = Strategy_CCI(strategy_config_mdl)
+            return Strategy_CCI(strategy_config_mdl)
 
         elif strategy == StrategyType.EMA_8_CROSS_EMA_30_FILTER_CCI_14:
-            strategy_instance = Strategy_EMA_8_CROSS_EMA_30_FILTER_CCI_14(
-                strategy_config_mdl
-            )
+            return Strategy_EMA_8_CROSS_EMA_30_FILTER_CCI_14(strategy_config_mdl)
 
         elif strategy == StrategyType.EMA_30_CROSS_EMA_100:
-            strategy_instance = EMA_30_CROSS_EMA_100(strategy_config_mdl)
+            return EMA_30_CROSS_EMA_100(strategy_config_mdl)
 
         elif strategy == StrategyType.EMA_30_CROSS_EMA_100_FILTER_CCI_50:
-            strategy_instance = EMA_30_CROSS_EMA_100_FILTER_CCI_50(strategy_config_mdl)
+            return EMA_30_CROSS_EMA_100_FILTER_CCI_50(strategy_config_mdl)
 
         elif strategy == StrategyType.EMA_8_CROSS_EMA_30_FILTER_EMA_100:
-            strategy_instance = EMA_8_CROSS_EMA_30_FILTER_EMA_100(strategy_config_mdl)
+            return EMA_8_CROSS_EMA_30_FILTER_EMA_100(strategy_config_mdl)
 
         elif strategy in [StrategyType.EMA_50_CROSS_EMA_100_FILTER_UP_LEVEL_TREND]:
-            strategy_instance = EMA_50_CROSS_EMA_100_FILTER_UP_LEVEL_TREND(
-                strategy_config_mdl
-            )
+            return EMA_50_CROSS_EMA_100_FILTER_UP_LEVEL_TREND(strategy_config_mdl)
 
         elif strategy in [
             StrategyType.EMA_50_CROSS_EMA_100_FILTER_UP_LEVEL_TREND_TP,
         ]:
-            strategy_instance = EMA_50_CROSS_EMA_100_FILTER_UP_LEVEL_TREND_TP(
-                strategy_config_mdl
-            )
+            return EMA_50_CROSS_EMA_100_FILTER_UP_LEVEL_TREND_TP(strategy_config_mdl)
 
         else:
             raise Exception(
                 f"{StrategyFactory.__name__}: Strategy {strategy} isn't implemented"
             )
 
-        strategy_data = strategy_instance.get_strategy_data(param)
-        return strategy_data
-
     @staticmethod
     def get_strategy_config_dict_vh() -> dict:
+        if StrategyFactory._strategy_configs is None:
+            StrategyFactory._strategy_configs = (
+                StrategyFactory._get_strategy_config_dict()
+            )
+
+        return StrategyFactory._strategy_configs
+
+    @staticmethod
+    def _get_strategy_config_dict() -> dict:
         return {
             StrategyType.CCI_14_CROSS_100: StrategyConfigModel(
                 strategy=StrategyType.CCI_14_CROSS_100,
                 name="1. CCI(14) cross +/- 100",
+                display_rows=3,
                 history_limit=16,
                 length=14,
                 miv_value=-100,
@@ -235,6 +439,7 @@ class StrategyFactory:
                 tp_move_limit=0.7,
                 tp_move_step=0.25,
                 tp_increment_limit=0,
+                display_rows=3,
                 history_limit=22,
                 length=20,
                 miv_value=-100,
@@ -248,6 +453,7 @@ class StrategyFactory:
                 tp_move_limit=0.7,
                 tp_move_step=0.25,
                 tp_increment_limit=0,
+                display_rows=3,
                 history_limit=52,
                 length=50,
                 miv_value=-100,
@@ -256,6 +462,7 @@ class StrategyFactory:
             StrategyType.CCI_50_CROSS_0: StrategyConfigModel(
                 strategy=StrategyType.CCI_50_CROSS_0,
                 name="3. CCI(50) cross 0",
+                display_rows=3,
                 history_limit=52,
                 length=50,
                 miv_value=0,
@@ -358,33 +565,222 @@ class StrategyFactory:
 
         return [item.strategy for item in sorted_strategies]
 
+    @staticmethod
+    def get_warm_up_report(tolerance: float = None) -> list[dict]:
+        if not tolerance:
+            tolerance = IndicatorWarmUp.get_tolerance()
+
+        report = []
+
+        for strategy, strategy_config_mdl in (
+            StrategyFactory.get_strategy_config_dict_vh().items()
+        ):
+            strategy_instance = StrategyFactory.get_strategy_instance(strategy)
+
+            # Fixed history limit includes displayed rows
+            fixed_warm_up = (
+                strategy_config_mdl.history_limit - strategy_config_mdl.display_rows
+            )
+
+            indicators = []
+            for kind, length in strategy_instance.get_indicator_lengths():
+                warm_up = IndicatorWarmUp.get_warm_up(
+                    kind=kind, length=length, tolerance=tolerance
+                )
+                indicators.append(
+                    {
+                        "kind": kind,
+                        "length": length,
+                        "warm_up": warm_up,
+                        "accuracy_cost": IndicatorWarmUp.get_accuracy_cost(
+                            kind=kind, length=length, warm_up=warm_up
+                        ),
+                        "history_limit_accuracy_cost": IndicatorWarmUp.get_accuracy_cost(
+                            kind=kind, length=length, warm_up=fixed_warm_up
+                        ),
+                    }
+                )
+
+            report.append(
+                {
+                    "strategy": strategy,
+                    "tolerance": tolerance,
+                    "history_limit": strategy_config_mdl.history_limit,
+                    "warm_up": strategy_instance.get_warm_up(tolerance),
+                    "indicators": indicators,
+                }
+            )
+
+        return report
+
 
 class StrategyBase:
+    """
+    Strategy is defined declaratively:
+        INDICATORS - pandas_ta definitions of the indicators
+        REQUIRED_FIELDS - indicator columns which have to be calculated for a bar
+        _prepare_data - trend rule (additional columns before signal)
+        _determine_signal, _determine_stop_loss_value, _determine_take_profit_value - signal and SL/TP rules
+    The definition is compiled once per strategy instance and is executed by get_strategy_data.
+    """
+
+    INDICATORS: list[dict] = []
+    REQUIRED_FIELDS: list[str] = []
+
+    # Number of the last rows required to derive signal, SL and TP of the latest bar
+    LATEST_ONLY_ROWS = 2
+    # Number of the rows before displayed rows required to derive signal of the first displayed row
+    LEAD_ROWS = 0
+
     def __init__(self, strategy_config_mdl: StrategyConfigModel):
         self._strategy_config_mdl = strategy_config_mdl
         self._min_value = self._strategy_config_mdl.miv_value
         self._max_value = self._strategy_config_mdl.max_value
 
+        # Execution plan of the indicators
+        self._ta_strategy = (
+            ta.Strategy(
+                name=self.__class__.__name__,
+                description=self._strategy_config_mdl.name,
+                ta=self.INDICATORS,
+            )
+            if self.INDICATORS
+            else None
+        )
+
     def get_strategy_config(self) -> StrategyConfigModel:
         return self._strategy_config_mdl
 
-    def get_strategy_data(self, param: StrategyParamModel) -> pd.DataFrame:
+    def get_indicator_lengths(self) -> list[tuple]:
+        return [(indicator["kind"], indicator["length"]) for indicator in self.INDICATORS]
+
+    def get_warm_up(self, tolerance: float = None) -> int:
+        return max(
+            [
+                IndicatorWarmUp.get_warm_up(
+                    kind=kind, length=length, tolerance=tolerance
+                )
+                for kind, length in self.get_indicator_lengths()
+            ],
+            default=0,
+        )
+
+    def get_strategy_data(
+        self, param: StrategyParamModel, history_data_mdl: HistoryDataModel = None
+    ) -> pd.DataFrame:
         if config.get_config_value(Const.CONF_PROPERTY_CORE_LOG):
             logger.info(
                 f"{self.__class__.__name__}: get_strategy_data({param.model_dump()})"
             )
 
-    def _determine_signal(self, df: pd.DataFrame) -> SignalType:
+        limit = self._get_display_limit(param)
+
+        df = self._get_indicator_data(param, history_data_mdl=history_data_mdl)
+
+        # Exclude rest data from calculation
+        df = df.tail(limit + self.LEAD_ROWS)
+        df = self._get_evaluation_data(df, param)
+
+        df = self._prepare_data(df, param)
+        df = self._apply_rules(df)
+
+        # Calculate Strategy data only for requested limit
+        return df.tail(limit)
+
+    def _get_display_limit(self, param: StrategyParamModel) -> int:
+        return param.limit + self._strategy_config_mdl.display_rows
+
+    def get_history_limit(self, param: StrategyParamModel) -> int:
+        # Requested rows with the warm-up of the indicators within the tolerance,
+        # the tolerance can reduce the fixed history limit of the strategy only
+        return min(
+            param.limit + self._strategy_config_mdl.history_limit,
+            self._get_display_limit(param) + self.LEAD_ROWS + self.get_warm_up(),
+        )
+
+    def _get_history_data(
+        self, param: StrategyParamModel, history_data_mdl: HistoryDataModel = None
+    ) -> HistoryDataModel:
+        history_data_param = HistoryDataParamModel(**param.model_dump())
+        history_data_param.limit = self.get_history_limit(param)
+
+        # History data which is loaded once for several strategies is cut to the limit of the strategy
+        if history_data_mdl:
+            return history_data_mdl.model_copy(
+                update={
+                    "limit": history_data_param.limit,
+                    "data": history_data_mdl.data.tail(history_data_param.limit),
+                }
+            )
+
+        return buffer_runtime_handler.get_history_data_handler(
+            trader_id=param.trader_id
+        ).get_history_data(history_data_param)
+
+    def _get_indicator_data(
+        self, param: StrategyParamModel, history_data_mdl: HistoryDataModel = None
+    ) -> pd.DataFrame:
+        history_data_mdl = self._get_history_data(param, history_data_mdl)
+
+        df = pd.DataFrame(history_data_mdl.data)
+        df.ta.strategy(self._ta_strategy)
+
+        # Remove initial values from DF
+        return df.dropna(subset=self.REQUIRED_FIELDS)
+
+    def _get_evaluation_data(
+        self, df: pd.DataFrame, param: StrategyParamModel
+    ) -> pd.DataFrame:
+        if param.latest_only:
+            return df.tail(self.LATEST_ONLY_ROWS)
+
+        return df
+
+    def _prepare_data(
+        self, df: pd.DataFrame, param: StrategyParamModel
+    ) -> pd.DataFrame:
+        return df
+
+    def _apply_rules(self, df: pd.DataFrame) -> pd.DataFrame:
+        stop_loss_values = self._determine_stop_loss_value(df)
+
+        return df.assign(
+            **{
+                Const.FLD_SIGNAL: self._determine_signal(df),
+                Const.FLD_STOP_LOSS_VALUE: stop_loss_values,
+                Const.FLD_TAKE_PROFIT_VALUE: self._determine_take_profit_value(
+                    df, stop_loss_values
+                ),
+            }
+        )
+
+    def _determine_signal(self, df: pd.DataFrame) -> np.ndarray:
         pass
 
-    def _determine_stop_loss_value(self, df: pd.DataFrame) -> float:
+    def _determine_stop_loss_value(self, df: pd.DataFrame) -> np.ndarray:
         pass
 
-    def _determine_take_profit_value(self, df: pd.DataFrame) -> float:
+    def _determine_take_profit_value(
+        self, df: pd.DataFrame, stop_loss_values: np.ndarray
+    ) -> np.ndarray:
         pass
 
+    def _get_values(self, df: pd.DataFrame, field: str) -> np.ndarray:
+        return df[field].to_numpy()
+
 
 class Strategy_EMA_Base(StrategyBase):
+    # Add trend column before signal determination
+    WITH_TREND = False
+
+    def _prepare_data(
+        self, df: pd.DataFrame, param: StrategyParamModel
+    ) -> pd.DataFrame:
+        if self.WITH_TREND:
+            return df.assign(**{Const.FLD_TREND: self._determine_trend(df)})
+
+        return df
+
     def _get_ema_delta(self, short_ema: float, long_ema: float) -> float:
         return short_ema - long_ema
 
@@ -406,6 +802,33 @@ class Strategy_EMA_Base(StrategyBase):
 
         return signal
 
+    def _get_ema_stop_loss_values(
+        self, df: pd.DataFrame, ema_medium_field: str, ema_long_field: str, shift: float
+    ) -> np.ndarray:
+        close = self._get_values(df, Const.FLD_CLOSE)
+        ema_medium = self._get_values(df, ema_medium_field)
+        ema_long = self._get_values(df, ema_long_field)
+
+        # SHORT: SL Price = EMA long + shift
+        short_stop_loss_price = (1 + shift) * ema_long
+        short_stop_loss_value = np.where(
+            short_stop_loss_price > close,
+            short_stop_loss_price - close,
+            shift * ema_long,
+        )
+
+        # LONG: SL Price = EMA long - shift
+        long_stop_loss_price = (1 - shift) * ema_long
+        long_stop_loss_value = np.where(
+            long_stop_loss_price < close,
+            close - long_stop_loss_price,
+            shift * ema_long,
+        )
+
+        return np.where(
+            ema_long > ema_medium, short_stop_loss_value, long_stop_loss_value
+        )
+
     def _get_2_emas_trend(
         self, short_ema: float, long_ema: float
     ) -> TrendDirectionType:
@@ -505,36 +928,38 @@ class Strategy_EMA_Base(StrategyBase):
         return up_level_param
 
     def _determine_trend(self, df):
-        ema_short = None
-        ema_medium = None
-        ema_long = None
-        trends = []
+        trends = [None] * len(df)
 
-        for i in range(len(df)):
-            bar = df.iloc[i]
-
-            if self._strategy_config_mdl.ema_short != 0:
-                ema_short = bar[Const.FLD_EMA_SHORT]
-
-            if self._strategy_config_mdl.ema_medium != 0:
-                ema_medium = bar[Const.FLD_EMA_MEDIUM]
+        ema_short = (
+            self._get_values(df, Const.FLD_EMA_SHORT)
+            if self._strategy_config_mdl.ema_short != 0
+            else None
+        )
+        ema_medium = (
+            self._get_values(df, Const.FLD_EMA_MEDIUM)
+            if self._strategy_config_mdl.ema_medium != 0
+            else None
+        )
+        ema_long = (
+            self._get_values(df, Const.FLD_EMA_LONG)
+            if self._strategy_config_mdl.ema_long != 0
+            else None
+        )
 
-            if self._strategy_config_mdl.ema_long != 0:
-                ema_long = bar[Const.FLD_EMA_LONG]
+        if ema_short is None or ema_long is None:
+            return trends
 
-            if ema_short and ema_long:
-                if ema_medium:
-                    trend = self._get_3_emas_trend(
-                        short_ema=ema_short,
-                        medium_ema=ema_medium,
-                        long_ema=ema_long,
-                    )
-                else:
-                    trend = self._get_2_emas_trend(
-                        short_ema=ema_short, long_ema=ema_long
-                    )
-
-                trends.append(trend)
+        for i in range(len(df)):
+            if ema_medium is not None:
+                trends[i] = self._get_3_emas_trend(
+                    short_ema=ema_short[i],
+                    medium_ema=ema_medium[i],
+                    long_ema=ema_long[i],
+                )
+            else:
+                trends[i] = self._get_2_emas_trend(
+                    short_ema=ema_short[i], long_ema=ema_long[i]
+                )
 
         return trends
 
@@ -544,77 +969,34 @@ class Strategy_CCI(StrategyBase):
         StrategyBase.__init__(self, strategy_config_mdl)
         self._cci = Indicator_CCI_ATR(self._strategy_config_mdl.length)
 
-    def get_strategy_data(self, param: StrategyParamModel):
-        super().get_strategy_data(param)
-        default_limit = self._cci.get_length() + 2
-        limit = param.limit + default_limit
-
-        history_data_param = HistoryDataParamModel(**param.model_dump())
-        history_data_param.limit = limit
-
-        history_data_mdl = buffer_runtime_handler.get_history_data_handler(
-            trader_id=param.trader_id
-        ).get_history_data(history_data_param)
+    def get_indicator_lengths(self) -> list[tuple]:
+        return self._cci.get_indicator_lengths()
 
-        cci_df = self._cci.get_indicator_by_history_data(history_data_mdl)
-        cci_df.insert(
-            cci_df.shape[1], Const.PARAM_SIGNAL, self._determine_signal(cci_df)
-        )
-
-        # Determive Stop Loss Value = 2 * ATR
-        cci_df.insert(
-            cci_df.shape[1],
-            Const.FLD_STOP_LOSS_VALUE,
-            self._determine_stop_loss_value(cci_df),
-        )
+    def _get_indicator_data(
+        self, param: StrategyParamModel, history_data_mdl: HistoryDataModel = None
+    ) -> pd.DataFrame:
+        history_data_mdl = self._get_history_data(param, history_data_mdl)
 
-        # Determive Take Profit Value = 3 * ATR
-        cci_df.insert(
-            cci_df.shape[1],
-            Const.FLD_TAKE_PROFIT_VALUE,
-            self._determine_take_profit_value(cci_df),
-        )
-
-        return cci_df
+        return self._cci.get_indicator_by_history_data(history_data_mdl)
 
     def _determine_signal(self, cci_df):
-        signals = []
-
-        for i in range(len(cci_df)):
-            decision = ""
-
-            if i == 0:
-                signals.append(decision)
-                continue
+        signals = [""] * len(cci_df)
+        cci_values = self._get_values(cci_df, Const.FLD_CCI)
 
-            current_value = cci_df.iloc[i, 5]
-            previous_value = cci_df.iloc[i - 1, 5]
-
-            decision = self._get_signal_decision(
-                current_value=current_value, previous_value=previous_value
+        for i in range(1, len(cci_df)):
+            signals[i] = self._get_signal_decision(
+                current_value=cci_values[i], previous_value=cci_values[i - 1]
             )
 
-            signals.append(decision)
-
         return signals
 
     def _determine_stop_loss_value(self, df: pd.DataFrame):
-        values = []
-
-        for i in range(len(df)):
-            value = 2 * df.iloc[i][Const.FLD_ATR]
-            values.append(value)
-
-        return values
-
-    def _determine_take_profit_value(self, df: pd.DataFrame):
-        values = []
-
-        for i in range(len(df)):
-            value = 3 * df.iloc[i][Const.FLD_ATR]
-            values.append(value)
+        # Stop Loss Value = 2 * ATR
+        return 2 * self._get_values(df, Const.FLD_ATR)
 
-        return values
+    def _determine_take_profit_value(self, df: pd.DataFrame, stop_loss_values):
+        # Take Profit Value = 3 * ATR
+        return 3 * self._get_values(df, Const.FLD_ATR)
 
     def _get_signal_decision(self, current_value, previous_value):
         decision = ""
@@ -640,137 +1022,71 @@ class Strategy_CCI(StrategyBase):
 
 
 class Strategy_EMA_8_CROSS_EMA_30_FILTER_CCI_14(StrategyBase):
-    def get_strategy_data(self, param: StrategyParamModel):
-        super().get_strategy_data(param)
-        limit = param.limit + self._strategy_config_mdl.display_rows
-        history_limit = param.limit + self._strategy_config_mdl.history_limit
-
-        history_data_param = HistoryDataParamModel(**param.model_dump())
-        history_data_param.limit = history_limit
-
-        history_data_mdl = buffer_runtime_handler.get_history_data_handler(
-            trader_id=param.trader_id
-        ).get_history_data(history_data_param)
-
-        # Create your own Custom Strategy
-        CustomStrategy = ta.Strategy(
-            name="EMA_8_CROSS_EMA_30_FILTER_CCI_14",
-            description="EMA 8 crosses EMA 30 with filter CCI(14) +/- 100",
-            ta=[
-                {
-                    "kind": "cci",
-                    "length": 14,
-                    "col_names": (Const.FLD_CCI, "MULTIPROCESSING_OFF"),
-                },
-                {
-                    "kind": "atr",
-                    "length": 14,
-                    "col_names": (Const.FLD_ATR),
-                },
-                {
-                    "kind": "ema",
-                    "length": 8,
-                    "col_names": (Const.FLD_EMA_8),
-                },
-                {
-                    "kind": "ema",
-                    "length": 30,
-                    "col_names": (Const.FLD_EMA_30),
-                },
-            ],
-        )
-        # To run your "Custom Strategy"
-        df = pd.DataFrame(history_data_mdl.data)
-        df.ta.strategy(CustomStrategy)
-
-        df = df.dropna(
-            subset=[
-                Const.FLD_CCI,
-                Const.FLD_ATR,
-                Const.FLD_EMA_8,
-                Const.FLD_EMA_30,
-            ]
-        )
-
-        df = df.tail(limit)
-
-        df.insert(df.shape[1], Const.PARAM_SIGNAL, self._determine_signal(df))
-
-        # Determive Stop Loss Value = 2 * ATR
-        df.insert(
-            df.shape[1],
-            Const.FLD_STOP_LOSS_VALUE,
-            self._determine_stop_loss_value(df),
-        )
-
-        # Determive Take Profit Value = 3 * ATR
-        df.insert(
-            df.shape[1],
-            Const.FLD_TAKE_PROFIT_VALUE,
-            self._determine_take_profit_value(df),
-        )
-
-        return df
+    INDICATORS = [
+        {
+            "kind": "cci",
+            "length": 14,
+            "col_names": (Const.FLD_CCI, "MULTIPROCESSING_OFF"),
+        },
+        {
+            "kind": "atr",
+            "length": 14,
+            "col_names": (Const.FLD_ATR),
+        },
+        {
+            "kind": "ema",
+            "length": 8,
+            "col_names": (Const.FLD_EMA_8),
+        },
+        {
+            "kind": "ema",
+            "length": 30,
+            "col_names": (Const.FLD_EMA_30),
+        },
+    ]
+    REQUIRED_FIELDS = [
+        Const.FLD_CCI,
+        Const.FLD_ATR,
+        Const.FLD_EMA_8,
+        Const.FLD_EMA_30,
+    ]
+
+    # Signal of the bar is determined by the cross of two previous bars
+    LATEST_ONLY_ROWS = 3
 
     def _determine_signal(self, df):
-        signals = []
-
-        for i in range(len(df)):
-            decision = ""
-
-            if i < 2:
-                signals.append(decision)
-                continue
-
-            current_bar = df.iloc[i]
-            current_cci = current_bar[Const.FLD_CCI]
+        signals = [SignalType.NONE] * len(df)
 
-            previous_bar = df.iloc[i - 1]
-            second_previous_bar = df.iloc[i - 2]
+        cci_values = self._get_values(df, Const.FLD_CCI)
+        deltas = self._get_values(df, Const.FLD_EMA_8) - self._get_values(
+            df, Const.FLD_EMA_30
+        )
 
+        for i in range(2, len(df)):
             decision = self._get_ema_cross_signal(
-                target_series=previous_bar, previous_series=second_previous_bar
+                target_delta=deltas[i - 1], previous_delta=deltas[i - 2]
             )
 
             if decision == SignalType.STRONG_BUY:
-                if current_cci <= self._strategy_config_mdl.max_value:
+                if cci_values[i] <= self._strategy_config_mdl.max_value:
                     decision = SignalType.NONE
             elif decision == SignalType.STRONG_SELL:
-                if current_cci >= self._strategy_config_mdl.miv_value:
+                if cci_values[i] >= self._strategy_config_mdl.miv_value:
                     decision = SignalType.NONE
 
-            signals.append(decision)
+            signals[i] = decision
 
         return signals
 
     def _determine_stop_loss_value(self, df: pd.DataFrame):
-        values = []
-
-        for i in range(len(df)):
-            value = 2 * df.iloc[i][Const.FLD_ATR]
-            values.append(value)
-
-        return values
+        # Stop Loss Value = 2 * ATR
+        return 2 * self._get_values(df, Const.FLD_ATR)
 
-    def _determine_take_profit_value(self, df: pd.DataFrame):
-        values = []
-
-        for i in range(len(df)):
-            value = 3 * df.iloc[i][Const.FLD_ATR]
-            values.append(value)
-
-        return values
-
-    def _get_ema_cross_signal(self, target_series, previous_series) -> SignalType:
-        target_ema_8 = target_series[Const.FLD_EMA_8]
-        target_ema_30 = target_series[Const.FLD_EMA_30]
-
-        previous_ema_8 = previous_series[Const.FLD_EMA_8]
-        previous_ema_30 = previous_series[Const.FLD_EMA_30]
-
-        target_delta = target_ema_8 - target_ema_30
-        previous_delta = previous_ema_8 - previous_ema_30
+    def _determine_take_profit_value(self, df: pd.DataFrame, stop_loss_values):
+        # Take Profit Value = 3 * ATR
+        return 3 * self._get_values(df, Const.FLD_ATR)
 
+    def _get_ema_cross_signal(self, target_delta, previous_delta) -> SignalType:
         if target_delta >= 0:
             # Current - LONG
             if previous_delta >= 0:
@@ -790,553 +1106,196 @@ class Strategy_EMA_8_CROSS_EMA_30_FILTER_CCI_14(StrategyBase):
 
         return decision
 
-    def _get_signal_decision(self, current_value, previous_value):
-        decision = ""
-        if self._max_value == 0 and self._min_value == 0:
-            if current_value > self._max_value and previous_value < self._max_value:
-                decision = Const.STRONG_BUY
-            elif current_value < self._max_value and previous_value > self._max_value:
-                decision = Const.STRONG_SELL
-        else:
-            if current_value > self._max_value:
-                if previous_value < self._max_value:
-                    decision = Const.BUY
-            elif current_value < self._min_value:
-                if previous_value > self._min_value:
-                    decision = Const.SELL
-            else:
-                if previous_value > self._max_value:
-                    decision = Const.STRONG_SELL
-                elif previous_value < self._min_value:
-                    decision = Const.STRONG_BUY
-
-        return decision
-
 
 class EMA_30_CROSS_EMA_100(Strategy_EMA_Base):
-    def get_strategy_data(self, param: StrategyParamModel):
-        super().get_strategy_data(param)
-
-        limit = param.limit + self._strategy_config_mdl.display_rows
-        history_limit = param.limit + self._strategy_config_mdl.history_limit
-
-        history_data_param = HistoryDataParamModel(**param.model_dump())
-        history_data_param.limit = history_limit
-
-        history_data_mdl = buffer_runtime_handler.get_history_data_handler(
-            trader_id=param.trader_id
-        ).get_history_data(history_data_param)
-
-        # Create your own Custom Strategy
-        CustomStrategy = ta.Strategy(
-            name="EMA_30_CROSS_EMA_100",
-            description="EMA 30 crosses EMA 100",
-            ta=[
-                {
-                    "kind": "ema",
-                    "length": 30,
-                    "col_names": (Const.FLD_EMA_30, "MULTIPROCESSING_OFF"),
-                },
-                {
-                    "kind": "ema",
-                    "length": 100,
-                    "col_names": (Const.FLD_EMA_100),
-                },
-            ],
-        )
-        # To run your "Custom Strategy"
-        df = pd.DataFrame(history_data_mdl.data)
-        df.ta.strategy(CustomStrategy)
-
-        # Remove initial values from DF
-        df = df.dropna(
-            subset=[
-                Const.FLD_EMA_30,
-                Const.FLD_EMA_100,
-            ]
-        )
-
-        # Calculate Strategy data only for requested limit + 3
-        df = df.tail(limit)
-
-        df.insert(df.shape[1], Const.FLD_SIGNAL, self._determine_signal(df))
-
-        # Determive Stop Loss Value
-        df.insert(
-            df.shape[1], Const.FLD_STOP_LOSS_VALUE, self._determine_stop_loss_value(df)
-        )
-
-        # Determive Take Profit Value
-        df.insert(
-            df.shape[1],
-            Const.FLD_TAKE_PROFIT_VALUE,
-            self._determine_take_profit_value(df),
-        )
-
-        return df
+    INDICATORS = [
+        {
+            "kind": "ema",
+            "length": 30,
+            "col_names": (Const.FLD_EMA_30, "MULTIPROCESSING_OFF"),
+        },
+        {
+            "kind": "ema",
+            "length": 100,
+            "col_names": (Const.FLD_EMA_100),
+        },
+    ]
+    REQUIRED_FIELDS = [
+        Const.FLD_EMA_30,
+        Const.FLD_EMA_100,
+    ]
 
     def _determine_stop_loss_value(self, df):
-        values = []
-        lv_ema_100_shift = 0.002
-
-        for i in range(len(df)):
-            stop_loss_value = 0
-
-            current_bar = df.iloc[i]
-            current_close = current_bar[Const.FLD_CLOSE]
-            current_ema_30 = current_bar[Const.FLD_EMA_30]
-            current_ema_100 = current_bar[Const.FLD_EMA_100]
-
-            # Stop Loss calculation
-            if current_ema_100 > current_ema_30:
-                # SHORT
-                # SL Price = EMA 100 + 0.5%
-                stop_loss_price = (1 + lv_ema_100_shift) * current_ema_100
-                if stop_loss_price > current_close:
-                    stop_loss_value = stop_loss_price - current_close
-                else:
-                    stop_loss_value = lv_ema_100_shift * current_ema_100
-            else:
-                # LONG
-                # SL Price = EMA 100 - 0.5%
-                stop_loss_price = (1 - lv_ema_100_shift) * current_ema_100
-                if stop_loss_price < current_close:
-                    stop_loss_value = current_close - stop_loss_price
-                else:
-                    stop_loss_value = lv_ema_100_shift * current_ema_100
-
-            values.append(stop_loss_value)
-
-        return values
-
-    def _determine_take_profit_value(self, df):
-        values = []
-
-        for i in range(len(df)):
-            take_profit_value = 0
-
-            current_bar = df.iloc[i]
-            stop_loss_value = current_bar[Const.FLD_STOP_LOSS_VALUE]
-
-            take_profit_value = 2 * stop_loss_value
-
-            values.append(take_profit_value)
+        return self._get_ema_stop_loss_values(
+            df,
+            ema_medium_field=Const.FLD_EMA_30,
+            ema_long_field=Const.FLD_EMA_100,
+            shift=0.002,
+        )
 
-        return values
+    def _determine_take_profit_value(self, df, stop_loss_values):
+        return 2 * stop_loss_values
 
     def _determine_signal(self, df):
-        signals = []
-
-        for i in range(len(df)):
-            decision = SignalType.NONE
-
-            if i < 1:
-                signals.append(decision)
-                continue
+        signals = [SignalType.NONE] * len(df)
 
-            current_bar = df.iloc[i]
-            previous_bar = df.iloc[i - 1]
+        deltas = self._get_ema_delta(
+            short_ema=self._get_values(df, Const.FLD_EMA_30),
+            long_ema=self._get_values(df, Const.FLD_EMA_100),
+        )
 
-            decision = self._get_ema_signal(
-                target_series=current_bar, previous_series=previous_bar
+        for i in range(1, len(df)):
+            signals[i] = self._get_ema_cross_signal(
+                delta_target_emas=deltas[i], delta_previous_emas=deltas[i - 1]
             )
 
-            signals.append(decision)
-
         return signals
 
-    def _get_ema_signal(self, target_series, previous_series) -> SignalType:
-        signal = SignalType.NONE
-
-        target_ema_30 = target_series[Const.FLD_EMA_30]
-        target_ema_100 = target_series[Const.FLD_EMA_100]
-
-        previous_ema_30 = previous_series[Const.FLD_EMA_30]
-        previous_ema_100 = previous_series[Const.FLD_EMA_100]
-
-        delta_target_ema_30_100 = self._get_ema_delta(
-            short_ema=target_ema_30, long_ema=target_ema_100
-        )
-        delta_previous_ema_30_100 = self._get_ema_delta(
-            short_ema=previous_ema_30, long_ema=previous_ema_100
-        )
-
-        if delta_target_ema_30_100 > 0:
-            # Current - LONG
-            if delta_previous_ema_30_100 <= 0:
-                # Previous - SHORT
-                signal = SignalType.STRONG_BUY
-        else:
-            # Current - SHORT
-            if delta_previous_ema_30_100 >= 0:
-                # Previous - LONG
-                signal = SignalType.STRONG_SELL
-
-        return signal
-
 
 class EMA_30_CROSS_EMA_100_FILTER_CCI_50(Strategy_EMA_Base):
-    def get_strategy_data(self, param: StrategyParamModel):
-        super().get_strategy_data(param)
-
-        limit = param.limit + self._strategy_config_mdl.display_rows
-        history_limit = param.limit + self._strategy_config_mdl.history_limit
-
-        history_data_param = HistoryDataParamModel(**param.model_dump())
-        history_data_param.limit = history_limit
-
-        history_data_mdl = buffer_runtime_handler.get_history_data_handler(
-            trader_id=param.trader_id
-        ).get_history_data(history_data_param)
-
-        # Create your own Custom Strategy
-        CustomStrategy = ta.Strategy(
-            name="EMA_30_CROSS_EMA_100_FILTER_CCI_50",
-            description="EMA 30 cross EMA 100 with filter CCI(20) +/- 100 and Trend CCi(50)",
-            ta=[
-                {
-                    "kind": "cci",
-                    "length": 50,
-                    "col_names": (Const.FLD_CCI, "MULTIPROCESSING_OFF"),
-                },
-                {
-                    "kind": "ema",
-                    "length": 30,
-                    "col_names": (Const.FLD_EMA_30),
-                },
-                {
-                    "kind": "ema",
-                    "length": 100,
-                    "col_names": (Const.FLD_EMA_100),
-                },
-            ],
-        )
-        # To run your "Custom Strategy"
-        df = pd.DataFrame(history_data_mdl.data)
-        df.ta.strategy(CustomStrategy)
+    INDICATORS = [
+        {
+            "kind": "cci",
+            "length": 50,
+            "col_names": (Const.FLD_CCI, "MULTIPROCESSING_OFF"),
+        },
+        {
+            "kind": "ema",
+            "length": 30,
+            "col_names": (Const.FLD_EMA_30),
+        },
+        {
+            "kind": "ema",
+            "length": 100,
+            "col_names": (Const.FLD_EMA_100),
+        },
+    ]
+    REQUIRED_FIELDS = [
+        Const.FLD_CCI,
+        Const.FLD_EMA_30,
+        Const.FLD_EMA_100,
+    ]
+
+    # Signal of the bar requires the trend counter of 10 previous bars
+    TREND_LIMIT = 10
+    LEAD_ROWS = TREND_LIMIT
+    LATEST_ONLY_ROWS = TREND_LIMIT + 1
 
-        # Remove initial values from DF
-        df = df.dropna(
-            subset=[
-                Const.FLD_CCI,
-                Const.FLD_EMA_30,
-                Const.FLD_EMA_100,
-            ]
+    def _determine_stop_loss_value(self, df):
+        return self._get_ema_stop_loss_values(
+            df,
+            ema_medium_field=Const.FLD_EMA_30,
+            ema_long_field=Const.FLD_EMA_100,
+            shift=0.01,
         )
 
-        # Exclude rest data from calculation
-        df = df.tail(limit + 10)
-
-        df.insert(df.shape[1], Const.FLD_SIGNAL, self._determine_signal(df))
+    def _determine_take_profit_value(self, df, stop_loss_values):
+        return stop_loss_values
 
-        # Determive Stop Loss Value
-        df.insert(
-            df.shape[1], Const.FLD_STOP_LOSS_VALUE, self._determine_stop_loss_value(df)
-        )
+    def _determine_signal(self, df):
+        signals = [SignalType.NONE] * len(df)
 
-        # Determive Take Profit Value
-        df.insert(
-            df.shape[1],
-            Const.FLD_TAKE_PROFIT_VALUE,
-            self._determine_take_profit_value(df),
+        cci_values = self._get_values(df, Const.FLD_CCI)
+        deltas = self._get_ema_delta(
+            short_ema=self._get_values(df, Const.FLD_EMA_30),
+            long_ema=self._get_values(df, Const.FLD_EMA_100),
         )
 
-        # Calculate Strategy data only for requested limit + 3
-        df = df.tail(limit)
-
-        return df
-
-    def _determine_stop_loss_value(self, df):
-        values = []
-        lv_ema_100_shift = 0.01
-
-        for i in range(len(df)):
-            stop_loss_value = 0
-
-            current_bar = df.iloc[i]
-            current_close = current_bar[Const.FLD_CLOSE]
-            current_ema_30 = current_bar[Const.FLD_EMA_30]
-            current_ema_100 = current_bar[Const.FLD_EMA_100]
-
-            # Stop Loss calculation
-            if current_ema_100 > current_ema_30:
-                # SHORT
-                # SL Price = EMA 100 + 0.5%
-                stop_loss_price = (1 + lv_ema_100_shift) * current_ema_100
-                if stop_loss_price > current_close:
-                    stop_loss_value = stop_loss_price - current_close
-                else:
-                    stop_loss_value = lv_ema_100_shift * current_ema_100
-            else:
-                # LONG
-                # SL Price = EMA 100 - 0.5%
-                stop_loss_price = (1 - lv_ema_100_shift) * current_ema_100
-                if stop_loss_price < current_close:
-                    stop_loss_value = current_close - stop_loss_price
-                else:
-                    stop_loss_value = lv_ema_100_shift * current_ema_100
-
-            values.append(stop_loss_value)
-
-        return values
-
-    def _determine_take_profit_value(self, df):
-        values = []
-
-        for i in range(len(df)):
-            take_profit_value = 0
-
-            current_bar = df.iloc[i]
-            stop_loss_value = current_bar[Const.FLD_STOP_LOSS_VALUE]
-
-            take_profit_value = stop_loss_value
-
-            values.append(take_profit_value)
-
-        return values
-
-    def _determine_signal(self, df):
-        signals = []
-
-        LIMIT = 10
         trend_up_counter = 0
         trend_down_counter = 0
 
         for i in range(len(df)):
-            decision = SignalType.NONE
-
-            current_bar = df.iloc[i]
-            current_cci = current_bar[Const.FLD_CCI]
-
             # Calculate counter of trend bars
-            if current_cci > 0:
+            if cci_values[i] > 0:
                 trend_up_counter += 1
                 trend_down_counter = 0
             else:
                 trend_down_counter += 1
                 trend_up_counter = 0
 
-            if i < 10:
-                signals.append(decision)
+            if i < self.TREND_LIMIT:
                 continue
 
-            previous_bar = df.iloc[i - 1]
-
-            decision = self._get_ema_signal(
-                target_series=current_bar, previous_series=previous_bar
+            decision = self._get_ema_cross_signal(
+                delta_target_emas=deltas[i], delta_previous_emas=deltas[i - 1]
             )
 
             if decision == SignalType.STRONG_BUY:
-                if trend_up_counter >= LIMIT:
-                    pass
-                else:
+                if trend_up_counter < self.TREND_LIMIT:
                     decision = SignalType.BUY
             elif decision == SignalType.STRONG_SELL:
-                if trend_down_counter >= LIMIT:
-                    pass
-                else:
+                if trend_down_counter < self.TREND_LIMIT:
                     decision = SignalType.SELL
-            else:
-                decision = SignalType.NONE
 
-            signals.append(decision)
+            signals[i] = decision
 
         return signals
 
-    def _get_ema_signal(self, target_series, previous_series) -> SignalType:
-        signal = SignalType.NONE
-
-        target_ema_30 = target_series[Const.FLD_EMA_30]
-        target_ema_100 = target_series[Const.FLD_EMA_100]
-
-        previous_ema_30 = previous_series[Const.FLD_EMA_30]
-        previous_ema_100 = previous_series[Const.FLD_EMA_100]
-
-        delta_target_ema_30_100 = self._get_ema_delta(
-            short_ema=target_ema_30, long_ema=target_ema_100
-        )
-        delta_previous_ema_30_100 = self._get_ema_delta(
-            short_ema=previous_ema_30, long_ema=previous_ema_100
-        )
-
-        if delta_target_ema_30_100 > 0:
-            # Current - LONG
-            if delta_previous_ema_30_100 <= 0:
-                # Previous - SHORT
-                signal = SignalType.STRONG_BUY
-        else:
-            # Current - SHORT
-            if delta_previous_ema_30_100 >= 0:
-                # Previous - LONG
-                signal = SignalType.STRONG_SELL
-
-        return signal
-
 
 class EMA_8_CROSS_EMA_30_FILTER_EMA_100(Strategy_EMA_Base):
-    def get_strategy_data(self, param: StrategyParamModel):
-        super().get_strategy_data(param)
-
-        limit = param.limit + self._strategy_config_mdl.display_rows
-        history_limit = param.limit + self._strategy_config_mdl.history_limit
-
-        history_data_param = HistoryDataParamModel(**param.model_dump())
-        history_data_param.limit = history_limit
-
-        history_data_mdl = buffer_runtime_handler.get_history_data_handler(
-            trader_id=param.trader_id
-        ).get_history_data(history_data_param)
-
-        # Create your own Custom Strategy
-        CustomStrategy = ta.Strategy(
-            name="EMA_8_CROSS_EMA_30_FILTER_EMA_100",
-            description="EMA 30 cross EMA 30 with filter EMA 100",
-            ta=[
-                {
-                    "kind": "atr",
-                    "length": 14,
-                    "col_names": (Const.FLD_ATR, "MULTIPROCESSING_OFF"),
-                },
-                {
-                    "kind": "ema",
-                    "length": 8,
-                    "col_names": (Const.FLD_EMA_SHORT),
-                },
-                {
-                    "kind": "ema",
-                    "length": 30,
-                    "col_names": (Const.FLD_EMA_MEDIUM),
-                },
-                {
-                    "kind": "ema",
-                    "length": 100,
-                    "col_names": (Const.FLD_EMA_LONG),
-                },
-            ],
-        )
-        # To run your "Custom Strategy"
-        df = pd.DataFrame(history_data_mdl.data)
-        df.ta.strategy(CustomStrategy)
-
-        # Remove initial values from DF
-        df = df.dropna(
-            subset=[
-                Const.FLD_EMA_SHORT,
-                Const.FLD_EMA_MEDIUM,
-                Const.FLD_EMA_LONG,
-            ]
-        )
-
-        # Calculate Strategy data only for requested limit + 3
-        df = df.tail(limit)
-
-        df.insert(df.shape[1], Const.FLD_TREND, self._determine_trend(df))
-
-        df.insert(df.shape[1], Const.FLD_SIGNAL, self._determine_signal(df))
-
-        # Determive Stop Loss Value
-        df.insert(
-            df.shape[1], Const.FLD_STOP_LOSS_VALUE, self._determine_stop_loss_value(df)
-        )
-
-        # Determive Take Profit Value
-        df.insert(
-            df.shape[1],
-            Const.FLD_TAKE_PROFIT_VALUE,
-            self._determine_take_profit_value(df),
-        )
-
-        return df
+    INDICATORS = [
+        {
+            "kind": "atr",
+            "length": 14,
+            "col_names": (Const.FLD_ATR, "MULTIPROCESSING_OFF"),
+        },
+        {
+            "kind": "ema",
+            "length": 8,
+            "col_names": (Const.FLD_EMA_SHORT),
+        },
+        {
+            "kind": "ema",
+            "length": 30,
+            "col_names": (Const.FLD_EMA_MEDIUM),
+        },
+        {
+            "kind": "ema",
+            "length": 100,
+            "col_names": (Const.FLD_EMA_LONG),
+        },
+    ]
+    REQUIRED_FIELDS = [
+        Const.FLD_EMA_SHORT,
+        Const.FLD_EMA_MEDIUM,
+        Const.FLD_EMA_LONG,
+    ]
+
+    WITH_TREND = True
 
     def _determine_stop_loss_value(self, df):
-        values = []
-        lv_ema_100_shift = 0.002
-
-        for i in range(len(df)):
-            stop_loss_value = 0
-
-            current_bar = df.iloc[i]
-            current_close = current_bar[Const.FLD_CLOSE]
-            current_ema_30 = current_bar[Const.FLD_EMA_MEDIUM]
-            current_ema_100 = current_bar[Const.FLD_EMA_LONG]
-
-            # Stop Loss calculation
-            if current_ema_100 > current_ema_30:
-                # SHORT
-                # SL Price = EMA 100 + 0.5%
-                stop_loss_price = (1 + lv_ema_100_shift) * current_ema_100
-                if stop_loss_price > current_close:
-                    stop_loss_value = stop_loss_price - current_close
-                else:
-                    stop_loss_value = lv_ema_100_shift * current_ema_100
-            else:
-                # LONG
-                # SL Price = EMA 100 - 0.5%
-                stop_loss_price = (1 - lv_ema_100_shift) * current_ema_100
-                if stop_loss_price < current_close:
-                    stop_loss_value = current_close - stop_loss_price
-                else:
-                    stop_loss_value = lv_ema_100_shift * current_ema_100
-
-            values.append(stop_loss_value)
-
-        return values
-
-    def _determine_take_profit_value(self, df):
-        values = []
-
-        for i in range(len(df)):
-            take_profit_value = 0
-
-            current_bar = df.iloc[i]
-            stop_loss_value = current_bar[Const.FLD_STOP_LOSS_VALUE]
-
-            take_profit_value = 2 * stop_loss_value
-
-            values.append(take_profit_value)
+        return self._get_ema_stop_loss_values(
+            df,
+            ema_medium_field=Const.FLD_EMA_MEDIUM,
+            ema_long_field=Const.FLD_EMA_LONG,
+            shift=0.002,
+        )
 
-        return values
+    def _determine_take_profit_value(self, df, stop_loss_values):
+        return 2 * stop_loss_values
 
     def _determine_signal(self, df):
-        signals = []
+        signals = [SignalType.NONE] * len(df)
 
-        for i in range(len(df)):
-            signal = SignalType.NONE
-
-            if i < 1:
-                signals.append(signal)
-                continue
+        trends = self._get_values(df, Const.FLD_TREND)
 
-            current_bar = df.iloc[i]
-            previous_bar = df.iloc[i - 1]
+        for i in range(1, len(df)):
+            current_trend = trends[i]
+            previous_trend = trends[i - 1]
 
-            current_trend = current_bar[Const.FLD_TREND]
-            previous_trend = previous_bar[Const.FLD_TREND]
+            if previous_trend not in [
+                TrendDirectionType.TREND_DOWN,
+                TrendDirectionType.TREND_UP,
+            ]:
+                continue
 
             if current_trend == TrendDirectionType.STRONG_TREND_UP:
-                if previous_trend in [
-                    TrendDirectionType.TREND_DOWN,
-                    TrendDirectionType.TREND_UP,
-                ]:
-                    # 8 upper 30 - this scenario is for open LONG position, when previous bar has TREND_UP
-                    signal = SignalType.STRONG_BUY
-                else:
-                    signal = SignalType.NONE
+                # 8 upper 30 - this scenario is for open LONG position, when previous bar has TREND_UP
+                signals[i] = SignalType.STRONG_BUY
 
             elif current_trend == TrendDirectionType.STRONG_TREND_DOWN:
-                if previous_trend in [
-                    TrendDirectionType.TREND_DOWN,
-                    TrendDirectionType.TREND_UP,
-                ]:
-                    # 8 lower 30 - this scenario is for open SHORT position, when previous bar has TREND_DOWN
-                    signal = SignalType.STRONG_SELL
-                else:
-                    signal = SignalType.NONE
-
-            else:
-                signal = SignalType.NONE
-
-            signals.append(signal)
+                # 8 lower 30 - this scenario is for open SHORT position, when previous bar has TREND_DOWN
+                signals[i] = SignalType.STRONG_SELL
 
         return signals
 
@@ -1358,221 +1317,162 @@ class EMA_50_CROSS_EMA_100_FILTER_UP_LEVEL_TREND(Strategy_EMA_Base):
     TP limit = 70 % (0.7)
     """
 
+    INDICATORS = [
+        # {
+        #     "kind": "bbands",
+        #     "length": 20,
+        #     "col_names": (
+        #         Const.FLD_BB_LOWER,
+        #         Const.FLD_BB_MID,
+        #         Const.FLD_BB_UPPER,
+        #         Const.FLD_BB_BANDWIDTH,
+        #         Const.FLD_BB_PERCENT,
+        #         "MULTIPROCESSING_OFF",
+        #     ),
+        # },
+        {
+            "kind": "atr",
+            "length": 14,
+            "col_names": (Const.FLD_ATR, "MULTIPROCESSING_OFF"),
+        },
+        {
+            "kind": "ema",
+            "length": 50,
+            "col_names": (Const.FLD_EMA_SHORT),
+        },
+        {
+            "kind": "ema",
+            "length": 100,
+            "col_names": (Const.FLD_EMA_LONG),
+        },
+    ]
+    REQUIRED_FIELDS = [
+        Const.FLD_EMA_SHORT,
+        Const.FLD_EMA_LONG,
+    ]
+
+    WITH_TREND = True
+
     SUFFIX_UP_LEVEL = "_up_level"
     FLD_EMA_LONG_UP_LEVEL = Const.FLD_EMA_LONG + SUFFIX_UP_LEVEL
     FLD_SIGNAL_UP_LEVEL = Const.FLD_SIGNAL + SUFFIX_UP_LEVEL
     FLD_ATR_UP_LEVEL = Const.FLD_ATR + SUFFIX_UP_LEVEL
 
-    def get_strategy_data(self, param: StrategyParamModel):
-        super().get_strategy_data(param)
+    UP_LEVEL_STRATEGY = StrategyType.EMA_8_CROSS_EMA_30_FILTER_EMA_100
 
-        limit = param.limit + self._strategy_config_mdl.display_rows
-        history_limit = param.limit + self._strategy_config_mdl.history_limit
+    TRENDS_DOWN = [
+        TrendDirectionType.TREND_DOWN,
+        TrendDirectionType.STRONG_TREND_DOWN,
+    ]
+    TRENDS_UP = [
+        TrendDirectionType.STRONG_TREND_UP,
+        TrendDirectionType.TREND_UP,
+    ]
 
-        history_data_param = HistoryDataParamModel(**param.model_dump())
-        history_data_param.limit = history_limit
-
-        history_data_mdl = buffer_runtime_handler.get_history_data_handler(
-            trader_id=param.trader_id
-        ).get_history_data(history_data_param)
-
-        # Create your own Custom Strategy
-        CustomStrategy = ta.Strategy(
-            name="EMA_50_CROSS_EMA_100_FILTER_UP_LEVEL_TREND",
-            description="EMA 50 cross EMA 100 with filter Up Level Trend",
-            ta=[
-                # {
-                #     "kind": "bbands",
-                #     "length": 20,
-                #     "col_names": (
-                #         Const.FLD_BB_LOWER,
-                #         Const.FLD_BB_MID,
-                #         Const.FLD_BB_UPPER,
-                #         Const.FLD_BB_BANDWIDTH,
-                #         Const.FLD_BB_PERCENT,
-                #         "MULTIPROCESSING_OFF",
-                #     ),
-                # },
-                {
-                    "kind": "atr",
-                    "length": 14,
-                    "col_names": (Const.FLD_ATR, "MULTIPROCESSING_OFF"),
-                },
-                {
-                    "kind": "ema",
-                    "length": 50,
-                    "col_names": (Const.FLD_EMA_SHORT),
-                },
-                {
-                    "kind": "ema",
-                    "length": 100,
-                    "col_names": (Const.FLD_EMA_LONG),
-                },
-            ],
-        )
-        # To run your "Custom Strategy"
-        df = pd.DataFrame(history_data_mdl.data)
-        df.ta.strategy(CustomStrategy)
-
-        # Remove initial values from DF
-        df = df.dropna(
-            subset=[
-                Const.FLD_EMA_SHORT,
-                Const.FLD_EMA_LONG,
-            ]
-        )
-
-        # Exclude rest data from calculation
-        df = df.tail(limit)
-
-        df.insert(df.shape[1], Const.FLD_TREND, self._determine_trend(df))
+    def _prepare_data(
+        self, df: pd.DataFrame, param: StrategyParamModel
+    ) -> pd.DataFrame:
+        df = super()._prepare_data(df, param)
 
         # Generate Up Trend Param
         up_level_param = self._get_up_level_param(param)
-        up_level_param.strategy = StrategyType.EMA_8_CROSS_EMA_30_FILTER_EMA_100
 
         if not up_level_param:
-            merged_df = df
-        else:
-            up_level_df = StrategyFactory.get_strategy_data(up_level_param)
-
-            # Assuming cci and trend are your DataFrames
-            # Reset index to make the datetime column a regular column
-            df.reset_index(inplace=True)
-            up_level_df.reset_index(inplace=True)
-
-            # Merge the DataFrames based on the datetime column
-            merged_df = pd.merge_asof(
-                df,
-                up_level_df[
-                    [
-                        Const.COLUMN_DATETIME,
-                        Const.FLD_TREND,
-                        Const.FLD_EMA_LONG,
-                        Const.FLD_SIGNAL,
-                        Const.FLD_ATR,
-                    ]
-                ],
-                left_on=Const.COLUMN_DATETIME,
-                right_on=Const.COLUMN_DATETIME,
-                direction="backward",
-                suffixes=("", "_up_level"),
-            )
-
-            merged_df = merged_df.rename(
-                columns={Const.FLD_SIGNAL: self.FLD_SIGNAL_UP_LEVEL}
-            )
-
-            # Set the datetime column as the index again
-            merged_df.set_index(Const.COLUMN_DATETIME, inplace=True)
-
-        merged_df.insert(
-            merged_df.shape[1], Const.FLD_SIGNAL, self._determine_signal(merged_df)
+            return df
+
+        up_level_param.strategy = self.UP_LEVEL_STRATEGY
+        up_level_df = StrategyFactory.get_strategy_data(up_level_param)
+
+        # Reset index to make the datetime column a regular column
+        df = df.reset_index()
+        up_level_df = up_level_df.reset_index()
+
+        # Merge the DataFrames based on the datetime column
+        merged_df = pd.merge_asof(
+            df,
+            up_level_df[
+                [
+                    Const.COLUMN_DATETIME,
+                    Const.FLD_TREND,
+                    Const.FLD_EMA_LONG,
+                    Const.FLD_SIGNAL,
+                    Const.FLD_ATR,
+                ]
+            ],
+            left_on=Const.COLUMN_DATETIME,
+            right_on=Const.COLUMN_DATETIME,
+            direction="backward",
+            suffixes=("", self.SUFFIX_UP_LEVEL),
         )
 
-        # Determive Stop Loss Value
-        merged_df.insert(
-            merged_df.shape[1],
-            Const.FLD_STOP_LOSS_VALUE,
-            self._determine_stop_loss_value(merged_df),
+        merged_df = merged_df.rename(
+            columns={Const.FLD_SIGNAL: self.FLD_SIGNAL_UP_LEVEL}
         )
 
-        # Determive Take Profit Value
-        merged_df.insert(
-            merged_df.shape[1],
-            Const.FLD_TAKE_PROFIT_VALUE,
-            self._determine_take_profit_value(merged_df),
-        )
+        # Set the datetime column as the index again
+        merged_df.set_index(Const.COLUMN_DATETIME, inplace=True)
 
         return merged_df
 
     def _determine_stop_loss_value(self, df):
-        values = []
-
-        for i in range(len(df)):
-            stop_loss_value = 0
-
-            current_bar = df.iloc[i]
-            current_close = current_bar[Const.FLD_CLOSE]
-            up_level_trend = current_bar[Const.FLD_TREND_UP_LEVEL]
-            current_ema_long_up_level = current_bar[self.FLD_EMA_LONG_UP_LEVEL]
-            up_level_atr_value = current_bar[self.FLD_ATR_UP_LEVEL]
-
-            # Stop Loss calculation
-            if up_level_trend in [
-                TrendDirectionType.TREND_DOWN,
-                TrendDirectionType.STRONG_TREND_DOWN,
-            ]:
-                # SHORT
-                stop_loss_price = current_ema_long_up_level + up_level_atr_value
-                stop_loss_value = stop_loss_price - current_close
-
-            else:
-                # LONG
-                stop_loss_price = current_ema_long_up_level - up_level_atr_value
-                stop_loss_value = current_close - stop_loss_price
-
-            values.append(stop_loss_value)
-
-        return values
-
-    def _determine_take_profit_value(self, df):
-        values = []
-
-        for i in range(len(df)):
-            take_profit_value = 0
-
-            current_bar = df.iloc[i]
-            # up_level_atr_value = current_bar[self.FLD_ATR_UP_LEVEL]
-            stop_loss_value = current_bar[Const.FLD_STOP_LOSS_VALUE]
+        return self._get_up_level_stop_loss_values(
+            df, ema_long=self._get_values(df, self.FLD_EMA_LONG_UP_LEVEL)
+        )
 
-            take_profit_value = stop_loss_value
+    def _determine_take_profit_value(self, df, stop_loss_values):
+        return stop_loss_values
 
-            values.append(take_profit_value)
+    def _get_up_level_stop_loss_values(self, df, ema_long):
+        close = self._get_values(df, Const.FLD_CLOSE)
+        up_level_atr_values = self._get_values(df, self.FLD_ATR_UP_LEVEL)
+        is_trend_down = np.array(
+            [
+                trend in self.TRENDS_DOWN
+                for trend in self._get_values(df, Const.FLD_TREND_UP_LEVEL)
+            ],
+            dtype=bool,
+        )
 
-        return values
+        # SHORT: SL Price = EMA long + ATR up level
+        # LONG: SL Price = EMA long - ATR up level
+        return np.where(
+            is_trend_down,
+            ema_long + up_level_atr_values - close,
+            close - (ema_long - up_level_atr_values),
+        )
 
     def _determine_signal(self, df):
-        signals = []
-
-        for i in range(len(df)):
-            signal = SignalType.NONE
+        signals = [SignalType.NONE] * len(df)
 
-            if i < 1:
-                signals.append(signal)
-                continue
-
-            current_bar = df.iloc[i]
-            previous_bar = df.iloc[i - 1]
+        trends = self._get_values(df, Const.FLD_TREND)
+        trends_up_level = self._get_values(df, Const.FLD_TREND_UP_LEVEL)
+        signals_up_level = self._get_values(df, self.FLD_SIGNAL_UP_LEVEL)
 
-            current_trend = current_bar[Const.FLD_TREND]
-            previous_trend = previous_bar[Const.FLD_TREND]
+        for i in range(1, len(df)):
+            current_trend = trends[i]
+            previous_trend = trends[i - 1]
 
-            trend_up_level = current_bar[Const.FLD_TREND_UP_LEVEL]
-            signal_up_level = current_bar[self.FLD_SIGNAL_UP_LEVEL]
+            trend_up_level = trends_up_level[i]
+            signal_up_level = signals_up_level[i]
 
-            if current_trend == TrendDirectionType.TREND_UP and trend_up_level in [
-                TrendDirectionType.STRONG_TREND_UP,
-                TrendDirectionType.TREND_UP,
-            ]:
+            if (
+                current_trend == TrendDirectionType.TREND_UP
+                and trend_up_level in self.TRENDS_UP
+            ):
                 if previous_trend == TrendDirectionType.TREND_DOWN:
-                    signal = SignalType.STRONG_BUY
+                    signals[i] = SignalType.STRONG_BUY
 
-            elif current_trend == TrendDirectionType.TREND_DOWN and trend_up_level in [
-                TrendDirectionType.STRONG_TREND_DOWN,
-                TrendDirectionType.TREND_DOWN,
-            ]:
+            elif (
+                current_trend == TrendDirectionType.TREND_DOWN
+                and trend_up_level in self.TRENDS_DOWN
+            ):
                 if previous_trend == TrendDirectionType.TREND_UP:
-                    signal = SignalType.STRONG_SELL
+                    signals[i] = SignalType.STRONG_SELL
 
             elif signal_up_level == SignalType.STRONG_BUY:
-                signal = SignalType.BUY
+                signals[i] = SignalType.BUY
             elif signal_up_level == SignalType.STRONG_SELL:
-                signal = SignalType.SELL
-            else:
-                signal = SignalType.NONE
-
-            signals.append(signal)
+                signals[i] = SignalType.SELL
 
         return signals
 
@@ -1581,47 +1481,9 @@ class EMA_50_CROSS_EMA_100_FILTER_UP_LEVEL_TREND_TP(
     EMA_50_CROSS_EMA_100_FILTER_UP_LEVEL_TREND
 ):
     def _determine_stop_loss_value(self, df):
-        values = []
-
-        for i in range(len(df)):
-            stop_loss_value = 0
-
-            current_bar = df.iloc[i]
-            current_close = current_bar[Const.FLD_CLOSE]
-            up_level_trend = current_bar[Const.FLD_TREND_UP_LEVEL]
-            current_ema_long = current_bar[Const.FLD_EMA_LONG]
-            up_level_atr_value = current_bar[self.FLD_ATR_UP_LEVEL]
-
-            # Stop Loss calculation
-            if up_level_trend in [
-                TrendDirectionType.TREND_DOWN,
-                TrendDirectionType.STRONG_TREND_DOWN,
-            ]:
-                # SHORT
-                stop_loss_price = current_ema_long + up_level_atr_value
-                stop_loss_value = stop_loss_price - current_close
-
-            else:
-                # LONG
-                stop_loss_price = current_ema_long - up_level_atr_value
-                stop_loss_value = current_close - stop_loss_price
-
-            values.append(stop_loss_value)
-
-        return values
-
-    def _determine_take_profit_value(self, df):
-        values = []
-
-        for i in range(len(df)):
-            take_profit_value = 0
-
-            current_bar = df.iloc[i]
-            up_level_atr_value = current_bar[self.FLD_ATR_UP_LEVEL]
-            # stop_loss_value = current_bar[Const.FLD_STOP_LOSS_VALUE]
-
-            take_profit_value = 2 * up_level_atr_value
-
-            values.append(take_profit_value)
+        return self._get_up_level_stop_loss_values(
+            df, ema_long=self._get_values(df, Const.FLD_EMA_LONG)
+        )
 
-        return values
+    def _determine_take_profit_value(self, df, stop_loss_values):
+        return 2 * self._get_values(df, self.FLD_ATR_UP_LEVEL)
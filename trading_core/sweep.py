@@ -0,0 +1,325 @@
+import itertools
+import pandas_ta as ta
+import pandas as pd
+import numpy as np
+
+from .constants import Const
+from .core import logger, config
+from .common import (
+    StrategyType,
+    StrategyConfigModel,
+    StrategyParamModel,
+    HistoryDataParamModel,
+)
+from .handler import buffer_runtime_handler
+from .indicator import IndicatorWarmUp
+from .strategy import StrategyFactory
+
+
+class StrategySweep:
+    """
+    Evaluates a grid of strategy config values over the same history data.
+    Every distinct indicator series is calculated once and shared between the combinations.
+
+    The combinations are ranked by the signal-only return: a position is opened by a signal at close
+    of the bar and is held until an opposite signal. SL/TP, trailing stops and fees of the risk manager
+    aren't applied, so the values differ from the /history_simulation results of the same config.
+    """
+
+    FAMILY_CCI = "CCI"
+    FAMILY_EMA_CROSS = "EMA_CROSS"
+    FAMILY_EMA_CROSS_FILTER_CCI = "EMA_CROSS_FILTER_CCI"
+
+    FAMILY_FIELDS = {
+        FAMILY_CCI: ["length", "miv_value", "max_value"],
+        FAMILY_EMA_CROSS: ["ema_short", "ema_long"],
+        FAMILY_EMA_CROSS_FILTER_CCI: [
+            "ema_short",
+            "ema_long",
+            "length",
+            "miv_value",
+            "max_value",
+        ],
+    }
+
+    FLD_SIGNAL_RETURN = "signal_return"
+    FLD_SIGNAL_MAX_DRAWDOWN = "signal_max_drawdown"
+    FLD_TRADES = "trades"
+
+    def run(
+        self, param: StrategyParamModel, grid: dict, top: int = None
+    ) -> list[dict]:
+        if config.get_config_value(Const.CONF_PROPERTY_CORE_LOG):
+            logger.info(
+                f"{self.__class__.__name__}: run({param.model_dump()}, grid: {grid})"
+            )
+
+        strategy_config_mdl = StrategyFactory.get_strategy_config(param.strategy)
+        family = self._get_family(param.strategy)
+
+        combinations = self._get_combinations(
+            strategy_config_mdl=strategy_config_mdl,
+            fields=self.FAMILY_FIELDS[family],
+            grid=grid,
+        )
+        if not combinations:
+            return []
+
+        history_df = self._get_history_data(
+            param=param,
+            strategy_config_mdl=strategy_config_mdl,
+            combinations=combinations,
+        )
+
+        indicators = self._get_indicators(history_df, family, combinations)
+
+        signals = np.vstack(
+            [
+                self._get_signals(family, indicators, combination)
+                for combination in combinations
+            ]
+        )
+
+        results = self._evaluate(
+            close=history_df[Const.COLUMN_CLOSE].to_numpy(dtype=float),
+            signals=signals,
+            combinations=combinations,
+            limit=param.limit,
+        )
+
+        # Combinations with the same return keep the order of the grid
+        results = sorted(results, key=lambda x: -x[self.FLD_SIGNAL_RETURN])
+
+        return results[:top] if top else results
+
+    def _get_family(self, strategy: StrategyType) -> str:
+        if strategy in [
+            StrategyType.CCI_50_CROSS_0,
+            StrategyType.CCI_14_CROSS_100,
+            StrategyType.CCI_20_CROSS_100,
+            StrategyType.CCI_50_CROSS_100,
+        ]:
+            return self.FAMILY_CCI
+        elif strategy == StrategyType.EMA_30_CROSS_EMA_100:
+            return self.FAMILY_EMA_CROSS
+        elif strategy == StrategyType.EMA_8_CROSS_EMA_30_FILTER_CCI_14:
+            return self.FAMILY_EMA_CROSS_FILTER_CCI
+        else:
+            raise Exception(
+                f"{self.__class__.__name__}: Parameter sweep isn't supported for the strategy {strategy}"
+            )
+
+    def _get_combinations(
+        self, strategy_config_mdl: StrategyConfigModel, fields: list, grid: dict
+    ) -> list[dict]:
+        for name in grid:
+            if name not in fields:
+                raise Exception(
+                    f"{self.__class__.__name__}: Parameter {name} can't be swept for the strategy {strategy_config_mdl.strategy}. Possible parameters: {fields}"
+                )
+
+        # Parameters which aren't in the grid are taken from the strategy config
+        values = [
+            grid[name] if name in grid else [getattr(strategy_config_mdl, name)]
+            for name in fields
+        ]
+
+        combinations = []
+        for combination_values in itertools.product(*values):
+            combination = dict(zip(fields, combination_values))
+
+            if "ema_short" in combination and not (
+                0 < combination["ema_short"] < combination["ema_long"]
+            ):
+                continue
+
+            if "miv_value" in combination and (
+                combination["miv_value"] > combination["max_value"]
+            ):
+                continue
+
+            if "length" in combination and combination["length"] <= 0:
+                continue
+
+            combinations.append(combination)
+
+        return combinations
+
+    def _get_history_data(
+        self,
+        param: StrategyParamModel,
+        strategy_config_mdl: StrategyConfigModel,
+        combinations: list[dict],
+    ) -> pd.DataFrame:
+        max_length = max(
+            max(
+                combination.get("length", 0),
+                combination.get("ema_long", 0),
+            )
+            for combination in combinations
+        )
+
+        # EMAs require several lengths of bars to converge, the tolerance can reduce the fixed warm-up only
+        fixed_warm_up = max(strategy_config_mdl.history_limit, 3 * max_length)
+
+        warm_up = 0
+        for combination in combinations:
+            if "ema_long" in combination:
+                warm_up = max(
+                    warm_up,
+                    IndicatorWarmUp.get_warm_up(
+                        kind="ema", length=combination["ema_long"]
+                    ),
+                )
+            if "length" in combination:
+                warm_up = max(
+                    warm_up,
+                    IndicatorWarmUp.get_warm_up(
+                        kind="cci", length=combination["length"]
+                    ),
+                )
+
+        history_data_param = HistoryDataParamModel(**param.model_dump())
+        history_data_param.limit = param.limit + min(warm_up, fixed_warm_up)
+
+        history_data_mdl = buffer_runtime_handler.get_history_data_handler(
+            trader_id=param.trader_id
+        ).get_history_data(history_data_param)
+
+        return history_data_mdl.data
+
+    def _get_indicators(
+        self, history_df: pd.DataFrame, family: str, combinations: list[dict]
+    ) -> dict:
+        indicators = {}
+
+        for combination in combinations:
+            if family in [self.FAMILY_EMA_CROSS, self.FAMILY_EMA_CROSS_FILTER_CCI]:
+                for length in [combination["ema_short"], combination["ema_long"]]:
+                    key = (Const.FLD_EMA, length)
+                    if key not in indicators:
+                        indicators[key] = self._to_numpy(
+                            history_df.ta.ema(length=length), history_df
+                        )
+
+            if family in [self.FAMILY_CCI, self.FAMILY_EMA_CROSS_FILTER_CCI]:
+                key = (Const.FLD_CCI, combination["length"])
+                if key not in indicators:
+                    indicators[key] = self._to_numpy(
+                        history_df.ta.cci(length=combination["length"]), history_df
+                    )
+
+        return indicators
+
+    def _get_signals(self, family: str, indicators: dict, combination: dict):
+        if family == self.FAMILY_CCI:
+            return self._get_cci_signals(
+                cci=indicators[(Const.FLD_CCI, combination["length"])],
+                min_value=combination["miv_value"],
+                max_value=combination["max_value"],
+            )
+
+        delta = (
+            indicators[(Const.FLD_EMA, combination["ema_short"])]
+            - indicators[(Const.FLD_EMA, combination["ema_long"])]
+        )
+
+        if family == self.FAMILY_EMA_CROSS:
+            return self._get_ema_cross_signals(delta)
+
+        return self._get_ema_cross_filter_cci_signals(
+            delta=delta,
+            cci=indicators[(Const.FLD_CCI, combination["length"])],
+            min_value=combination["miv_value"],
+            max_value=combination["max_value"],
+        )
+
+    def _get_cci_signals(self, cci, min_value: float, max_value: float):
+        # The same decisions as Strategy_CCI, 1 - BUY/STRONG_BUY, -1 - SELL/STRONG_SELL
+        signals = np.zeros(len(cci))
+        current = cci[1:]
+        previous = cci[:-1]
+
+        if max_value == 0 and min_value == 0:
+            buy = (current > max_value) & (previous < max_value)
+            sell = (current < max_value) & (previous > max_value)
+        else:
+            in_range = (current >= min_value) & (current <= max_value)
+            buy = ((current > max_value) & (previous < max_value)) | (
+                in_range & (previous < min_value)
+            )
+            sell = ((current < min_value) & (previous > min_value)) | (
+                in_range & (previous > max_value)
+            )
+
+        signals[1:] = np.where(buy, 1, np.where(sell, -1, 0))
+        return signals
+
+    def _get_ema_cross_signals(self, delta):
+        # The same decisions as EMA_30_CROSS_EMA_100
+        signals = np.zeros(len(delta))
+        current = delta[1:]
+        previous = delta[:-1]
+
+        buy = (current > 0) & (previous <= 0)
+        sell = (current <= 0) & (previous >= 0)
+
+        signals[1:] = np.where(buy, 1, np.where(sell, -1, 0))
+        return signals
+
+    def _get_ema_cross_filter_cci_signals(
+        self, delta, cci, min_value: float, max_value: float
+    ):
+        # The same decisions as Strategy_EMA_8_CROSS_EMA_30_FILTER_CCI_14:
+        # the cross of two previous bars is confirmed by CCI of the current bar
+        signals = np.zeros(len(delta))
+        target = delta[1:-1]
+        previous = delta[:-2]
+        current_cci = cci[2:]
+
+        buy = (target >= 0) & (previous < 0) & (current_cci > max_value)
+        sell = (target < 0) & (previous >= 0) & (current_cci < min_value)
+
+        signals[2:] = np.where(buy, 1, np.where(sell, -1, 0))
+        return signals
+
+    def _evaluate(
+        self, close, signals, combinations: list[dict], limit: int
+    ) -> list[dict]:
+        if limit:
+            close = close[-limit:]
+            signals = signals[:, -limit:]
+
+        # Signal-only position: it's opened by a signal at close of the bar and is held until an opposite
+        # signal, SL/TP and fees aren't applied
+        positions = (
+            pd.DataFrame(signals.T).replace(0, np.nan).ffill().fillna(0).to_numpy().T
+        )
+
+        bar_returns = np.zeros(len(close))
+        bar_returns[1:] = close[1:] / close[:-1] - 1
+
+        strategy_returns = np.zeros(positions.shape)
+        strategy_returns[:, 1:] = positions[:, :-1] * bar_returns[1:]
+
+        equity = np.cumprod(1 + strategy_returns, axis=1)
+        drawdowns = 1 - equity / np.maximum.accumulate(equity, axis=1)
+        trades = np.count_nonzero(np.diff(positions, axis=1), axis=1) + (
+            positions[:, 0] != 0
+        )
+
+        results = []
+        for i, combination in enumerate(combinations):
+            results.append(
+                {
+                    **combination,
+                    self.FLD_SIGNAL_RETURN: float(equity[i, -1] - 1),
+                    self.FLD_SIGNAL_MAX_DRAWDOWN: float(drawdowns[i].max()),
+                    self.FLD_TRADES: int(trades[i]),
+                }
+            )
+
+        return results
+
+    def _to_numpy(self, series: pd.Series, history_df: pd.DataFrame):
+        return series.reindex(history_df.index).to_numpy(dtype=float)
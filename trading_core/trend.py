@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 
 from .core import logger, config, Const
@@ -5,6 +6,7 @@ from .indicator import Indicator_CCI
 from .common import TraderSymbolIntervalLimitModel, IndicatorParamModel, IndicatorType
 
 GLOBAL_TREND_COUNT = 10
+TREND_MAX_WORKERS = 8
 # LOCAL_TREND_COUNT = 8
 # QUICK_TREND_COUNT = 6
 
@@ -37,28 +39,44 @@ class TrendCCI(TrendBase):
 
         # Get indecator CCI(50) data
         cci_50_df = self.__get_cci_data(length=50, param=param)
-
-        for i in range(len(cci_50_df) + 1):
-            if i < GLOBAL_TREND_COUNT:
-                continue
-
-            cci_info = self.__get_cci_info(
-                cci_50_df.iloc[i - GLOBAL_TREND_COUNT : i, 5]
-            )
-            trend_info = self.__get_trend_info(cci_info)
-
-            trends.append(trend_info)
-
-        df = pd.DataFrame(trends)
-        df.set_index(Const.COLUMN_DATETIME, inplace=True)
+        cci_series = cci_50_df[IndicatorType.CCI.name]
+
+        # Mean of the last GLOBAL_TREND_COUNT bars for every bar in one pass
+        df = pd.DataFrame(
+            {
+                IndicatorType.CCI.name: cci_series,
+                GLOBAL_TREND_COUNT: cci_series.rolling(GLOBAL_TREND_COUNT).mean(),
+            }
+        ).dropna(subset=[GLOBAL_TREND_COUNT])
+
+        df[Const.PARAM_TREND] = df[GLOBAL_TREND_COUNT].map(
+            lambda value: self.__get_trend_descr(value, 70)
+        )
+        df.index.name = Const.COLUMN_DATETIME
 
         return df
 
     def detect_trends(self, params: list[TraderSymbolIntervalLimitModel]):
         trends = []
 
-        for param in params:
-            trends.append(self.detect_trend(param))
+        if not params:
+            return trends
+
+        # History data of the symbols and intervals is fetched concurrently, the order of params is kept
+        with ThreadPoolExecutor(
+            max_workers=min(TREND_MAX_WORKERS, len(params))
+        ) as executor:
+            futures = [
+                executor.submit(self.detect_trend, param) for param in params
+            ]
+
+            for param, future in zip(params, futures):
+                try:
+                    trends.append(future.result())
+                except Exception as error:
+                    logger.error(
+                        f"{self.__class__.__name__}: detect_trend({param.symbol}, {param.interval}) - {error}"
+                    )
 
         return trends
 
@@ -72,7 +90,10 @@ class TrendCCI(TrendBase):
         limit = length_cci_50 + GLOBAL_TREND_COUNT + 1
 
         param_with_limit = TraderSymbolIntervalLimitModel(
-            param.symbol, interval=param.interval, limit=limit, consistency_check=False
+            trader_id=param.trader_id,
+            symbol=param.symbol,
+            interval=param.interval,
+            limit=limit,
         )
 
         cci_50_df = self.__get_cci_data(length=50, param=param_with_limit)
@@ -82,8 +103,9 @@ class TrendCCI(TrendBase):
         return {
             Const.PARAM_SYMBOL: param.symbol,
             Const.INTERVAL: param.interval,
+            Const.COLUMN_DATETIME: trend_info[Const.COLUMN_DATETIME],
+            IndicatorType.CCI.name: trend_info[IndicatorType.CCI.name],
             Const.PARAM_TREND: trend_info[Const.PARAM_TREND],
-            Const.PARAM_SIGNAL: trend_info[Const.PARAM_SIGNAL],
         }
 
     def __get_cci_data(